@@ -1,5 +1,8 @@
 // Ecuador a la Carta — js/data.js
-// Carga de datos: loadRecipes, loadPosts, loadPriceDb, showDataError
+// Carga de datos: loadRecipes, loadPosts, loadPriceDb, loadPriceIndex, loadMenus, showDataError
+// + índices y fichas por slug (data/manifest.json, scripts/build_shards.py)
+// Sin '?t=' + Date.now(): el navegador revalida (304) y en producción scripts/build_assets.py
+// cambia estas URLs por copias con hash que se cachean como inmutables
 
 'use strict';
 
@@ -8,9 +11,14 @@ import { escapeHtml } from './utils.js';
 const DATA_URL = 'recipes.json';
 const POSTS_URL = 'posts.json';
 const PRICES_URL = 'price_db.json';
+const PRICE_INDEX_URL = 'price_index.json';
+const MANIFEST_URL = 'data/manifest.json';
+const MENUS_URL = 'data/menus.json';
 
 let allRecipes = [];
 let priceDbCache = null;
+let priceIndexCache = null;
+let manifestPromise = null;
 
 export function showDataError(containerId, msg, retryFn) {
   var el = document.getElementById(containerId);
@@ -30,7 +38,7 @@ export function showDataError(containerId, msg, retryFn) {
 export async function loadRecipes() {
   console.log("[js/data.js] Iniciando fetch de recetas...");
   try {
-    var res = await fetch(DATA_URL + '?t=' + Date.now());
+    var res = await fetch(DATA_URL);
     console.log("[js/data.js] Respuesta de recetas:", res.status);
     if (!res.ok) throw new Error('HTTP ' + res.status);
     allRecipes = await res.json();
@@ -47,7 +55,7 @@ export async function loadRecipes() {
 export async function loadPriceDb() {
   if (priceDbCache) return priceDbCache;
   try {
-    var res = await fetch(PRICES_URL + '?t=' + Date.now());
+    var res = await fetch(PRICES_URL);
     if (!res.ok) return {};
     priceDbCache = await res.json();
     return priceDbCache;
@@ -57,10 +65,35 @@ export async function loadPriceDb() {
   }
 }
 
+// Mapa ingrediente -> clave de price_db generado por scripts/build_price_index.py
+export async function loadPriceIndex() {
+  if (priceIndexCache) return priceIndexCache;
+  try {
+    var res = await fetch(PRICE_INDEX_URL);
+    if (!res.ok) return null;
+    priceIndexCache = (await res.json()).bases || null;
+    return priceIndexCache;
+  } catch (err) {
+    return null;
+  }
+}
+
+// Menús semanales precalculados por scripts/build_menus.py (null si no se generaron)
+export async function loadMenus() {
+  try {
+    var res = await fetch(MENUS_URL);
+    if (!res.ok) return null;
+    var data = await res.json();
+    return data.menus && data.menus.length ? data : null;
+  } catch (err) {
+    return null;
+  }
+}
+
 export async function loadPosts() {
   console.log("[js/data.js] Iniciando fetch de posts...");
   try {
-    var res = await fetch(POSTS_URL + '?t=' + Date.now());
+    var res = await fetch(POSTS_URL);
     console.log("[js/data.js] Respuesta de posts:", res.status);
     if (!res.ok) throw new Error('HTTP ' + res.status);
     const data = await res.json();
@@ -73,3 +106,65 @@ export async function loadPosts() {
     return [];
   }
 }
+
+// ─── Datos fragmentados ───────────────────────────────────────
+// Los archivos de data/ llevan hash en el nombre; solo el manifest se revalida.
+// Si el manifest no existe se usa el JSON completo como antes.
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(MANIFEST_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .catch(function () { return null; });
+  }
+  return manifestPromise;
+}
+
+async function fetchShard(url) {
+  try {
+    var res = await fetch(url);
+    return res.ok ? await res.json() : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+async function loadIndex(kind, fallback) {
+  var manifest = await loadManifest();
+  if (manifest && manifest[kind]) {
+    var cards = await fetchShard(manifest[kind].index);
+    if (cards) return cards;
+  }
+  return fallback();
+}
+
+// Páginas generadas por scripts/prerender.py traen el registro embebido
+function prerenderedRecord(slug) {
+  var el = document.getElementById('prerender-data');
+  if (!el) return null;
+  try {
+    var record = JSON.parse(el.textContent);
+    return record && record.slug === slug ? record : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+async function loadBySlug(kind, slug, fallback) {
+  var embedded = prerenderedRecord(slug);
+  if (embedded) return embedded;
+  var manifest = await loadManifest();
+  var file = manifest && manifest[kind] && manifest[kind].items[slug];
+  if (file) {
+    var item = await fetchShard(file);
+    if (item) return item;
+  }
+  var all = await fallback();
+  return all.find(function (x) { return x.slug === slug; }) || null;
+}
+
+// Solo campos de tarjeta (renderCard / renderBlogCard)
+export function loadRecipeIndex() { return loadIndex('recipes', loadRecipes); }
+export function loadPostIndex() { return loadIndex('posts', loadPosts); }
+
+export function loadRecipe(slug) { return loadBySlug('recipes', slug, loadRecipes); }
+export function loadPost(slug) { return loadBySlug('posts', slug, loadPosts); }
@@ -0,0 +1,70 @@
+// Ecuador a la Carta — js/geo.js
+// Índice geográfico de data/geo/ (generado por scripts/build_geo.py): el mapa baja
+// index.json y solo las teselas que cubren lo visible, no recipes.json + posts.json
+
+'use strict';
+
+const GEO_INDEX_URL = 'data/geo/index.json';
+
+let indexPromise = null;
+const tileCache = {};
+
+export function loadGeoIndex() {
+  if (!indexPromise) {
+    indexPromise = fetch(GEO_INDEX_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .catch(function () { return null; });
+  }
+  return indexPromise;
+}
+
+// Web-mercator, igual que to_world() en build_geo.py
+function tileOf(lat, lng, zoom, tilePx) {
+  var size = tilePx * Math.pow(2, zoom);
+  var s = Math.sin(Math.max(-85.0511, Math.min(85.0511, lat)) * Math.PI / 180);
+  var x = (lng + 180) / 360 * size;
+  var y = (0.5 - Math.log((1 + s) / (1 - s)) / (4 * Math.PI)) * size;
+  return [Math.floor(x / tilePx), Math.floor(y / tilePx)];
+}
+
+// URLs de las teselas existentes que cubren bbox = [latMin, lngMin, latMax, lngMax]
+export function tilesForBounds(index, bbox, zoom) {
+  var tiles = (index && index.tiles[String(zoom)]) || {};
+  var a = tileOf(bbox[2], bbox[1], zoom, index.tile_px);
+  var b = tileOf(bbox[0], bbox[3], zoom, index.tile_px);
+  var urls = [];
+  for (var x = a[0]; x <= b[0]; x++) {
+    for (var y = a[1]; y <= b[1]; y++) {
+      if (tiles[x + '-' + y]) urls.push(tiles[x + '-' + y]);
+    }
+  }
+  return urls;
+}
+
+function loadTile(url) {
+  if (!tileCache[url]) {
+    tileCache[url] = fetch(url)
+      .then(function (res) { return res.ok ? res.json() : []; })
+      .catch(function () { return []; });
+  }
+  return tileCache[url];
+}
+
+// Elementos dentro de bbox: recetas, lugares y posts a max_zoom; grupos a zooms menores
+export async function loadVisible(index, bbox, zoom) {
+  if (!index) return [];
+  var z = zoom === undefined ? index.max_zoom : zoom;
+  var tiles = await Promise.all(tilesForBounds(index, bbox, z).map(loadTile));
+  return [].concat.apply([], tiles).filter(function (f) {
+    return f.lat >= bbox[0] && f.lat <= bbox[2] && f.lng >= bbox[1] && f.lng <= bbox[3];
+  });
+}
+
+// Lo más cercano a una ciudad (precalculado por región)
+export async function loadNearest(index, city) {
+  var info = index && index.cities[city];
+  var url = info && index.regions[info.region];
+  if (!url) return [];
+  var nearest = await loadTile(url);
+  return (nearest && nearest[city]) || [];
+}
@@ -0,0 +1,41 @@
+// Ecuador a la Carta — js/glossary.js
+// Enlaces del glosario precalculados (generados por scripts/build_glossary.py): posiciones
+// [inicio, fin, término] por texto, sin una regex por término y paso en cada visita
+
+'use strict';
+
+import { escapeHtml } from './utils.js';
+
+const LINKS_URL = 'data/glossary-links.json';
+const TERM_CLASS = 'glossary-term cursor-help border-b border-dotted border-ec-gold/50 hover:text-ec-gold transition-all';
+
+let linksPromise = null;
+
+export function loadGlossaryLinks() {
+  if (!linksPromise) {
+    linksPromise = fetch(LINKS_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .catch(function () { return null; });
+  }
+  return linksPromise;
+}
+
+// Texto plano + spans -> HTML escapado con los términos envueltos
+export function linkTerms(text, spans) {
+  if (!spans || !spans.length) return escapeHtml(text);
+  var html = '';
+  var pos = 0;
+  spans.forEach(function (span) {
+    html += escapeHtml(text.slice(pos, span[0])) +
+      '<span class="' + TERM_CLASS + '" data-term="' + escapeHtml(span[2]) + '">' +
+      escapeHtml(text.slice(span[0], span[1])) + '</span>';
+    pos = span[1];
+  });
+  return html + escapeHtml(text.slice(pos));
+}
+
+// Spans de un campo de la receta: field -> {"índice": spans}; {} si no tiene o no estaba en el build
+export function recipeSpans(links, slug, field) {
+  var recipe = links && links.recipes[slug];
+  return (recipe && recipe[field]) || {};
+}
@@ -6,12 +6,14 @@
 const LANG_KEY = 'ec_lang';
 const LANG_ES = 'es';
 const LANG_EN = 'en';
+// URLs literales: scripts/build_assets.py las reescribe a las versiones con hash
+const STRINGS_URLS = { es: 'i18n/es.json', en: 'i18n/en.json' };
 
 let _strings = {};
 
 async function loadStrings(lang) {
   try {
-    const res = await fetch('i18n/' + lang + '.json?v=' + Date.now());
+    const res = await fetch(STRINGS_URLS[lang] || STRINGS_URLS[LANG_ES]);
     if (!res.ok) return {};
     return await res.json();
   } catch (e) {
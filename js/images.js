@@ -0,0 +1,63 @@
+// Ecuador a la Carta — js/images.js
+// Variantes responsive de images/ (images/manifest.json, generado por scripts/build_images.py)
+
+"use strict";
+
+import { escapeHtml } from "./utils.js";
+
+const IMAGE_MANIFEST_URL = "images/manifest.json";
+// image_url de recetas/posts a veces apunta al repo en GitHub en vez de a /images
+const REPO_RAW_PREFIX = "https://raw.githubusercontent.com/LordRa2pat/recetas-ecuador/main/";
+
+let imageManifest = null;
+let imageManifestPromise = null;
+
+// Sin manifest (build no ejecutado) todo sigue usando la imagen original
+export function loadImageManifest() {
+  if (!imageManifestPromise) {
+    imageManifestPromise = fetch(IMAGE_MANIFEST_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .then(function (data) {
+        imageManifest = (data && data.images) || null;
+        return imageManifest;
+      })
+      .catch(function () { return null; });
+  }
+  return imageManifestPromise;
+}
+
+function imageEntry(src) {
+  if (!imageManifest || !src) return null;
+  var key = src.indexOf(REPO_RAW_PREFIX) === 0 ? src.slice(REPO_RAW_PREFIX.length) : src.replace(/^\//, "");
+  return imageManifest[key] || null;
+}
+
+// <img> para cards: <picture> con AVIF/WebP y placeholder difuminado si la imagen está en el manifest
+export function renderImage(src, alt, className, sizes) {
+  var entry = imageEntry(src);
+  var img = '<img src="' + escapeHtml(src) + '" alt="' + escapeHtml(alt) + '" class="' + className + '"';
+  if (!entry) return img + ">";
+
+  sizes = sizes || "(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw";
+  var sources = ["avif", "webp"]
+    .filter(function (fmt) { return entry.srcset[fmt]; })
+    .map(function (fmt) {
+      return '<source type="image/' + fmt + '" srcset="' + entry.srcset[fmt] + '" sizes="' + sizes + '">';
+    })
+    .join("");
+  return (
+    "<picture>" + sources +
+    img + ' width="' + entry.width + '" height="' + entry.height + '" decoding="async"' +
+    ' style="background:url(' + entry.placeholder + ') center/cover">' +
+    "</picture>"
+  );
+}
+
+// Hero (<img> ya existente en la página): srcset WebP, el navegador elige el ancho
+export function applyResponsiveImage(imgEl, src) {
+  var entry = imageEntry(src);
+  if (!entry || !entry.srcset.webp) return;
+  imgEl.style.background = "url(" + entry.placeholder + ") center/cover";
+  imgEl.sizes = "100vw";
+  imgEl.srcset = entry.srcset.webp;
+}
@@ -20,9 +20,13 @@ export function extractIngBase(ing) {
   return normText(t.split(',')[0].split(';')[0]);
 }
 
-export function findPriceEntry(ing, priceDb) {
+export function findPriceEntry(ing, priceDb, priceIndex) {
   if (!priceDb) return null;
   var name = extractIngBase(ing);
+  // price_index.json (scripts/build_price_index.py) ya resolvió los ingredientes conocidos
+  if (priceIndex && Object.prototype.hasOwnProperty.call(priceIndex, name)) {
+    return priceIndex[name] ? priceDb[priceIndex[name]] || null : null;
+  }
   if (priceDb[name]) return priceDb[name];
   for (var key in priceDb) {
     var nk = normText(key);
@@ -38,12 +42,18 @@ export function findPriceEntry(ing, priceDb) {
   return null;
 }
 
-export function renderIngredient(ing, priceDb) {
-  // Normalize: new n8n schema uses {name, quantity, where_to_buy} objects
-  var ingText = typeof ing === 'object' && ing !== null
+// Texto de un ingrediente. scripts/quality_gate.py --fix ya convierte en el build los
+// {name, quantity, where_to_buy} que agregan los flujos de n8n, pero los datos pueden llegar
+// sin pasar por él (desarrollo local, un paso del build que falló)
+export function ingredientText(ing) {
+  return typeof ing === 'object' && ing !== null
     ? (ing.quantity ? ing.quantity + ' de ' : '') + (ing.name || '') +
     (ing.where_to_buy ? ' (' + ing.where_to_buy + ')' : '')
     : String(ing);
+}
+
+export function renderIngredient(ing, priceDb, priceIndex) {
+  var ingText = ingredientText(ing);
 
   var lowerIng = ingText.toLowerCase();
   var badge = '';
@@ -57,11 +67,13 @@ export function renderIngredient(ing, priceDb) {
 
   var priceRow = '';
   if (priceDb) {
-    var entry = findPriceEntry(ingText, priceDb);
+    var entry = findPriceEntry(ingText, priceDb, priceIndex);
     if (entry && entry.reference_price_min) {
       var unit = entry.unit || 'kg';
-      var tMin = '$' + entry.reference_price_min.toFixed(2);
-      var sMax = '$' + (entry.reference_price_max || entry.reference_price_min).toFixed(2);
+      // Precio vivo de cada tienda si scripts/price_refresh.py lo aceptó, ya convertido a la unidad
+      // de la entrada (unit_price; `price` es por paquete); si no, la referencia curada
+      var tMin = '$' + (entry.tuti && entry.tuti.unit_price ? entry.tuti.unit_price : entry.reference_price_min).toFixed(2);
+      var sMax = '$' + (entry.supermaxi && entry.supermaxi.unit_price ? entry.supermaxi.unit_price : (entry.reference_price_max || entry.reference_price_min)).toFixed(2);
       priceRow = '<div class="ml-8 mt-1 flex flex-wrap gap-1.5">' +
         '<span title="Precio referencia Tuti" class="inline-flex items-center gap-1 text-xs text-red-600 bg-red-50 border border-red-100 px-2 py-0.5 rounded-full">' +
         '<span class="font-bold">Tuti</span> ' + tMin + '/' + unit +
@@ -5,6 +5,7 @@
 
 import { escapeHtml } from "./utils.js";
 import { renderInFeedAd } from "./ads.js";
+import { renderImage } from "./images.js";
 
 // ─── Audience chip ────────────────────────────────────────────
 export function getAudienceChip(recipe) {
@@ -56,7 +57,7 @@ export function renderCard(recipe) {
   // YouTube Thumbnail Engine (Auto-Visuals)
   var img = "";
   if (recipe.image_url && recipe.image_url.trim() !== "") {
-    img = escapeHtml(recipe.image_url);
+    img = recipe.image_url;
   } else if (recipe.youtube_videos && recipe.youtube_videos.length > 0) {
     // Buscar primer video que no sea de canal KIWA si es posible
     var validVideo = recipe.youtube_videos.find(v => {
@@ -70,13 +71,12 @@ export function renderCard(recipe) {
   }
 
   if (!img) img = "images/default-recipe.jpg";
-  var imgAlt = escapeHtml(recipe.image_alt || recipe.title);
 
   return (
     '<article class="group relative rounded-[48px] overflow-hidden glass-card shadow-[0_10px_30px_-10px_rgba(0,0,0,0.5)] border border-white/5 hover:border-ec-gold/20 hover:shadow-[0_20px_50px_-15px_rgba(220,160,17,0.2)] transition-all duration-700 hover:-translate-y-2">' +
     '<a href="recipe.html?slug=' + encodeURIComponent(recipe.slug) + '" class="block h-full flex flex-col" aria-label="' + escapeHtml(recipe.title) + '">' +
     '<div class="relative h-72 overflow-hidden">' +
-    '<img src="' + img + '" alt="' + imgAlt + '" class="w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110">' +
+    renderImage(img, recipe.image_alt || recipe.title, "w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110") +
     '<div class="absolute inset-0 bg-gradient-to-t from-[#0B1221] via-[#0B1221]/40 to-transparent opacity-90 transition-opacity duration-500 group-hover:opacity-100"></div>' +
     '<div class="absolute inset-0 bg-ec-gold/10 mix-blend-overlay opacity-0 group-hover:opacity-100 transition-opacity duration-700"></div>' +
     (chip ? '<div class="absolute top-8 left-8 z-10">' + chip + "</div>" : "") +
@@ -318,15 +318,14 @@ export function renderGridWithAds(recipes, gridEl, adsInterval) {
 // ─── Blog Card ─────────────────────────────────────────────
 export function renderBlogCard(post) {
   var img = post.image_url && post.image_url.trim() !== ""
-    ? escapeHtml(post.image_url)
+    ? post.image_url
     : "images/default-turismo.jpg";
-  var imgAlt = escapeHtml(post.image_alt || post.title);
 
   return (
     '<article class="group relative rounded-[48px] overflow-hidden glass-card shadow-[0_10px_30px_-10px_rgba(0,0,0,0.5)] border border-white/5 hover:border-ec-gold/20 hover:shadow-[0_20px_50px_-15px_rgba(220,160,17,0.2)] transition-all duration-700 hover:-translate-y-2">' +
     '<a href="post.html?slug=' + encodeURIComponent(post.slug) + '" class="block h-full flex flex-col" aria-label="' + escapeHtml(post.title) + '">' +
     '<div class="relative h-72 overflow-hidden">' +
-    '<img src="' + img + '" alt="' + imgAlt + '" class="w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110">' +
+    renderImage(img, post.image_alt || post.title, "w-full h-full object-cover transition-transform duration-1000 group-hover:scale-110") +
     '<div class="absolute inset-0 bg-gradient-to-t from-[#0B1221] via-[#0B1221]/40 to-transparent opacity-90 transition-opacity duration-500 group-hover:opacity-100"></div>' +
     '<div class="absolute inset-0 bg-ec-gold/10 mix-blend-overlay opacity-0 group-hover:opacity-100 transition-opacity duration-700"></div>' +
     (post.featured ? '<div class="absolute top-8 left-8 z-10"><span class="inline-flex items-center gap-2 px-3 py-1 rounded-full text-[9px] font-black uppercase tracking-widest bg-ec-gold text-[#0B1221] shadow-[0_0_15px_rgba(220,160,17,0.4)] border border-white/20">Destacado</span></div>' : "") +
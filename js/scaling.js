@@ -0,0 +1,118 @@
+// Ecuador a la Carta — js/scaling.js
+// Escalado de porciones sobre data/scaling.json (generado por scripts/scaling.py):
+// cantidades ya parseadas en columnas, sin regex por ingrediente en cada clic
+
+'use strict';
+
+const SCALING_URL = 'data/scaling.json';
+
+// unidad -> [dimensión, factor a g / ml / unidad]  (igual que UNIT_TABLE en scaling.py)
+const UNIT_TABLE = {
+  g: [0, 1], kg: [0, 1000], lb: [0, 453.592], oz: [0, 28.3495],
+  ml: [1, 1], l: [1, 1000], taza: [1, 240], cucharada: [1, 15], cucharadita: [1, 5]
+};
+const PLURALS = {
+  taza: 'tazas', cucharada: 'cucharadas', cucharadita: 'cucharaditas', pizca: 'pizcas', diente: 'dientes',
+  rama: 'ramas', hoja: 'hojas', atado: 'atados', lata: 'latas', paquete: 'paquetes', unidad: 'unidades'
+};
+const PLURAL_WORDS = Object.keys(PLURALS).map(function (u) { return PLURALS[u]; });
+const FAMILIES = {
+  g: ['kg', 'g'], kg: ['kg', 'g'], ml: ['l', 'ml'], l: ['l', 'ml'],
+  taza: ['taza', 'cucharada', 'cucharadita'], cucharada: ['taza', 'cucharada', 'cucharadita'],
+  cucharadita: ['taza', 'cucharada', 'cucharadita']
+};
+const MIN_SHOWN = { kg: 1000, g: 0, l: 1000, ml: 0, taza: 60, cucharada: 15, cucharadita: 0 };
+const FRACTIONS = [[0, ''], [1 / 4, '1/4'], [1 / 3, '1/3'], [1 / 2, '1/2'], [2 / 3, '2/3'], [3 / 4, '3/4'], [1, '']];
+const SINGULAR = ['1', '1/4', '1/3', '1/2', '2/3', '3/4'];
+const SIZE_RE = /^(median[oa]|pequeñ[oa]|grande)\b/;
+
+let tablePromise = null;
+
+function buildTable(data) {
+  var n = data.qty.length;
+  var base = new Float64Array(n);
+  var unit = new Uint8Array(data.unit);
+  for (var i = 0; i < n; i++) {
+    var u = UNIT_TABLE[data.units[unit[i]]];
+    base[i] = data.qty[i] === null ? NaN : data.qty[i] * (u ? u[1] : 1);
+  }
+  var index = {};
+  data.slugs.forEach(function (slug, i) { index[slug] = i; });
+  return {
+    index: index,
+    units: data.units,
+    exponent: data.spice_exponent,
+    servings: new Float64Array(data.servings),
+    offsets: new Int32Array(data.offsets),
+    base: base,
+    unit: unit,
+    spice: new Uint8Array(data.spice),
+    shown: new Uint8Array(data.shown),
+    tails: data.tails
+  };
+}
+
+// Sin data/scaling.json (build no ejecutado) el calculador usa su escalado básico
+export function loadScalingTable() {
+  if (!tablePromise) {
+    tablePromise = fetch(SCALING_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .then(function (data) { return data ? buildTable(data) : null; })
+      .catch(function () { return null; });
+  }
+  return tablePromise;
+}
+
+// Math.round redondea .5 hacia arriba, igual que round_half_up() en scaling.py
+function formatNumber(value, unit) {
+  if (unit === 'g' || unit === 'ml') {
+    var step = value >= 50 ? 5 : 1;
+    return String(Math.max(step, Math.round(value / step) * step));
+  }
+  if (value >= 10) return String(Math.round(value));
+  var whole = Math.floor(value);
+  var best = FRACTIONS[0];
+  FRACTIONS.forEach(function (f) {
+    if (Math.abs(f[0] - (value - whole)) < Math.abs(best[0] - (value - whole))) best = f;
+  });
+  if (best[0] === 1) whole += 1;
+  if (whole === 0 && !best[1]) return '1/4';
+  if (!best[1]) return String(whole);
+  return whole ? whole + ' ' + best[1] : best[1];
+}
+
+// Cantidad en g / ml / unidades -> texto en la unidad más legible de la misma familia
+export function formatQuantity(baseValue, unit, showUnit) {
+  var family = FAMILIES[unit];
+  var value = baseValue / (UNIT_TABLE[unit] ? UNIT_TABLE[unit][1] : 1);
+  if (family) {
+    unit = family[family.length - 1];
+    for (var i = 0; i < family.length; i++) {
+      if (baseValue >= MIN_SHOWN[family[i]]) { unit = family[i]; break; }
+    }
+    value = baseValue / UNIT_TABLE[unit][1];
+  }
+  var number = formatNumber(value, unit);
+  if (showUnit === false || !unit) return number;
+  return number + ' ' + (SINGULAR.indexOf(number) !== -1 ? unit : PLURALS[unit] || unit);
+}
+
+// Líneas de ingredientes de `slug` para `servings` porciones (null si la receta no está en la tabla)
+export function scaleRecipe(table, slug, servings) {
+  var r = table ? table.index[slug] : undefined;
+  if (r === undefined) return null;
+  var ratio = servings / table.servings[r];
+  var spiceRatio = Math.pow(ratio, table.exponent);
+  var lines = [];
+  for (var i = table.offsets[r]; i < table.offsets[r + 1]; i++) {
+    var tail = table.tails[i];
+    if (isNaN(table.base[i])) { lines.push(tail); continue; }
+    var unit = table.units[table.unit[i]];
+    var qty = formatQuantity(table.base[i] * (table.spice[i] ? spiceRatio : ratio), unit, !!table.shown[i]);
+    if (table.shown[i] && PLURAL_WORDS.indexOf(qty.split(' ').pop()) !== -1) {
+      tail = tail.replace(SIZE_RE, '$1s');
+    }
+    lines.push(qty + (tail === '' || tail.charAt(0) === ',' ? tail : ' ' + tail));
+  }
+  return lines;
+}
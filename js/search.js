@@ -0,0 +1,71 @@
+// Ecuador a la Carta — js/search.js
+// Búsqueda sobre search-index.json (generado por scripts/build_search_index.py)
+
+'use strict';
+
+import { normText } from './prices.js';
+
+const INDEX_URL = 'search-index.json';
+const STOPWORDS = new Set('a al con como de del el en es la las lo los mas o para por que se sin su sus un una y'.split(' '));
+
+let indexPromise = null;
+
+export function loadSearchIndex() {
+  if (!indexPromise) {
+    indexPromise = fetch(INDEX_URL)
+      .then(function (res) { return res.ok ? res.json() : null; })
+      .catch(function () { return null; });
+  }
+  return indexPromise;
+}
+
+// Términos buscables de un texto; [] si la consulta es solo de 1 letra o palabras vacías
+export function tokenize(text) {
+  return (normText(text).match(/[a-z0-9]+/g) || []).filter(function (t) {
+    return t.length > 1 && !STOPWORDS.has(t);
+  });
+}
+
+// Todos los términos que empiezan con `token` (búsqueda binaria sobre la lista ordenada).
+// Sin tope: script.js usa el resultado como filtro exclusivo, y escribir una letra más
+// nunca debe devolver recetas que el prefijo más corto había descartado.
+function expand(terms, token) {
+  var lo = 0, hi = terms.length;
+  while (lo < hi) {
+    var mid = (lo + hi) >> 1;
+    if (terms[mid] < token) lo = mid + 1; else hi = mid;
+  }
+  var out = [];
+  while (lo < terms.length && terms[lo].indexOf(token) === 0) out.push(lo++);
+  return out;
+}
+
+// Devuelve [{kind: 'r'|'p', slug, score}] ordenado; todos los términos deben coincidir (como prefijo)
+export function searchIndex(index, query, kind) {
+  var tokens = tokenize(query);
+  if (!index || !tokens.length) return [];
+  var totals = null;
+  for (var i = 0; i < tokens.length; i++) {
+    var best = new Map();
+    expand(index.terms, tokens[i]).forEach(function (ti) {
+      var plist = index.postings[ti];
+      for (var j = 0; j < plist.length; j += 2) {
+        if (plist[j + 1] > (best.get(plist[j]) || -1)) best.set(plist[j], plist[j + 1]);
+      }
+    });
+    if (totals === null) {
+      totals = best;
+    } else {
+      var next = new Map();
+      totals.forEach(function (s, d) { if (best.has(d)) next.set(d, s + best.get(d)); });
+      totals = next;
+    }
+    if (!totals.size) return [];
+  }
+  var results = [];
+  totals.forEach(function (score, d) {
+    var doc = index.docs[d];
+    if (!kind || doc[0] === kind) results.push({ kind: doc[0], slug: doc[1], score: score / (index.scale || 100) });
+  });
+  return results.sort(function (a, b) { return b.score - a.score; });
+}
@@ -3,7 +3,7 @@
 
 'use strict';
 
-import { escapeHtml, timeToISO8601 } from './utils.js';
+import { escapeHtml, timeToISO8601, keywordList } from './utils.js';
 
 // ─── Meta upsert ─────────────────────────────────────────────
 export function upsertMeta(attrName, attrValue, content) {
@@ -45,11 +45,7 @@ export function setMeta(title, description, imageUrl, canonicalUrl) {
 export function injectSEO(recipe) {
   var canonicalUrl = 'https://ecuadoralacarta.com/recipe.html?slug=' + encodeURIComponent(recipe.slug);
   var imageUrl = recipe.image_url || '';
-  var rawKeywords = recipe.keywords || [];
-  if (typeof rawKeywords === 'string') {
-    rawKeywords = rawKeywords.split(',').map(function (s) { return s.trim(); });
-  }
-  var allKeywords = rawKeywords.concat(['recetas ecuatorianas', 'cocina ecuatoriana', 'gastronomia ecuatoriana', 'Ecuador a la Carta']).join(', ');
+  var allKeywords = keywordList(recipe.keywords).concat(['recetas ecuatorianas', 'cocina ecuatoriana', 'gastronomia ecuatoriana', 'Ecuador a la Carta']).join(', ');
 
   setMeta(
     recipe.meta_title || (recipe.title + ' \u2014 Receta Ecuatoriana Aut\u00e9ntica | Cocina Ecuador \uD83C\uDDEA\uD83C\uDDE8'),
@@ -145,11 +141,7 @@ export function injectSEO(recipe) {
 export function injectPostSEO(post) {
   var canonicalUrl = 'https://ecuadoralacarta.com/post.html?slug=' + encodeURIComponent(post.slug);
   var imageUrl = post.image_url || '';
-  var rawKeywords = post.keywords || [];
-  if (typeof rawKeywords === 'string') {
-    rawKeywords = rawKeywords.split(',').map(function (s) { return s.trim(); });
-  }
-  var keywords = rawKeywords.concat(['turismo ecuador', 'viaje ecuador', 'destinos ecuador']).join(', ');
+  var keywords = keywordList(post.keywords).concat(['turismo ecuador', 'viaje ecuador', 'destinos ecuador']).join(', ');
 
   setMeta(
     post.meta_title || (post.title + ' | Turismo Ecuador \uD83C\uDDEA\uD83C\uDDE8'),
@@ -1,5 +1,5 @@
 // Ecuador a la Carta — js/utils.js
-// Utilidades: trackEvent, escapeHtml, debounce, timeToISO8601, parseMinutes, sortRecipes
+// Utilidades: trackEvent, escapeHtml, debounce, timeToISO8601, parseMinutes, sortRecipes, keywordList, cityName
 // + delegación global de clicks para tracking
 
 'use strict';
@@ -61,6 +61,19 @@ export function sortRecipes(recipes, sortBy) {
   return copy;
 }
 
+// keywords / seo_keywords de n8n pueden llegar como texto "a, b, c" si el build no pasó por
+// scripts/quality_gate.py --fix
+export function keywordList(keywords) {
+  if (!keywords) return [];
+  if (typeof keywords === 'string') return keywords.split(',').map(function(s) { return s.trim(); }).filter(Boolean);
+  return keywords;
+}
+
+// origin_cities: {city, province, region} tras el quality gate, o solo el nombre desde n8n
+export function cityName(city) {
+  return typeof city === 'object' && city !== null ? city.city : city;
+}
+
 // Delegación global para clicks en tarjetas de receta/post
 document.addEventListener('click', function(e) {
   var anchor = e.target.closest('a[data-track-type]');
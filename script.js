@@ -4,9 +4,9 @@
 //          js/render.js, js/seo.js, js/prices.js, js/i18n.js
 // ============================================================
 
-import { trackEvent, escapeHtml, debounce, sortRecipes } from "./js/utils.js";
+import { trackEvent, escapeHtml, debounce, sortRecipes, keywordList, cityName } from "./js/utils.js";
 import { initI18n } from "./js/i18n.js";
-import { loadRecipes, loadPosts, loadPriceDb } from "./js/data.js";
+import { loadRecipes, loadRecipeIndex, loadPriceDb, loadPriceIndex, loadRecipe, loadPost, loadPostIndex, loadMenus } from "./js/data.js";
 import { initAds } from "./js/ads.js";
 import {
   getAudienceChip,
@@ -21,7 +21,12 @@ import {
   renderFaqsSection,
 } from "./js/render.js";
 import { injectSEO, injectPostSEO, setMeta, injectIndexSEO } from "./js/seo.js";
-import { renderIngredient } from "./js/prices.js";
+import { findPriceEntry, renderIngredient, ingredientText } from "./js/prices.js";
+import { loadSearchIndex, searchIndex, tokenize } from "./js/search.js";
+import { loadImageManifest, applyResponsiveImage } from "./js/images.js";
+import { loadScalingTable, scaleRecipe } from "./js/scaling.js";
+import { loadGeoIndex, loadVisible } from "./js/geo.js";
+import { loadGlossaryLinks, linkTerms, recipeSpans } from "./js/glossary.js";
 
 // ─── Safe LocalStorage Wrapper ──────────────────────────────
 const safeLS = {
@@ -32,7 +37,8 @@ const safeLS = {
 // ─── Página: INDEX ────────────────────────────────────────────
 async function initIndex() {
   console.log("[v3.5] Iniciando Index...");
-  var recipes = await loadRecipes();
+  // Solo fichas (data/recipes/index.*.json); recipes.json completo si no hay manifest
+  var [recipes] = await Promise.all([loadRecipeIndex(), loadImageManifest()]);
   console.log("[v3.5] Recetas cargadas:", recipes.length);
 
   // Mapeo a la nueva estructura V2.5
@@ -62,7 +68,7 @@ async function initIndex() {
   injectIndexSEO();
   initMapNavigation();
   initThemeEngine(); // Sistema de Temas V3.5
-  initCalentadoGenerator(recipes);
+  initCalentadoGenerator();
   initHomeAds();
   initMenuPlanner();
   initDigitalStore();
@@ -90,7 +96,7 @@ async function initIndex() {
 // ─── Componente: BLOG PREVIEW ─────────────────────────────────
 async function loadBlogPreview() {
   console.log("[v3.5] Cargando vista previa del blog...");
-  const posts = await loadPosts();
+  const [posts] = await Promise.all([loadPostIndex(), loadImageManifest()]);
   console.log("[v3.5] Posts cargados:", posts.length);
   const grid = document.getElementById("blog-preview-grid");
   if (!grid) return;
@@ -104,7 +110,7 @@ async function loadBlogPreview() {
 
 // ─── Página: LISTADO ──────────────────────────────────────────
 async function initListing() {
-  var recipes = await loadRecipes();
+  var [recipes, searchIdx] = await Promise.all([loadRecipeIndex(), loadSearchIndex(), loadImageManifest()]);
   var grid = document.getElementById("recipes-grid");
   var resultsCount = document.getElementById("results-count");
   var searchInput = document.getElementById("filter-search");
@@ -153,14 +159,23 @@ async function initListing() {
     var audience = audienceSel ? audienceSel.value : "";
     var sort = sortSel ? sortSel.value : "recent";
 
+    // Índice invertido (search-index.json): unas pocas búsquedas en vez de escanear cada receta.
+    // Consultas sin términos indexables ("a", "de", "con") usan el filtro por subcadena
+    var qMatches = null;
+    if (q && searchIdx && tokenize(q).length) {
+      qMatches = new Set(searchIndex(searchIdx, q, "r").map(function (x) { return x.slug; }));
+    }
+
     var filtered = recipes.filter(function (r) {
-      if (q) {
+      if (qMatches) {
+        if (!qMatches.has(r.slug)) return false;
+      } else if (q) {
         var haystack = (
           r.title +
           " " +
           (r.description || "") +
           " " +
-          (r.keywords || []).join(" ")
+          keywordList(r.keywords).join(" ")
         ).toLowerCase();
         if (haystack.indexOf(q) === -1) return false;
       }
@@ -169,7 +184,7 @@ async function initListing() {
       var urlParams = new URLSearchParams(window.location.search);
       var cityFilter = urlParams.get("city");
       if (cityFilter) {
-        if (!(r.origin_cities && r.origin_cities.includes(cityFilter))) return false;
+        if (!(r.origin_cities && r.origin_cities.some((c) => cityName(c) === cityFilter))) return false;
       }
 
       if (region && r.region !== region) return false;
@@ -545,8 +560,7 @@ async function initRecipe() {
     return;
   }
 
-  const recipes = await loadRecipes();
-  const recipe = recipes.find(r => r.slug === slug);
+  const [recipe] = await Promise.all([loadRecipe(slug), loadImageManifest()]);
 
   if (!recipe) {
     if (loadingEl) loadingEl.classList.add("hidden");
@@ -598,12 +612,13 @@ async function initRecipe() {
       if (v && v.videoId) img = "https://img.youtube.com/vi/" + v.videoId + "/maxresdefault.jpg";
     }
     heroImg.src = img || "https://images.unsplash.com/photo-1547517023-7ca0c162f816?w=1200";
+    applyResponsiveImage(heroImg, img);
   }
 
   // Ingredients and Instructions (New containers)
   const ingList = document.getElementById("ingredients-list");
   if (ingList && recipe.ingredients) {
-    ingList.innerHTML = recipe.ingredients.map(ing => `
+    ingList.innerHTML = recipe.ingredients.map(ingredientText).map(ing => `
           <li class="flex items-start gap-4 text-white/40 hover:text-white transition-colors group cursor-default">
             <span class="w-1.5 h-1.5 rounded-full bg-ec-gold group-hover:scale-150 transition-transform mt-2"></span>
             <span class="text-sm tracking-[0.05em] font-light italic">${escapeHtml(ing)}</span>
@@ -639,7 +654,7 @@ async function initRecipe() {
   initRating(slug);
   initFavoritesAndSticky(recipe);
   initAds();
-  initGlossary();
+  initGlossary(recipe);
   initSpotifyPlayer(recipe);
   initSpicySlider(recipe);
   initCalculator(recipe);
@@ -662,7 +677,7 @@ async function initRecipe() {
       const ingList = document.getElementById("ingredients-list");
 
       if (ingList && recipe.ingredients) {
-        let displayIngredients = [...recipe.ingredients];
+        let displayIngredients = recipe.ingredients.map(ingredientText);
 
         if (active && recipe.diaspora_substitutes) {
           recipe.diaspora_substitutes.forEach(sub => {
@@ -690,7 +705,7 @@ async function initRecipe() {
 
 // ─── Página: BLOG ─────────────────────────────────────────────
 async function initBlog() {
-  var posts = await loadPosts();
+  var [posts] = await Promise.all([loadPostIndex(), loadImageManifest()]);
   var grid = document.getElementById("blog-grid");
   var resultsCount = document.getElementById("blog-results-count");
   var searchInput = document.getElementById("blog-search");
@@ -743,7 +758,7 @@ async function initBlog() {
           " " +
           (p.description || "") +
           " " +
-          (p.keywords || []).join(" ")
+          keywordList(p.keywords).join(" ")
         ).toLowerCase();
         if (hay.indexOf(q) === -1) return false;
       }
@@ -812,14 +827,7 @@ async function initPost() {
     return;
   }
 
-  var posts = await loadPosts();
-  var post = null;
-  for (var i = 0; i < posts.length; i++) {
-    if (posts[i].slug === slug) {
-      post = posts[i];
-      break;
-    }
-  }
+  var [post] = await Promise.all([loadPost(slug), loadImageManifest()]);
 
   if (loadingEl) loadingEl.classList.add("hidden");
 
@@ -847,7 +855,9 @@ async function initPost() {
       post.image_url ||
       "https://images.unsplash.com/photo-1555881400-74d7acaacd8b?w=1200&q=80";
     heroImg.alt = post.image_alt || post.title;
+    applyResponsiveImage(heroImg, post.image_url);
     heroImg.onerror = function () {
+      this.removeAttribute("srcset");
       this.src =
         "https://images.unsplash.com/photo-1555881400-74d7acaacd8b?w=1200&q=80";
     };
@@ -912,12 +922,12 @@ async function initPost() {
             '<details class="group px-5 py-4 cursor-pointer">' +
             '<summary class="font-semibold text-gray-800 text-sm list-none flex items-center justify-between gap-2">' +
             "<span>" +
-            escapeHtml(faq.q) +
+            escapeHtml(faq.q || faq.question || '') +
             "</span>" +
             '<span class="text-[#0033A0] font-bold text-lg flex-shrink-0">+</span>' +
             "</summary>" +
             '<p class="text-gray-600 text-sm mt-2 leading-relaxed">' +
-            escapeHtml(faq.a) +
+            escapeHtml(faq.a || faq.answer || '') +
             "</p>" +
             "</details>"
           );
@@ -929,7 +939,7 @@ async function initPost() {
 
   var relatedEl = document.getElementById("post-related-recipes");
   if (relatedEl && post.region) {
-    var recipes = await loadRecipes();
+    var recipes = await loadRecipeIndex();
     var related = recipes
       .filter(function (r) {
         return r.region === post.region;
@@ -1000,33 +1010,65 @@ function initRating(slug) {
 }
 
 // ─── Diccionario de la Abuela (Tooltips) ──────────────────────
-async function initGlossary() {
-  try {
-    const response = await fetch('glossary.json');
-    const glossary = await response.json();
-
-    // Escanear ingredientes e instrucciones
-    const containers = [
-      document.getElementById("ingredients-list"),
-      document.getElementById("instructions-list"),
-      document.getElementById("recipe-description")
-    ];
+// Con data/glossary-links.json (scripts/build_glossary.py) los términos ya vienen ubicados;
+// sin él, o para recetas publicadas después del build, se buscan término por término con regex
+function applyGlossaryLinks(recipe, links) {
+  const fill = (elements, field, texts) => {
+    const spans = recipeSpans(links, recipe.slug, field);
+    Array.from(elements).forEach((el, i) => {
+      const text = texts[i];
+      // Solo si el texto mostrado sigue siendo el original (p. ej. no escalado por la calculadora)
+      if (spans[i] && typeof text === "string" && el.textContent.trim() === text.trim()) {
+        el.innerHTML = linkTerms(text, spans[i]);
+      }
+    });
+  };
+  fill([document.getElementById("recipe-description")].filter(Boolean), "description", [recipe.description]);
+  fill(document.querySelectorAll("#ingredients-list li > span:last-child"), "ingredients", recipe.ingredients || []);
+  fill(document.querySelectorAll("#instructions-list .instruction-line p"), "instructions", recipe.instructions || []);
+  fill([document.getElementById("yapa-content")].filter(Boolean), "tips", recipe.tips || []);
+}
 
-    containers.forEach(container => {
-      if (!container) return;
+function applyGlossaryRegex(glossary) {
+  // Escanear ingredientes e instrucciones
+  const containers = [
+    document.getElementById("ingredients-list"),
+    document.getElementById("instructions-list"),
+    document.getElementById("recipe-description")
+  ];
 
-      let html = container.innerHTML;
-      // Ordenamos los términos por longitud (descendente) para evitar colisiones (ej. "achiote" vs "achi")
-      const sortedKeys = Object.keys(glossary).sort((a, b) => b.length - a.length);
+  containers.forEach(container => {
+    if (!container) return;
 
-      sortedKeys.forEach(key => {
-        const item = glossary[key];
-        // Solo reemplazar texto que no esté ya dentro de una etiqueta glossary-term
-        const regex = new RegExp(`\\b(${item.term})\\b(?![^<]*>|[^<>]*<\/span>)`, 'gi');
-        html = html.replace(regex, `<span class="glossary-term cursor-help border-b border-dotted border-ec-gold/50 hover:text-ec-gold transition-all" data-term="${key}">$1</span>`);
-      });
-      container.innerHTML = html;
+    let html = container.innerHTML;
+    // Ordenamos los términos por longitud (descendente) para evitar colisiones (ej. "achiote" vs "achi")
+    const sortedKeys = Object.keys(glossary).sort((a, b) => b.length - a.length);
+
+    sortedKeys.forEach(key => {
+      const item = glossary[key];
+      // Solo reemplazar texto que no esté ya dentro de una etiqueta glossary-term
+      const regex = new RegExp(`\\b(${item.term})\\b(?![^<]*>|[^<>]*<\/span>)`, 'gi');
+      html = html.replace(regex, `<span class="glossary-term cursor-help border-b border-dotted border-ec-gold/50 hover:text-ec-gold transition-all" data-term="${key}">$1</span>`);
     });
+    container.innerHTML = html;
+  });
+}
+
+async function initGlossary(recipe) {
+  try {
+    const links = recipe ? await loadGlossaryLinks() : null;
+    let glossary;
+
+    if (links) {
+      glossary = links.terms;
+      // Cada receta del build tiene entrada (aunque sea vacía); las auto-publicadas después, no
+      if (links.recipes[recipe.slug]) applyGlossaryLinks(recipe, links);
+      else applyGlossaryRegex(glossary);
+    } else {
+      const response = await fetch('glossary.json');
+      glossary = await response.json();
+      applyGlossaryRegex(glossary);
+    }
 
     // Event listener para tooltips (Simplificado para V3.0)
     document.querySelectorAll('.glossary-term').forEach(el => {
@@ -1047,7 +1089,7 @@ async function initMapNavigation() {
   if (!wrapper) return;
 
   try {
-    const response = await fetch('mapa.svg?t=' + Date.now());
+    const response = await fetch('mapa.svg');
     let svgText = await response.text();
     const svgStart = svgText.indexOf('<svg');
     if (svgStart !== -1) svgText = svgText.substring(svgStart);
@@ -1135,20 +1177,23 @@ function applyTheme(theme) {
 }
 
 // ─── Generador de Calentado (Buscador Inverso) ─────────────
-function initCalentadoGenerator(recipes) {
+function initCalentadoGenerator() {
   const input = document.getElementById("calentado-input");
   const btn = document.getElementById("calentado-btn");
   const results = document.getElementById("calentado-results");
 
   if (!btn || !input || !results) return;
 
-  btn.addEventListener("click", () => {
+  btn.addEventListener("click", async () => {
     const query = input.value.toLowerCase().trim();
     if (!query) return;
 
+    // Busca en los ingredientes, que las fichas no traen: recipes.json solo se pide al usarlo
+    const recipes = await loadRecipes();
+
     // Algoritmo de coincidencia parcial
     const matches = recipes.filter(r => {
-      const allText = (r.ingredients.join(" ") + " " + r.title + " " + r.description).toLowerCase();
+      const allText = ((r.ingredients || []).map(ingredientText).join(" ") + " " + r.title + " " + r.description).toLowerCase();
       return query.split(/[\s,]+/).some(q => q.length > 2 && allText.includes(q));
     });
 
@@ -1185,10 +1230,12 @@ function initCalculator(recipe) {
   let currentServings = baseServings;
   countDisplay.textContent = currentServings;
 
-  const updateIngredients = (newServings) => {
+  const updateIngredients = async (newServings) => {
     const ratio = newServings / baseServings;
 
-    const scaledIngredients = recipe.ingredients.map(ing => {
+    // Cantidades pre-parseadas (data/scaling.json); si no está, escalado por regex
+    const table = await loadScalingTable();
+    const scaledIngredients = scaleRecipe(table, recipe.slug, newServings) || recipe.ingredients.map(ingredientText).map(ing => {
       // RegEx para detectar números al inicio
       const match = ing.match(/^([\d.,/]+)\s*(.*)$/);
       if (match) {
@@ -1338,17 +1385,13 @@ async function calculateEstimatedPrice(recipe) {
   if (!priceBox) return;
 
   try {
-    const response = await fetch('price_db.json');
-    const db = await response.json();
+    // price_index.json resuelve cada ingrediente en O(1); sin él, findPriceEntry recorre price_db
+    const [db, index] = await Promise.all([loadPriceDb(), loadPriceIndex()]);
     let total = 0;
 
-    recipe.ingredients.forEach(ing => {
-      const lower = ing.toLowerCase();
-      Object.keys(db).forEach(key => {
-        if (lower.includes(key)) {
-          total += db[key].price_min || 0;
-        }
-      });
+    (recipe.ingredients || []).forEach(ing => {
+      const entry = findPriceEntry(ing, db, index);
+      if (entry) total += entry.price_min || 0;
     });
 
     if (total === 0) total = 5.75; // Fallback
@@ -1484,15 +1527,53 @@ async function initMenuSemanal() {
   const grid = document.getElementById("menu-grid");
   if (!grid) return;
 
-  const recipes = await loadRecipes();
+  const [recipes, precomputed] = await Promise.all([loadRecipeIndex(), loadMenus()]);
+  const bySlug = new Map((recipes || []).map(r => [r.slug, r]));
+  let lastMenu = -1;
+
+  // Menú precalculado (presupuesto, tiempo y variedad resueltos en el build); si no hay, al azar
+  function pickMenu() {
+    if (precomputed) {
+      const options = precomputed.menus.filter(m => m.days.every(d => bySlug.has(d.slug)));
+      if (options.length) {
+        let i = Math.floor(Math.random() * options.length);
+        if (i === lastMenu && options.length > 1) i = (i + 1) % options.length;
+        lastMenu = i;
+        return options[i];
+      }
+    }
+    return null;
+  }
+
+  function renderShopping(menu) {
+    const box = document.getElementById("menu-shopping");
+    if (!box) return;
+    if (!menu) { box.classList.add("hidden"); return; }
+    box.classList.remove("hidden");
+    const summary = document.getElementById("menu-shopping-summary");
+    if (summary) {
+      summary.textContent = `Para ${precomputed.servings} personas · ${menu.shopping.length} productos · aprox. $${menu.cost.toFixed(2)}`;
+    }
+    const list = document.getElementById("menu-shopping-list");
+    if (list) {
+      list.innerHTML = menu.shopping.map(([name, qty]) => `
+        <li class="flex items-baseline justify-between gap-4 py-2 border-b border-white/5">
+          <span class="text-white/70 text-sm capitalize">${escapeHtml(name)}</span>
+          <span class="text-ec-gold text-xs font-bold whitespace-nowrap">${escapeHtml(qty || "al gusto")}</span>
+        </li>`).join("");
+    }
+  }
 
   function generateMenu() {
     if (!recipes || recipes.length === 0) {
       grid.innerHTML = '<div class="col-span-full text-center py-20 text-white/40 italic">Cargando orquestación...</div>';
       return;
     }
-    const shuffled = [...recipes].sort(() => 0.5 - Math.random());
-    const menu = shuffled.slice(0, 7);
+    const planned = pickMenu();
+    const menu = planned
+      ? planned.days.map(d => bySlug.get(d.slug))
+      : [...recipes].sort(() => 0.5 - Math.random()).slice(0, 7);
+    renderShopping(planned);
 
     const days = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"];
 
@@ -1740,6 +1821,62 @@ function initMapa() {
     orellana: { name: "Orellana", region: "AMAZONÍA", icon: "🐆", cities: ["El Coca", "Tiputini"] }
   };
 
+  const nearbySection = document.getElementById("nearby-section");
+  const nearbyList = document.getElementById("nearby-list");
+  const geoIndex = loadGeoIndex();
+  const KIND_ORDER = { recipe: 0, place: 1, post: 2 };
+  let renderToken = 0;
+
+  function renderCityButtons(target, cities) {
+    if (!target) return;
+    target.innerHTML = cities.map(c => `
+      <button onclick="window.location.href='recipes.html?city=${encodeURIComponent(c)}'"
+              class="px-5 py-3 glass-card rounded-2xl text-[10px] font-black uppercase tracking-widest text-white/40 hover:text-ec-gold hover:border-ec-gold/50 hover:bg-white/5 transition-all">
+        ${escapeHtml(c)}
+      </button>
+    `).join("");
+  }
+
+  // Solo las teselas de data/geo/ que cubren la provincia; sin índice se quedan las ciudades fijas
+  async function renderProvinceNearby(info) {
+    const token = ++renderToken;
+    nearbySection?.classList.add("hidden");
+    const geo = await geoIndex;
+    const prov = geo && geo.provinces[info.name];
+    if (!prov || token !== renderToken) return;
+    const withRecipes = prov.cities.filter(c => geo.cities[c].counts.recipe);
+    if (withRecipes.length) renderCityButtons(cityList, withRecipes);
+
+    const features = await loadVisible(geo, prov.bbox);
+    if (token !== renderToken || !nearbyList) return;
+    const seen = new Set();
+    const items = features
+      .filter(f => f.province === info.name)
+      .filter(f => {
+        const key = f.kind === "place" ? `${f.slug}|${f.name}` : `${f.kind}|${f.slug}`;
+        if (seen.has(key)) return false;
+        seen.add(key);
+        return true;
+      })
+      .sort((a, b) => KIND_ORDER[a.kind] - KIND_ORDER[b.kind])
+      .slice(0, 12);
+    if (!items.length) return;
+
+    nearbyList.innerHTML = items.map(f => {
+      const href = f.kind === "post" ? `post.html?slug=${encodeURIComponent(f.slug)}` : `recipe.html?slug=${encodeURIComponent(f.slug)}`;
+      const icon = f.kind === "recipe" ? "🍲" : f.kind === "place" ? "📍" : "🏔️";
+      const label = f.kind === "place" ? `${escapeHtml(f.name)} <span class="text-white/30">· ${escapeHtml(f.title)}</span>` : escapeHtml(f.title);
+      return `
+        <li>
+          <a href="${href}" class="flex items-start gap-3 text-xs text-white/60 hover:text-ec-gold transition-all">
+            <span>${icon}</span>
+            <span>${label} <span class="text-white/30">· ${escapeHtml(f.city || "")}</span></span>
+          </a>
+        </li>`;
+    }).join("");
+    nearbySection?.classList.remove("hidden");
+  }
+
   const provinces = mapSvg.querySelectorAll(".province");
 
   provinces.forEach(p => {
@@ -1757,14 +1894,8 @@ function initMapa() {
         if (regionLabel) regionLabel.textContent = info.region;
         if (regionIcon) regionIcon.textContent = info.icon;
 
-        if (cityList) {
-          cityList.innerHTML = info.cities.map(c => `
-      < button onclick = "window.location.href='recipes.html?city=${encodeURIComponent(c)}'" 
-               class= "px-5 py-3 glass-card rounded-2xl text-[10px] font-black uppercase tracking-widest text-white/40 hover:text-ec-gold hover:border-ec-gold/50 hover:bg-white/5 transition-all" >
-      ${c}
-            </button >
-      `).join("");
-        }
+        renderCityButtons(cityList, info.cities);
+        renderProvinceNearby(info);
 
         initialMsg?.classList.add("hidden");
         dataPanel?.classList.remove("hidden");
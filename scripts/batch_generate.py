@@ -0,0 +1,564 @@
+"""Batch recipe / post generation with one merged write.
+
+The n8n workflows publish one item per 12-hour run, each with a full
+GET -> merge -> PUT of recipes.json / posts.json. This generates N items
+concurrently with the workflows' own logic and merges the whole batch at
+once:
+
+    name     LLM call with the namer node's body (Nombrador de Plato / Topic Finder)
+    prompt   the prompt node's jsCode (Preparar Prompt Chef / Preparar Prompt Turismo)
+    write    LLM call with the writer node's body (Chef Redactor v3 / Article Writer)
+    parse    the parser node's jsCode (Parsear Receta JSON / Parsear Post JSON)
+    validate quality_gate.Gate normalization + schema, slug unique in corpus and batch
+
+Node bodies and jsCode are read from n8n-exports/ and run by
+scripts/n8n-code-runner.mjs, so prompts never drift from the workflow. Each
+stage has its own queue; LLM calls share a --concurrency bound. A failing
+item is retried on its own (an invalid or duplicate article is rewritten, a
+name already taken is asked for again) and dropped after --retries, without
+stopping the others. Accepted items get ids and created_at like the
+workflow's merge node and are prepended to the corpus in a single atomic
+write, or a single GitHub commit with --github.
+
+YouTube and image enrichment are not part of the batch; image_url stays
+empty (a quality-gate warning) for the image backfill scripts to fill.
+
+For offline runs, `serve-llm` is a local stand-in for the chat completions
+API that answers with schema-shaped recipes / posts, with optional latency
+and failures to exercise the retries.
+
+Usage:
+    python scripts/batch_generate.py recipes -n 20                         # XAI_API_KEY
+    python scripts/batch_generate.py posts -n 10 --concurrency 4 --dry-run
+    python scripts/batch_generate.py recipes -n 50 --github                 # GITHUB_TOKEN, one commit
+    python scripts/batch_generate.py serve-llm --port 8767 --latency 0.3 --fail-rate 0.1 &
+    python scripts/batch_generate.py recipes -n 100 --llm-url http://127.0.0.1:8767/v1/chat/completions
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from quality_gate import ERROR, Gate
+from site_data import POSTS_PATH, RECIPES_PATH, ROOT, commit_atomic, discard_atomic, load_json, norm_text, \
+    open_atomic
+
+LLM_URL = 'https://api.x.ai/v1/chat/completions'
+GITHUB_REPO = 'LordRa2pat/recetas-ecuador'
+RUNNER = Path(__file__).resolve().parent / 'n8n-code-runner.mjs'
+
+# kind -> workflow export and the nodes each stage borrows from it
+FLOWS = {
+    'recipes': {'workflow': 'n8n-exports/recetas_workflow.json', 'path': RECIPES_PATH, 'file': 'recipes.json',
+                'existing': 'Extraer slugs existentes', 'namer': 'Nombrador de Plato',
+                'prompt': 'Preparar Prompt Chef', 'writer': 'Chef Redactor v3', 'parser': 'Parsear Receta JSON',
+                # Enriquecer Receta drops it before publishing
+                'drop': ('youtube_query',)},
+    'posts': {'workflow': 'n8n-exports/turismo_workflow.json', 'path': POSTS_PATH, 'file': 'posts.json',
+              'existing': 'Extraer temas existentes', 'namer': 'Topic Finder',
+              'prompt': 'Preparar Prompt Turismo', 'writer': 'Article Writer', 'parser': 'Parsear Post JSON',
+              'drop': ()},
+}
+STAGES = ('name', 'prompt', 'write', 'parse', 'validate')
+# A failure in one stage is retried from this stage
+RETRY_FROM = {'name': 'name', 'prompt': 'name', 'write': 'write', 'parse': 'write', 'validate': 'write'}
+JS_WORKERS = 2
+
+
+class StageError(Exception):
+    pass
+
+
+# ─── n8n code ─────────────────────────────────────────────────
+
+class NodeRunner:
+    """One long-lived n8n-code-runner.mjs process; requests are matched to replies by id."""
+
+    def __init__(self, script=RUNNER):
+        self.script = script
+        self.proc = None
+        self.pending = {}
+        self.next_id = 0
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            'node', str(self.script), stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            limit=1 << 24)
+        self.reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self.pending.pop(reply['id'], None)
+            if future is not None and not future.done():
+                if reply['ok']:
+                    future.set_result(reply['result'])
+                else:
+                    future.set_exception(StageError(reply['error']))
+        for future in self.pending.values():
+            future.set_exception(RuntimeError('n8n-code-runner.mjs exited'))
+
+    async def call(self, **request):
+        self.next_id += 1
+        request['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.proc.stdin.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        await self.proc.stdin.drain()
+        return await future
+
+    async def close(self):
+        if self.proc:
+            self.proc.stdin.close()
+            await self.proc.wait()
+            await self.reader
+
+
+# ─── Pipeline ─────────────────────────────────────────────────
+
+class Job:
+    def __init__(self, index):
+        self.index = index
+        self.nodes = {}
+        self.attempts = dict.fromkeys(STAGES, 0)
+        self.record = None
+        self.name = None
+        self.error = None
+
+
+class BatchGenerator:
+    def __init__(self, kind, corpus, llm_url=LLM_URL, concurrency=8, retries=3, timeout=120, backoff=1.0,
+                 api_key=None, verbose=False):
+        flow = FLOWS[kind]
+        nodes = {n['name']: n for n in load_json(ROOT / flow['workflow'])['nodes']}
+        self.kind = kind
+        self.flow = flow
+        self.namer_body = nodes[flow['namer']]['parameters']['jsonBody']
+        self.writer_body = nodes[flow['writer']]['parameters']['jsonBody']
+        self.prompt_code = nodes[flow['prompt']]['parameters']['jsCode']
+        self.parser_code = nodes[flow['parser']]['parameters']['jsCode']
+        self.gate = Gate(kind)
+        self.llm_url = llm_url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.verbose = verbose
+        self.headers = {'Content-Type': 'application/json', 'User-Agent': 'n8n-recetas-bot/3.0'}
+        if api_key:
+            self.headers['Authorization'] = f'Bearer {api_key}'
+
+        self.slugs = {r.get('slug') for r in corpus if r.get('slug')}
+        self.titles = [r.get('title') for r in corpus if r.get('title')]
+        self.claimed_names = []
+        self.taken = {norm_text(t) for t in self.titles}
+        self.stats = dict.fromkeys(STAGES, 0)
+        self.retried = dict.fromkeys(STAGES, 0)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def existing(self):
+        """The existing-items node as the workflow builds it, with this batch's names first."""
+        titles = self.claimed_names[::-1] + self.titles
+        slugs = sorted(self.slugs)
+        return {'existingSlugs': slugs, 'existingTitles': titles, 'totalExisting': len(slugs), 'total': len(slugs)}
+
+    def log(self, job, message):
+        if self.verbose:
+            print(f'  [{job.index:>3}] {message}', file=sys.stderr)
+
+    async def llm(self, payload):
+        async with self.llm_slots:
+            r = await asyncio.to_thread(self.session.post, self.llm_url, data=json.dumps(payload),
+                                        headers=self.headers, timeout=self.timeout)
+        if r.status_code >= 400:
+            raise StageError(f'LLM HTTP {r.status_code} {r.reason}')
+        try:
+            return r.json()
+        except ValueError:
+            raise StageError(f'LLM returned non-JSON: {r.text[:200]}')
+
+    async def stage_name(self, job):
+        job.nodes = {self.flow['existing']: self.existing()}
+        payload = await self.runner.call(expr=self.namer_body, nodes=job.nodes, json={})
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        response = await self.llm(payload)
+        try:
+            name = response['choices'][0]['message']['content'].strip()
+        except (KeyError, IndexError, TypeError, AttributeError):
+            raise StageError(f'no choices in namer response: {json.dumps(response)[:200]}')
+        if not name or norm_text(name) in self.taken:
+            raise StageError(f'name already taken: {name!r}')
+        # Claimed at once so concurrent namers see it in their exclusion list
+        self.taken.add(norm_text(name))
+        self.claimed_names.append(name)
+        job.name = name
+        job.nodes[self.flow['namer']] = response
+        return 'prompt'
+
+    async def stage_prompt(self, job):
+        job.nodes['prompt'] = await self.runner.call(code=self.prompt_code, nodes=job.nodes, input={})
+        return 'write'
+
+    async def stage_write(self, job):
+        payload = await self.runner.call(expr=self.writer_body, nodes=job.nodes, json=job.nodes['prompt'])
+        job.nodes[self.flow['writer']] = await self.llm(payload)
+        return 'parse'
+
+    async def stage_parse(self, job):
+        response = job.nodes[self.flow['writer']]
+        job.nodes[self.flow['existing']] = self.existing()
+        job.record = await self.runner.call(code=self.parser_code, nodes=job.nodes, input=response)
+        return 'validate'
+
+    async def stage_validate(self, job):
+        record = job.record
+        for key in self.flow['drop']:
+            record.pop(key, None)
+        self.gate.normalize(record)
+        errors = [f'{rule}: {detail}' for rule, severity, detail in self.gate.validate(record) if severity == ERROR]
+        if errors:
+            raise StageError('; '.join(errors))
+        if record['slug'] in self.slugs:
+            raise StageError(f"slug already exists: {record['slug']}")
+        self.slugs.add(record['slug'])
+        return None
+
+    async def worker(self, stage, queues):
+        handler = getattr(self, f'stage_{stage}')
+        queue = queues[stage]
+        while True:
+            job = await queue.get()
+            try:
+                following = await handler(job)
+            except Exception as e:  # one bad item must not stop the batch
+                job.attempts[stage] += 1
+                retry_from = RETRY_FROM[stage]
+                if job.attempts[stage] > self.retries:
+                    job.error = f'{stage}: {e}'
+                    self.log(job, f'failed {job.error}')
+                    self.finish(job)
+                else:
+                    self.retried[stage] += 1
+                    self.log(job, f'retry {stage} from {retry_from}: {e}')
+                    delay = self.backoff * 2 ** (job.attempts[stage] - 1) * random.uniform(0.5, 1.5)
+                    asyncio.get_running_loop().call_later(delay, queues[retry_from].put_nowait, job)
+                continue
+            finally:
+                queue.task_done()
+            self.stats[stage] += 1
+            if following is None:
+                self.log(job, f"ok {job.record['slug']}")
+                self.finish(job)
+            else:
+                queues[following].put_nowait(job)
+
+    def finish(self, job):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.all_done.set()
+
+    async def run(self, count):
+        jobs = [Job(i) for i in range(count)]
+        self.remaining = count
+        self.all_done = asyncio.Event()
+        self.llm_slots = asyncio.Semaphore(self.concurrency)
+        # asyncio.to_thread's default pool is sized by CPU count, not by --concurrency
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        self.runner = NodeRunner()
+        await self.runner.start()
+        queues = {stage: asyncio.Queue() for stage in STAGES}
+        sizes = {'name': self.concurrency, 'write': self.concurrency}
+        tasks = [asyncio.create_task(self.worker(stage, queues))
+                 for stage in STAGES for _ in range(sizes.get(stage, JS_WORKERS))]
+        for job in jobs:
+            queues['name'].put_nowait(job)
+        try:
+            if count:
+                await self.all_done.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.runner.close()
+            self.session.close()
+        return jobs
+
+
+# ─── Merge ────────────────────────────────────────────────────
+
+def now_iso():
+    """Same format as JS new Date().toISOString()."""
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def merge(corpus, records):
+    """Prepend records (newest first) with ids after the corpus max, like the workflow's merge node."""
+    next_id = max((int(r.get('id') or 0) for r in corpus if str(r.get('id') or '').isdigit()), default=0) + 1
+    created = now_iso()
+    merged = []
+    for offset, record in enumerate(records):
+        record['id'] = next_id + offset
+        record['created_at'] = created
+        merged.append(record)
+    # The last generated is the newest, as if published one run after another
+    return merged[::-1] + corpus
+
+
+def write_corpus(path, records):
+    """One atomic write in the layout quality_gate.py --fix produces."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, path.stat().st_size - 1))
+        trailing = '\n' if f.read(1) == b'\n' else ''
+    out, tmp = open_atomic(path)
+    try:
+        with out:
+            out.write(json.dumps(records, indent=2, ensure_ascii=False) + trailing)
+        commit_atomic(tmp, path)
+    except BaseException:
+        discard_atomic(tmp)
+        raise
+
+
+def github_get(file, token):
+    """(records, sha) of a corpus file from the GitHub contents API.
+
+    The contents API returns an empty 'content' for files over 1 MB, which
+    the merged write would then replace the whole corpus with; the body is
+    read raw from the blob of the returned sha instead (up to 100 MB), and
+    an empty corpus is an error.
+    """
+    url = f'https://api.github.com/repos/{GITHUB_REPO}/contents/{file}'
+    headers = {'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'}
+    r = requests.get(url, headers=headers, timeout=60)
+    r.raise_for_status()
+    sha = r.json()['sha']
+    blob_url = f'https://api.github.com/repos/{GITHUB_REPO}/git/blobs/{sha}'
+    r = requests.get(blob_url, headers=dict(headers, Accept='application/vnd.github.raw'), timeout=120)
+    r.raise_for_status()
+    records = json.loads(r.content) if r.content.strip() else None
+    if not records or not isinstance(records, list):
+        raise SystemExit(f'{file}: GitHub returned an empty or invalid corpus (blob {sha[:10]}); not merging')
+    return records, sha
+
+
+def github_put(file, records, sha, token, message):
+    url = f'https://api.github.com/repos/{GITHUB_REPO}/contents/{file}'
+    headers = {'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'}
+    content = base64.b64encode(json.dumps(records, indent=2, ensure_ascii=False).encode('utf-8')).decode('ascii')
+    r = requests.put(url, headers=headers, json={'message': message, 'content': content, 'sha': sha}, timeout=120)
+    r.raise_for_status()
+    return r.json()['commit']['sha']
+
+
+# ─── Stand-in LLM ─────────────────────────────────────────────
+
+DISH_BASES = ('Seco de', 'Encebollado de', 'Caldo de', 'Tonga de', 'Ceviche de', 'Locro de', 'Bolón de',
+              'Humita de', 'Sango de', 'Viche de', 'Corviche de', 'Estofado de')
+DISH_FILLINGS = ('Chivo', 'Pescado', 'Pollo', 'Camarón', 'Verde', 'Queso', 'Maní', 'Choclo', 'Zapallo',
+                 'Fréjol', 'Cangrejo', 'Guanta', 'Conchas', 'Melloco')
+DISH_STYLES = ('Manabita', 'Lojano', 'Esmeraldeño', 'Cuencano', 'Amazónico', 'Quiteño', 'Montuvio', 'Orense',
+               'Riobambeño', 'Lojano de Altura')
+TOPIC_PLACES = ('Mindo', 'Baños de Agua Santa', 'Vilcabamba', 'Zaruma', 'Quilotoa', 'Cuyabeno', 'Montañita',
+                'Otavalo', 'Ingapirca', 'Puerto López', 'Tena', 'Cajas', 'Salinas', 'Cotacachi', 'Loja')
+TOPIC_ANGLES = ('ruta de dos días', 'guía para mochileros', 'qué comer y dónde', 'fiestas y tradiciones',
+                'naturaleza y senderos', 'viaje en familia', 'escapada de fin de semana')
+STANDIN_CITIES = ('Quito', 'Guayaquil', 'Cuenca', 'Manta', 'Loja', 'Esmeraldas', 'Riobamba', 'Tena')
+
+
+def _slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', norm_text(text)).strip('-')
+
+
+def _pick(options, prompt, rng):
+    """A random option that the prompt does not already list."""
+    folded = norm_text(prompt)
+    fresh = [o for o in options if norm_text(o) not in folded]
+    return rng.choice(fresh or options)
+
+
+def standin_reply(payload, rng):
+    """Content for one chat completion request, by which workflow prompt it is."""
+    system = payload['messages'][0]['content']
+    user = payload['messages'][-1]['content']
+    if 'nombres de platos' in system:
+        names = [f'{b} {f} {s}' for b in DISH_BASES for f in DISH_FILLINGS for s in DISH_STYLES]
+        return _pick(names, user, rng)
+    if 'temas' in system:
+        return _pick([f'{p}: {a}' for p in TOPIC_PLACES for a in TOPIC_ANGLES], user, rng)
+    if 'CHEF' in system:
+        dish = user.split('Crea la receta completa para:', 1)[-1].split('\n', 1)[0].strip()
+        cities = rng.sample(STANDIN_CITIES, 2)
+        return json.dumps({
+            'slug': _slugify(dish), 'title': f'{dish} Receta Ecuatoriana Tradicional',
+            'description': f'{dish}: receta ecuatoriana tradicional paso a paso, con ingredientes de mercado, '
+                           'tiempos exactos y consejos de la cocina de casa.',
+            'region': rng.choice(('Sierra', 'Costa', 'Amazonia')), 'category': 'Platos Fuertes',
+            'difficulty': rng.choice(('Facil', 'Media', 'Dificil')), 'servings': '4 personas',
+            'prep_time': '20 min', 'cook_time': '40 min', 'total_time': '60 min',
+            'ingredients': [{'name': n, 'quantity': q, 'where_to_buy': 'Mercado local'} for n, q in (
+                ('cebolla paiteña', '1 unidad'), ('ajo', '3 dientes'), ('tomate', '2 unidades'),
+                ('pimiento', '1 unidad'), ('comino', '1 cucharadita'), ('achiote', '1 cucharada'),
+                ('cilantro', '1 atado'), ('sal', '1 pizca'), ('aceite', '2 cucharadas'))],
+            'instructions': [f'Paso {i}: preparar y cocinar durante {5 * i} minutos a fuego medio.'
+                             for i in range(1, 8)],
+            'tips': ['Usar ingredientes frescos del mercado.', 'Servir recién hecho.'],
+            'origin_cities': cities, 'youtube_query': f'{dish} receta ecuatoriana',
+            'image_keywords': [dish, 'ecuadorian food', 'traditional dish'],
+            'image_alt': f'Fotografía de {dish} servido en plato de barro',
+            'seo_keywords': [f'{dish.lower()} {k}' for k in ('receta', 'ecuador', 'tradicional', 'casera', 'fácil')],
+            'faqs': [{'question': f'¿{q}?', 'answer': 'Respuesta de referencia del servidor de pruebas.'}
+                     for q in ('Se puede congelar', 'Con qué se acompaña', 'Cuánto dura')],
+            'places': [{'name': f'Mercado Central de {c}', 'city': c, 'description': 'Puestos tradicionales.'}
+                       for c in cities],
+            'substitutions': [{'original': 'achiote', 'substitute': 'paprika', 'notes': 'supermercados latinos'},
+                              {'original': 'cebolla paiteña', 'substitute': 'red onion', 'notes': 'cualquier tienda'}],
+            'estimated_cost': '$8.50 USD'}, ensure_ascii=False)
+    topic = user.split('sobre:', 1)[-1].split('\n', 1)[0].strip()
+    sections = ''.join(f'<h2>{h} en {topic}</h2><p>{topic} ofrece experiencias únicas: información práctica, '
+                       'horarios, precios de referencia y recomendaciones de viajeros locales.</p>'
+                       for h in ('Cómo llegar', 'Qué hacer', 'Dónde comer', 'Mejor época'))
+    return json.dumps({
+        'title': f'{topic} 2026: Guía Completa'[:60], 'subtitle': f'Todo lo que necesitas saber de {topic}',
+        'slug': _slugify(topic), 'description': f'{topic}: guía de viaje 2026 con cómo llegar, qué hacer, dónde '
+                                                'comer y la mejor época para visitar este rincón de Ecuador.',
+        'category': rng.choice(('Destinos', 'Rutas', 'Naturaleza', 'Cultura')),
+        'region': rng.choice(('Sierra', 'Costa', 'Amazonia')),
+        'keywords': [f'{topic.lower()} {k}' for k in ('2026', 'guía', 'cómo llegar', 'qué hacer', 'ecuador')],
+        'content': f'<p>{topic} es uno de los destinos más atractivos de Ecuador.</p>' + sections,
+        'faqs': [{'q': f'¿{q}?', 'a': 'Respuesta de referencia del servidor de pruebas.'}
+                 for q in ('Cuánto cuesta ir', 'Cuál es la mejor época para visitar', 'Qué documentos necesito')],
+    }, ensure_ascii=False)
+
+
+def make_llm_handler(latency=0.0, fail_rate=0.0, seed=1):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class StandInLLM(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+            with lock:
+                fail = rng.random() < fail_rate
+                broken = fail and rng.random() < 0.5
+                content = standin_reply(payload, rng)
+            if latency:
+                time.sleep(latency)
+            if fail and not broken:
+                self.send_error(503, 'stand-in failure')
+                return
+            if broken:
+                content = content[:len(content) // 2]
+            body = json.dumps({
+                'id': hashlib.sha1(content.encode('utf-8')).hexdigest(), 'object': 'chat.completion',
+                'created': int(time.time()), 'model': payload.get('model', 'stand-in'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                             'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}},
+                ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return StandInLLM
+
+
+# ─── CLI ──────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate recipes or posts in concurrent batches.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for kind in FLOWS:
+        gen = sub.add_parser(kind, help=f'Generate {kind} and merge them into {FLOWS[kind]["file"]}')
+        gen.add_argument('-n', '--count', type=int, default=10)
+        gen.add_argument('--concurrency', type=int, default=8, help='LLM requests in flight (default 8)')
+        gen.add_argument('--retries', type=int, default=3, help='Retries per stage per item (default 3)')
+        gen.add_argument('--timeout', type=float, default=120, help='Seconds per LLM request')
+        gen.add_argument('--backoff', type=float, default=1.0, help='First retry delay in seconds')
+        gen.add_argument('--llm-url', default=LLM_URL)
+        gen.add_argument('--github', action='store_true', help='Merge into the GitHub copy in one commit')
+        gen.add_argument('--dry-run', action='store_true', help='Generate and validate, write nothing')
+        gen.add_argument('-o', '--output', help='Also save the accepted batch to this file')
+        gen.add_argument('-v', '--verbose', action='store_true')
+    srv = sub.add_parser('serve-llm', help='Local stand-in for the chat completions API')
+    srv.add_argument('--port', type=int, default=8767)
+    srv.add_argument('--latency', type=float, default=0.0, help='Seconds per response')
+    srv.add_argument('--fail-rate', type=float, default=0.0, help='Share of 503s and truncated JSON')
+    srv.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve-llm':
+        server = ThreadingHTTPServer(('127.0.0.1', args.port),
+                                     make_llm_handler(args.latency, args.fail_rate, args.seed))
+        print(f'Stand-in LLM on http://127.0.0.1:{args.port}/v1/chat/completions')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    flow = FLOWS[args.command]
+    token = os.environ.get('GITHUB_TOKEN')
+    if args.github and not token:
+        parser.error('--github needs GITHUB_TOKEN')
+    corpus, sha = github_get(flow['file'], token) if args.github else (load_json(flow['path']), None)
+
+    generator = BatchGenerator(args.command, corpus, args.llm_url, args.concurrency, args.retries, args.timeout,
+                               args.backoff, os.environ.get('XAI_API_KEY'), args.verbose)
+    start = time.perf_counter()
+    jobs = asyncio.run(generator.run(args.count))
+    elapsed = time.perf_counter() - start
+
+    accepted = [job.record for job in jobs if job.error is None]
+    for job in jobs:
+        if job.error:
+            print(f'  - #{job.index} {job.name or "(unnamed)"}: {job.error}')
+    retried = ', '.join(f'{stage} {n}' for stage, n in generator.retried.items() if n)
+    print(f'{len(accepted)}/{args.count} {args.command} in {elapsed:.1f}s'
+          f'{f" (retries: {retried})" if retried else ""}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(accepted, f, indent=2, ensure_ascii=False)
+    if not accepted or args.dry_run:
+        return 0 if accepted or not args.count else 1
+
+    merged = merge(corpus, accepted)
+    if args.github:
+        message = f'feat(batch): agregar {len(accepted)} {args.command} — lote {now_iso()[:10]}'
+        commit = github_put(flow['file'], merged, sha, token, message)
+        print(f'{flow["file"]}: {len(merged)} items, commit {commit[:10]}')
+    else:
+        write_corpus(flow['path'], merged)
+        print(f'{flow["path"].name}: {len(merged)} items')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env node
+/**
+ * bench-client.mjs — tiempos de las rutas calientes del navegador
+ * Ecuador a la Carta
+ *
+ * Uso:   node scripts/bench-client.mjs [raíz del sitio]
+ * Salida: JSON {caso: {seconds, heap_mb}} en stdout (lo lee scripts/bench.py)
+ *
+ * Carga los módulos reales de js/ con un fetch que lee del disco, sobre el
+ * árbol indicado (por defecto el repo; bench.py pasa uno sintético).
+ */
+
+import { readFile } from 'fs/promises';
+import { register } from 'module';
+import { resolve, dirname } from 'path';
+import { fileURLToPath } from 'url';
+
+// js/*.js son módulos ES para el navegador, pero package.json no declara "type": "module"
+register('data:text/javascript,' + encodeURIComponent(`
+  import { readFile } from 'fs/promises';
+  export async function load(url, context, next) {
+    if (/\\/js\\/[^/]+\\.js$/.test(url)) {
+      return { format: 'module', source: await readFile(new URL(url)), shortCircuit: true };
+    }
+    return next(url, context);
+  }`));
+
+const __dirname = dirname(fileURLToPath(import.meta.url));
+const SITE = resolve(process.argv[2] || resolve(__dirname, '..'));
+
+// Recetas cuyas listas de ingredientes se buscan en price_db (una página de receta = una)
+const PRICE_SAMPLE = 200;
+// Cada caso se repite hasta sumar al menos este tiempo (ms)
+const MIN_TIME_MS = 200;
+
+// ── Entorno mínimo de navegador para los módulos de js/ ──────
+globalThis.window = { location: { pathname: '/' }, dataLayer: [] };
+globalThis.document = { addEventListener() {}, getElementById() { return null; } };
+globalThis.fetch = async function (url) {
+  try {
+    const text = await readFile(resolve(SITE, String(url).split('?')[0]), 'utf-8');
+    return { ok: true, status: 200, json: async () => JSON.parse(text) };
+  } catch (e) {
+    return { ok: false, status: 404, json: async () => null };
+  }
+};
+const log = console.log;
+console.log = function () {};  // data.js registra cada fetch
+
+const { sortRecipes } = await import('../js/utils.js');
+const { findPriceEntry } = await import('../js/prices.js');
+const data = await import('../js/data.js');
+
+async function time(fn) {
+  if (globalThis.gc) globalThis.gc();
+  const heap = process.memoryUsage().heapUsed;
+  let runs = 0;
+  let result;
+  const start = performance.now();
+  do {
+    result = await fn();
+    runs++;
+  } while (performance.now() - start < MIN_TIME_MS);
+  const seconds = (performance.now() - start) / runs / 1000;
+  const heapMb = Math.max(0, process.memoryUsage().heapUsed - heap) / 1048576;
+  return { seconds: Number(seconds.toPrecision(4)), heap_mb: Number(heapMb.toFixed(1)), runs, result };
+}
+
+const results = {};
+async function bench(name, fn) {
+  const r = await time(fn);
+  results[name] = { seconds: r.seconds, heap_mb: r.heap_mb, runs: r.runs };
+  return r.result;
+}
+
+const recipes = await bench('loadRecipes', () => data.loadRecipes());
+await bench('loadPosts', () => data.loadPosts());
+await bench('loadRecipeIndex', () => data.loadRecipeIndex());
+await bench('sortRecipes.fast', () => sortRecipes(recipes, 'fast'));
+await bench('sortRecipes.alpha', () => sortRecipes(recipes, 'alpha'));
+
+const priceDb = await data.loadPriceDb();
+const priceIndex = await data.loadPriceIndex();
+const sample = recipes.slice(0, PRICE_SAMPLE);
+// Por receta: lo que cuesta pintar los precios de una página
+const perRecipe = (index) => () => {
+  sample.forEach((r) => (r.ingredients || []).forEach((ing) => findPriceEntry(ing, priceDb, index)));
+};
+await bench('findPriceEntry', perRecipe(priceIndex));
+await bench('findPriceEntry.noindex', perRecipe(null));
+['findPriceEntry', 'findPriceEntry.noindex'].forEach((name) => {
+  results[name].seconds = Number((results[name].seconds / Math.max(1, sample.length)).toPrecision(4));
+});
+
+log(JSON.stringify(results));
@@ -0,0 +1,556 @@
+"""Scalability benchmarks for the data-build scripts and the client hot paths.
+
+`generate` writes a synthetic site tree at N times today's corpus:
+recipes.json, posts.json, price_db.json and the n8n workflow exports. Records
+are resampled from the real ones, so field presence, list lengths, categories
+and regions keep their real distribution, while titles, descriptions,
+ingredients, steps, FAQs and post paragraphs are recombined from the corpus
+pools so text is not just copied. Dates advance two items per 12 hours like the
+auto-publisher. LEGACY_RATE of the records arrive in the pre-gate n8n shapes
+(ingredient objects, {question, answer} FAQs, comma-separated keywords).
+
+`run` times every stage in STAGES on a fresh copy of each tree, in build
+order, and records wall time, CPU time and peak RSS. The copy is hard-linked,
+which is safe because every script writes through open_atomic. The client
+stage runs bench-client.mjs, which times loadRecipes, sortRecipes and
+findPriceEntry from js/ in Node. Results go to .cache/bench/results.json.
+
+With two or more scales, each stage gets a growth exponent (time ~ n^k) and a
+projection to --project; the slowest projected stage is listed first. With
+--save-baseline the results become the baseline. Later runs flag stages that
+got slower or bigger than --tolerance, and exit 1 when any did.
+
+Usage:
+    python scripts/bench.py run                              # 10x and 100x
+    python scripts/bench.py run --scales 1 10 100 1000 --timeout 1800
+    python scripts/bench.py run --only quality_gate prerender client
+    python scripts/bench.py run --save-baseline
+    python scripts/bench.py generate 100 --out /tmp/site-100x
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from site_data import CACHE_DIR, POSTS_PATH, PRICE_DB_PATH, RECIPES_PATH, ROOT, commit_atomic, discard_atomic, \
+    extract_ing_base, load_json, norm_text, open_atomic, write_json
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BENCH_DIR = CACHE_DIR / 'bench'
+RESULTS_PATH = BENCH_DIR / 'results.json'
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+
+# Bump when the generator changes so cached synthetic trees are rebuilt.
+GENERATOR_VERSION = 1
+
+DEFAULT_SCALES = (10, 100)
+DEFAULT_TIMEOUT = 900
+# Share of synthetic records written in the legacy n8n shapes
+LEGACY_RATE = 0.05
+# Auto-publisher rate, used to translate a scale into time
+ITEMS_PER_DAY = 4
+# Slowdowns smaller than these are noise, whatever the ratio.
+MIN_DELTA_SECONDS = 0.1
+MIN_DELTA_RSS_MB = 20
+
+WORKFLOW_FILES = ('n8n-exports/*.json', 'recetas_workflow_v3.json')
+STATIC_FILES = ('*.html', 'i18n/*.json', 'glossary.json', 'mapa.svg', 'script.js', 'js/*.js')
+PRICE_QUALIFIERS = ('fresco', 'orgánico', 'criollo', 'importado', 'congelado', 'en funda', 'a granel', 'premium',
+                    'nacional', 'tierno', 'maduro', 'seco', 'entero', 'pelado', 'picado', 'light')
+PRICE_ORIGINS = ('de la costa', 'de la sierra', 'amazónico', 'de Galápagos', 'de Loja', 'de Manabí', 'del Oro',
+                 'de Imbabura', 'de Cotopaxi', 'de Chimborazo')
+
+
+class Stage:
+    __slots__ = ('name', 'argv', 'node')
+
+    def __init__(self, name, *argv, node=False):
+        self.name = name
+        self.argv = argv
+        self.node = node
+
+
+# Build order: the quality gate normalizes the corpus the later stages read.
+STAGES = (
+    Stage('quality_gate', 'quality_gate.py', '--fix', '-q'),
+    Stage('mojibake', 'mojibake.py'),
+    Stage('json_stream', 'json_stream.py', '--dry-run'),
+    Stage('node_patch', 'node_patch.py'),
+    Stage('ingredients', 'ingredients.py', '--check'),
+    Stage('price_index', 'build_price_index.py'),
+    Stage('price_rescore', 'price_refresh.py', 'rescore', '--dry-run'),
+    Stage('search_index', 'build_search_index.py'),
+    Stage('shards', 'build_shards.py'),
+    Stage('sitemap', 'build_sitemap.py'),
+    Stage('dedup', 'dedup.py', 'build'),
+    Stage('scaling', 'scaling.py', 'build'),
+    Stage('menus', 'build_menus.py'),
+    Stage('geo', 'build_geo.py', 'build'),
+    Stage('glossary', 'build_glossary.py', '--full'),
+    Stage('prerender', 'prerender.py'),
+    Stage('assets', 'build_assets.py', '--pages'),
+    Stage('db_load', 'db_load.py', '--dry-run'),
+    Stage('client', 'bench-client.mjs', node=True),
+)
+
+
+# ─── Synthetic corpora ────────────────────────────────────────
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_BLOCK_RE = re.compile(r'<(h2|h3|p|ul)>.*?</\1>', re.S)
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+# First word that ends the dish name in titles like "Locro de Papa Ecuatoriano Receta Tradicional"
+_TITLE_TAIL_RE = re.compile(r'\s(?=(?:Ecuatorian[oa]s?|Receta|Tradicional|Casero|Casera|con|al|a la|estilo)\b)')
+
+
+def _slugify(text, n):
+    return _SLUG_RE.sub('-', norm_text(text)).strip('-')[:60].rstrip('-') + f'-{n}'
+
+
+def _split_title(title):
+    parts = _TITLE_TAIL_RE.split(title, maxsplit=1)
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def _sentences(texts):
+    return [s for t in texts if isinstance(t, str) for s in _SENTENCE_RE.split(t.strip()) if len(s) > 20]
+
+
+def _sample(rng, pool, k):
+    return rng.sample(pool, min(k, len(pool)))
+
+
+def _legacy_ingredient(text):
+    quantity, sep, name = text.partition(' de ')
+    return {'name': name, 'quantity': quantity, 'where_to_buy': 'Supermaxi'} if sep else {'name': text}
+
+
+class Synthesizer:
+    """Record generators resampled from the real corpus."""
+
+    def __init__(self, recipes, posts, price_db, seed=0):
+        self.rng = random.Random(seed)
+        self.recipes = recipes
+        self.posts = posts
+        self.price_db = price_db
+        self.pools = {
+            'titles': [_split_title(r['title']) for r in recipes],
+            'post_titles': [_split_title(p['title']) for p in posts],
+            'ingredients': sorted({i for r in recipes for i in r.get('ingredients') or [] if isinstance(i, str)}),
+            'steps': [s for r in recipes for s in r.get('instructions') or [] if isinstance(s, str)],
+            'tips': [t for r in recipes for t in r.get('tips') or [] if isinstance(t, str)],
+            'faqs': [f for r in recipes + posts for f in r.get('faqs') or [] if isinstance(f, dict)],
+            'keywords': sorted({k for r in recipes + posts for k in r.get('keywords') or [] if isinstance(k, str)}),
+            'sentences': _sentences(r.get('description') for r in recipes + posts),
+            'blocks': [b.group(0) for p in posts for b in _BLOCK_RE.finditer(p.get('content') or '')],
+        }
+
+    def _title(self, template, pool):
+        head, _ = _split_title(template['title'])
+        _, tail = self.rng.choice(pool)
+        return f'{head} {tail or "Receta Tradicional"}'.strip()
+
+    def _common(self, template, n, title, start):
+        rng = self.rng
+        record = dict(template)
+        record['title'] = title
+        record['slug'] = _slugify(title, n)
+        record['id'] = n
+        record['description'] = ' '.join(_sample(rng, self.pools['sentences'], rng.randint(2, 4)))
+        if template.get('keywords'):
+            record['keywords'] = _sample(rng, self.pools['keywords'], len(template['keywords']))
+        if template.get('faqs'):
+            record['faqs'] = _sample(rng, self.pools['faqs'], len(template['faqs']))
+        when = start + timedelta(hours=6 * n)
+        record['created_at'] = when.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        if 'date_published' in template:
+            record['date_published'] = when.strftime('%Y-%m-%d')
+        if rng.random() < LEGACY_RATE:
+            if record.get('keywords'):
+                record['keywords'] = ', '.join(record['keywords'])
+            if record.get('faqs'):
+                record['faqs'] = [{'question': f.get('q'), 'answer': f.get('a')} for f in record['faqs']]
+        return record
+
+    def recipes_at(self, scale):
+        rng = self.rng
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for n in range(1, round(len(self.recipes) * scale) + 1):
+            template = rng.choice(self.recipes)
+            record = self._common(template, n, self._title(template, self.pools['titles']), start)
+            record['ingredients'] = _sample(rng, self.pools['ingredients'], len(template.get('ingredients') or []))
+            record['instructions'] = _sample(rng, self.pools['steps'], len(template.get('instructions') or []))
+            if template.get('tips'):
+                record['tips'] = _sample(rng, self.pools['tips'], len(template['tips']))
+            if rng.random() < LEGACY_RATE:
+                record['ingredients'] = [_legacy_ingredient(i) for i in record['ingredients']]
+            yield record
+
+    def posts_at(self, scale):
+        rng = self.rng
+        start = datetime(2026, 1, 1, 3, tzinfo=timezone.utc)
+        for n in range(1, round(len(self.posts) * scale) + 1):
+            template = rng.choice(self.posts)
+            title = self._title(template, self.pools['post_titles'])
+            record = self._common(template, n, title, start)
+            blocks = len(_BLOCK_RE.findall(template.get('content') or '')) or 10
+            record['content'] = f'<h1>{title}</h1>\n\n' + '\n\n'.join(_sample(rng, self.pools['blocks'], blocks))
+            yield record
+
+    def price_db_at(self, scale):
+        rng = self.rng
+        db = dict(self.price_db)
+        templates = list(self.price_db.values())
+        bases = sorted({b for b in map(extract_ing_base, self.pools['ingredients']) if 3 <= len(b) <= 30})
+        bases += list(self.price_db)
+        target = round(len(self.price_db) * scale)
+        while len(db) < target:
+            key = f'{rng.choice(bases)} {rng.choice(PRICE_QUALIFIERS)}'
+            if key in db:
+                key += ' ' + rng.choice(PRICE_ORIGINS)
+            if key in db:
+                continue
+            entry = dict(rng.choice(templates), ingredient=key)
+            for field in ('price_min', 'price_max', 'reference_price_min', 'reference_price_max'):
+                if isinstance(entry.get(field), (int, float)):
+                    entry[field] = round(entry[field] * rng.uniform(0.8, 1.25), 2)
+            db[key] = entry
+        return db
+
+
+def scale_workflow(workflow, scale):
+    """Repeat the nodes of an n8n export `scale` times, with renamed copies wired the same way."""
+    copies = max(1, round(scale))
+    nodes, connections = workflow.get('nodes') or [], workflow.get('connections') or {}
+    out_nodes, out_connections = [], {}
+    for i in range(copies):
+        rename = (lambda name: name) if i == 0 else (lambda name, i=i: f'{name} #{i}')
+        for node in nodes:
+            node = dict(node, name=rename(node['name']))
+            if 'id' in node:
+                node['id'] = f"{node['id']}-{i}" if i else node['id']
+            if isinstance(node.get('position'), list) and len(node['position']) == 2:
+                node['position'] = [node['position'][0], node['position'][1] + 1200 * i]
+            out_nodes.append(node)
+        for source, outputs in connections.items():
+            out_connections[rename(source)] = {
+                kind: [[dict(link, node=rename(link['node'])) for link in branch] for branch in branches]
+                for kind, branches in outputs.items()}
+    return dict(workflow, nodes=out_nodes, connections=out_connections)
+
+
+def write_array(path, records):
+    """Stream records to `path` as an indent=2 JSON array, like the n8n exports; return the count."""
+    f, tmp = open_atomic(path)
+    count = 0
+    try:
+        with f:
+            for record in records:
+                text = json.dumps(record, indent=2, ensure_ascii=False)
+                f.write(('[\n  ' if not count else ',\n  ') + text.replace('\n', '\n  '))
+                count += 1
+            f.write('[]' if not count else '\n]')
+        commit_atomic(tmp, path)
+    except BaseException:
+        discard_atomic(tmp)
+        raise
+    return count
+
+
+def _source_files():
+    files = [RECIPES_PATH, POSTS_PATH, PRICE_DB_PATH]
+    for pattern in WORKFLOW_FILES + STATIC_FILES:
+        files.extend(sorted(ROOT.glob(pattern)))
+    return files
+
+
+def _source_hash():
+    h = hashlib.sha256(str(GENERATOR_VERSION).encode())
+    for path in _source_files():
+        h.update(path.relative_to(ROOT).as_posix().encode() + b'\0')
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def generate(scale, out_dir, seed=0):
+    """Write a synthetic tree at `scale` into out_dir; reused when already current.
+
+    The stamp file records the generator inputs and the record counts.
+    """
+    out_dir = Path(out_dir)
+    stamp_path = out_dir / '.bench.json'
+    stamp = {'scale': scale, 'seed': seed, 'source': _source_hash()}
+    if stamp_path.exists() and {k: v for k, v in load_json(stamp_path).items() if k != 'records'} == stamp:
+        return False
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    synth = Synthesizer(load_json(RECIPES_PATH), load_json(POSTS_PATH), load_json(PRICE_DB_PATH), seed)
+    price_db = synth.price_db_at(scale)
+    stamp['records'] = {'recipes': write_array(out_dir / 'recipes.json', synth.recipes_at(scale)),
+                        'posts': write_array(out_dir / 'posts.json', synth.posts_at(scale)),
+                        'price_db': len(price_db)}
+    write_json(out_dir / 'price_db.json', price_db)
+    for pattern in WORKFLOW_FILES:
+        for path in sorted(ROOT.glob(pattern)):
+            write_json(out_dir / path.relative_to(ROOT), scale_workflow(load_json(path), scale))
+    for pattern in STATIC_FILES:
+        for path in sorted(ROOT.glob(pattern)):
+            target = out_dir / path.relative_to(ROOT)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+    (out_dir / 'scripts').mkdir(exist_ok=True)
+    write_json(stamp_path, stamp)
+    return True
+
+
+# ─── Runner ───────────────────────────────────────────────────
+
+def _peak_rss_mb(usage):
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return round(usage.ru_maxrss / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def run_stage(stage, site, timeout):
+    """Run one stage against `site`; return its measurements."""
+    if stage.node:
+        node = shutil.which('node')
+        if not node:
+            return {'status': 'skipped', 'detail': 'node not found'}
+        cmd = [node, '--expose-gc', str(SCRIPTS_DIR / stage.argv[0]), str(site), *stage.argv[1:]]
+    else:
+        cmd = [sys.executable, str(SCRIPTS_DIR / stage.argv[0]), *stage.argv[1:]]
+    env = dict(os.environ, SITE_ROOT=str(site), PYTHONIOENCODING='utf-8')
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=site, env=env, stdout=out, stderr=err)
+        killed = threading.Event()
+
+        def kill():
+            killed.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            if hasattr(os, 'wait4'):
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+            else:
+                proc.wait()
+                usage = None
+        finally:
+            timer.cancel()
+        seconds = time.perf_counter() - start
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read().decode('utf-8', 'replace'), err.read().decode('utf-8', 'replace')
+    result = {'status': 'ok', 'seconds': round(seconds, 3)}
+    if usage is not None:
+        result['cpu_seconds'] = round(usage.ru_utime + usage.ru_stime, 3)
+        result['rss_mb'] = _peak_rss_mb(usage)
+    if killed.is_set():
+        result['status'] = 'timeout'
+    elif proc.returncode != 0:
+        # Some checks exit 1 to report findings; only a traceback means the stage broke.
+        lines = stderr.strip().splitlines()
+        if 'Traceback' in stderr or not stdout.strip():
+            result['status'] = 'failed'
+            result['detail'] = lines[-1][:200] if lines else f'exit {proc.returncode}'
+    if stage.node and result['status'] == 'ok':
+        try:
+            result['cases'] = json.loads(stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            result['status'] = 'failed'
+            result['detail'] = (stderr.strip().splitlines() or ['no output'])[-1][:200]
+    return result
+
+
+def _fresh_copy(src, dst):
+    if dst.exists():
+        shutil.rmtree(dst)
+    # Scripts replace files atomically (rename), so hard links never alter src.
+    shutil.copytree(src, dst, copy_function=os.link, ignore=shutil.ignore_patterns('.bench.json'))
+
+
+def run(scales, stages, timeout=DEFAULT_TIMEOUT, seed=0, keep=False, echo=print):
+    results = {'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+               'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+               'scales': {}}
+    for scale in scales:
+        src = BENCH_DIR / f'x{scale:g}'
+        # Generated in a child process: peak RSS carries over from parent to
+        # child across fork/exec, so this process has to stay small.
+        start = time.perf_counter()
+        subprocess.run([sys.executable, __file__, 'generate', f'{scale:g}', '--out', str(src), '--seed', str(seed)],
+                       check=True, stdout=subprocess.DEVNULL)
+        echo(f'{scale:g}x: tree ready in {time.perf_counter() - start:.1f}s')
+        site = BENCH_DIR / f'x{scale:g}-run'
+        _fresh_copy(src, site)
+        found = results['scales'][f'{scale:g}'] = {'records': load_json(src / '.bench.json')['records'],
+                                                   'stages': {}}
+        try:
+            for stage in stages:
+                result = found['stages'][stage.name] = run_stage(stage, site, timeout)
+                echo(f"{scale:g}x {stage.name:14} {result['status']:8} "
+                     f"{_fmt_seconds(result.get('seconds'))} {_fmt_mb(result.get('rss_mb'))}"
+                     + (f"  {result['detail']}" if 'detail' in result else ''))
+        finally:
+            if not keep:
+                shutil.rmtree(site, ignore_errors=True)
+    return results
+
+
+# ─── Report ───────────────────────────────────────────────────
+
+def _fmt_seconds(value):
+    if value is None:
+        return '      -'
+    if value < 0.001:
+        return f'{value * 1e6:6.1f}µs'
+    return f'{value * 1000:6.1f}ms' if value < 1 else f'{value:7.2f}s'
+
+
+def _fmt_mb(value):
+    return f'{value:7.0f}MB' if value is not None else '        -'
+
+
+def flatten(scale_result):
+    """{stage or stage.case: measurements} for one scale, client cases included."""
+    flat = {}
+    for name, result in scale_result['stages'].items():
+        flat[name] = result
+        for case, measured in (result.get('cases') or {}).items():
+            flat[f'{name}.{case}'] = dict(measured, status=result['status'])
+    return flat
+
+
+def growth(results):
+    """{name: (exponent, largest scale, its seconds)} from the smallest and largest scale."""
+    scales = sorted(results['scales'], key=float)
+    if len(scales) < 2:
+        return {}
+    lo, hi = scales[0], scales[-1]
+    # Corpus size ratio, not the nominal scale (rounding at small scales)
+    size = {s: sum(results['scales'][s]['records'].values()) for s in (lo, hi)}
+    a, b = flatten(results['scales'][lo]), flatten(results['scales'][hi])
+    out = {}
+    for name, r in b.items():
+        if name in a and a[name].get('seconds') and r.get('seconds') and r['status'] == 'ok':
+            k = math.log(r['seconds'] / a[name]['seconds']) / math.log(size[hi] / size[lo])
+            out[name] = (k, float(hi), r['seconds'])
+    return out
+
+
+def compare(results, baseline, tolerance):
+    """Return [(scale, name, message)] for measurements worse than the baseline."""
+    regressions = []
+    for scale, found in results['scales'].items():
+        if scale not in baseline.get('scales', {}):
+            continue
+        before = flatten(baseline['scales'][scale])
+        for name, now in flatten(found).items():
+            old = before.get(name)
+            if not old:
+                continue
+            if old['status'] == 'ok' and now['status'] != 'ok':
+                regressions.append((scale, name, f"{old['status']} -> {now['status']}"))
+                continue
+            for key, floor, fmt in (('seconds', MIN_DELTA_SECONDS, _fmt_seconds), ('rss_mb', MIN_DELTA_RSS_MB, _fmt_mb)):
+                if old.get(key) and now.get(key) and now[key] > old[key] * (1 + tolerance) \
+                        and now[key] - old[key] > floor:
+                    regressions.append((scale, name, f'{key} {fmt(old[key]).strip()} -> {fmt(now[key]).strip()} '
+                                                     f'(+{now[key] / old[key] - 1:.0%})'))
+    return regressions
+
+
+def print_report(results, project):
+    scales = sorted(results['scales'], key=float)
+    names = []
+    for s in scales:
+        names.extend(n for n in flatten(results['scales'][s]) if n not in names)
+    print('\n' + f'{"stage":30}' + ''.join(f'{s + "x":>18}   ' for s in scales) + '   growth')
+    rates = growth(results)
+    for name in names:
+        cells = []
+        for s in scales:
+            r = flatten(results['scales'][s]).get(name)
+            if not r:
+                cells.append(f'{"-":>20}')
+            elif r['status'] != 'ok' and 'seconds' not in r:
+                cells.append(f"{r['status']:>20}")
+            else:
+                mark = '' if r['status'] == 'ok' else '!'
+                cells.append(f"{_fmt_seconds(r.get('seconds'))}{mark:1}{_fmt_mb(r.get('rss_mb'))}   ")
+        rate = f'n^{rates[name][0]:.2f}' if name in rates else ''
+        print(f'{name:30}'[:30] + ''.join(cells) + f'   {rate}')
+    if rates:
+        total = sum(results['scales'][scales[0]]['records'][k] for k in ('recipes', 'posts'))
+        per_scale = total / float(scales[0])
+        days = (per_scale * project - per_scale) / ITEMS_PER_DAY
+        print(f'\nProjected at {project:g}x (~{days / 365:.0f} years of auto-publishing), slowest first:')
+        projected = sorted(((t * (project / hi) ** k, name, k) for name, (k, hi, t) in rates.items()), reverse=True)
+        for seconds, name, k in projected[:8]:
+            print(f'  {name:30} {_fmt_seconds(seconds)}   n^{k:.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the build scripts on synthetic corpora.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    gen = sub.add_parser('generate', help='Write a synthetic site tree')
+    gen.add_argument('scale', type=float)
+    gen.add_argument('--out', help='Output directory (default: .cache/bench/x<scale>)')
+    gen.add_argument('--seed', type=int, default=0)
+    r = sub.add_parser('run', help='Time every stage at each scale')
+    r.add_argument('--scales', type=float, nargs='+', default=list(DEFAULT_SCALES))
+    r.add_argument('--only', nargs='+', metavar='STAGE', choices=[s.name for s in STAGES])
+    r.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds before a stage is killed')
+    r.add_argument('--seed', type=int, default=0)
+    r.add_argument('--keep', action='store_true', help='Keep the .cache/bench/x<scale>-run trees')
+    r.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline results to compare with')
+    r.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    r.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown / growth (default 25%%)')
+    r.add_argument('--project', type=float, default=1000, help='Scale to project growth to')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        out = Path(args.out) if args.out else BENCH_DIR / f'x{args.scale:g}'
+        changed = generate(args.scale, out, args.seed)
+        print(f"{out}: {'generated' if changed else 'up to date'}")
+        return 0
+
+    stages = [s for s in STAGES if not args.only or s.name in args.only]
+    results = run(args.scales, stages, args.timeout, args.seed, args.keep)
+    write_json(RESULTS_PATH, results)
+    print_report(results, args.project)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        write_json(baseline_path, results)
+        print(f'\nbaseline saved to {baseline_path}')
+        return 0
+    if not baseline_path.exists():
+        print('\nno baseline yet (run with --save-baseline)')
+        return 0
+    regressions = compare(results, load_json(baseline_path), args.tolerance)
+    for scale, name, message in regressions:
+        print(f'REGRESSION {scale}x {name}: {message}')
+    if not regressions:
+        print(f'\nno regressions against {baseline_path}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""Fingerprinted, precompressed copies of the static assets for deploys.
+
+js/data.js used to fetch recipes.json, posts.json and price_db.json with
+'?t=' + Date.now(), so neither the browser nor the CDN could reuse them and
+every page view downloaded ~1.4 MB of JSON again. The fetches now use plain
+URLs (a repeat visit costs a 304), and this stage makes the deployed site
+use URLs that never have to be revalidated at all:
+
+- JSON (and mapa.svg) loaded by fetch() is minified: no whitespace, no
+  pipeline-only fields such as _image_source / _imagen_status.
+- script.js and js/*.js are copied with their module imports and their
+  literal data URLs ('recipes.json', 'data/menus.json', ...) rewritten to
+  the fingerprinted ones; modules are hashed after their dependencies, so a
+  change in js/utils.js renames every module that imports it.
+- Every file is written as assets/<path>.<hash>.<ext> with .gz and .br
+  variants next to it (brotli when the brotli package is installed), for
+  hosts that serve precompressed files; Vercel compresses on its own.
+- vercel.json gets Cache-Control: immutable for assets/ and for the files
+  other stages already name by content hash (data shards, geo tiles,
+  image derivatives). Everything else keeps Vercel's default revalidation.
+
+With --pages (the deploy step in vercel.json's buildCommand) the *.html
+pages and prerender/ output are rewritten in place to point at the
+fingerprinted script.js and get their own .gz/.br variants; page URLs stay
+stable, their content hashes are listed in the manifest. Re-running is
+safe: references that already point at an older fingerprint are mapped
+back to their source first.
+
+--pages is deploy-only: it edits tracked files, so in a git checkout it
+refuses to run unless the build is on Vercel (VERCEL=1) or --force is given.
+Everything this stage writes (assets/, data/assets.json, the page .gz/.br
+variants) is in .gitignore.
+
+data/assets.json maps each source path to its URL and sizes. Unchanged
+files are not rewritten (the name is the hash) and assets no longer
+referenced are deleted.
+
+Usage:
+    python scripts/build_assets.py
+    python scripts/build_assets.py --pages     # deploy only: rewrite the pages too
+    python scripts/build_assets.py --dry-run
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+
+from build_shards import compact
+from site_data import ROOT, commit_atomic, load_json, open_atomic, write_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+OUT_DIR = ROOT / 'assets'
+URL_PREFIX = '/assets/'
+MANIFEST_PATH = ROOT / 'data' / 'assets.json'
+VERCEL_PATH = ROOT / 'vercel.json'
+
+# Fetched by the pages, relative to the site root; files not generated yet are skipped.
+DATA_SOURCES = (
+    'recipes.json', 'posts.json', 'price_db.json', 'price_index.json', 'glossary.json',
+    'search-index.json', 'i18n/*.json', 'data/*.json', 'data/geo/index.json', 'images/manifest.json',
+    'mapa.svg',
+)
+MODULE_SOURCES = ('script.js', 'js/*.js')
+PAGE_SOURCES = ('*.html', 'prerender/*/*.html')
+
+# Written by the n8n / backfill scripts, never read by the pages.
+# _image_source_url stays: renderPost() shows it as the photo credit.
+INTERNAL_FIELDS = frozenset(('_image_source', '_imagen_status'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Paths whose file names are content hashes (this stage, build_shards, build_geo, build_images)
+IMMUTABLE_SOURCES = (
+    '/assets/(.*)',
+    '/data/(recipes|posts)/(.*)',
+    '/data/geo/(\\d+)/(.*)',
+    '/images/derived/(.*)',
+)
+
+HASH_LEN = 12
+# Below this the compressed copy saves less than the request headers weigh
+MIN_COMPRESS = 512
+# Fingerprinted assets are compressed once per content; 10 is within 2% of 11 at
+# less than half the time. Pages change on every deploy: 6 is ~50x faster than 11.
+BROTLI_QUALITY = 10
+PAGE_BROTLI_QUALITY = 6
+
+IMPORT_RE = re.compile(r'''(\bfrom\s*|\bimport\s*\(\s*|\bimport\s+)(['"])(\.\.?/[^'"]+)\2''')
+PAGE_REF_RE = re.compile(r'''(\b(?:src|href)=)(["'])/?([^"'?#:]+)\2''')
+FINGERPRINT_RE = re.compile(r'^assets/(.+)\.[0-9a-f]{%d}(\.\w+)$' % HASH_LEN)
+
+
+def strip_internal(obj):
+    if isinstance(obj, dict):
+        return {k: strip_internal(v) for k, v in obj.items() if k not in INTERNAL_FIELDS}
+    if isinstance(obj, list):
+        return [strip_internal(v) for v in obj]
+    return obj
+
+
+def minify(rel, raw):
+    if rel.endswith('.json'):
+        return compact(strip_internal(json.loads(raw))).encode('utf-8')
+    return raw
+
+
+def fingerprint(rel, raw):
+    stem, ext = posixpath.splitext(rel)
+    return f'{stem}.{hashlib.sha256(raw).hexdigest()[:HASH_LEN]}{ext}'
+
+
+def compressed(raw, quality=BROTLI_QUALITY):
+    """{'.gz': bytes, '.br': bytes}, leaving out variants that would not be smaller."""
+    out = {}
+    if len(raw) < MIN_COMPRESS:
+        return out
+    out['.gz'] = gzip.compress(raw, compresslevel=9, mtime=0)
+    if brotli is not None:
+        out['.br'] = brotli.compress(raw, quality=quality)
+    return {ext: data for ext, data in out.items() if len(data) < len(raw)}
+
+
+def collect(patterns, root=ROOT):
+    found = {}
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            rel = path.relative_to(root).as_posix()
+            if path.is_file() and path != MANIFEST_PATH:
+                found[rel] = path
+    return found
+
+
+def _write_bytes(path, raw):
+    f, tmp = open_atomic(path, 'wb')
+    with f:
+        f.write(raw)
+    commit_atomic(tmp, path)
+
+
+# ─── Build ────────────────────────────────────────────────────
+
+class AssetWriter:
+    def __init__(self, out_dir, dry_run=False):
+        self.out_dir = out_dir
+        self.dry_run = dry_run
+        self.entries = {}
+        self.written = []
+        self.keep = set()
+
+    def put(self, rel, raw, source_bytes):
+        """Write assets/<rel with hash> and its variants unless they exist; return the URL."""
+        name = fingerprint(rel, raw)
+        entry = {'url': URL_PREFIX + name, 'source': source_bytes, 'bytes': len(raw)}
+        self.entries[rel] = entry
+        existing = {ext: self.out_dir / (name + ext) for ext in ('', '.gz', '.br')}
+        existing = {ext: path for ext, path in existing.items() if path.exists()}
+        if '' in existing and ('.br' in existing or brotli is None or len(raw) < MIN_COMPRESS):
+            # Same name, same bytes: reuse the variants instead of compressing again
+            for ext, path in existing.items():
+                self.keep.add(name + ext)
+                if ext:
+                    entry[ext[1:]] = path.stat().st_size
+            return entry['url']
+        for ext, data in [('', raw)] + list(compressed(raw).items()):
+            self.keep.add(name + ext)
+            if ext:
+                entry[ext[1:]] = len(data)
+            path = self.out_dir / (name + ext)
+            if path.exists():
+                continue
+            self.written.append(name + ext)
+            if not self.dry_run:
+                _write_bytes(path, data)
+        return entry['url']
+
+    def prune(self):
+        removed = []
+        if not self.out_dir.exists():
+            return removed
+        for path in sorted(self.out_dir.rglob('*')):
+            rel = path.relative_to(self.out_dir).as_posix()
+            if path.is_file() and rel not in self.keep:
+                removed.append(rel)
+                if not self.dry_run:
+                    path.unlink()
+        return removed
+
+
+def _literal_re(paths):
+    alternatives = '|'.join(re.escape(p) for p in sorted(paths, key=len, reverse=True))
+    return re.compile(r'''(['"])(%s)\1''' % alternatives)
+
+
+def build_modules(modules, urls, writer):
+    """Fingerprint JS modules dependencies-first, rewriting imports and data URLs."""
+    data_re = _literal_re(urls) if urls else None
+    stack = []
+
+    def build(rel):
+        if rel in urls:
+            return urls[rel]
+        if rel in stack:
+            raise SystemExit('Import cycle: ' + ' -> '.join(stack + [rel]))
+        stack.append(rel)
+        raw = modules[rel].read_bytes()
+        text = raw.decode('utf-8')
+
+        def sub_import(m):
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(rel), m.group(3)))
+            if target not in modules:
+                return m.group(0)
+            return m.group(1) + m.group(2) + build(target) + m.group(2)
+
+        text = IMPORT_RE.sub(sub_import, text)
+        if data_re:
+            text = data_re.sub(lambda m: m.group(1) + urls[m.group(2)] + m.group(1), text)
+        stack.pop()
+        urls[rel] = writer.put(rel, text.encode('utf-8'), len(raw))
+        return urls[rel]
+
+    for rel in modules:
+        build(rel)
+
+
+def rewrite_page(html, urls):
+    """Point src/href at the fingerprinted URLs; older fingerprints are resolved to their source."""
+    def sub(m):
+        ref = m.group(3)
+        old = FINGERPRINT_RE.match(ref)
+        source = old.group(1) + old.group(2) if old else ref
+        if source not in urls:
+            return m.group(0)
+        return m.group(1) + m.group(2) + urls[source] + m.group(2)
+    return PAGE_REF_RE.sub(sub, html)
+
+
+def build_pages(pages, urls, dry_run=False):
+    """Rewrite pages in place (plus .gz/.br); return ({page: hash}, changed pages)."""
+    hashes, changed = {}, []
+    for rel, path in pages.items():
+        html = path.read_text(encoding='utf-8')
+        raw = rewrite_page(html, urls).encode('utf-8')
+        hashes[rel] = hashlib.sha256(raw).hexdigest()[:HASH_LEN]
+        outputs = [(path, raw)] + [(path.with_name(path.name + ext), data)
+                                   for ext, data in compressed(raw, PAGE_BROTLI_QUALITY).items()]
+        stale = [(p, data) for p, data in outputs if not p.exists() or p.read_bytes() != data]
+        if not stale:
+            continue
+        changed.append(rel)
+        if not dry_run:
+            for p, data in stale:
+                _write_bytes(p, data)
+    return hashes, changed
+
+
+def cache_headers(existing=()):
+    """vercel.json "headers": other rules kept, the immutable ones regenerated."""
+    rules = [r for r in existing if r.get('source') not in IMMUTABLE_SOURCES]
+    return rules + [{'source': source, 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]}
+                    for source in IMMUTABLE_SOURCES]
+
+
+def sync_vercel(dry_run=False):
+    if not VERCEL_PATH.exists():
+        return False
+    config = load_json(VERCEL_PATH)
+    headers = cache_headers(config.get('headers') or ())
+    if config.get('headers') == headers:
+        return False
+    config['headers'] = headers
+    if not dry_run:
+        write_json(VERCEL_PATH, config, indent=4)
+    return True
+
+
+def build(pages=False, dry_run=False):
+    writer = AssetWriter(OUT_DIR, dry_run)
+    urls = {}
+    for rel, path in collect(DATA_SOURCES).items():
+        raw = path.read_bytes()
+        urls[rel] = writer.put(rel, minify(rel, raw), len(raw))
+    build_modules(collect(MODULE_SOURCES), urls, writer)
+    removed = writer.prune()
+
+    manifest = {'files': writer.entries}
+    changed_pages = []
+    if pages:
+        manifest['pages'], changed_pages = build_pages(collect(PAGE_SOURCES), urls, dry_run)
+    old = load_json(MANIFEST_PATH) if MANIFEST_PATH.exists() else None
+    if old != manifest and not dry_run:
+        write_json(MANIFEST_PATH, manifest, indent=None)
+    return writer, removed, changed_pages, sync_vercel(dry_run)
+
+
+def _kb(n):
+    return f'{n / 1024:.0f} KB' if n >= 10240 else f'{n / 1024:.1f} KB'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress the static assets into assets/.')
+    parser.add_argument('--pages', action='store_true',
+                        help='Also rewrite *.html and prerender/ to the fingerprinted URLs (deploy step)')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change')
+    parser.add_argument('--force', action='store_true', help='Allow --pages outside a Vercel build')
+    args = parser.parse_args(argv)
+    if args.pages and not (args.dry_run or args.force or os.environ.get('VERCEL')) and (ROOT / '.git').exists():
+        parser.error('--pages rewrites the tracked *.html files; it runs in the Vercel build '
+                     '(pass --force to rewrite this checkout anyway)')
+
+    writer, removed, changed_pages, vercel_changed = build(pages=args.pages, dry_run=args.dry_run)
+    for name in writer.written:
+        print(f'  + assets/{name}')
+    for name in removed:
+        print(f'  - assets/{name}')
+    entries = writer.entries.values()
+    totals = {key: sum(e.get(key, e['bytes']) for e in entries) for key in ('source', 'bytes', 'gz', 'br')}
+    print(f"{len(writer.entries)} assets, {len(writer.written)} files written, {len(removed)} removed: "
+          f"{_kb(totals['source'])} -> {_kb(totals['bytes'])} minified, {_kb(totals['gz'])} gzip"
+          + (f", {_kb(totals['br'])} brotli" if brotli is not None else ' (brotli not installed)'))
+    if args.pages:
+        print(f'{len(changed_pages)} pages rewritten')
+    print(f"vercel.json cache headers {'updated' if vercel_changed else 'unchanged'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,423 @@
+"""Geospatial index and clustered map tiles for mapa.html.
+
+Recipes are located by their origin_cities, their places by the place's own
+lat/lng when n8n provides one or else by its city, and posts by the first
+gazetteer name in their title (then slug). Every located item becomes a
+feature in a uniform lat/lng grid (GeoIndex), which answers "within X km"
+and nearest-N queries without scanning the corpus.
+
+Output (static files, content-hashed like build_shards.py):
+    data/geo/index.json                 -> {zooms, tiles: {z: {"x-y": file}}, cities, provinces, regions}
+    data/geo/<z>/<x>-<y>.<hash>.json    clusters at zoom z for one web-mercator
+                                           tile; at MAX_ZOOM, the features themselves
+    data/geo/region/<region>.<hash>.json   nearest-N features for each city in the region
+
+The map reads index.json (cities, province bounds) and then only the tiles
+that cover what is on screen. Unchanged files are not rewritten and stale
+ones are removed.
+
+Usage:
+    python scripts/build_geo.py build
+    python scripts/build_geo.py build --dry-run
+    python scripts/build_geo.py near Quito --km 30
+    python scripts/build_geo.py near --km 10 --kind place -- -2.90,-79.00
+    python scripts/build_geo.py near Cuenca --nearest 5 --json
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+from collections import Counter, defaultdict
+
+from build_shards import ShardWriter, compact, short_hash
+from site_data import POSTS_PATH, RECIPES_PATH, ROOT, load_json, norm_text, write_json
+
+OUT_DIR = ROOT / 'data'
+GEO_DIR = 'geo'
+
+# name -> (lat, lng, province, region). Cities first, then destinations that
+# posts are written about. Coordinates are town centres / park entrances.
+GAZETTEER = {
+    'Quito': (-0.1807, -78.4678, 'Pichincha', 'Sierra'),
+    'Sangolquí': (-0.3126, -78.4451, 'Pichincha', 'Sierra'),
+    'Machachi': (-0.5100, -78.5670, 'Pichincha', 'Sierra'),
+    'Cayambe': (0.0411, -78.1436, 'Pichincha', 'Sierra'),
+    'Mindo': (0.0525, -78.7754, 'Pichincha', 'Sierra'),
+    'Ibarra': (0.3517, -78.1223, 'Imbabura', 'Sierra'),
+    'Otavalo': (0.2343, -78.2625, 'Imbabura', 'Sierra'),
+    'Cotacachi': (0.3010, -78.2640, 'Imbabura', 'Sierra'),
+    'Tulcán': (0.8120, -77.7173, 'Carchi', 'Sierra'),
+    'Latacunga': (-0.9352, -78.6155, 'Cotopaxi', 'Sierra'),
+    'Salcedo': (-1.0450, -78.5900, 'Cotopaxi', 'Sierra'),
+    'Ambato': (-1.2491, -78.6168, 'Tungurahua', 'Sierra'),
+    'Baños': (-1.3964, -78.4247, 'Tungurahua', 'Sierra'),
+    'Riobamba': (-1.6636, -78.6546, 'Chimborazo', 'Sierra'),
+    'Guano': (-1.6060, -78.6310, 'Chimborazo', 'Sierra'),
+    'Guaranda': (-1.5926, -79.0010, 'Bolívar', 'Sierra'),
+    'Azogues': (-2.7397, -78.8486, 'Cañar', 'Sierra'),
+    'Cuenca': (-2.9001, -79.0059, 'Azuay', 'Sierra'),
+    'Gualaceo': (-2.8928, -78.7772, 'Azuay', 'Sierra'),
+    'Paute': (-2.7770, -78.7590, 'Azuay', 'Sierra'),
+    'Loja': (-3.9931, -79.2042, 'Loja', 'Sierra'),
+    'Catamayo': (-3.9860, -79.3580, 'Loja', 'Sierra'),
+    'Vilcabamba': (-4.2600, -79.2200, 'Loja', 'Sierra'),
+    'El Cisne': (-3.8500, -79.4300, 'Loja', 'Sierra'),
+    'Guayaquil': (-2.1710, -79.9224, 'Guayas', 'Costa'),
+    'Durán': (-2.1700, -79.8300, 'Guayas', 'Costa'),
+    'Milagro': (-2.1346, -79.5872, 'Guayas', 'Costa'),
+    'Playas': (-2.6333, -80.3833, 'Guayas', 'Costa'),
+    'Samborondón': (-1.9630, -79.7250, 'Guayas', 'Costa'),
+    'Santa Elena': (-2.2262, -80.8587, 'Santa Elena', 'Costa'),
+    'Salinas': (-2.2145, -80.9518, 'Santa Elena', 'Costa'),
+    'Montañita': (-1.8260, -80.7530, 'Santa Elena', 'Costa'),
+    'Manta': (-0.9677, -80.7089, 'Manabí', 'Costa'),
+    'Portoviejo': (-1.0546, -80.4545, 'Manabí', 'Costa'),
+    'Chone': (-0.6981, -80.0936, 'Manabí', 'Costa'),
+    'Bahía de Caráquez': (-0.5983, -80.4242, 'Manabí', 'Costa'),
+    'Puerto López': (-1.5597, -80.8128, 'Manabí', 'Costa'),
+    'Isla de la Plata': (-1.2667, -81.0667, 'Manabí', 'Costa'),
+    'Esmeraldas': (0.9682, -79.6517, 'Esmeraldas', 'Costa'),
+    'Atacames': (0.8667, -79.8500, 'Esmeraldas', 'Costa'),
+    'Muisne': (0.6100, -80.0200, 'Esmeraldas', 'Costa'),
+    'Quinindé': (0.3260, -79.4700, 'Esmeraldas', 'Costa'),
+    'Santo Domingo': (-0.2530, -79.1754, 'Santo Domingo de los Tsáchilas', 'Costa'),
+    'Babahoyo': (-1.8022, -79.5344, 'Los Ríos', 'Costa'),
+    'Machala': (-3.2581, -79.9554, 'El Oro', 'Costa'),
+    'Zaruma': (-3.6910, -79.6110, 'El Oro', 'Costa'),
+    'Puyango': (-3.8833, -80.0833, 'Loja', 'Sierra'),
+    'Tena': (-0.9938, -77.8129, 'Napo', 'Amazonia'),
+    'Archidona': (-0.9100, -77.8070, 'Napo', 'Amazonia'),
+    'Baeza': (-0.4500, -77.8900, 'Napo', 'Amazonia'),
+    'Puyo': (-1.4924, -78.0024, 'Pastaza', 'Amazonia'),
+    'Mera': (-1.4600, -78.1100, 'Pastaza', 'Amazonia'),
+    'Macas': (-2.3087, -78.1114, 'Morona Santiago', 'Amazonia'),
+    'Cueva de los Tayos': (-3.0667, -78.2000, 'Morona Santiago', 'Amazonia'),
+    'Coca': (-0.4628, -76.9874, 'Orellana', 'Amazonia'),
+    'Puerto Francisco de Orellana': (-0.4628, -76.9874, 'Orellana', 'Amazonia'),
+    'Tiputini': (-0.7600, -75.5300, 'Orellana', 'Amazonia'),
+    'Yasuní': (-0.9833, -75.9167, 'Orellana', 'Amazonia'),
+    'Lago Agrio': (0.0847, -76.8828, 'Sucumbíos', 'Amazonia'),
+    'Cuyabeno': (-0.0300, -76.2000, 'Sucumbíos', 'Amazonia'),
+    'Zamora': (-4.0670, -78.9550, 'Zamora Chinchipe', 'Amazonia'),
+    'Puerto Ayora': (-0.7433, -90.3137, 'Galápagos', 'Galapagos'),
+    'Puerto Baquerizo Moreno': (-0.9020, -89.6100, 'Galápagos', 'Galapagos'),
+    'Puerto Villamil': (-0.9560, -90.9660, 'Galápagos', 'Galapagos'),
+    'Cotopaxi': (-0.6833, -78.4367, 'Cotopaxi', 'Sierra'),
+    'Quilotoa': (-0.8583, -78.9056, 'Cotopaxi', 'Sierra'),
+    'Chimborazo': (-1.4692, -78.8175, 'Chimborazo', 'Sierra'),
+    'Volcán Cayambe': (0.0290, -77.9860, 'Pichincha', 'Sierra'),
+    'Cajas': (-2.7833, -79.2167, 'Azuay', 'Sierra'),
+    'Ingapirca': (-2.5447, -78.8753, 'Cañar', 'Sierra'),
+    'Podocarpus': (-4.1167, -79.1667, 'Zamora Chinchipe', 'Amazonia'),
+    'Sangay': (-2.0000, -78.3333, 'Morona Santiago', 'Amazonia'),
+}
+# Other spellings found in the corpus and in mapa.html
+ALIASES = {
+    'El Coca': 'Coca', 'Nueva Loja': 'Lago Agrio', 'Baños de Agua Santa': 'Baños', 'Bahía': 'Bahía de Caráquez',
+    'Puerto Baquerizo': 'Puerto Baquerizo Moreno', 'Santo Domingo de los Tsáchilas': 'Santo Domingo',
+    'Galápagos': 'Puerto Ayora', 'Manabí': 'Portoviejo', 'Isabela': 'Puerto Villamil',
+}
+
+# Zoom levels with precomputed tiles; features are listed at MAX_ZOOM.
+ZOOMS = (6, 8, 10)
+MAX_ZOOM = ZOOMS[-1]
+TILE_PX = 256
+CLUSTER_PX = 64
+# GeoIndex grid cell (degrees, about 28 km)
+CELL_DEG = 0.25
+NEAREST_N = 12
+# Padding around a province's known places for its map bounds (degrees)
+PROVINCE_PAD = 0.15
+EARTH_KM = 6371.0088
+
+_COORDS_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat, dlng = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# ─── Gazetteer ────────────────────────────────────────────────
+
+class Gazetteer:
+    def __init__(self, entries=GAZETTEER, aliases=ALIASES):
+        self.entries = entries
+        self.folded = {norm_text(name): name for name in entries}
+        self.folded.update((norm_text(alias), name) for alias, name in aliases.items())
+        # Longest names first so "Volcán Cayambe" wins over "Cayambe"
+        names = sorted(self.folded, key=len, reverse=True)
+        self.pattern = re.compile(r'\b(?:' + '|'.join(re.escape(n) for n in names) + r')\b')
+
+    def lookup(self, name):
+        """Canonical gazetteer name for a city/place name, or None."""
+        return self.folded.get(norm_text(name)) if name else None
+
+    def find(self, text):
+        """First gazetteer name mentioned in free text (title, slug), or None."""
+        m = self.pattern.search(norm_text(str(text or '')).replace('-', ' '))
+        return self.folded[m.group(0)] if m else None
+
+
+# ─── Features ─────────────────────────────────────────────────
+
+def _feature(kind, slug, title, city, lat, lng, gaz, **extra):
+    province, region = (gaz.entries[city][2:] if city in gaz.entries else (None, None))
+    out = {'kind': kind, 'slug': slug, 'title': title, 'city': city, 'province': province, 'region': region,
+           'lat': round(lat, 5), 'lng': round(lng, 5)}
+    out.update((k, v) for k, v in extra.items() if v is not None)
+    return out
+
+
+def extract_features(recipes, posts, gaz):
+    """Return (features, unlocated Counter by kind)."""
+    features, unlocated = [], Counter()
+    for recipe in recipes:
+        slug, title = recipe.get('slug'), recipe.get('title')
+        if not slug:
+            continue
+        seen = set()
+        for entry in recipe.get('origin_cities') or []:
+            name = gaz.lookup(entry.get('city') if isinstance(entry, dict) else entry)
+            if name and name not in seen:
+                seen.add(name)
+                lat, lng = gaz.entries[name][:2]
+                features.append(_feature('recipe', slug, title, name, lat, lng, gaz))
+        if not seen:
+            unlocated['recipe'] += 1
+        for place in recipe.get('places') or []:
+            if not isinstance(place, dict) or not place.get('name'):
+                continue
+            name = gaz.lookup(place.get('city'))
+            if isinstance(place.get('lat'), (int, float)) and isinstance(place.get('lng'), (int, float)):
+                lat, lng, approx = place['lat'], place['lng'], None
+            elif name:
+                lat, lng = gaz.entries[name][:2]
+                approx = True
+            else:
+                unlocated['place'] += 1
+                continue
+            features.append(_feature('place', slug, title, name or place.get('city'), lat, lng, gaz,
+                                     name=place['name'], rating=place.get('rating'),
+                                     reviews=place.get('userRatingCount'), url=place.get('googleMapsUri'),
+                                     approx=approx))
+    for post in posts:
+        slug = post.get('slug')
+        name = gaz.find(post.get('title')) or gaz.find(slug)
+        if not slug:
+            continue
+        if not name:
+            unlocated['post'] += 1
+            continue
+        lat, lng = gaz.entries[name][:2]
+        features.append(_feature('post', slug, post.get('title'), name, lat, lng, gaz))
+    return features, unlocated
+
+
+# ─── Spatial index ────────────────────────────────────────────
+
+class GeoIndex:
+    """Uniform lat/lng grid over features; exact haversine distances on the candidates."""
+
+    def __init__(self, features, cell=CELL_DEG):
+        self.cell = cell
+        self.grid = defaultdict(list)
+        for f in features:
+            self.grid[self._key(f['lat'], f['lng'])].append(f)
+
+    def _key(self, lat, lng):
+        return math.floor(lat / self.cell), math.floor(lng / self.cell)
+
+    def within(self, lat, lng, km, kinds=None):
+        """[(km, feature)] within `km` of the point, nearest first."""
+        dlat = km / 111.32
+        dlng = km / max(1e-6, 111.32 * math.cos(math.radians(lat)))
+        lo, hi = self._key(lat - dlat, lng - dlng), self._key(lat + dlat, lng + dlng)
+        out = []
+        for i in range(lo[0], hi[0] + 1):
+            for j in range(lo[1], hi[1] + 1):
+                for f in self.grid.get((i, j), ()):
+                    if kinds and f['kind'] not in kinds:
+                        continue
+                    d = haversine_km(lat, lng, f['lat'], f['lng'])
+                    if d <= km:
+                        out.append((d, f))
+        out.sort(key=lambda df: (df[0], df[1]['kind'], df[1]['slug']))
+        return out
+
+    def nearest(self, lat, lng, n, kinds=None, max_km=2000):
+        """The n nearest features; the radius doubles until n are inside it."""
+        km = self.cell * 111.32
+        while True:
+            found = self.within(lat, lng, km, kinds)
+            if len(found) >= n or km >= max_km:
+                return found[:n]
+            km *= 2
+
+
+# ─── Tiles and clusters ───────────────────────────────────────
+
+def to_world(lat, lng, zoom):
+    """Web-mercator pixel coordinates at `zoom`."""
+    size = TILE_PX * 2 ** zoom
+    x = (lng + 180) / 360 * size
+    s = math.sin(math.radians(max(-85.0511, min(85.0511, lat))))
+    y = (0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)) * size
+    return x, y
+
+
+def cluster(features, zoom):
+    """Grid clustering in pixel space: {(tile_x, tile_y): [cluster]}."""
+    cells = defaultdict(list)
+    for f in features:
+        x, y = to_world(f['lat'], f['lng'], zoom)
+        cells[int(x // CLUSTER_PX), int(y // CLUSTER_PX)].append(f)
+    tiles = defaultdict(list)
+    for members in cells.values():
+        lat = sum(f['lat'] for f in members) / len(members)
+        lng = sum(f['lng'] for f in members) / len(members)
+        x, y = to_world(lat, lng, zoom)
+        kinds = Counter(f['kind'] for f in members)
+        cities = Counter(f['city'] for f in members)
+        tiles[int(x // TILE_PX), int(y // TILE_PX)].append({
+            'lat': round(lat, 5), 'lng': round(lng, 5), 'count': len(members), 'kinds': dict(sorted(kinds.items())),
+            'city': cities.most_common(1)[0][0]})
+    for clusters in tiles.values():
+        clusters.sort(key=lambda c: (-c['count'], c['lat'], c['lng']))
+    return tiles
+
+
+def feature_tiles(features, zoom):
+    tiles = defaultdict(list)
+    for f in features:
+        x, y = to_world(f['lat'], f['lng'], zoom)
+        tiles[int(x // TILE_PX), int(y // TILE_PX)].append(f)
+    return tiles
+
+
+# ─── Build ────────────────────────────────────────────────────
+
+def _summary(feature):
+    out = {'kind': feature['kind'], 'slug': feature['slug'], 'title': feature['title'], 'city': feature['city']}
+    if 'name' in feature:
+        out['name'] = feature['name']
+    return out
+
+
+def build(recipes, posts, out_dir=OUT_DIR, dry_run=False, gaz=None):
+    gaz = gaz or Gazetteer()
+    features, unlocated = extract_features(recipes, posts, gaz)
+    index = GeoIndex(features)
+    writer = ShardWriter(out_dir, dry_run)
+
+    def put(rel, obj):
+        raw = compact(obj)
+        rel = f'{rel}.{short_hash(raw)}.json'
+        writer.put(rel, raw)
+        return 'data/' + rel
+
+    tiles = {}
+    for zoom in ZOOMS:
+        by_tile = feature_tiles(features, zoom) if zoom == MAX_ZOOM else cluster(features, zoom)
+        tiles[str(zoom)] = {f'{x}-{y}': put(f'{GEO_DIR}/{zoom}/{x}-{y}', items)
+                            for (x, y), items in sorted(by_tile.items())}
+
+    counts = defaultdict(Counter)
+    for f in features:
+        counts[f['city']][f['kind']] += 1
+    cities, provinces, by_region = {}, defaultdict(list), defaultdict(dict)
+    for name, (lat, lng, province, region) in GAZETTEER.items():
+        provinces[province].append(name)
+        if not counts[name]:
+            continue
+        cities[name] = {'lat': lat, 'lng': lng, 'province': province, 'region': region,
+                        'counts': dict(sorted(counts[name].items()))}
+        by_region[region][name] = [dict(_summary(f), km=round(d, 1))
+                                   for d, f in index.nearest(lat, lng, NEAREST_N)]
+
+    province_info = {}
+    for province, names in sorted(provinces.items()):
+        lats = [GAZETTEER[n][0] for n in names]
+        lngs = [GAZETTEER[n][1] for n in names]
+        province_info[province] = {
+            'bbox': [round(min(lats) - PROVINCE_PAD, 4), round(min(lngs) - PROVINCE_PAD, 4),
+                     round(max(lats) + PROVINCE_PAD, 4), round(max(lngs) + PROVINCE_PAD, 4)],
+            'cities': sorted((n for n in names if n in cities), key=lambda n: (-sum(cities[n]['counts'].values()), n)),
+        }
+    regions = {region: put(f'{GEO_DIR}/region/{region}', nearest) for region, nearest in sorted(by_region.items())}
+
+    manifest = {'zooms': list(ZOOMS), 'max_zoom': MAX_ZOOM, 'tile_px': TILE_PX, 'tiles': tiles,
+                'cities': cities, 'provinces': province_info, 'regions': regions,
+                'features': dict(sorted(Counter(f['kind'] for f in features).items()))}
+    removed = writer.prune([f'{GEO_DIR}/{z}' for z in ZOOMS] + [f'{GEO_DIR}/region'])
+    manifest_path = out_dir / GEO_DIR / 'index.json'
+    old = load_json(manifest_path) if manifest_path.exists() else None
+    if old != manifest and not dry_run:
+        write_json(manifest_path, manifest, indent=None)
+    return {'features': len(features), 'unlocated': dict(unlocated), 'written': writer.written,
+            'removed': removed, 'manifest_changed': old != manifest}
+
+
+# ─── CLI ──────────────────────────────────────────────────────
+
+def resolve_point(text, gaz):
+    m = _COORDS_RE.match(text)
+    if m:
+        return float(m.group(1)), float(m.group(2)), None
+    name = gaz.lookup(text)
+    if not name:
+        raise SystemExit(f'Unknown place "{text}"; use a gazetteer city or lat,lng')
+    return GAZETTEER[name][0], GAZETTEER[name][1], name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Geo index and map tiles for recipes, places and posts.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help='Write data/geo/')
+    b.add_argument('--dry-run', action='store_true', help='Report what would change')
+    q = sub.add_parser('near', help='Recipes, places and posts near a city or lat,lng')
+    q.add_argument('point', help='Gazetteer name (Quito, Montañita) or "lat,lng" (after -- when negative)')
+    q.add_argument('--km', type=float, default=25.0, help='Search radius (default 25)')
+    q.add_argument('--nearest', type=int, metavar='N', help='Return the N nearest instead of a radius')
+    q.add_argument('--kind', action='append', choices=('recipe', 'place', 'post'))
+    q.add_argument('--limit', type=int, default=30)
+    q.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    recipes, posts = load_json(RECIPES_PATH), load_json(POSTS_PATH)
+    gaz = Gazetteer()
+    if args.command == 'build':
+        result = build(recipes, posts, dry_run=args.dry_run, gaz=gaz)
+        for rel in result['written']:
+            print(f'  + data/{rel}')
+        for rel in result['removed']:
+            print(f'  - data/{rel}')
+        missing = ', '.join(f'{n} {k}s' for k, n in sorted(result['unlocated'].items()))
+        print(f"{result['features']} features{f' (unlocated: {missing})' if missing else ''}, "
+              f"{len(result['written'])} files written, {len(result['removed'])} removed, "
+              f"index {'updated' if result['manifest_changed'] else 'unchanged'}")
+        return 0
+
+    lat, lng, name = resolve_point(args.point, gaz)
+    features, _ = extract_features(recipes, posts, gaz)
+    index = GeoIndex(features)
+    kinds = set(args.kind) if args.kind else None
+    found = (index.nearest(lat, lng, args.nearest, kinds) if args.nearest
+             else index.within(lat, lng, args.km, kinds))[:args.limit]
+    if args.json:
+        print(json.dumps([dict(f, km=round(d, 2)) for d, f in found], ensure_ascii=False, indent=2))
+        return 0
+    where = name or f'{lat},{lng}'
+    print(f"{len(found)} results {'nearest to' if args.nearest else f'within {args.km:g} km of'} {where}")
+    for d, f in found:
+        label = f"{f['name']} ({f['title']})" if f['kind'] == 'place' else f['title']
+        print(f"  {d:6.1f} km  {f['kind']:6}  {f['city'] or '?':20}  {label}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
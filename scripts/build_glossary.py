@@ -0,0 +1,293 @@
+"""Precomputed glossary links for recipe text.
+
+initGlossary() used to run one regex per glossary term over every rendered
+container on each recipe page. This stage compiles every term of
+glossary.json, with its variants, into one Aho-Corasick automaton over
+normText-folded text (lowercase, no accents), and annotates each recipe's
+description, ingredients, instructions and tips in a single pass per string,
+so the cost is linear in the text however many terms the glossary has.
+
+Variants per term: the key and the display term, plurals (achiote ->
+achiotes, maíz -> maíces) and, for -ar/-er/-ir verbs, participles and the
+gerund (sancochar -> sancochado(s), sancochada(s), sancochando). Conjugated
+forms are left out on purpose: "sancocho" is a soup, not "I parboil". An
+entry can list extra spellings in "variants". Matches must sit on word
+boundaries; overlapping matches keep the leftmost, then the longest.
+
+Output: data/glossary-links.json
+    {"terms": {key: {term, definition, video}},
+     "recipes": {slug: {field: {"<index>": [[start, end, key], ...]}}}}
+Only strings with a match are listed, but every recipe gets an entry (empty
+when nothing matched), so the page can tell a recipe published after the
+build, which falls back to matching at runtime. Offsets are UTF-16 code
+units, as String.prototype.slice() expects. Per-recipe results are cached in
+.cache/glossary-links.json by text hash, so only recipes whose text changed
+are re-annotated, and all of them only when the glossary (or the variant
+rules) change.
+
+Usage:
+    python scripts/build_glossary.py
+    python scripts/build_glossary.py --full          # ignore the cache
+    python scripts/build_glossary.py --show locro-de-papa
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import deque
+
+from site_data import CACHE_DIR, RECIPES_PATH, ROOT, load_json, write_json
+
+GLOSSARY_PATH = ROOT / 'glossary.json'
+OUT_PATH = ROOT / 'data' / 'glossary-links.json'
+CACHE_PATH = CACHE_DIR / 'glossary-links.json'
+FIELDS = ('description', 'ingredients', 'instructions', 'tips')
+# Bump when the variant rules change so cached annotations are redone
+RULES_VERSION = 1
+
+VOWELS = frozenset('aeiou')
+VERB_FORMS = {
+    'ar': ('ado', 'ada', 'ados', 'adas', 'ando'),
+    'er': ('ido', 'ida', 'idos', 'idas', 'iendo'),
+    'ir': ('ido', 'ida', 'idos', 'idas', 'iendo'),
+}
+
+
+# Same folding as norm_text() / normText()
+_FOLD_TABLE = str.maketrans('áàâäéèêëíìîïóòôöúùûüñ', 'aaaaeeeeiiiioooouuuun')
+
+
+def fold(text):
+    """norm_text() without the strip, one output char per input char (offsets stay valid)."""
+    folded = text.lower().translate(_FOLD_TABLE)
+    if len(folded) == len(text):
+        return folded
+    # lower() can expand a few characters (e.g. 'İ'); keep the first one
+    return ''.join(c.lower().translate(_FOLD_TABLE)[:1] or c for c in text)
+
+
+def plural(word):
+    if word[-1] in VOWELS:
+        return word + 's'
+    if word[-1] == 'z':
+        return word[:-1] + 'ces'
+    if word[-1] in 'sx':
+        return word
+    return word + 'es'
+
+
+def variants(key, entry):
+    """Folded spellings that link to `key`."""
+    out = set()
+    for name in [key, entry.get('term') or key] + list(entry.get('variants') or []):
+        base = fold(name).strip()
+        if not base:
+            continue
+        head, _, rest = base.partition(' ')
+        out.add(base)
+        # Compound terms pluralize their first word: "hoja de achira" -> "hojas de achira"
+        out.add(plural(head) + (' ' + rest if rest else ''))
+        if not rest and base[-2:] in VERB_FORMS:
+            out.update(base[:-2] + suffix for suffix in VERB_FORMS[base[-2:]])
+    return out
+
+
+# ─── Automaton ────────────────────────────────────────────────
+
+class TermAutomaton:
+    """Aho-Corasick over folded variants; one pass per text, independent of the number of terms."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for word, key in sorted(patterns.items()):
+            state = 0
+            for c in word:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] = ((len(word), key),)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def contains(self, text):
+        """True if any pattern occurs in the folded text, word boundaries or not."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for c in fold(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if out[state]:
+                return True
+        return False
+
+    def find(self, text):
+        """Non-overlapping [start, end, key] matches on word boundaries, leftmost-longest."""
+        folded = fold(text)
+        goto, fail, out = self.goto, self.fail, self.out
+        found = []
+        state = 0
+        for i, c in enumerate(folded):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for length, key in out[state]:
+                start, end = i + 1 - length, i + 1
+                if (start == 0 or not folded[start - 1].isalnum()) and \
+                        (end == len(folded) or not folded[end].isalnum()):
+                    found.append((start, end, key))
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        spans = []
+        last = 0
+        for start, end, key in found:
+            if start >= last:
+                spans.append([start, end, key])
+                last = end
+        return spans
+
+
+def utf16_spans(text, spans):
+    """Code point offsets -> UTF-16 offsets (only differs past U+FFFF, e.g. emoji)."""
+    if not spans or all(ord(c) <= 0xFFFF for c in text):
+        return spans
+    units = [0]
+    for c in text:
+        units.append(units[-1] + (2 if ord(c) > 0xFFFF else 1))
+    return [[units[s], units[e], key] for s, e, key in spans]
+
+
+# ─── Build ────────────────────────────────────────────────────
+
+def _hash(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def recipe_texts(recipe):
+    out = {}
+    for field in FIELDS:
+        value = recipe.get(field)
+        if isinstance(value, str):
+            out[field] = [value]
+        elif isinstance(value, list):
+            out[field] = [v if isinstance(v, str) else '' for v in value]
+    return out
+
+
+def annotate(automaton, texts):
+    """{field: {"<index>": spans}} for the strings with at least one match."""
+    links = {}
+    for field, strings in texts.items():
+        per_field = {}
+        for i, text in enumerate(strings):
+            spans = automaton.find(text) if text else []
+            if spans:
+                per_field[str(i)] = utf16_spans(text, spans)
+        if per_field:
+            links[field] = per_field
+    return links
+
+
+def compile_patterns(glossary):
+    """{folded variant: key}; the first key listing a variant keeps it."""
+    patterns = {}
+    for key, entry in glossary.items():
+        for variant in sorted(variants(key, entry)):
+            patterns.setdefault(variant, key)
+    return patterns
+
+
+def build(recipes, glossary, cache=None):
+    """Return (output, new_cache, stats), re-annotating only what the changes can affect.
+
+    A recipe's cached spans are reused when its text is unchanged and none of
+    the variants added, removed or remapped since the cache was written occurs
+    in it (checked with a small automaton of just those variants). Editing a
+    definition or GIF re-annotates nothing.
+    """
+    patterns = compile_patterns(glossary)
+    automaton = TermAutomaton(patterns)
+    if not cache or cache.get('rules') != RULES_VERSION:
+        cache = {'patterns': {}, 'recipes': {}}
+    old = cache['patterns']
+    changed = {v: patterns.get(v) or old[v] for v in set(old) | set(patterns) if old.get(v) != patterns.get(v)}
+    delta = TermAutomaton(changed) if changed else None
+
+    stats = {'recipes': 0, 'annotated': 0, 'links': 0, 'variants': len(patterns)}
+    result, new_cache = {}, {'rules': RULES_VERSION, 'patterns': patterns, 'recipes': {}}
+    for recipe in recipes:
+        slug = recipe.get('slug')
+        if not slug:
+            continue
+        stats['recipes'] += 1
+        texts = recipe_texts(recipe)
+        text_hash = _hash(texts)
+        cached = cache['recipes'].get(slug)
+        if cached and cached[0] == text_hash and not (delta and any(
+                delta.contains(t) for strings in texts.values() for t in strings)):
+            links = cached[1]
+        else:
+            links = annotate(automaton, texts)
+            stats['annotated'] += 1
+        new_cache['recipes'][slug] = [text_hash, links]
+        result[slug] = links
+        if links:
+            stats['links'] += sum(len(s) for field in links.values() for s in field.values())
+    terms = {key: {k: entry.get(k, '') for k in ('term', 'definition', 'video')} for key, entry in glossary.items()}
+    return {'terms': terms, 'recipes': result}, new_cache, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute glossary term links for recipe text.')
+    parser.add_argument('--full', action='store_true', help='Re-annotate every recipe')
+    parser.add_argument('--show', metavar='SLUG', help='Print the linked terms of one recipe')
+    parser.add_argument('--dry-run', action='store_true', help='Report without writing')
+    args = parser.parse_args(argv)
+
+    recipes = load_json(RECIPES_PATH)
+    glossary = load_json(GLOSSARY_PATH)
+    cache = None if args.full or not CACHE_PATH.exists() else load_json(CACHE_PATH)
+    output, new_cache, stats = build(recipes, glossary, cache)
+
+    if args.show:
+        recipe = next((r for r in recipes if r.get('slug') == args.show), None)
+        if recipe is None:
+            print(f'No recipe {args.show}', file=sys.stderr)
+            return 1
+        texts = recipe_texts(recipe)
+        for field, per_field in output['recipes'].get(args.show, {}).items():
+            for i, spans in per_field.items():
+                # --show is for eyeballing; slice by code points
+                marks = ', '.join(f'{texts[field][int(i)][s:e]!r}->{key}' for s, e, key in spans)
+                print(f'  {field}[{i}]: {marks}')
+        return 0
+
+    old = load_json(OUT_PATH) if OUT_PATH.exists() else None
+    changed = old != output
+    if not args.dry_run:
+        if changed:
+            write_json(OUT_PATH, output, indent=None)
+        write_json(CACHE_PATH, new_cache, indent=None)
+    print(f"{stats['recipes']} recipes ({stats['annotated']} annotated), {len(glossary)} terms as "
+          f"{stats['variants']} variants, {stats['links']} links, "
+          f"{OUT_PATH.relative_to(ROOT)} {'updated' if changed else 'unchanged'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
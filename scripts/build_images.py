@@ -0,0 +1,202 @@
+"""Build responsive derivatives for images/ and images/manifest.json.
+
+Every source JPEG/PNG under images/ gets resized copies at a few widths in
+WebP (and AVIF when the installed Pillow supports it), plus a tiny blurred
+WebP placeholder inlined as a data URI. Derivatives are served from
+images/derived/ and are named after the source's content hash, so they can
+be cached forever; a new or replaced image only changes its own entries.
+
+The source hashes are remembered in CACHE_DIR/images.json and every
+derivative is also kept in CACHE_DIR/images/ (a hard link where possible).
+CACHE_DIR survives between Vercel builds (see site_data.py) while the
+gitignored images/derived/ does not, so a deploy restores unchanged
+derivatives from there instead of re-encoding the folder; only new or
+edited images are decoded, in a process pool. Derivatives that no manifest
+entry references any more are deleted from both places.
+
+images/manifest.json maps each source path (as used in image_url, e.g.
+"images/posts/otavalo-....jpg") to its width/height, placeholder and one
+srcset per format; js/images.js turns that into <picture> markup.
+
+Usage:
+    python scripts/build_images.py
+    python scripts/build_images.py --force --workers 4
+    python scripts/build_images.py --dry-run
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageFilter, features
+
+from site_data import CACHE_DIR, ROOT, link_or_copy, load_json, write_json
+
+IMAGES_DIR = ROOT / 'images'
+DERIVED_DIR = IMAGES_DIR / 'derived'
+MANIFEST_PATH = IMAGES_DIR / 'manifest.json'
+CACHE_PATH = CACHE_DIR / 'images.json'
+STORE_DIR = CACHE_DIR / 'images'
+
+SOURCE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+# Card grids render at ~360-480 CSS px; 960 covers 2x screens and the recipe hero.
+WIDTHS = (320, 640, 960)
+QUALITY = {'avif': 50, 'webp': 72}
+PLACEHOLDER_WIDTH = 16
+
+# Bump when the encoding settings change so every image is re-encoded.
+PIPELINE_VERSION = 1
+
+HASH_LEN = 10
+
+
+def available_formats():
+    return tuple(fmt for fmt in ('avif', 'webp') if features.check(fmt))
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_images(images_dir=IMAGES_DIR):
+    for path in sorted(images_dir.rglob('*')):
+        if path.suffix.lower() in SOURCE_SUFFIXES and DERIVED_DIR not in path.parents:
+            yield path
+
+
+def _derived_prefix(rel, digest):
+    return f"{rel.rsplit('.', 1)[0].replace('/', '__')}.{digest[:HASH_LEN]}-"
+
+
+def _derived_name(rel, digest, width, fmt):
+    return f'{_derived_prefix(rel, digest)}{width}.{fmt}'
+
+
+def restore(names, dry_run=False):
+    """True when every derivative is in DERIVED_DIR or STORE_DIR; fills in whichever side lacks it."""
+    if not all((DERIVED_DIR / n).exists() or (STORE_DIR / n).exists() for n in names):
+        return False
+    if not dry_run:
+        for name in names:
+            served, kept = DERIVED_DIR / name, STORE_DIR / name
+            if not served.exists():
+                link_or_copy(kept, served)
+            elif not kept.exists():
+                link_or_copy(served, kept)
+    return True
+
+
+def encode_image(path, rel, digest, formats, overwrite=False):
+    """Resize and encode one source; runs in a worker process. Returns its manifest entry."""
+    with Image.open(path) as im:
+        im = im.convert('RGB')
+        width, height = im.size
+        srcset = {fmt: [] for fmt in formats}
+        files = []
+        widths = [w for w in WIDTHS if w < width] + [min(width, WIDTHS[-1])]
+        for w in sorted(set(widths)):
+            resized = im if w == width else im.resize((w, round(height * w / width)), Image.LANCZOS)
+            for fmt in formats:
+                name = _derived_name(rel, digest, w, fmt)
+                out = DERIVED_DIR / name
+                if overwrite or not out.exists():
+                    tmp = out.with_name(out.name + '.tmp')
+                    resized.save(tmp, fmt.upper(), quality=QUALITY[fmt])
+                    tmp.replace(out)
+                files.append(name)
+                srcset[fmt].append(f'images/derived/{name} {w}w')
+
+        tiny = im.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+        buf = io.BytesIO()
+        tiny.filter(ImageFilter.GaussianBlur(1)).save(buf, 'WEBP', quality=30)
+
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': 'data:image/webp;base64,' + base64.b64encode(buf.getvalue()).decode('ascii'),
+        'srcset': {fmt: ', '.join(items) for fmt, items in srcset.items()},
+        'files': files,
+    }
+
+
+def build(force=False, workers=None, dry_run=False):
+    formats = available_formats()
+    settings = [PIPELINE_VERSION, list(WIDTHS), QUALITY, list(formats)]
+    cache = load_json(CACHE_PATH) if CACHE_PATH.exists() else {}
+    # Derivative names only carry the source hash, so new settings must overwrite existing files.
+    overwrite = force or bool(cache) and cache.get('settings') != settings
+    cached = {} if overwrite else cache.get('images', {})
+
+    entries, todo = {}, []
+    for path in source_images(IMAGES_DIR):
+        rel = path.relative_to(ROOT).as_posix()
+        digest = file_hash(path)
+        hit = cached.get(rel)
+        if hit and hit['hash'] == digest and restore(hit['entry']['files'], dry_run):
+            entries[rel] = hit
+        else:
+            todo.append((path, rel, digest))
+
+    if todo and not dry_run:
+        DERIVED_DIR.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(rel, digest, pool.submit(encode_image, path, rel, digest, formats, overwrite))
+                       for path, rel, digest in todo]
+            for rel, digest, future in futures:
+                entries[rel] = {'hash': digest, 'entry': future.result()}
+        for _, rel, _ in todo:
+            for name in entries[rel]['entry']['files']:
+                link_or_copy(DERIVED_DIR / name, STORE_DIR / name)
+
+    keep = {f for e in entries.values() for f in e['entry']['files']}
+    # In a dry run the pending images were not encoded; their existing files are not stale.
+    pending = tuple(_derived_prefix(rel, digest) for _, rel, digest in todo) if dry_run else ()
+    stale = sorted(p for p in DERIVED_DIR.glob('*')
+                   if p.name not in keep and not p.name.startswith(pending)) if DERIVED_DIR.exists() else []
+    if not dry_run:
+        for p in stale:
+            p.unlink()
+        for p in STORE_DIR.glob('*') if STORE_DIR.exists() else ():
+            if p.name not in keep:
+                p.unlink()
+        manifest = {
+            'v': 1,
+            'images': {rel: {k: v for k, v in e['entry'].items() if k != 'files'}
+                       for rel, e in sorted(entries.items())},
+        }
+        old = load_json(MANIFEST_PATH) if MANIFEST_PATH.exists() else None
+        if old != manifest:
+            write_json(MANIFEST_PATH, manifest, indent=None)
+        write_json(CACHE_PATH, {'settings': settings, 'images': entries}, indent=None)
+    return {'formats': formats, 'total': len(entries) + (len(todo) if dry_run else 0),
+            'encoded': [rel for _, rel, _ in todo], 'removed': [p.name for p in stale]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build responsive image derivatives and images/manifest.json.')
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and re-encode every image')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='List the images that would be encoded')
+    args = parser.parse_args(argv)
+
+    result = build(force=args.force, workers=args.workers, dry_run=args.dry_run)
+    for rel in result['encoded']:
+        print(f'  + {rel}')
+    for name in result['removed']:
+        print(f'  - images/derived/{name}')
+    verb = 'would encode' if args.dry_run else 'encoded'
+    print(f"{result['total']} images ({'/'.join(result['formats'])}), {verb} {len(result['encoded'])}, "
+          f"removed {len(result['removed'])} stale derivatives")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Precompute weekly menus for menu-semanal.html.
+
+A recipe x ingredient incidence matrix is built once: ingredients are keyed
+by their price_db.json entry when PriceMatcher resolves one, else by their
+normalized base name, so "2 papas" and "1 kg Papas" count as the same
+purchase. From it come the recipe costs and the pairwise overlap matrix.
+
+Each menu is 7 main dishes chosen by a randomized greedy pass plus swap
+local search that maximizes ingredients shared across the week (each shared
+purchase is one fewer line on the shopping list), under:
+    budget      estimated cost for --servings people at most the tier budget;
+                a priced ingredient shared by several recipes is paid once
+                (saving at most SHARED_SAVING_CAP of the week's cost)
+    time        at most WEEKEND_SLOTS dishes over --weekday-minutes; those go
+                to Saturday/Sunday
+    variety     at most MAX_PER_CATEGORY dishes per category and
+                MAX_PER_REGION per region
+Several menus per budget tier are generated with different seeds and
+written with their merged shopping list (scaling.py) to data/menus.json.
+The file is only rewritten when its inputs or the settings change.
+
+Usage:
+    python scripts/build_menus.py
+    python scripts/build_menus.py --menus 20 --servings 2 --show
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import statistics
+import sys
+from collections import Counter
+
+import numpy as np
+
+from build_price_index import PriceMatcher
+from ingredients import SPICES
+from scaling import ScalingTable
+from site_data import PRICE_DB_PATH, RECIPES_PATH, ROOT, extract_ing_base, ingredient_text, load_json, norm_text, \
+    parse_minutes, parse_servings, write_json
+
+OUT_PATH = ROOT / 'data' / 'menus.json'
+
+# Bump when the model changes so menus.json is regenerated.
+MODEL_VERSION = 1
+
+DAYS = ('Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo')
+MAIN_CATEGORIES = ('Platos Fuertes', 'Sopas', 'Mariscos')
+# Weekly budget (USD) per tier for the default 4 servings; scaled with --servings
+TIERS = {'economico': 50.0, 'estandar': 70.0, 'festivo': 95.0}
+MAX_PER_CATEGORY = 3
+MAX_PER_REGION = 4
+WEEKEND_SLOTS = 2
+# Seasonings are shared by almost every recipe; sharing them saves little.
+SPICE_WEIGHT = 0.25
+# Trade-off between shared ingredients and cost (per fraction of the budget)
+COST_WEIGHT = 2.0
+LOCAL_SEARCH_PASSES = 4
+# Objective cost of reusing a recipe already picked for another menu of the tier
+REUSE_PENALTY = 1.5
+# Shared purchases never save more than this share of the week's cost
+SHARED_SAVING_CAP = 0.25
+
+_COST_RE = re.compile(r'\$\s*(\d+(?:[.,]\d+)?)')
+_COST_SERVINGS_RE = re.compile(r'para\s+(\d+)', re.I)
+_SPICE_KEY_RE = re.compile(r'\b(?:%s)\b' % '|'.join(re.escape(s) for s in SPICES))
+
+
+def parse_cost(value):
+    """'$15.00 USD' -> 15.0, 'Aprox. $14.76 - $26.92 USD (para 4 personas)' -> (20.84, 4)."""
+    amounts = [float(a.replace(',', '.')) for a in _COST_RE.findall(str(value or ''))]
+    if not amounts:
+        return None, None
+    m = _COST_SERVINGS_RE.search(str(value))
+    return sum(amounts) / len(amounts), int(m.group(1)) if m else None
+
+
+class MenuModel:
+    """Recipe x ingredient matrix plus per-recipe attributes, built once per run."""
+
+    def __init__(self, recipes, price_db, servings=4):
+        matcher = PriceMatcher(price_db)
+        self.recipes = [r for r in recipes if r.get('slug') and r.get('category') in MAIN_CATEGORIES]
+        keys, rows = {}, []
+        for recipe in self.recipes:
+            row = set()
+            for ing in recipe.get('ingredients') or []:
+                base = extract_ing_base(ingredient_text(ing))
+                if base:
+                    row.add(keys.setdefault(matcher.resolve(base) or base, len(keys)))
+            rows.append(row)
+        self.keys = list(keys)
+        self.incidence = np.zeros((len(self.recipes), len(keys)), dtype=np.float64)
+        for i, row in enumerate(rows):
+            self.incidence[i, list(row)] = 1.0
+        self.weights = np.array([SPICE_WEIGHT if _SPICE_KEY_RE.search(norm_text(k)) else 1.0 for k in self.keys])
+        self.prices = np.array([(price_db.get(k) or {}).get('price_min') or 0.0 for k in self.keys])
+        # Weighted shared-ingredient counts between every pair of recipes
+        self.overlap = (self.incidence * self.weights) @ self.incidence.T
+        np.fill_diagonal(self.overlap, 0.0)
+
+        self.servings = servings
+        self.minutes = np.array([parse_minutes(r.get('total_time')) for r in self.recipes], dtype=np.float64)
+        self.category = np.array([MAIN_CATEGORIES.index(r['category']) for r in self.recipes])
+        regions = sorted({r.get('region') or '' for r in self.recipes})
+        self.region = np.array([regions.index(r.get('region') or '') for r in self.recipes])
+        self.cost = self._costs()
+
+    def _costs(self):
+        """Cost of each recipe for self.servings: estimated_cost when present, else its priced ingredients."""
+        per_serving = []
+        for i, recipe in enumerate(self.recipes):
+            amount, serves = parse_cost(recipe.get('estimated_cost'))
+            if amount:
+                per_serving.append(amount / (serves or parse_servings(recipe.get('servings'))))
+            else:
+                priced = float(self.incidence[i] @ self.prices)
+                per_serving.append(priced / parse_servings(recipe.get('servings')) if priced else None)
+        fallback = statistics.median(c for c in per_serving if c)
+        return np.array([(c or fallback) * self.servings for c in per_serving])
+
+    def _totals(self, counts, gross):
+        """Menu cost and shared-ingredient score from ingredient counts (rows = alternative menus)."""
+        extra = np.maximum(counts - 1, 0)
+        saving = np.minimum(extra @ self.prices, SHARED_SAVING_CAP * gross)
+        return gross - saving, extra @ self.weights
+
+    def menu_cost(self, members):
+        return float(self._totals(self.incidence[members].sum(axis=0), self.cost[members].sum())[0])
+
+    def shared(self, members):
+        return float(self._totals(self.incidence[members].sum(axis=0), self.cost[members].sum())[1])
+
+    def feasible(self, members, weekday_minutes):
+        if len(set(members)) != len(members):
+            return False
+        if np.bincount(self.category[members]).max() > MAX_PER_CATEGORY:
+            return False
+        if np.bincount(self.region[members]).max() > MAX_PER_REGION:
+            return False
+        return int((self.minutes[members] > weekday_minutes).sum()) <= WEEKEND_SLOTS
+
+    def objective(self, members, budget):
+        return self.shared(members) - COST_WEIGHT * self.menu_cost(members) / budget
+
+    def _allowed(self, others, weekday_minutes):
+        """Candidates that keep `others` + candidate within the variety and time limits."""
+        ok = np.ones(len(self.recipes), dtype=bool)
+        ok[others] = False
+        if others:
+            cats = np.bincount(self.category[others], minlength=len(MAIN_CATEGORIES))
+            regs = np.bincount(self.region[others], minlength=self.region.max() + 1)
+            ok &= cats[self.category] < MAX_PER_CATEGORY
+            ok &= regs[self.region] < MAX_PER_REGION
+            if (self.minutes[others] > weekday_minutes).sum() >= WEEKEND_SLOTS:
+                ok &= self.minutes <= weekday_minutes
+        return ok
+
+    def solve(self, budget, weekday_minutes, rng, penalty=None, days=len(DAYS)):
+        """One menu (list of recipe indices) within budget, or None.
+
+        `penalty` (one value per recipe) is subtracted from the objective; the
+        batch uses it to steer later menus away from recipes already used.
+        """
+        n = len(self.recipes)
+        penalty = np.zeros(n) if penalty is None else penalty
+        noise = np.array([rng.random() for _ in range(n * days)]).reshape(days, n) * 1.5
+        members = [int(rng.randrange(n))]
+        while len(members) < days:
+            ok = self._allowed(members, weekday_minutes)
+            if not ok.any():
+                return None
+            gain = (self.overlap[:, members].sum(axis=1) - COST_WEIGHT * self.cost / budget - penalty +
+                    noise[len(members)])
+            members.append(int(np.argmax(np.where(ok, gain, -np.inf))))
+
+        # Swap local search: every replacement of one day is scored at once.
+        for _ in range(LOCAL_SEARCH_PASSES):
+            improved = False
+            for pos in rng.sample(range(days), days):
+                others = members[:pos] + members[pos + 1:]
+                base = self.incidence[others].sum(axis=0)
+                cost, shared = self._totals(base + self.incidence, self.cost[others].sum() + self.cost)
+                value = np.where(self._allowed(others, weekday_minutes) & (cost <= budget),
+                                 shared - COST_WEIGHT * cost / budget - penalty, -np.inf)
+                best = int(np.argmax(value))
+                current = (self.objective(members, budget) - penalty[members[pos]]
+                           if self.menu_cost(members) <= budget else -np.inf)
+                if value[best] > current + 1e-9:
+                    members[pos] = best
+                    improved = True
+            if not improved:
+                break
+        if self.menu_cost(members) > budget or not self.feasible(members, weekday_minutes):
+            return None
+        return members
+
+    def schedule(self, members, weekday_minutes):
+        """Long dishes on the weekend, the rest Monday-Friday by cook time."""
+        long_ones = [m for m in members if self.minutes[m] > weekday_minutes]
+        short = sorted((m for m in members if m not in long_ones), key=lambda m: self.minutes[m])
+        weekend = sorted(long_ones, key=lambda m: self.minutes[m])
+        while len(weekend) < WEEKEND_SLOTS and short:
+            weekend.insert(0, short.pop())
+        return short + weekend
+
+
+def input_hash(recipes, price_db, settings):
+    raw = json.dumps([MODEL_VERSION, settings, recipes, price_db], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def build(recipes, price_db, menus_per_tier, servings, weekday_minutes, seed):
+    model = MenuModel(recipes, price_db, servings)
+    table = ScalingTable.load(recipes=recipes)
+    scale = servings / 4
+    out, seen = [], set()
+    for tier, budget in TIERS.items():
+        budget *= scale
+        rng = random.Random(f'{seed}:{tier}')
+        usage = np.zeros(len(model.recipes))
+        attempts = 0
+        while sum(m['tier'] == tier for m in out) < menus_per_tier and attempts < menus_per_tier * 10:
+            attempts += 1
+            members = model.solve(budget, weekday_minutes, rng, REUSE_PENALTY * usage)
+            if members is None or frozenset(members) in seen:
+                continue
+            seen.add(frozenset(members))
+            usage[members] += 1
+            ordered = model.schedule(members, weekday_minutes)
+            slugs = [model.recipes[m]['slug'] for m in ordered]
+            out.append({
+                'id': f'{tier}-{len([m for m in out if m["tier"] == tier]) + 1}',
+                'tier': tier,
+                'budget': round(budget, 2),
+                'cost': round(model.menu_cost(members), 2),
+                'shared': round(model.shared(members), 2),
+                'minutes': int(model.minutes[members].sum()),
+                'days': [{'day': d, 'slug': s} for d, s in zip(DAYS, slugs)],
+                'shopping': [[name, qty] for name, qty in table.shopping_list([(s, servings) for s in slugs])],
+            })
+    return model, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute weekly menus into data/menus.json.')
+    parser.add_argument('--menus', type=int, default=12, help='Menus per budget tier')
+    parser.add_argument('--servings', type=int, default=4)
+    parser.add_argument('--weekday-minutes', type=int, default=90, help='Longest dish on a weekday')
+    parser.add_argument('--seed', default='menus')
+    parser.add_argument('--show', action='store_true', help='Print every menu')
+    parser.add_argument('--force', action='store_true', help='Rebuild even when the inputs did not change')
+    args = parser.parse_args(argv)
+
+    recipes = load_json(RECIPES_PATH)
+    price_db = load_json(PRICE_DB_PATH)
+    settings = [args.menus, args.servings, args.weekday_minutes, args.seed, TIERS]
+    digest = input_hash(recipes, price_db, settings)
+    if not args.force and not args.show and OUT_PATH.exists() and load_json(OUT_PATH).get('source') == digest:
+        print('data/menus.json is up to date')
+        return 0
+
+    model, menus = build(recipes, price_db, args.menus, args.servings, args.weekday_minutes, args.seed)
+    write_json(OUT_PATH, {'v': MODEL_VERSION, 'source': digest, 'servings': args.servings, 'menus': menus},
+               indent=None)
+
+    titles = {r['slug']: r['title'] for r in model.recipes}
+    for menu in menus if args.show else []:
+        print(f"\n{menu['id']}: ${menu['cost']:.2f} / ${menu['budget']:.2f}, shared {menu['shared']}, "
+              f"{len(menu['shopping'])} shopping items, {menu['minutes']} min")
+        for day in menu['days']:
+            print(f"  {day['day']:<10} {titles[day['slug']]}")
+    tiers = Counter(m['tier'] for m in menus)
+    print(f"{len(model.recipes)} recipes x {len(model.keys)} ingredients; " +
+          ', '.join(f'{t} {tiers[t]}' for t in TIERS) + ' menus')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Build price_index.json: every recipe ingredient resolved to its price_db.json key.
+
+findPriceEntry() in js/prices.js normalizes every price_db key and scans it
+with substring and word tests for each ingredient on every render. This
+does the same resolution once at build time, with the keys normalized once
+and a word -> keys index for the last fallback, and writes a flat map
+{extractIngBase(ingredient): price_db key or null} that the front-end reads
+in O(1).
+
+Usage:
+    python scripts/build_price_index.py
+    python scripts/build_price_index.py --check     # report unmatched ingredients
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+
+from site_data import PRICE_DB_PATH, RECIPES_PATH, ROOT, extract_ing_base, ingredient_text, load_json, norm_text, write_json
+
+OUTPUT_PATH = ROOT / 'price_index.json'
+
+# findPriceEntry() only matches on words longer than this.
+MIN_WORD_LEN = 5
+
+
+class PriceMatcher:
+    """findPriceEntry() semantics over a price DB normalized once."""
+
+    def __init__(self, price_db):
+        self.keys = list(price_db)
+        self.normalized = [(norm_text(k), k) for k in self.keys]
+        # word -> price keys, in price_db order (first hit wins, as in the JS loop)
+        self.words = defaultdict(list)
+        for nk, k in self.normalized:
+            for w in set(nk.split()):
+                if len(w) >= MIN_WORD_LEN:
+                    self.words[w].append(k)
+        self.order = {k: i for i, k in enumerate(self.keys)}
+
+    def resolve(self, base):
+        if not base:
+            return None
+        if base in self.order:
+            return base
+        for nk, k in self.normalized:
+            if nk in base or base in nk:
+                return k
+        hits = [k for w in base.split() if len(w) >= MIN_WORD_LEN for k in self.words.get(w, ())]
+        return min(hits, key=self.order.__getitem__) if hits else None
+
+
+def build_index(recipes, price_db):
+    matcher = PriceMatcher(price_db)
+    bases = {}
+    for recipe in recipes:
+        for ing in recipe.get('ingredients') or []:
+            base = extract_ing_base(ingredient_text(ing))
+            if base and base not in bases:
+                bases[base] = matcher.resolve(base)
+    return dict(sorted(bases.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute ingredient -> price_db key lookups.')
+    parser.add_argument('--recipes', default=RECIPES_PATH)
+    parser.add_argument('--prices', default=PRICE_DB_PATH)
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH)
+    parser.add_argument('--check', action='store_true', help='List unmatched ingredients, do not write')
+    args = parser.parse_args(argv)
+
+    bases = build_index(load_json(args.recipes), load_json(args.prices))
+    matched = sum(1 for v in bases.values() if v)
+    if args.check:
+        for base, key in bases.items():
+            if key is None:
+                print(f'  sin precio: {base}')
+    else:
+        # Compact: the browser only needs the map.
+        write_json(args.output, {'bases': bases}, indent=None)
+    print(f'{len(bases)} ingredients, {matched} with price entry')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Build search-index.json: a compact inverted index over recipes and posts.
+
+Fields title, description, ingredients, keywords, region and category are
+folded like normText() (lowercase, no accents), tokenized and scored with
+BM25 (field-weighted term frequency). The artifact holds a sorted term list,
+so prefixes are a binary search, and one postings list per term, so a query
+costs a few lookups instead of a scan over every document. js/search.js
+reads the same format in the browser.
+
+Usage:
+    python scripts/build_search_index.py
+    python scripts/build_search_index.py query "llapinga queso"
+"""
+
+import argparse
+import bisect
+import math
+import re
+import sys
+from collections import Counter, defaultdict
+
+from site_data import POSTS_PATH, RECIPES_PATH, ROOT, ingredient_text, load_json, norm_text, write_json
+
+OUTPUT_PATH = ROOT / 'search-index.json'
+
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'keywords': 2.0,
+    'category': 1.5,
+    'region': 1.5,
+    'description': 1.0,
+    'ingredients': 1.0,
+}
+
+STOPWORDS = frozenset(
+    'a al con como de del el en es la las lo los mas o para por que se sin su sus un una y'.split()
+)
+
+K1 = 1.2
+B = 0.75
+
+# Scores are stored as integers (score * SCALE) to keep the JSON small.
+SCALE = 100
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_PARENS_RE = re.compile(r'\([^)]*\)')
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall(norm_text(text)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _as_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ' '.join(_as_text(v) for v in value)
+    return str(value)
+
+
+def document_fields(record, kind):
+    keywords = _as_text(record.get('keywords')) + ' ' + _as_text(record.get('seo_keywords'))
+    fields = {
+        'title': _as_text(record.get('title')),
+        'description': _as_text(record.get('description')),
+        'keywords': keywords,
+        'region': _as_text(record.get('region')),
+        # posts use "Destinos|Naturaleza"
+        'category': _as_text(record.get('category')).replace('|', ' '),
+    }
+    if kind == 'r':
+        # Drop "(comprar en Supermaxi)" notes, they would match every recipe.
+        fields['ingredients'] = ' '.join(_PARENS_RE.sub('', ingredient_text(i))
+                                         for i in record.get('ingredients') or [])
+    return fields
+
+
+def build_index(recipes, posts):
+    docs = []
+    tfs = []
+    for kind, records in (('r', recipes), ('p', posts)):
+        for record in records:
+            if not record.get('slug'):
+                continue
+            tf = Counter()
+            for field, text in document_fields(record, kind).items():
+                weight = FIELD_WEIGHTS[field]
+                for tok in tokenize(text):
+                    tf[tok] += weight
+            docs.append([kind, record['slug']])
+            tfs.append(tf)
+
+    n = len(docs)
+    avg_len = sum(sum(tf.values()) for tf in tfs) / n if n else 0
+    df = Counter(t for tf in tfs for t in tf)
+    postings = defaultdict(list)
+    for doc_id, tf in enumerate(tfs):
+        norm = K1 * (1 - B + B * sum(tf.values()) / avg_len) if avg_len else K1
+        for term, freq in tf.items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score = idf * freq * (K1 + 1) / (freq + norm)
+            postings[term].append((doc_id, round(score * SCALE)))
+
+    terms = sorted(postings)
+    flat = []
+    for term in terms:
+        plist = sorted(postings[term], key=lambda p: -p[1])
+        flat.append([x for pair in plist for x in pair])
+    return {'v': 1, 'scale': SCALE, 'docs': docs, 'terms': terms, 'postings': flat}
+
+
+def expand(index, token):
+    """Every term starting with `token` (exact match first), via binary search on the sorted list.
+
+    Uncapped on purpose: results are a filter, so a longer prefix must never
+    match a document a shorter one missed.
+    """
+    terms = index['terms']
+    i = bisect.bisect_left(terms, token)
+    out = []
+    while i < len(terms) and terms[i].startswith(token):
+        out.append(i)
+        i += 1
+    return out
+
+
+def search(index, query, limit=20):
+    """Every query token must match (as a prefix); returns [(score, kind, slug)]."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    totals = None
+    for token in tokens:
+        best = {}
+        for ti in expand(index, token):
+            plist = index['postings'][ti]
+            for j in range(0, len(plist), 2):
+                doc, score = plist[j], plist[j + 1]
+                if score > best.get(doc, -1):
+                    best[doc] = score
+        if totals is None:
+            totals = best
+        else:
+            totals = {d: s + best[d] for d, s in totals.items() if d in best}
+        if not totals:
+            return []
+    ranked = sorted(totals.items(), key=lambda x: -x[1])[:limit]
+    scale = index.get('scale', SCALE)
+    return [(score / scale, *index['docs'][doc]) for doc, score in ranked]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or query the static search index.')
+    sub = parser.add_subparsers(dest='command')
+    q = sub.add_parser('query', help='Query an existing index')
+    q.add_argument('text')
+    q.add_argument('-n', '--limit', type=int, default=10)
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'query':
+        index = load_json(args.output)
+        for score, kind, slug in search(index, args.text, args.limit):
+            print(f"{score:7.2f}  {'receta' if kind == 'r' else 'post  '}  {slug}")
+        return 0
+
+    index = build_index(load_json(RECIPES_PATH), load_json(POSTS_PATH))
+    write_json(args.output, index, indent=None)
+    print(f"{len(index['docs'])} docs, {len(index['terms'])} terms -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
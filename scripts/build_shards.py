@@ -0,0 +1,158 @@
+"""Split recipes.json / posts.json into a card index plus per-slug shards.
+
+Output (served as static files):
+    data/manifest.json                      -> {recipes: {index, count, items: {slug: file}}, posts: {...}}
+    data/recipes/index.<hash>.json          card fields only, corpus order
+    data/recipes/<slug>.<hash>.json         full record
+    data/posts/...
+
+File names carry a content hash, so the browser and CDN can cache them
+forever and only the manifest has to be revalidated. The build is
+incremental: unchanged shards are not rewritten, and shards no longer
+referenced are deleted, so publishing one new recipe touches the manifest,
+the index and a single shard.
+
+Usage:
+    python scripts/build_shards.py
+    python scripts/build_shards.py --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+
+from site_data import POSTS_PATH, RECIPES_PATH, ROOT, commit_atomic, load_json, open_atomic, write_json
+
+OUT_DIR = ROOT / 'data'
+
+# Fields used by renderCard() / getAudienceChip(), the recipes.html filters (text, city,
+# audience), the chuchaqui button and the weekly menu
+RECIPE_CARD_FIELDS = (
+    'id', 'slug', 'title', 'description', 'region', 'category', 'difficulty', 'servings',
+    'total_time', 'image_url', 'image_alt', 'target_audience', 'is_chuchaqui', 'estimated_cost',
+    'created_at', 'date_published', 'keywords', 'tags', 'tourism_route',
+)
+# Lists the front end only tests for emptiness on cards; the index keeps their first item
+NONEMPTY_FIELDS = ('places', 'international_substitutes')
+# Fields used by renderBlogCard() / blog filters
+POST_CARD_FIELDS = (
+    'id', 'slug', 'title', 'subtitle', 'description', 'category', 'region', 'keywords',
+    'date_published', 'featured', 'image_url', 'image_alt', 'reading_time', 'created_at',
+)
+
+CORPORA = {
+    'recipes': (RECIPES_PATH, RECIPE_CARD_FIELDS),
+    'posts': (POSTS_PATH, POST_CARD_FIELDS),
+}
+
+HASH_LEN = 12
+
+
+def compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def short_hash(raw):
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:HASH_LEN]
+
+
+def card(record, fields):
+    out = {k: record[k] for k in fields if k in record}
+    videos = record.get('youtube_videos')
+    if videos:
+        # renderCard() only needs videoId/channel for the thumbnail fallback.
+        out['youtube_videos'] = [{'videoId': v.get('videoId'), 'channel': v.get('channel')}
+                                 for v in videos[:3] if isinstance(v, dict)]
+    for key in NONEMPTY_FIELDS:
+        if record.get(key):
+            out[key] = record[key][:1]
+    if record.get('origin_cities'):
+        # the ?city= filter only compares names (cityName() in js/utils.js)
+        out['origin_cities'] = [c.get('city') if isinstance(c, dict) else c for c in record['origin_cities']]
+    return out
+
+
+class ShardWriter:
+    def __init__(self, out_dir, dry_run=False):
+        self.out_dir = out_dir
+        self.dry_run = dry_run
+        self.written = []
+        self.keep = set()
+
+    def put(self, rel, raw):
+        """Write data/<rel> unless it already exists (the name is its content hash)."""
+        self.keep.add(rel)
+        path = self.out_dir / rel
+        if path.exists():
+            return
+        self.written.append(rel)
+        if not self.dry_run:
+            f, tmp = open_atomic(path)
+            with f:
+                f.write(raw)
+            commit_atomic(tmp, path)
+
+    def prune(self, subdirs):
+        removed = []
+        for sub in subdirs:
+            for path in sorted((self.out_dir / sub).glob('*.json')):
+                rel = path.relative_to(self.out_dir).as_posix()
+                if rel not in self.keep:
+                    removed.append(rel)
+                    if not self.dry_run:
+                        path.unlink()
+        return removed
+
+
+def build_corpus(name, records, fields, writer):
+    items = {}
+    cards = []
+    for record in records:
+        slug = record.get('slug')
+        if not slug:
+            continue
+        if slug in items:
+            print(f'  {name}: slug duplicado "{slug}", se usa el último')
+        raw = compact(record)
+        rel = f'{name}/{slug}.{short_hash(raw)}.json'
+        writer.put(rel, raw)
+        items[slug] = 'data/' + rel
+        cards.append(card(record, fields))
+    raw = compact(cards)
+    rel = f'{name}/index.{short_hash(raw)}.json'
+    writer.put(rel, raw)
+    return {'index': 'data/' + rel, 'count': len(cards), 'items': items}
+
+
+def build(corpora=CORPORA, out_dir=OUT_DIR, dry_run=False):
+    writer = ShardWriter(out_dir, dry_run)
+    manifest = {}
+    for name, (path, fields) in corpora.items():
+        manifest[name] = build_corpus(name, load_json(path), fields, writer)
+    removed = writer.prune(corpora)
+
+    manifest_path = out_dir / 'manifest.json'
+    old = load_json(manifest_path) if manifest_path.exists() else None
+    if old != manifest and not dry_run:
+        write_json(manifest_path, manifest, indent=None)
+    return writer.written, removed, old != manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the sharded recipes/posts data under data/.')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change')
+    args = parser.parse_args(argv)
+
+    written, removed, manifest_changed = build(dry_run=args.dry_run)
+    for rel in written:
+        print(f'  + data/{rel}')
+    for rel in removed:
+        print(f'  - data/{rel}')
+    print(f"{len(written)} shards written, {len(removed)} removed, "
+          f"manifest {'updated' if manifest_changed else 'unchanged'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Build sitemap.xml from the static pages, recipes.json and posts.json.
+
+Each URL's content hash is kept in CACHE_DIR/sitemap_state.json (the build
+cache Vercel keeps between deploys), so <lastmod> only moves for pages whose
+content actually changed (a new recipe gets its created_at / date_published
+date, an edited one gets the build date) and crawlers are told exactly what
+to recrawl. When that state is missing (a fresh clone or a wiped cache) the
+lastmods of the committed sitemap are adopted as-is instead of stamping
+every URL with the build date.
+
+Entries are generated lazily and rendered per output file. While
+everything fits in one file (50,000 URLs / 50 MB, the sitemaps.org limits)
+sitemap.xml is a plain <urlset>; past that it becomes a <sitemapindex> over
+gzipped sitemap-<n>.xml.gz children.
+Output files are only rewritten when their bytes change.
+
+Usage:
+    python scripts/build_sitemap.py
+    python scripts/build_sitemap.py --dry-run
+    python scripts/build_sitemap.py --max-urls 50     # force the index layout
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+from datetime import date
+from urllib.parse import quote
+from xml.sax.saxutils import escape, unescape
+
+from site_data import CACHE_DIR, POSTS_PATH, RECIPES_PATH, ROOT, commit_atomic, load_json, open_atomic, write_json
+
+BASE_URL = 'https://ecuadoralacarta.com'
+SITEMAP_PATH = ROOT / 'sitemap.xml'
+STATE_PATH = CACHE_DIR / 'sitemap_state.json'
+
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+
+# (path, html file, changefreq, priority)
+STATIC_PAGES = (
+    ('/', 'index.html', 'daily', '1.0'),
+    ('/recipes.html', 'recipes.html', 'daily', '0.9'),
+    ('/blog.html', 'blog.html', 'daily', '0.9'),
+    ('/menu-semanal.html', 'menu-semanal.html', 'weekly', '0.8'),
+    ('/mapa.html', 'mapa.html', 'monthly', '0.6'),
+    ('/nosotros.html', 'nosotros.html', 'monthly', '0.5'),
+    ('/contact.html', 'contact.html', 'monthly', '0.4'),
+    ('/privacy.html', 'privacy.html', 'yearly', '0.2'),
+    ('/terms.html', 'terms.html', 'yearly', '0.2'),
+)
+
+# corpus -> (json path, page, changefreq, priority)
+CORPORA = (
+    ('recipes', RECIPES_PATH, '/recipe.html', 'monthly', '0.8'),
+    ('posts', POSTS_PATH, '/post.html', 'monthly', '0.7'),
+)
+
+XML_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+
+_URL_RE = re.compile(r'<url><loc>([^<]+)</loc><lastmod>([^<]+)</lastmod>')
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _record_date(record):
+    value = record.get('date_modified') or record.get('date_published') or record.get('created_at')
+    return str(value)[:10] if value else None
+
+
+def iter_entries():
+    """Yield (loc, content_hash, first_date, changefreq, priority) for every URL."""
+    for path, html, changefreq, priority in STATIC_PAGES:
+        file = ROOT / html
+        if file.exists():
+            yield BASE_URL + path, _hash(file.read_bytes()), None, changefreq, priority
+    for _, json_path, page, changefreq, priority in CORPORA:
+        seen = set()
+        for record in load_json(json_path):
+            slug = record.get('slug')
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            raw = json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            loc = f'{BASE_URL}{page}?slug={quote(slug, safe="-_.~")}'
+            yield loc, _hash(raw), _record_date(record), changefreq, priority
+
+
+def seed_state():
+    """State recovered from the published sitemap files: {loc: {'hash': None, 'lastmod'}}."""
+    state = {}
+    files = [SITEMAP_PATH] if SITEMAP_PATH.exists() else []
+    for path in files + sorted(ROOT.glob('sitemap-*.xml.gz')):
+        data = path.read_bytes()
+        text = (gzip.decompress(data) if path.suffix == '.gz' else data).decode('utf-8')
+        for loc, lastmod in _URL_RE.findall(text):
+            state[unescape(loc)] = {'hash': None, 'lastmod': lastmod}
+    return state
+
+
+def resolve_lastmod(entries, state, today):
+    """Attach lastmod to each entry and return (urls, new_state, changed_locs).
+
+    Seeded entries (hash None) keep their lastmod and pick up the current hash.
+    """
+    urls, new_state, changed = [], {}, []
+    for loc, digest, first_date, changefreq, priority in entries:
+        old = state.get(loc)
+        if old and old['hash'] in (digest, None):
+            lastmod = old['lastmod']
+        else:
+            lastmod = first_date if not old and first_date else today
+            changed.append(loc)
+        new_state[loc] = {'hash': digest, 'lastmod': lastmod}
+        urls.append((loc, lastmod, changefreq, priority))
+    return urls, new_state, changed
+
+
+def url_element(loc, lastmod, changefreq, priority):
+    return (f'  <url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod>'
+            f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n')
+
+
+def iter_chunks(urls, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+    """Split url elements into lists that respect the per-sitemap count and size limits."""
+    overhead = len(XML_HEAD) + len(URLSET_OPEN) + len(URLSET_CLOSE)
+    chunk, size = [], overhead
+    for url in urls:
+        element = url_element(*url)
+        n = len(element.encode('utf-8'))
+        if chunk and (len(chunk) >= max_urls or size + n > max_bytes):
+            yield chunk
+            chunk, size = [], overhead
+        chunk.append(element)
+        size += n
+    if chunk:
+        yield chunk
+
+
+def write_if_changed(path, data, dry_run):
+    if path.exists() and path.read_bytes() == data:
+        return False
+    if not dry_run:
+        f, tmp = open_atomic(path, 'wb')
+        with f:
+            f.write(data)
+        commit_atomic(tmp, path)
+    return True
+
+
+def render_urlset(elements, compress):
+    data = ''.join([XML_HEAD, URLSET_OPEN, *elements, URLSET_CLOSE]).encode('utf-8')
+    # mtime=0 keeps the gzip bytes stable across runs, so unchanged children are not rewritten
+    return gzip.compress(data, mtime=0) if compress else data
+
+
+def render_index(children):
+    lines = [XML_HEAD, '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name, lastmod in children:
+        lines.append(f'  <sitemap><loc>{escape(BASE_URL)}/{name}</loc><lastmod>{lastmod}</lastmod></sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    return ''.join(lines).encode('utf-8')
+
+
+def build(today=None, max_urls=MAX_URLS, max_bytes=MAX_BYTES, dry_run=False):
+    today = today or date.today().isoformat()
+    state = load_json(STATE_PATH) if STATE_PATH.exists() else seed_state()
+    urls, new_state, changed = resolve_lastmod(iter_entries(), state, today)
+    removed = sorted(set(state) - set(new_state))
+
+    chunks = list(iter_chunks(urls, max_urls, max_bytes))
+    written = []
+    keep = set()
+    if len(chunks) <= 1:
+        if write_if_changed(SITEMAP_PATH, render_urlset(chunks[0] if chunks else [], False), dry_run):
+            written.append(SITEMAP_PATH.name)
+    else:
+        children = []
+        start = 0
+        for n, chunk in enumerate(chunks, 1):
+            name = f'sitemap-{n}.xml.gz'
+            keep.add(name)
+            lastmod = max(u[1] for u in urls[start:start + len(chunk)])
+            start += len(chunk)
+            children.append((name, lastmod))
+            if write_if_changed(ROOT / name, render_urlset(chunk, True), dry_run):
+                written.append(name)
+        if write_if_changed(SITEMAP_PATH, render_index(children), dry_run):
+            written.append(SITEMAP_PATH.name)
+    for stale in sorted(ROOT.glob('sitemap-*.xml.gz')):
+        if stale.name not in keep:
+            written.append(f'-{stale.name}')
+            if not dry_run:
+                stale.unlink()
+
+    if new_state != state and not dry_run:
+        write_json(STATE_PATH, new_state, indent=1)
+    return {'urls': len(urls), 'sitemaps': len(chunks), 'changed': changed, 'removed': removed,
+            'written': written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incrementally rebuild sitemap.xml.')
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without writing')
+    parser.add_argument('--today', help='Date used for changed entries (default: today, YYYY-MM-DD)')
+    parser.add_argument('--max-urls', type=int, default=MAX_URLS, help='URLs per sitemap file')
+    args = parser.parse_args(argv)
+
+    result = build(today=args.today, max_urls=args.max_urls, dry_run=args.dry_run)
+    for loc in result['changed']:
+        print(f'  ~ {loc}')
+    for loc in result['removed']:
+        print(f'  - {loc}')
+    files = ', '.join(result['written']) or 'no files'
+    print(f"{result['urls']} URLs in {result['sitemaps']} sitemap(s), {len(result['changed'])} changed, "
+          f"{len(result['removed'])} removed; {'would write' if args.dry_run else 'wrote'} {files}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Load recipes.json into the Prisma/PostgreSQL schema (prisma/schema.prisma).
+
+Records are mapped to Recipe / Ingredient / Step / Faq / Keyword rows:
+ingredient lines are parsed into baseQuantity / unit / isSpice by
+ingredients.py, estimatedPrice comes from price_db.json (same matching as
+the front-end), keywords are folded into one normalized vocabulary and
+schemaMarkup holds the Recipe JSON-LD that prerender.py emits.
+
+Everything runs in one transaction: recipes are COPYed into a staging table
+and upserted by slug (existing ids are kept), the children of the loaded
+recipes are deleted and re-COPYed, and keywords are upserted by word. By
+default only records whose content changed since the last load into the
+same database (hashes in .cache/db_load.json), or that are missing from it,
+are touched; --full reloads everything.
+
+Needs psycopg2 (requirements-dev.txt) and DATABASE_URL (the same variable prisma.config.ts
+reads).
+
+Usage:
+    DATABASE_URL=postgresql://localhost/recetas python scripts/db_load.py
+    python scripts/db_load.py --full --database-url postgresql://...
+    python scripts/db_load.py --dry-run          # parse and report, no database
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+from build_price_index import PriceMatcher
+from ingredients import parse_ingredient
+from prerender import recipe_seo
+from site_data import CACHE_DIR, PRICE_DB_PATH, RECIPES_PATH, extract_ing_base, ingredient_text, load_json, norm_text, \
+    parse_minutes, parse_servings, write_json
+
+STATE_PATH = CACHE_DIR / 'db_load.json'
+
+# Bump when the row mapping changes so the next run reloads every record.
+LOADER_VERSION = 1
+
+DIFFICULTY = {'facil': 'FACIL', 'media': 'INTERMEDIO', 'intermedia': 'INTERMEDIO', 'dificil': 'AVANZADO',
+              'avanzada': 'AVANZADO'}
+REGION = {'sierra': 'SIERRA', 'costa': 'COSTA', 'amazonia': 'AMAZONIA', 'oriente': 'AMAZONIA',
+          'galapagos': 'GALAPAGOS', 'insular': 'GALAPAGOS'}
+# The Category enum has no Entradas / Desayunos; they load as PLATOS_FUERTES.
+CATEGORY = {'sopas': 'SOPAS', 'platos fuertes': 'PLATOS_FUERTES', 'mariscos': 'MARISCOS', 'postres': 'POSTRES',
+            'bebidas': 'BEBIDAS'}
+DEFAULT_CATEGORY = 'PLATOS_FUERTES'
+
+RECIPE_COLUMNS = ('id', 'slug', 'title', 'description', 'prepTime', 'cookTime', 'servings', 'difficulty', 'region',
+                  'category', 'isChuchaqui', 'spotifyPlaylistId', 'image', 'videoUrl', 'schemaMarkup')
+INGREDIENT_COLUMNS = ('id', 'recipeId', 'name', 'baseQuantity', 'unit', 'diasporaSubstitute', 'diasporaNotes',
+                      'isSpice', 'estimatedPrice')
+STEP_COLUMNS = ('id', 'recipeId', 'order', 'description', 'gifUrl')
+FAQ_COLUMNS = ('id', 'recipeId', 'question', 'answer')
+# Implicit many-to-many table Prisma creates for Keyword <-> Recipe ("A" = Keyword, "B" = Recipe)
+KEYWORD_LINK_TABLE = '_KeywordToRecipe'
+
+MAX_KEYWORD_LEN = 80
+
+_KEYWORD_STRIP_RE = re.compile(r'[^a-z0-9ñ ]+')
+
+
+def _id(prefix, *parts):
+    return prefix + hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()[:22]
+
+
+def normalize_keyword(word):
+    word = ' '.join(_KEYWORD_STRIP_RE.sub(' ', norm_text(word)).split())
+    return word if 1 < len(word) <= MAX_KEYWORD_LEN else None
+
+
+def recipe_keywords(recipe):
+    words = []
+    for field in ('keywords', 'seo_keywords'):
+        raw = recipe.get(field) or []
+        if isinstance(raw, str):
+            raw = raw.split(',')
+        for w in raw:
+            w = normalize_keyword(w)
+            if w and w not in words:
+                words.append(w)
+    return words
+
+
+def _enum(table, value, default, warnings, field):
+    key = norm_text(value or '')
+    if key in table:
+        return table[key]
+    warnings.append(f'{field} "{value}" -> {default}')
+    return default
+
+
+def recipe_row(recipe, warnings):
+    videos = [v for v in recipe.get('youtube_videos') or [] if isinstance(v, dict) and v.get('videoId')]
+    return {
+        'id': _id('rcp_', recipe['slug']),
+        'slug': recipe['slug'],
+        'title': recipe.get('title') or recipe['slug'],
+        'description': recipe.get('description') or '',
+        'prepTime': parse_minutes(recipe.get('prep_time')),
+        'cookTime': parse_minutes(recipe.get('cook_time')),
+        'servings': parse_servings(recipe.get('servings')),
+        'difficulty': _enum(DIFFICULTY, recipe.get('difficulty'), 'INTERMEDIO', warnings, 'difficulty'),
+        'region': _enum(REGION, recipe.get('region'), 'SIERRA', warnings, 'region'),
+        'category': _enum(CATEGORY, recipe.get('category'), DEFAULT_CATEGORY, warnings, 'category'),
+        'isChuchaqui': bool(recipe.get('is_chuchaqui')),
+        'spotifyPlaylistId': recipe.get('spotify_playlist_id') or None,
+        'image': recipe.get('image_url') or recipe.get('og_image') or '',
+        'videoUrl': f"https://www.youtube.com/watch?v={videos[0]['videoId']}" if videos else None,
+        'schemaMarkup': json.dumps(recipe_seo(recipe)['schemas'][0], ensure_ascii=False),
+    }
+
+
+def child_rows(recipe, recipe_id, matcher, price_db):
+    substitutes = [s for s in recipe.get('diaspora_substitutes') or [] if isinstance(s, dict) and s.get('original')]
+    ingredients = []
+    for n, ing in enumerate(recipe.get('ingredients') or []):
+        parsed = parse_ingredient(ing)
+        text = norm_text(parsed['text'])
+        sub = next((s for s in substitutes if norm_text(s['original']) in text), None)
+        price_key = matcher.resolve(extract_ing_base(ingredient_text(ing)))
+        ingredients.append({
+            'id': _id('ing_', recipe_id, str(n)),
+            'recipeId': recipe_id,
+            'name': parsed['name'] or parsed['text'],
+            'baseQuantity': parsed['quantity'] or 0.0,
+            'unit': parsed['unit'],
+            'diasporaSubstitute': sub.get('substitute') if sub else None,
+            'diasporaNotes': sub.get('notes') if sub else None,
+            'isSpice': parsed['is_spice'],
+            'estimatedPrice': (price_db[price_key].get('price_min') if price_key else None),
+        })
+    step_videos = recipe.get('step_videos') or []
+    steps = [{
+        'id': _id('stp_', recipe_id, str(n)),
+        'recipeId': recipe_id,
+        'order': n + 1,
+        'description': step if isinstance(step, str) else str(step.get('text', '')),
+        'gifUrl': step_videos[n] if n < len(step_videos) else None,
+    } for n, step in enumerate(recipe.get('instructions') or [])]
+    faqs = [{
+        'id': _id('faq_', recipe_id, str(n)),
+        'recipeId': recipe_id,
+        'question': faq.get('q') or faq.get('question') or '',
+        'answer': faq.get('a') or faq.get('answer') or '',
+    } for n, faq in enumerate(f for f in recipe.get('faqs') or [] if isinstance(f, dict))]
+    return ingredients, steps, faqs
+
+
+def record_hash(recipe):
+    raw = json.dumps([LOADER_VERSION, recipe], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def database_key(url):
+    """State is kept per database, so loading a second database does not skip records."""
+    parts = urlsplit(url)
+    netloc = parts.netloc.rpartition('@')[2]
+    return parts._replace(scheme='postgresql', netloc=netloc, fragment='').geturl()
+
+
+# ─── COPY helpers ─────────────────────────────────────────────
+
+_NULL = '\\N'
+
+
+def _csv_value(value):
+    if value is None:
+        return _NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value
+
+
+def copy_rows(cur, table, columns, rows):
+    if not rows:
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    for row in rows:
+        writer.writerow([_csv_value(row[c]) for c in columns])
+    buf.seek(0)
+    cols = ', '.join(f'"{c}"' for c in columns)
+    cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{_NULL}')", buf)
+
+
+def load(conn, recipes, price_db):
+    """Upsert `recipes` and replace their children; returns per-table row counts."""
+    warnings = []
+    rows = [recipe_row(r, warnings) for r in recipes]
+    matcher = PriceMatcher(price_db)
+    counts = {}
+    with conn.cursor() as cur:
+        cur.execute('CREATE TEMP TABLE _stage_recipe (LIKE "Recipe" INCLUDING DEFAULTS) ON COMMIT DROP')
+        copy_rows(cur, '_stage_recipe', RECIPE_COLUMNS, rows)
+        cols = ', '.join(f'"{c}"' for c in RECIPE_COLUMNS)
+        updates = ', '.join(f'"{c}" = EXCLUDED."{c}"' for c in RECIPE_COLUMNS if c not in ('id', 'slug'))
+        cur.execute(f'INSERT INTO "Recipe" ({cols}) SELECT {cols} FROM _stage_recipe '
+                    f'ON CONFLICT (slug) DO UPDATE SET {updates}')
+        counts['Recipe'] = cur.rowcount
+
+        # Existing recipes keep their ids; children must point at those.
+        cur.execute('SELECT r.slug, r.id FROM "Recipe" r JOIN _stage_recipe s USING (slug)')
+        ids = dict(cur.fetchall())
+        id_list = list(ids.values())
+        for table, column in (('"Ingredient"', '"recipeId"'), ('"Step"', '"recipeId"'), ('"Faq"', '"recipeId"'),
+                              (f'"{KEYWORD_LINK_TABLE}"', '"B"')):
+            cur.execute(f'DELETE FROM {table} WHERE {column} = ANY(%s)', (id_list,))
+
+        ingredients, steps, faqs, keywords = [], [], [], []
+        for recipe in recipes:
+            recipe_id = ids[recipe['slug']]
+            i, s, f = child_rows(recipe, recipe_id, matcher, price_db)
+            ingredients += i
+            steps += s
+            faqs += f
+            keywords += [{'id': _id('kw_', w), 'word': w, 'recipeId': recipe_id} for w in recipe_keywords(recipe)]
+        copy_rows(cur, '"Ingredient"', INGREDIENT_COLUMNS, ingredients)
+        copy_rows(cur, '"Step"', STEP_COLUMNS, steps)
+        copy_rows(cur, '"Faq"', FAQ_COLUMNS, faqs)
+
+        cur.execute('CREATE TEMP TABLE _stage_keyword (id text, word text, "recipeId" text) ON COMMIT DROP')
+        copy_rows(cur, '_stage_keyword', ('id', 'word', 'recipeId'), keywords)
+        cur.execute('INSERT INTO "Keyword" (id, word) SELECT DISTINCT ON (word) id, word FROM _stage_keyword '
+                    'ON CONFLICT (word) DO NOTHING')
+        cur.execute(f'INSERT INTO "{KEYWORD_LINK_TABLE}" ("A", "B") '
+                    'SELECT DISTINCT k.id, s."recipeId" FROM _stage_keyword s JOIN "Keyword" k USING (word) '
+                    'ON CONFLICT DO NOTHING')
+        counts.update(Ingredient=len(ingredients), Step=len(steps), Faq=len(faqs), KeywordLinks=len(keywords))
+    return counts, warnings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-load recipes.json into PostgreSQL.')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--full', action='store_true', help='Reload every record, not only changed ones')
+    parser.add_argument('--dry-run', action='store_true', help='Parse and report without touching the database')
+    args = parser.parse_args(argv)
+
+    recipes = [r for r in load_json(RECIPES_PATH) if r.get('slug')]
+    price_db = load_json(PRICE_DB_PATH)
+    hashes = {r['slug']: record_hash(r) for r in recipes}
+
+    if args.dry_run:
+        warnings, matcher = [], PriceMatcher(price_db)
+        rows = [recipe_row(r, warnings) for r in recipes]
+        ingredients = sum(len(child_rows(r, row['id'], matcher, price_db)[0]) for r, row in zip(recipes, rows))
+        print(f'{len(recipes)} recipes parsed, {ingredients} ingredients')
+        for w in sorted(set(warnings)):
+            print(f'  ! {w}')
+        return 0
+    if not args.database_url:
+        parser.error('set DATABASE_URL or pass --database-url')
+
+    import psycopg2
+
+    state = load_json(STATE_PATH) if STATE_PATH.exists() else {}
+    db_key = database_key(args.database_url)
+    known = {} if args.full else state.get(db_key, {})
+
+    conn = psycopg2.connect(args.database_url)
+    try:
+        with conn:  # one transaction; rolled back on any error
+            with conn.cursor() as cur:
+                cur.execute('SELECT slug FROM "Recipe"')
+                in_db = {row[0] for row in cur.fetchall()}
+            todo = [r for r in recipes if known.get(r['slug']) != hashes[r['slug']] or r['slug'] not in in_db]
+            counts, warnings = load(conn, todo, price_db) if todo else ({}, [])
+    finally:
+        conn.close()
+
+    state[db_key] = hashes
+    write_json(STATE_PATH, state, indent=None)
+    orphans = sorted(in_db - set(hashes))
+    for w in sorted(set(warnings)):
+        print(f'  ! {w}')
+    if orphans:
+        print(f"  {len(orphans)} recipes in the database are not in recipes.json: {', '.join(orphans[:10])}")
+    print(f'{len(todo)}/{len(recipes)} recipes loaded' +
+          (' (' + ', '.join(f'{t} {n}' for t, n in counts.items()) + ')' if counts else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""Near-duplicate detection for recipes and posts (MinHash + LSH).
+
+Every record gets two MinHash signatures:
+    title   word unigrams/bigrams of the title, without the boilerplate words
+            every generated title carries ("receta tradicional ecuatoriana",
+            "guia 2025-2026")
+    full    title + ingredient bases + the words of the instructions
+            (recipes) or of the article text (posts); generated rewrites of
+            the same dish paraphrase freely, so word n-grams barely overlap
+
+Signatures are banded into LSH buckets, so a lookup only compares the
+candidate with records that share a bucket instead of with the whole
+corpus. Signatures and buckets are stored in .cache/dedup.sqlite (stdlib
+sqlite3, indexed by bucket) with each record's content hash: `build` only
+recomputes new or edited records, and `check` hashes the candidate alone
+and reads just its own buckets, so it costs the same whatever the corpus
+size. The index records the size and mtime of recipes.json / posts.json and
+catches up incrementally when they changed since the last build.
+
+Usage:
+    python scripts/dedup.py build
+    python scripts/dedup.py check "Llapingachos de la Sierra con hierbas aromaticas"
+    python scripts/dedup.py check --record candidate.json --json     # full record from the workflow
+    python scripts/dedup.py clusters --field full
+
+`check` exits with status 1 when a near-duplicate is found, so a workflow
+step can branch on it.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import sys
+from collections import defaultdict
+
+from build_search_index import tokenize
+from site_data import CACHE_DIR, POSTS_PATH, RECIPES_PATH, extract_ing_base, load_json, norm_text
+
+INDEX_PATH = CACHE_DIR / 'dedup.sqlite'
+
+NUM_PERM = 128
+# Bump when the features change so stored signatures are recomputed.
+FEATURES_VERSION = 1
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20260101)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Default Jaccard thresholds. Unrelated pairs in the current corpus sit around
+# 0.15 (full) / 0.0 (title); 99% are below 0.33.
+THRESHOLDS = {'title': 0.35, 'full': 0.33}
+
+TITLE_NOISE = frozenset(
+    'receta recetas tradicional tradicionales ecuatoriano ecuatoriana ecuatorianos ecuatorianas '
+    'ecuador guia 2025 2026 autentica autentico'.split()
+)
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+KINDS = {'r': RECIPES_PATH, 'p': POSTS_PATH}
+
+
+# ─── Features and signatures ──────────────────────────────────
+
+def _ngrams(tokens, n):
+    return {' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+
+
+def title_features(title):
+    tokens = [t for t in tokenize(title or '') if t not in TITLE_NOISE]
+    return {'t:' + s for s in set(tokens) | _ngrams(tokens, 2)}
+
+
+def full_features(record, kind):
+    features = title_features(record.get('title'))
+    if kind == 'r':
+        for ing in record.get('ingredients') or []:
+            base = norm_text(extract_ing_base(ing))
+            if base:
+                features.add('i:' + base)
+        text = ' '.join(s if isinstance(s, str) else str(s.get('text', '')) for s in record.get('instructions') or [])
+    else:
+        text = _TAG_RE.sub(' ', record.get('content') or '')
+    features.update('x:' + t for t in tokenize(text))
+    return features
+
+
+def minhash(features):
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'big')
+              for f in features]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two feature sets."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to the threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def bucket_ids(sig, bands, rows):
+    """One signed 64-bit id per band (candidates are verified, so a rare collision is harmless)."""
+    return [int.from_bytes(hashlib.blake2b(repr(sig[i * rows:(i + 1) * rows]).encode('ascii'), digest_size=8).digest(),
+                           'big', signed=True) for i in range(bands)]
+
+
+def record_hash(record):
+    return hashlib.sha256(json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+# ─── Index ────────────────────────────────────────────────────
+
+class LSHIndex:
+    """Banded LSH buckets over one signature field."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold)
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        self.signatures = {}
+
+    def _keys(self, sig):
+        r = self.rows
+        return [tuple(sig[i * r:(i + 1) * r]) for i in range(self.bands)]
+
+    def add(self, key, sig):
+        self.signatures[key] = sig
+        for band, k in zip(self.buckets, self._keys(sig)):
+            band[k].append(key)
+
+    def candidates(self, sig):
+        found = set()
+        for band, k in zip(self.buckets, self._keys(sig)):
+            found.update(band.get(k, ()))
+        return found
+
+    def query(self, sig, threshold=None, exclude=None):
+        threshold = self.threshold if threshold is None else threshold
+        hits = []
+        for key in self.candidates(sig):
+            if key == exclude:
+                continue
+            score = similarity(sig, self.signatures[key])
+            if score >= threshold:
+                hits.append((score, key))
+        return sorted(hits, reverse=True)
+
+    def clusters(self, threshold=None):
+        """Connected components of verified candidate pairs (union-find), largest first."""
+        threshold = self.threshold if threshold is None else threshold
+        parent = {}
+
+        def find(x):
+            while parent.setdefault(x, x) != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked = set()
+        for band in self.buckets:
+            for members in band.values():
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pair = (a, b) if a < b else (b, a)
+                        if pair in checked:
+                            continue
+                        checked.add(pair)
+                        if similarity(self.signatures[a], self.signatures[b]) >= threshold:
+                            parent[find(a)] = find(b)
+        groups = defaultdict(list)
+        for key in parent:
+            groups[find(key)].append(key)
+        return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS docs (key TEXT PRIMARY KEY, hash TEXT, title TEXT, sigs TEXT);
+CREATE TABLE IF NOT EXISTS buckets (field TEXT, band INTEGER, bucket INTEGER, key TEXT);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (field, band, bucket);
+CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key);
+"""
+
+
+class DedupIndex:
+    """Signatures and LSH buckets of the corpus, persisted in SQLite."""
+
+    def __init__(self, path=INDEX_PATH, thresholds=THRESHOLDS):
+        self.path = path
+        self.thresholds = thresholds
+        self.params = {field: lsh_params(t) for field, t in thresholds.items()}
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path) if path else ':memory:')
+        self.db.executescript(_SCHEMA)
+        version = json.dumps([FEATURES_VERSION, NUM_PERM, self.params], sort_keys=True)
+        if self._meta('version') != version:
+            self.db.executescript('DELETE FROM meta; DELETE FROM docs; DELETE FROM buckets;')
+            self._set_meta('version', version)
+
+    def _meta(self, name):
+        row = self.db.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (name, value))
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+    def title(self, key):
+        row = self.db.execute('SELECT title FROM docs WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else ''
+
+    def _put(self, key, digest, title, sigs):
+        self.db.execute('DELETE FROM buckets WHERE key = ?', (key,))
+        self.db.execute('INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)', (key, digest, title, json.dumps(sigs)))
+        rows = []
+        for field, (bands, band_rows) in self.params.items():
+            if sigs.get(field):
+                rows.extend((field, band, bucket, key)
+                            for band, bucket in enumerate(bucket_ids(sigs[field], bands, band_rows)))
+        self.db.executemany('INSERT INTO buckets VALUES (?, ?, ?, ?)', rows)
+
+    def _delete(self, key):
+        self.db.execute('DELETE FROM buckets WHERE key = ?', (key,))
+        self.db.execute('DELETE FROM docs WHERE key = ?', (key,))
+
+    @staticmethod
+    def _stamp(corpora):
+        return json.dumps({kind: [path.stat().st_mtime_ns, path.stat().st_size] if path.exists() else None
+                           for kind, path in sorted(corpora.items())})
+
+    def update(self, corpora=KINDS):
+        """Sync signatures with the corpus files; returns (added_or_changed, removed)."""
+        known = dict(self.db.execute('SELECT key, hash FROM docs'))
+        seen, changed = set(), []
+        for kind, path in corpora.items():
+            for record in load_json(path):
+                if not record.get('slug'):
+                    continue
+                key = f"{kind}/{record['slug']}"
+                seen.add(key)
+                digest = record_hash(record)
+                if known.get(key) == digest:
+                    continue
+                self._put(key, digest, record.get('title') or '',
+                          {'title': minhash(title_features(record.get('title'))),
+                           'full': minhash(full_features(record, kind))})
+                changed.append(key)
+        removed = [key for key in known if key not in seen]
+        for key in removed:
+            self._delete(key)
+        self._set_meta('corpora', self._stamp(corpora))
+        return changed, removed
+
+    def sync(self, corpora=KINDS):
+        """update() only when the corpus files changed since the last one (a stat per file otherwise)."""
+        if self._meta('corpora') == self._stamp(corpora):
+            return [], []
+        return self.update(corpora)
+
+    def query(self, field, sig, threshold=None, exclude=None):
+        """[(similarity, key)] of the records sharing a bucket with `sig`, best first."""
+        threshold = self.thresholds[field] if threshold is None else threshold
+        bands, rows = self.params[field]
+        keys = set()
+        for band, bucket in enumerate(bucket_ids(sig, bands, rows)):
+            keys.update(key for (key,) in self.db.execute(
+                'SELECT key FROM buckets WHERE field = ? AND band = ? AND bucket = ?', (field, band, bucket)))
+        keys.discard(exclude)
+        hits = []
+        for key in keys:
+            (sigs,) = self.db.execute('SELECT sigs FROM docs WHERE key = ?', (key,)).fetchone()
+            score = similarity(sig, json.loads(sigs)[field])
+            if score >= threshold:
+                hits.append((score, key))
+        return sorted(hits, reverse=True)
+
+    def lsh(self, field):
+        """In-memory LSHIndex over every stored signature (for whole-corpus clustering)."""
+        index = LSHIndex(self.thresholds[field])
+        for key, sigs in self.db.execute('SELECT key, sigs FROM docs'):
+            sig = json.loads(sigs)[field]
+            if sig:
+                index.add(key, sig)
+        return index
+
+    def check(self, title=None, record=None, kind='r', threshold=None):
+        """Near-duplicates of a candidate: full-record match when a record is given, else by title."""
+        if record is not None:
+            field, sig = 'full', minhash(full_features(record, kind))
+            exclude = f"{kind}/{record['slug']}" if record.get('slug') else None
+        else:
+            field, sig, exclude = 'title', minhash(title_features(title)), None
+        if sig is None:
+            return field, []
+        hits = self.query(field, sig, threshold, exclude)
+        return field, [{'key': key, 'title': self.title(key), 'similarity': round(score, 3)} for score, key in hits]
+
+    def save(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Near-duplicate detection over recipes and posts.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='Update the signature index from recipes.json / posts.json')
+    chk = sub.add_parser('check', help='Is a candidate a near-duplicate of anything published?')
+    chk.add_argument('title', nargs='?', help='Candidate title')
+    chk.add_argument('--record', help='Candidate record as a JSON file ("-" for stdin); compares full content')
+    chk.add_argument('--kind', choices=('r', 'p'), default='r', help='r = recipe, p = post')
+    chk.add_argument('--threshold', type=float)
+    chk.add_argument('--json', action='store_true')
+    cl = sub.add_parser('clusters', help='Report duplicate clusters in the corpus')
+    cl.add_argument('--field', choices=sorted(THRESHOLDS), default='full')
+    cl.add_argument('--threshold', type=float)
+    args = parser.parse_args(argv)
+
+    index = DedupIndex()
+    # check / clusters only catch up when recipes.json / posts.json changed since the last build
+    changed, removed = index.update() if args.command == 'build' else index.sync()
+    index.save()
+
+    if args.command == 'build':
+        print(f'{len(index)} records indexed, {len(changed)} updated, {len(removed)} removed')
+        return 0
+
+    if args.command == 'check':
+        record = None
+        if args.record:
+            record = json.load(sys.stdin if args.record == '-' else open(args.record, encoding='utf-8'))
+        elif not args.title:
+            parser.error('check needs a title or --record')
+        field, hits = index.check(args.title, record, args.kind, args.threshold)
+        if args.json:
+            print(json.dumps({'field': field, 'duplicate': bool(hits), 'matches': hits}, ensure_ascii=False))
+        else:
+            for hit in hits:
+                print(f"  {hit['similarity']:.2f}  {hit['key']}  {hit['title']}")
+            print(f"{len(hits)} near-duplicate(s) by {field}")
+        return 1 if hits else 0
+
+    groups = index.lsh(args.field).clusters(args.threshold)
+    for group in groups:
+        print(f'\n{len(group)} records:')
+        for key in group:
+            print(f"  {key}  {index.title(key)}")
+    print(f'\n{len(groups)} clusters by {args.field}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,8 @@
 import json
-import os
 
-file_path = r'c:\Users\leonp\recetas-ecuador\n8n-exports\turismo_workflow.json'
+from site_data import ROOT
+
+file_path = ROOT / 'n8n-exports' / 'turismo_workflow.json'
 
 with open(file_path, 'r', encoding='utf-8') as f:
     content = f.read()
@@ -1,57 +1,16 @@
 import json
-import os
 
-file_path = r'c:\Users\leonp\recetas-ecuador\n8n-exports\turismo_workflow.json'
+from json_stream import rewrite_file
+from mojibake import Repairer
+from site_data import ROOT
 
-with open(file_path, 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-# Fix encoding issues again, more broadly
-def fix_encoding(text):
-    if not isinstance(text, str): return text
-    # Common n8n expressions and JS strings
-    text = text.replace('artÃ­culo', 'artículo')
-    text = text.replace('artÃ­culos', 'artículos')
-    text = text.replace('especÃ­fico', 'específico')
-    text = text.replace('especÃ­fica', 'específica')
-    text = text.replace('Ãºnico', 'único')
-    text = text.replace('Ãºnicos', 'únicos')
-    text = text.replace('Ãºnica', 'única')
-    text = text.replace('Ãºnicas', 'únicas')
-    text = text.replace('guÃ­a', 'guía')
-    text = text.replace('optimizaciÃ³n', 'optimización')
-    text = text.replace('espaÃ±ol', 'español')
-    text = text.replace('fallÃ³', 'falló')
-    text = text.replace('generÃ³', 'generó')
-    text = text.replace('tambiÃ©n', 'también')
-    text = text.replace('mÃ¡s', 'más')
-    text = text.replace('Ã©poca', 'época')
-    text = text.replace('invÃ¡lido', 'inválido')
-    text = text.replace('vacÃ­o', 'vacío')
-    text = text.replace('informaciÃ³n', 'información')
-    text = text.replace('festividad', 'festividad')
-    text = text.replace('â€”', '—')
-    text = text.replace('Ã¡', 'á')
-    text = text.replace('Ã©', 'é')
-    text = text.replace('Ã­', 'í')
-    text = text.replace('Ã³', 'ó')
-    text = text.replace('Ãº', 'ú')
-    text = text.replace('Ã±', 'ñ')
-    return text
+file_path = ROOT / 'n8n-exports' / 'turismo_workflow.json'
 
-def process_node(obj):
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if k == 'jsCode' or k == 'jsonBody':
-                obj[k] = fix_encoding(v)
-            else:
-                obj[k] = process_node(v)
-    elif isinstance(obj, list):
-        for i in range(len(obj)):
-            obj[i] = process_node(obj[i])
-    return obj
+# Repair mojibake in jsCode/jsonBody with one streamed pass (see mojibake.py); one-off, so no hash cache
+rewrite_file(file_path, Repairer(cache_path=None), keys=('jsCode', 'jsonBody'))
 
-data = process_node(data)
+with open(file_path, 'r', encoding='utf-8') as f:
+    data = json.load(f)
 
 # Find 'preparar-prompt-turismo' and add error handling
 new_js_code = r"""const topicFinderNode = $('Topic Finder').first();
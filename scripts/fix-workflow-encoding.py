@@ -1,56 +1,22 @@
-import json
-import os
-import re
+import sys
 
-def fix_mangled_utf8(text):
-    replacements = {
-        'fallÃ³': 'falló',
-        'tambiÃ©n': 'también',
-        'invÃ¡lido': 'inválido',
-        'invÃ¡lida': 'inválida',
-        'vacÃ­o': 'vacío',
-        'especÃ­fico': 'específico',
-        'especÃ­fica': 'específica',
-        'artÃ­culos': 'artículos',
-        'guÃ­a': 'guía',
-        'optimizaciÃ³n': 'optimización',
-        'espaÃ±ol': 'español',
-        'â€”': '—',
-        'generÃ³': 'generó',
-        'Ãºnicos': 'únicos',
-        'temas ya publicados': 'temas ya publicados',
-        'festividad': 'festividad',
-        'informaciÃ³n': 'información',
-        'falla': 'falla',
-        'mÃ¡s': 'más',
-        'Ã©poca': 'época',
-        'Ãºnico': 'único',
-    }
-    for mangled, fixed in replacements.items():
-        text = text.replace(mangled, fixed)
-    return text
+from json_stream import rewrite_file
+from mojibake import Repairer
+from site_data import ROOT
+
+# Byte-level mojibake repair over every string, streamed (see mojibake.py)
+REPAIRER = Repairer()
 
 def fix_workflow(file_path):
-    if not os.path.exists(file_path):
+    if not file_path.exists():
         return
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Recursively fix all strings in the JSON
-    def process(obj):
-        if isinstance(obj, str):
-            return fix_mangled_utf8(obj)
-        elif isinstance(obj, list):
-            return [process(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {k: process(v) for k, v in obj.items()}
-        return obj
-
-    data = process(data)
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Fixed {file_path}")
+    stats = rewrite_file(file_path, REPAIRER, keys=None)
+    print(f"Fixed {file_path} ({stats['rewritten']} strings, {stats['replacements']} replacements)")
 
-fix_workflow(r'c:\Users\leonp\recetas-ecuador\n8n-exports\turismo_workflow.json')
-fix_workflow(r'c:\Users\leonp\recetas-ecuador\n8n-exports\recetas_workflow.json')
+paths = sys.argv[1:] or [
+    ROOT / 'n8n-exports' / 'turismo_workflow.json',
+    ROOT / 'n8n-exports' / 'recetas_workflow.json',
+]
+for path in paths:
+    fix_workflow(ROOT / path)
+REPAIRER.save()
@@ -1,28 +1,11 @@
-import glob
+"""Global utility-class color migration (blue/red/gold -> editorial palette).
 
-html_files = glob.glob('c:/Users/leonp/recetas-ecuador/*.html')
+The mapping lives in theme_tables.json under "utility-classes"; see theme_migrate.py.
+"""
 
-for file in html_files:
-    with open(file, 'r', encoding='utf-8') as f:
-        content = f.read()
+import sys
 
-    # Colors
-    content = content.replace("#0033A0", "#14213D")
-    content = content.replace("bg-blue-800", "bg-[#0b1324]")
-    content = content.replace("bg-blue-700", "bg-[#1f305c]")
-    content = content.replace("border-blue-700", "border-[#14213D]")
-    content = content.replace("#002280", "#0b1324")
-    
-    # Secondary highlight red
-    content = content.replace("#EF3340", "#9A1B22")
-    content = content.replace("bg-red-50", "bg-[#F9F1F2]")
-    content = content.replace("border-red-200", "border-[#9A1B22]/20")
-    content = content.replace("bg-red-100", "bg-[#F1DEE0]")
-    
-    # Gold
-    content = content.replace("#FFD100", "#DCA011")
+from theme_migrate import main
 
-    with open(file, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-print(f"Updated global utility classes in {len(html_files)} HTML files.")
+if __name__ == '__main__':
+    sys.exit(main(['utility-classes'] + sys.argv[1:]))
@@ -0,0 +1,184 @@
+"""Structured parsing of recipe ingredient lines.
+
+recipes.json stores ingredients as free text written by the recipe workflow,
+e.g. "1 kg Papas (comprar en Supermaxi)", "1/2 taza, picado de Cilantro
+fresco (Supermaxi)", "3 dientes de ajo, triturados" or "Al gusto Sal", plus a
+few {name, quantity, where_to_buy} objects. parse_ingredient() splits them
+into quantity / unit / name / note / store, the shape of the Prisma
+Ingredient model.
+
+Usage:
+    python scripts/ingredients.py "1 1/2 tazas de mote cocido"
+    python scripts/ingredients.py --check        # parse every ingredient in recipes.json
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+
+from site_data import RECIPES_PATH, load_json, norm_text
+
+# alias -> canonical unit
+UNITS = {}
+for canonical, aliases in {
+    'kg': ('kg', 'kgs', 'kilo', 'kilos', 'kilogramo', 'kilogramos'),
+    'g': ('g', 'gr', 'grs', 'gramo', 'gramos'),
+    'lb': ('lb', 'lbs', 'libra', 'libras'),
+    'oz': ('oz', 'onza', 'onzas'),
+    'l': ('l', 'lt', 'lts', 'litro', 'litros'),
+    'ml': ('ml', 'mililitro', 'mililitros'),
+    'taza': ('taza', 'tazas'),
+    'cucharada': ('cucharada', 'cucharadas', 'cda', 'cdas'),
+    'cucharadita': ('cucharadita', 'cucharaditas', 'cdta', 'cdtas'),
+    'pizca': ('pizca', 'pizcas'),
+    'diente': ('diente', 'dientes'),
+    'rama': ('rama', 'ramas', 'ramita', 'ramitas'),
+    'hoja': ('hoja', 'hojas'),
+    'atado': ('atado', 'atados', 'manojo', 'manojos'),
+    'lata': ('lata', 'latas'),
+    'paquete': ('paquete', 'paquetes', 'funda', 'fundas'),
+    'unidad': ('unidad', 'unidades', 'pieza', 'piezas'),
+}.items():
+    for alias in aliases:
+        UNITS[alias] = canonical
+
+# Size words that follow the unit ("2 unidades medianas picadas")
+_SIZES = ('mediano', 'mediana', 'medianos', 'medianas', 'grande', 'grandes', 'pequeno', 'pequena',
+          'pequenos', 'pequenas')
+
+# Seasonings: scaled sub-linearly when servings change (Ingredient.isSpice)
+SPICES = (
+    'sal', 'pimienta', 'comino', 'achiote', 'oregano', 'canela', 'clavo de olor', 'clavos de olor', 'anis',
+    'paprika', 'pimenton', 'curcuma', 'nuez moscada', 'laurel', 'aji', 'ajo', 'ajos', 'jengibre',
+)
+_SPICE_RE = re.compile(r'\b(?:%s)\b' % '|'.join(re.escape(s) for s in sorted(SPICES, key=len, reverse=True)))
+
+STORES = ('Supermaxi', 'Megamaxi', 'TIA', 'Mercado local', 'Tuti', 'Akí', 'Santa María', 'Coral')
+
+_UNICODE_FRACTIONS = {'½': 0.5, '¼': 0.25, '¾': 0.75, '⅓': 1 / 3, '⅔': 2 / 3}
+_NUM = r'(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?|[½¼¾⅓⅔])'
+_QTY_RE = re.compile(r'^\s*(%s)(?:\s*(?:-|a)\s*(%s))?\s*' % (_NUM, _NUM))
+_TO_TASTE_RE = re.compile(r'\bal gusto\b', re.I)
+_PARENS_RE = re.compile(r'\s*\(([^)]*)\)')
+_STORE_RE = re.compile(r'^(?:comprar en |disponible en )?(%s)\b' % '|'.join(re.escape(s) for s in STORES), re.I)
+_WORD_RE = re.compile(r'^([^\s,]+)\s*')
+
+
+def parse_number(text):
+    text = text.strip()
+    if text in _UNICODE_FRACTIONS:
+        return _UNICODE_FRACTIONS[text]
+    if '/' in text:
+        whole, _, frac = text.rpartition(' ')
+        num, den = frac.split('/')
+        return (float(whole) if whole else 0.0) + (float(num) / float(den) if float(den) else 0.0)
+    return float(text.replace(',', '.'))
+
+
+def parse_quantity(text, skip_sizes=True):
+    """Leading "1 1/2 tazas medianas" -> (1.5, 'taza', rest). Ranges ("2-3") use their midpoint.
+
+    `rest` is always a suffix of `text`; with skip_sizes=False it still starts
+    with the size word, so the line can be re-rendered with a new quantity.
+    """
+    m = _QTY_RE.match(text)
+    if not m:
+        return None, '', text
+    quantity = parse_number(m.group(1))
+    if m.group(2):
+        quantity = (quantity + parse_number(m.group(2))) / 2
+    rest = text[m.end():]
+    unit = ''
+    w = _WORD_RE.match(rest)
+    if w and norm_text(w.group(1)) in UNITS:
+        unit = UNITS[norm_text(w.group(1))]
+        rest = rest[w.end():]
+        w = _WORD_RE.match(rest)
+        if skip_sizes and w and norm_text(w.group(1)) in _SIZES:
+            rest = rest[w.end():]
+    return quantity, unit, rest
+
+
+def _split_name(rest):
+    """Split "<prep>, <prep> Name" / "de name, prep" into (name, note)."""
+    rest = rest.strip().lstrip(',').strip()
+    rest = re.sub(r'^de\s+', '', rest, flags=re.I)
+    # Workflow format: lowercase preparation words, then the capitalized product name.
+    m = re.match(r'^([a-záéíóúñ ,/-]*?)\s*,?\s*([A-ZÁÉÍÓÚÑ].*)$', rest)
+    if m and m.group(1).strip(' ,'):
+        return m.group(2).strip(), re.sub(r'\s+de$', '', m.group(1).strip(' ,'))
+    name, _, note = rest.partition(',')
+    return name.strip(), note.strip()
+
+
+def parse_ingredient(ing):
+    """Return {name, quantity, unit, note, store, to_taste, is_spice, text}."""
+    store = ''
+    notes = []
+    if isinstance(ing, dict):
+        text = (ing.get('quantity') or '') + ' ' + (ing.get('name') or '')
+        quantity, unit, rest = parse_quantity(ing.get('quantity') or '')
+        name = ing.get('name') or ''
+        if rest.strip():
+            notes.append(rest.strip())
+        store = ing.get('where_to_buy') or ''
+    else:
+        text = str(ing)
+        for paren in _PARENS_RE.findall(text):
+            s = _STORE_RE.match(paren.strip())
+            if s and not store:
+                store = s.group(1)
+            elif paren.strip():
+                notes.append(paren.strip())
+        body = _PARENS_RE.sub('', text)
+        quantity, unit, rest = parse_quantity(body)
+        rest = _TO_TASTE_RE.sub('', rest) if quantity is None or _TO_TASTE_RE.match(rest.strip()) else rest
+        name, note = _split_name(rest)
+        if note:
+            notes.insert(0, note)
+
+    to_taste = bool(_TO_TASTE_RE.search(text))
+    name = _TO_TASTE_RE.sub('', name).strip(' ,')
+    if quantity is not None and not unit:
+        unit = 'unidad'
+    return {
+        'name': name[:1].upper() + name[1:],
+        'quantity': quantity,
+        'unit': unit or ('al gusto' if to_taste else ''),
+        'note': '; '.join(notes),
+        'store': store,
+        'to_taste': to_taste,
+        'is_spice': bool(_SPICE_RE.search(norm_text(name))),
+        'text': text.strip(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse ingredient lines into quantity / unit / name.')
+    parser.add_argument('lines', nargs='*')
+    parser.add_argument('--check', action='store_true', help='Parse every ingredient in recipes.json')
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        for line in args.lines:
+            print(parse_ingredient(line))
+        return 0
+
+    units, missing = Counter(), []
+    total = 0
+    for recipe in load_json(RECIPES_PATH):
+        for ing in recipe.get('ingredients') or []:
+            total += 1
+            parsed = parse_ingredient(ing)
+            units[parsed['unit']] += 1
+            if parsed['quantity'] is None and not parsed['to_taste'] or not parsed['name']:
+                missing.append(parsed['text'])
+    print(f'{total} ingredients; units: ' + ', '.join(f'{u or "-"} {n}' for u, n in units.most_common()))
+    for text in missing:
+        print(f'  ? {text}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Single-pass streaming JSON string rewriter.
+
+Reads a JSON document (n8n workflow exports, last-execution.json, posts.json)
+in fixed-size chunks, tokenizes it and copies it straight to the output. Only
+string values under selected keys (e.g. jsCode, jsonBody) are decoded and run
+through a compiled rule table; everything else is passed through byte for byte,
+so memory stays bounded by the chunk size plus the largest single string.
+
+Usage:
+    python scripts/json_stream.py n8n-exports/turismo_workflow.json
+    python scripts/json_stream.py last-execution.json --all-strings -o fixed.json
+    python scripts/json_stream.py posts.json --rules my-rules.json --dry-run
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from site_data import ROOT, commit_atomic, count, discard_atomic, open_atomic
+
+CHUNK_SIZE = 1 << 16
+
+DEFAULT_KEYS = ('jsCode', 'jsonBody')
+
+# strict=False: some exports carry raw newlines inside jsCode strings.
+_decode = json.JSONDecoder(strict=False).decode
+
+# One token per match: whitespace, string, structural char or bare scalar.
+_TOKEN_RE = re.compile(r'\s+|"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+', re.S)
+# Coarser: a bracket, or everything (strings included) up to the next one.
+_SPAN_RE = re.compile(r'[{}\[\]]|(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")+', re.S)
+
+
+class RuleTable:
+    """Literal replacement table compiled into one alternation regex.
+
+    The text is scanned once; each match is looked up in a dispatch dict,
+    instead of running one str.replace per rule over the whole string.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = {k: v for k, v in mapping.items() if k and k != v}
+        # Longest first so 'artÃ­culos' wins over 'Ã­' at the same position.
+        keys = sorted(self.mapping, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(k) for k in keys)) if keys else None
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def sub(self, text):
+        """Return (new_text, replacements)."""
+        if self.pattern is None:
+            return text, 0
+        mapping = self.mapping
+        return self.pattern.subn(lambda m: mapping[m.group(0)], text)
+
+
+def iter_tokens(fp, chunk_size=CHUNK_SIZE, pattern=_TOKEN_RE):
+    """Yield raw JSON tokens from a text file object, reading chunk by chunk."""
+    buf = fp.read(chunk_size)
+    pos = 0
+    eof = not buf
+    while True:
+        if pos >= len(buf):
+            if eof:
+                return
+            buf = fp.read(chunk_size)
+            pos = 0
+            eof = not buf
+            continue
+        m = pattern.match(buf, pos)
+        # A token touching the end of the buffer may continue in the next chunk.
+        if (m is None or m.end() == len(buf)) and not eof:
+            # Read at least as much as we hold so long strings stay amortized O(n).
+            more = fp.read(max(chunk_size, len(buf) - pos))
+            buf = buf[pos:] + more
+            pos = 0
+            eof = not more
+            continue
+        if m is None:
+            raise ValueError('Unterminated or invalid JSON near: %r' % buf[pos:pos + 40])
+        pos = m.end()
+        yield m.group(0)
+
+
+def iter_events(fp, chunk_size=CHUNK_SIZE):
+    """Yield (path, event, raw) for a JSON document without building it.
+
+    path is a tuple of object keys / array indices leading to the value;
+    event is one of key, value, start_map, end_map, start_array, end_array;
+    raw is the token text (decode strings with json.loads when needed).
+    """
+    path = []
+    stack = []  # [is_object, expecting_key]
+    for tok in iter_tokens(fp, chunk_size):
+        c = tok[0]
+        if c.isspace():
+            continue
+        if c == ',':
+            if stack[-1][0]:
+                stack[-1][1] = True
+            else:
+                path[-1] += 1
+        elif c == ':':
+            stack[-1][1] = False
+        elif c == '"' and stack and stack[-1][0] and stack[-1][1]:
+            path[-1] = _decode(tok)
+            yield tuple(path), 'key', tok
+        elif c == '{' or c == '[':
+            is_obj = c == '{'
+            yield tuple(path), 'start_map' if is_obj else 'start_array', tok
+            stack.append([is_obj, is_obj])
+            path.append(None if is_obj else 0)
+        elif c == '}' or c == ']':
+            stack.pop()
+            path.pop()
+            yield tuple(path), 'end_map' if c == '}' else 'end_array', tok
+        else:
+            yield tuple(path), 'value', tok
+
+
+def iter_array(fp, chunk_size=CHUNK_SIZE, decode=True):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being read is held in memory, so recipes.json or
+    posts.json can grow well past what json.load would comfortably parse.
+    With decode=False the raw JSON text of each element is yielded instead
+    (e.g. to hand it to a worker process that decodes it there).
+    """
+    finish = _decode if decode else str.strip
+    depth = 0
+    parts = []
+    # Spans inside an element are copied whole; only the text between
+    # elements (depth 1) is split into tokens to find the commas.
+    for span in iter_tokens(fp, chunk_size, _SPAN_RE):
+        c = span[0]
+        if c == '{' or c == '[':
+            depth += 1
+            if depth == 1:
+                if c != '[':
+                    raise ValueError('Expected a top-level JSON array')
+                continue
+        elif c == '}' or c == ']':
+            depth -= 1
+            if depth == 0:
+                if parts:
+                    yield finish(''.join(parts))
+                return
+        elif depth == 1:
+            for tok in _TOKEN_RE.findall(span):
+                if tok == ',':
+                    yield finish(''.join(parts))
+                    parts = []
+                elif parts or not tok[0].isspace():
+                    parts.append(tok)
+            continue
+        elif depth == 0:
+            if not span.isspace():
+                raise ValueError('Expected a top-level JSON array')
+            continue
+        parts.append(span)
+
+
+def rewrite_stream(src, dst, table, keys=DEFAULT_KEYS, chunk_size=CHUNK_SIZE):
+    """Copy JSON from `src` to `dst`, rewriting strings under `keys` with `table`.
+
+    `table` is anything with a sub(text) -> (text, count) method. With
+    keys=None every string value is rewritten (object keys never are).
+    Returns a stats dict.
+    """
+    keys = None if keys is None else frozenset(keys)
+    stats = {'strings': 0, 'selected': 0, 'rewritten': 0, 'replacements': 0}
+    # Each frame: [is_object, expecting_key, current_key]
+    stack = []
+    write = dst.write
+    for tok in iter_tokens(src, chunk_size):
+        c = tok[0]
+        if c == '"':
+            stats['strings'] += 1
+            frame = stack[-1] if stack else None
+            if frame is not None and frame[0] and frame[1]:
+                frame[2] = _decode(tok)
+                write(tok)
+                continue
+            key = frame[2] if frame is not None and frame[0] else None
+            if keys is None or key in keys:
+                stats['selected'] += 1
+                value = _decode(tok)
+                fixed, n = table.sub(value)
+                if n:
+                    stats['rewritten'] += 1
+                    stats['replacements'] += n
+                    tok = json.dumps(fixed, ensure_ascii=False)
+            write(tok)
+        elif c == '{':
+            stack.append([True, True, None])
+            write(tok)
+        elif c == '[':
+            stack.append([False, False, None])
+            write(tok)
+        elif c == '}' or c == ']':
+            stack.pop()
+            write(tok)
+        elif c == ',':
+            if stack and stack[-1][0]:
+                stack[-1][1] = True
+            write(tok)
+        elif c == ':':
+            stack[-1][1] = False
+            write(tok)
+        else:
+            write(tok)
+    count('strings', stats['strings'])
+    count('strings_rewritten', stats['rewritten'])
+    return stats
+
+
+def rewrite_file(path, table, keys=DEFAULT_KEYS, out_path=None, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Stream `path` through rewrite_stream, writing to `out_path` (default: in place).
+
+    Output goes to a temp file that only replaces the target when something
+    changed (or when writing to a different file), so untouched files keep
+    their mtime.
+    """
+    target = out_path or path
+    with open(path, 'r', encoding='utf-8', newline='') as src:
+        dst, tmp = open_atomic(target)
+        try:
+            with dst:
+                stats = rewrite_stream(src, dst, table, keys, chunk_size)
+            if dry_run or (stats['rewritten'] == 0 and out_path is None):
+                discard_atomic(tmp)
+            else:
+                commit_atomic(tmp, target)
+        except BaseException:
+            discard_atomic(tmp)
+            raise
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream-rewrite strings inside JSON files.')
+    parser.add_argument('files', nargs='*', help='JSON files (default: n8n-exports/*.json)')
+    parser.add_argument('-k', '--key', dest='keys', action='append',
+                        help='Only rewrite values of this key (repeatable, default: jsCode, jsonBody)')
+    parser.add_argument('--all-strings', action='store_true', help='Rewrite every string value')
+    parser.add_argument('--rules', help='JSON object {"broken": "fixed"} (default: mojibake repair)')
+    parser.add_argument('-o', '--output', help='Write to this file instead of in place (single input only)')
+    parser.add_argument('--dry-run', action='store_true', help='Report counts without writing')
+    args = parser.parse_args(argv)
+
+    files = args.files or sorted(str(p) for p in (ROOT / 'n8n-exports').glob('*.json'))
+    if args.output and len(files) != 1:
+        parser.error('--output needs exactly one input file')
+    if args.rules:
+        table = RuleTable.from_file(args.rules)
+    else:
+        from mojibake import Repairer
+        table = Repairer(cache_path=None)
+    keys = None if args.all_strings else (args.keys or DEFAULT_KEYS)
+
+    for path in files:
+        stats = rewrite_file(path, table, keys, args.output, args.dry_run)
+        print(f"{path}: {stats['selected']}/{stats['strings']} strings checked, "
+              f"{stats['rewritten']} rewritten ({stats['replacements']} replacements)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
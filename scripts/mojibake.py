@@ -0,0 +1,211 @@
+"""Mojibake detector/repairer for UTF-8 text that was decoded as Latin-1/CP1252.
+
+Instead of a hand-kept list of broken words ('artÃ­culo', 'optimizaciÃ³n',
+...), any run of characters that looks like UTF-8 lead + continuation bytes
+is mapped back to bytes and re-decoded as UTF-8. A sequence is only
+replaced when it is plausible mojibake: it starts with one of the lead
+characters UTF-8 Spanish text actually turns into (Ã, Â, â) and decodes to
+Latin-1 or General Punctuation. Legitimate accented text followed by
+punctuation ('SÍ—no', 'CAFÉ”') decodes too, but to Greek or Cyrillic
+combining marks, and is left alone.
+
+Most strings are clean: pure-ASCII strings are skipped at C speed, the rest
+go through one pre-scan regex, and long strings already verified are
+remembered by hash in .cache/mojibake.json across runs.
+
+Usage:
+    python scripts/mojibake.py                  # check recipes, posts, i18n, n8n-exports
+    python scripts/mojibake.py --write          # repair in place
+    python scripts/mojibake.py posts.json -k content --write
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+
+from json_stream import rewrite_file
+from site_data import CACHE_DIR, ROOT, write_json
+
+CACHE_PATH = CACHE_DIR / 'mojibake.json'
+
+DEFAULT_GLOBS = ('recipes.json', 'posts.json', 'i18n/*.json', 'n8n-exports/*.json')
+
+# Strings shorter than this are cheaper to scan than to hash.
+MIN_CACHE_LEN = 256
+
+MAX_PASSES = 3
+
+# Bump when the repair rules change so cached results are redone
+RULES_VERSION = 2
+# Bump when the cache layout changes ('fixed' maps digest -> [text, runs])
+CACHE_FORMAT = 2
+
+
+def _byte_table():
+    """Map every char a byte 0x80-0xFF can turn into (CP1252 or Latin-1) back to that byte."""
+    table = {}
+    for b in range(0x80, 0x100):
+        raw = bytes([b])
+        table[raw.decode('latin-1')] = b
+        try:
+            table.setdefault(raw.decode('cp1252'), b)
+        except UnicodeDecodeError:
+            pass
+    return table
+
+
+_BYTE = _byte_table()
+_CONT = ''.join(re.escape(c) for c, b in _BYTE.items() if 0x80 <= b <= 0xBF)
+# Only the leads of U+0080-U+00FF (Â, Ã) and U+2000-U+2FFF (â): Spanish text and
+# its typography never needs anything else, while uppercase accented letters
+# (Í, É, Ñ, Ú) followed by CP1252 punctuation look like other lead bytes.
+_SEQ = r'(?:[\xc2\xc3][{c}]|\xe2[{c}]{{2}})'.format(c=_CONT)
+
+# Pre-scan: Â/Ã/â followed by a continuation byte never happens in Spanish text.
+SUSPECT_RE = re.compile(r'[\xc2\xc3\xe2][{c}]'.format(c=_CONT))
+_SEQ_RE = re.compile(_SEQ)
+_RUN_RE = re.compile(_SEQ + '+')
+
+# Outside Latin-1 and General Punctuation, only these are accepted
+EXTRA_CHARS = frozenset('€™')
+
+
+def _to_bytes(run):
+    return bytes(_BYTE[c] for c in run)
+
+
+def plausible(char):
+    """True if `char` is something a Spanish UTF-8 source could have contained."""
+    code = ord(char)
+    return 0xA0 <= code <= 0xFF or 0x2000 <= code <= 0x206F or char in EXTRA_CHARS
+
+
+def _repair_seq(m):
+    try:
+        out = _to_bytes(m.group(0)).decode('utf-8')
+    except UnicodeDecodeError:
+        return m.group(0)
+    return out if plausible(out) else m.group(0)
+
+
+def _repair_run(m):
+    # One sequence at a time: each must decode to a plausible character on its own.
+    return _SEQ_RE.sub(_repair_seq, m.group(0))
+
+
+def repair(text):
+    """Return (fixed_text, repaired_runs) without using the cache."""
+    total = 0
+    for _ in range(MAX_PASSES):  # double-encoded text needs more than one pass
+        if not SUSPECT_RE.search(text):
+            break
+        count = 0
+
+        def fix(m):
+            nonlocal count
+            out = _repair_run(m)
+            if out != m.group(0):
+                count += 1
+            return out
+
+        text = _RUN_RE.sub(fix, text)
+        if not count:
+            break
+        total += count
+    return text, total
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class Repairer:
+    """repair() with ASCII fast path and a persistent hash cache.
+
+    Has the sub(text) -> (text, count) interface expected by
+    json_stream.rewrite_stream.
+    """
+
+    def __init__(self, cache_path=CACHE_PATH, min_cache_len=MIN_CACHE_LEN):
+        self.cache_path = cache_path
+        self.min_cache_len = min_cache_len
+        self.clean = set()
+        self.fixed = {}
+        self.stats = {'ascii': 0, 'cache_hits': 0, 'scanned': 0, 'repaired': 0}
+        self._dirty = False
+        if cache_path and cache_path.exists():
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('rules') == RULES_VERSION and data.get('format') == CACHE_FORMAT:
+                self.clean = set(data.get('clean', []))
+                self.fixed = {k: tuple(v) for k, v in data.get('fixed', {}).items()}
+
+    def sub(self, text):
+        if text.isascii():
+            self.stats['ascii'] += 1
+            return text, 0
+        key = _digest(text) if len(text) >= self.min_cache_len else None
+        if key is not None:
+            if key in self.clean:
+                self.stats['cache_hits'] += 1
+                return text, 0
+            if key in self.fixed:
+                self.stats['cache_hits'] += 1
+                self.stats['repaired'] += 1
+                return self.fixed[key]
+        self.stats['scanned'] += 1
+        fixed, n = repair(text)
+        if n:
+            self.stats['repaired'] += 1
+        if key is not None:
+            if n:
+                self.fixed[key] = (fixed, n)
+            else:
+                self.clean.add(key)
+            self._dirty = True
+        return fixed, n
+
+    def save(self):
+        if self.cache_path and self._dirty:
+            write_json(self.cache_path, {'rules': RULES_VERSION, 'format': CACHE_FORMAT, 'clean': sorted(self.clean),
+                                         'fixed': {k: list(v) for k, v in self.fixed.items()}}, indent=None)
+            self._dirty = False
+
+
+def default_files():
+    files = []
+    for pattern in DEFAULT_GLOBS:
+        files.extend(sorted(ROOT.glob(pattern)))
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detect and repair UTF-8 mojibake in JSON content.')
+    parser.add_argument('files', nargs='*', help='JSON files (default: recipes, posts, i18n, n8n-exports)')
+    parser.add_argument('-k', '--key', dest='keys', action='append',
+                        help='Only check values of this key (repeatable, default: every string)')
+    parser.add_argument('--write', action='store_true', help='Repair files in place')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the hash cache')
+    args = parser.parse_args(argv)
+
+    repairer = Repairer(cache_path=None if args.no_cache else CACHE_PATH)
+    files = args.files or default_files()
+    broken = 0
+    for path in files:
+        stats = rewrite_file(path, repairer, keys=args.keys, dry_run=not args.write)
+        broken += stats['rewritten']
+        if stats['rewritten']:
+            verb = 'repaired' if args.write else 'need repair'
+            print(f"{path}: {stats['rewritten']} strings {verb} ({stats['replacements']} runs)")
+    repairer.save()
+
+    s = repairer.stats
+    print(f"{len(files)} files: {s['ascii']} ascii, {s['cache_hits']} cached, "
+          f"{s['scanned']} scanned, {s['repaired']} with mojibake")
+    return 1 if broken and not args.write else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
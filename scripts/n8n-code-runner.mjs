@@ -0,0 +1,75 @@
+#!/usr/bin/env node
+/**
+ * n8n-code-runner.mjs — ejecuta el código de nodos n8n fuera de n8n
+ * Ecuador a la Carta
+ *
+ * Uso:   node scripts/n8n-code-runner.mjs   (lo arranca scripts/batch_generate.py)
+ * Entrada: una petición JSON por línea en stdin
+ *          { id, code, nodes, input }   jsCode de un nodo Code
+ *          { id, expr, nodes, json }    expresión "={{ ... }}" (p. ej. jsonBody)
+ * Salida:  { id, ok: true, result } | { id, ok: false, error } por línea en stdout
+ *
+ * $('Nodo').first().json devuelve nodes['Nodo'] y $input / $json la entrada,
+ * así el lote construye los prompts con el mismo código que el workflow.
+ * Las peticiones se atienden a medida que llegan; las respuestas llevan su id.
+ */
+
+import { createInterface } from 'readline';
+
+const AsyncFunction = Object.getPrototypeOf(async function () {}).constructor;
+const quiet = { log() {}, info() {}, warn() {}, error() {} };
+
+function items(value) {
+  const item = { json: value };
+  return { first: () => item, last: () => item, all: () => [item], item };
+}
+
+function nodeAccessor(nodes) {
+  return function (name) {
+    if (!(name in nodes)) throw new Error(`Nodo no disponible fuera de n8n: ${name}`);
+    return items(nodes[name]);
+  };
+}
+
+// "={{ expr }}" -> "expr"
+function unwrapExpression(expr) {
+  const body = String(expr).replace(/^=/, '').trim();
+  const m = body.match(/^\{\{([\s\S]*)\}\}$/);
+  if (!m) return JSON.stringify(body);
+  return m[1];
+}
+
+// Un nodo Code devuelve [{json}], {json} o el objeto directamente
+function firstJson(result) {
+  const first = Array.isArray(result) ? result[0] : result;
+  return first && typeof first === 'object' && 'json' in first ? first.json : first;
+}
+
+async function handle(req) {
+  const nodes = req.nodes || {};
+  if (req.code !== undefined) {
+    const fn = new AsyncFunction('$', '$input', '$json', '$env', 'console', req.code);
+    return firstJson(await fn(nodeAccessor(nodes), items(req.input), req.input, {}, quiet));
+  }
+  const fn = new AsyncFunction('$', '$json', '$env', 'return (' + unwrapExpression(req.expr) + ');');
+  return await fn(nodeAccessor(nodes), req.json, {});
+}
+
+const rl = createInterface({ input: process.stdin, crlfDelay: Infinity });
+rl.on('line', async (line) => {
+  if (!line.trim()) return;
+  let req;
+  try {
+    req = JSON.parse(line);
+  } catch (e) {
+    process.stdout.write(JSON.stringify({ id: null, ok: false, error: 'Petición inválida: ' + e.message }) + '\n');
+    return;
+  }
+  let out;
+  try {
+    out = { id: req.id, ok: true, result: await handle(req) };
+  } catch (e) {
+    out = { id: req.id, ok: false, error: e && e.message ? e.message : String(e) };
+  }
+  process.stdout.write(JSON.stringify(out) + '\n');
+});
@@ -0,0 +1,241 @@
+"""Per-node timing profile for n8n execution dumps (last-execution.json, exec_*.json).
+
+The execution record is streamed with json_stream.iter_events: only the
+run metadata (startTime, executionTime, status, source) is kept, and the
+node outputs under data.main are counted (items, approximate compact
+bytes) but never built, so a multi-megabyte dump costs one pass and little
+memory.
+
+For each execution it reports the node timeline, the critical path
+(longest chain of executionTime through each node's source), the slowest
+nodes and the bytes handed from node to node. With several files it also
+aggregates per-node timings across executions.
+
+Usage:
+    python scripts/n8n_exec_profile.py                       # last-execution.json
+    python scripts/n8n_exec_profile.py executions/*.json --top 5
+    python scripts/n8n_exec_profile.py last-execution.json --json
+"""
+
+import argparse
+import glob
+import json
+import statistics
+import sys
+from datetime import datetime
+
+from json_stream import iter_events
+from site_data import ROOT
+
+RUN_DATA = ('data', 'resultData', 'runData')
+_N = len(RUN_DATA)
+
+# Offsets inside runData.<node>.<run>.*
+_NODE, _RUN, _FIELD = _N, _N + 1, _N + 2
+
+# Structural tokens ({} [] , :) are not counted; this is a lower bound of compact JSON size.
+_COUNTED = ('key', 'value')
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000
+
+
+def profile_execution(path):
+    """Stream one execution file and return its profile dict."""
+    meta = {}
+    runs = {}  # (node, run) -> info
+
+    def run_info(p):
+        key = (p[_NODE], p[_RUN])
+        info = runs.get(key)
+        if info is None:
+            info = runs[key] = {'node': p[_NODE], 'run': p[_RUN], 'sources': [], 'items': [], 'bytes': []}
+        return info
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for p, event, raw in iter_events(f):
+            depth = len(p)
+            if depth == 1 and event == 'value':
+                if p[0] in ('id', 'workflowId', 'status', 'startedAt', 'stoppedAt', 'mode'):
+                    meta[p[0]] = json.loads(raw)
+                continue
+            if depth == 2 and p == ('workflowData', 'name') and event == 'value':
+                meta['name'] = json.loads(raw)
+                continue
+            if depth <= _FIELD or p[:_N] != RUN_DATA:
+                continue
+            field = p[_FIELD]
+            if field in ('startTime', 'executionTime', 'executionStatus') and depth == _FIELD + 1:
+                if event == 'value':
+                    run_info(p)[field] = json.loads(raw)
+            elif field == 'source':
+                # source[i].previousNode / previousNodeOutput
+                if depth == _FIELD + 3 and event == 'value' and p[-1] in ('previousNode', 'previousNodeOutput'):
+                    sources = run_info(p)['sources']
+                    while len(sources) <= p[_FIELD + 1]:
+                        sources.append({})
+                    sources[p[_FIELD + 1]][p[-1]] = json.loads(raw)
+            elif field == 'data' and depth > _FIELD + 2 and p[_FIELD + 1] == 'main':
+                info = run_info(p)
+                out = p[_FIELD + 2]
+                while len(info['items']) <= out:
+                    info['items'].append(0)
+                    info['bytes'].append(0)
+                if depth == _FIELD + 4 and event == 'start_map':
+                    info['items'][out] += 1
+                if event in _COUNTED:
+                    info['bytes'][out] += len(raw.encode('utf-8'))
+                else:
+                    info['bytes'][out] += 1
+
+    nodes = sorted(runs.values(), key=lambda r: (r.get('startTime') or 0, r['run']))
+    t0 = nodes[0].get('startTime', 0) if nodes else 0
+    for r in nodes:
+        r['offset'] = (r.get('startTime') or t0) - t0
+        r['executionTime'] = r.get('executionTime') or 0
+
+    started, stopped = _parse_time(meta.get('startedAt')), _parse_time(meta.get('stoppedAt'))
+    return {
+        'file': str(path),
+        'meta': meta,
+        'wall_ms': stopped - started if started and stopped else None,
+        'nodes': nodes,
+        'critical_path': critical_path(nodes),
+        'edges': edges(nodes),
+    }
+
+
+def critical_path(nodes):
+    """Longest chain by executionTime following each run's source nodes."""
+    last_run = {}
+    for r in nodes:  # nodes are in start order, so predecessors come first
+        best, best_prev = 0, None
+        for src in r['sources']:
+            prev = last_run.get(src.get('previousNode'))
+            if prev and prev['_cp'] > best:
+                best, best_prev = prev['_cp'], prev
+        r['_cp'] = best + r['executionTime']
+        r['_cp_prev'] = best_prev
+        last_run[r['node']] = r
+    if not nodes:
+        return {'ms': 0, 'nodes': []}
+    end = max(nodes, key=lambda r: r['_cp'])
+    chain = []
+    cur = end
+    while cur is not None:
+        chain.append(cur['node'])
+        cur = cur['_cp_prev']
+    total = end['_cp']
+    for r in nodes:
+        del r['_cp'], r['_cp_prev']
+    return {'ms': total, 'nodes': chain[::-1]}
+
+
+def edges(nodes):
+    """Bytes/items each node received from its sources."""
+    by_node = {}
+    for r in nodes:
+        by_node[r['node']] = r
+    out = []
+    for r in nodes:
+        for src in r['sources']:
+            prev = by_node.get(src.get('previousNode'))
+            if prev is None:
+                continue
+            i = src.get('previousNodeOutput') or 0
+            out.append({
+                'from': prev['node'], 'to': r['node'],
+                'items': prev['items'][i] if i < len(prev['items']) else 0,
+                'bytes': prev['bytes'][i] if i < len(prev['bytes']) else 0,
+            })
+    return out
+
+
+def fmt_bytes(n):
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024 or unit == 'MB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+
+
+def print_profile(prof, top):
+    meta = prof['meta']
+    print(f"\n{meta.get('name', '?')}  exec {meta.get('id', '?')}  [{meta.get('status', '?')}]  {prof['file']}")
+    if prof['wall_ms'] is not None:
+        print(f"  wall time: {prof['wall_ms'] / 1000:.1f} s")
+    print(f"  {'start':>8}  {'exec':>8}  {'items':>5}  {'out':>9}  node")
+    for r in prof['nodes']:
+        print(f"  {r['offset'] / 1000:7.2f}s  {r['executionTime']:6d}ms  {sum(r['items']):5d}  "
+              f"{fmt_bytes(sum(r['bytes'])):>9}  {r['node']}" + ('' if r.get('executionStatus', 'success') == 'success'
+                                                                   else f"  [{r.get('executionStatus')}]"))
+    cp = prof['critical_path']
+    print(f"  critical path: {cp['ms'] / 1000:.1f} s  ({' -> '.join(cp['nodes'])})")
+    slow = sorted(prof['nodes'], key=lambda r: -r['executionTime'])[:top]
+    total = sum(r['executionTime'] for r in prof['nodes']) or 1
+    print('  slowest: ' + ', '.join(f"{r['node']} {r['executionTime'] / 1000:.1f}s "
+                                    f"({100 * r['executionTime'] / total:.0f}%)" for r in slow))
+    heavy = sorted(prof['edges'], key=lambda e: -e['bytes'])[:top]
+    print('  heaviest hand-offs: ' + ', '.join(f"{e['from']} -> {e['to']} {fmt_bytes(e['bytes'])}" for e in heavy))
+
+
+def aggregate(profiles):
+    per_node = {}
+    for prof in profiles:
+        for r in prof['nodes']:
+            agg = per_node.setdefault(r['node'], {'times': [], 'bytes': []})
+            agg['times'].append(r['executionTime'])
+            agg['bytes'].append(sum(r['bytes']))
+    rows = []
+    for node, agg in per_node.items():
+        times = sorted(agg['times'])
+        rows.append({
+            'node': node,
+            'runs': len(times),
+            'mean_ms': statistics.fmean(times),
+            'p50_ms': times[len(times) // 2],
+            'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))],
+            'max_ms': times[-1],
+            'mean_bytes': statistics.fmean(agg['bytes']),
+        })
+    return sorted(rows, key=lambda r: -r['mean_ms'])
+
+
+def print_aggregate(rows, count):
+    print(f'\nAcross {count} executions:')
+    print(f"  {'runs':>4}  {'mean':>8}  {'p50':>8}  {'p95':>8}  {'max':>8}  {'out':>9}  node")
+    for r in rows:
+        print(f"  {r['runs']:4d}  {r['mean_ms']:6.0f}ms  {r['p50_ms']:6d}ms  {r['p95_ms']:6d}ms  "
+              f"{r['max_ms']:6d}ms  {fmt_bytes(r['mean_bytes']):>9}  {r['node']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile n8n execution dumps per node.')
+    parser.add_argument('files', nargs='*', help='Execution JSON files or globs (default: last-execution.json)')
+    parser.add_argument('--top', type=int, default=3, help='How many slow nodes / heavy edges to list')
+    parser.add_argument('--json', action='store_true', help='Print the profiles as JSON')
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.files or [str(ROOT / 'last-execution.json')]:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    profiles = [profile_execution(p) for p in paths]
+    if args.json:
+        out = {'executions': profiles}
+        if len(profiles) > 1:
+            out['aggregate'] = aggregate(profiles)
+        json.dump(out, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+    for prof in profiles:
+        print_profile(prof, args.top)
+    if len(profiles) > 1:
+        print_aggregate(aggregate(profiles), len(profiles))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Concurrent n8n workflow sync client.
+
+One pooled requests.Session with retry/backoff is shared by every call.
+Workflows are pulled and pushed in parallel (bounded by --workers). The
+content hash of each workflow's nodes/connections is kept in
+.cache/n8n-sync.json, so a push skips workflows that did not change since
+the last successful sync without touching the network. GETs are conditional
+(If-None-Match) when the server sends an ETag.
+
+Usage (N8N_API_KEY must be set; N8N_BASE_URL overrides the default host):
+    python scripts/n8n_sync.py push                 # every workflow in WORKFLOWS
+    python scripts/n8n_sync.py push --dry-run       # show a node-level diff, no PUT
+    python scripts/n8n_sync.py push SHRZnCATkL1FX9jo=recetas_workflow_v3.json
+    python scripts/n8n_sync.py pull                 # refresh the local exports
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from site_data import CACHE_DIR, ROOT, count, load_json, write_json
+
+DEFAULT_BASE_URL = 'https://n8n-n8n.tlsfxv.easypanel.host/api/v1/'
+
+# workflow id -> local export
+WORKFLOWS = {
+    'SHRZnCATkL1FX9jo': 'n8n-exports/recetas_workflow.json',  # RECETAS-AI-Auto-Publisher-v3
+    'grhUOia7e869tqSN': 'n8n-exports/turismo_workflow.json',  # TURISMO-AI-Auto-Publisher-v2
+}
+
+# Fields the public API accepts on PUT /workflows/{id}
+UPDATE_FIELDS = ('name', 'nodes', 'connections', 'settings')
+
+CACHE_PATH = CACHE_DIR / 'n8n-sync.json'
+BODY_CACHE_DIR = CACHE_DIR / 'n8n'
+
+
+def content_hash(workflow):
+    """Hash of the parts of a workflow that matter for a deploy."""
+    body = {'nodes': workflow.get('nodes') or [], 'connections': workflow.get('connections') or {}}
+    raw = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def update_payload(workflow):
+    payload = {k: workflow.get(k) for k in UPDATE_FIELDS}
+    if payload['settings'] is None:
+        payload['settings'] = {}
+    return {k: v for k, v in payload.items() if v is not None}
+
+
+def diff_workflows(old, new):
+    """Return readable lines describing node/connection changes from old to new."""
+    old_nodes = {n.get('name'): n for n in (old or {}).get('nodes') or []}
+    new_nodes = {n.get('name'): n for n in (new or {}).get('nodes') or []}
+    lines = []
+    for name in sorted(new_nodes.keys() - old_nodes.keys(), key=str):
+        lines.append(f"+ node '{name}'")
+    for name in sorted(old_nodes.keys() - new_nodes.keys(), key=str):
+        lines.append(f"- node '{name}'")
+    for name in sorted(old_nodes.keys() & new_nodes.keys(), key=str):
+        a, b = old_nodes[name], new_nodes[name]
+        if a == b:
+            continue
+        changed = []
+        for key in sorted(a.keys() | b.keys()):
+            if key == 'parameters' and isinstance(a.get(key), dict) and isinstance(b.get(key), dict):
+                pa, pb = a[key], b[key]
+                changed += ['parameters.' + k for k in sorted(pa.keys() | pb.keys()) if pa.get(k) != pb.get(k)]
+            elif a.get(key) != b.get(key):
+                changed.append(key)
+        lines.append(f"~ node '{name}': {', '.join(changed)}")
+    if (old or {}).get('connections') != (new or {}).get('connections'):
+        lines.append('~ connections')
+    return lines
+
+
+class N8nClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, workers=4, retries=3, backoff=0.5,
+                 timeout=60, cache_path=CACHE_PATH, body_cache_dir=BODY_CACHE_DIR):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.workers = workers
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.body_cache_dir = body_cache_dir
+        self.cache = load_json(cache_path) if cache_path and cache_path.exists() else {}
+        self._lock = threading.Lock()
+
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({'GET', 'PUT'}))
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'X-N8N-API-KEY': api_key, 'Content-Type': 'application/json'})
+
+    def close(self):
+        self.session.close()
+        self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self):
+        if self.cache_path:
+            with self._lock:
+                write_json(self.cache_path, self.cache)
+
+    def _remember(self, wid, **fields):
+        with self._lock:
+            self.cache.setdefault(wid, {}).update(fields)
+
+    def _body_path(self, wid):
+        return self.body_cache_dir / f'{wid}.json' if self.body_cache_dir else None
+
+    def get_workflow(self, wid):
+        """GET a workflow, reusing the cached body on 304 Not Modified."""
+        headers = {}
+        entry = self.cache.get(wid, {})
+        body_path = self._body_path(wid)
+        if entry.get('etag') and body_path and body_path.exists():
+            headers['If-None-Match'] = entry['etag']
+        r = self.session.get(self.base_url + 'workflows/' + wid, headers=headers, timeout=self.timeout)
+        if r.status_code == 304:
+            return load_json(body_path)
+        r.raise_for_status()
+        workflow = r.json()
+        etag = r.headers.get('ETag')
+        if etag and body_path:
+            write_json(body_path, workflow, indent=None)
+        self._remember(wid, etag=etag, remote_hash=content_hash(workflow))
+        return workflow
+
+    def put_workflow(self, wid, workflow):
+        r = self.session.put(self.base_url + 'workflows/' + wid, json=update_payload(workflow),
+                             timeout=self.timeout)
+        r.raise_for_status()
+        return r.json() if r.content else {}
+
+    def push(self, wid, workflow, dry_run=False, force=False):
+        """Push one workflow unless its nodes/connections match the last sync.
+
+        Returns {'id', 'status', 'diff'} where status is one of
+        unchanged / updated / would-update / error.
+        """
+        h = content_hash(workflow)
+        result = {'id': wid, 'status': 'unchanged', 'diff': []}
+        try:
+            if not force and self.cache.get(wid, {}).get('remote_hash') == h:
+                pass  # unchanged since the last sync; still counted below
+            elif dry_run:
+                remote = self.get_workflow(wid)
+                if content_hash(remote) != h or force:
+                    result['status'] = 'would-update'
+                    result['diff'] = diff_workflows(remote, workflow)
+            else:
+                self.put_workflow(wid, workflow)
+                self._remember(wid, remote_hash=h, etag=None)
+                result['status'] = 'updated'
+        except requests.RequestException as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+            if getattr(e, 'response', None) is not None:
+                result['error'] += ': ' + e.response.text[:500]
+        count('workflows_' + result['status'].replace('-', '_'))
+        return result
+
+    def push_many(self, items, dry_run=False, force=False):
+        """items: iterable of (workflow_id, workflow). Runs with bounded parallelism."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.push, wid, wf, dry_run, force) for wid, wf in items]
+            return [f.result() for f in futures]
+
+    def fetch_many(self, wids):
+        """Return {id: workflow or exception}."""
+        def fetch(wid):
+            try:
+                return self.get_workflow(wid)
+            except requests.RequestException as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(wids, pool.map(fetch, wids)))
+
+
+def client_from_env(**kwargs):
+    api_key = os.environ.get('N8N_API_KEY')
+    if not api_key:
+        sys.exit('N8N_API_KEY is not set')
+    return N8nClient(api_key, os.environ.get('N8N_BASE_URL', DEFAULT_BASE_URL), **kwargs)
+
+
+def parse_targets(targets):
+    if not targets:
+        return list(WORKFLOWS.items())
+    pairs = []
+    for t in targets:
+        wid, _, path = t.partition('=')
+        pairs.append((wid, path or WORKFLOWS[wid]))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pull/push n8n workflows concurrently.')
+    parser.add_argument('command', choices=('push', 'pull'))
+    parser.add_argument('targets', nargs='*', help='ID or ID=local.json (default: WORKFLOWS)')
+    parser.add_argument('--dry-run', action='store_true', help='Fetch and diff instead of PUT')
+    parser.add_argument('--force', action='store_true', help='Ignore the content-hash cache')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args(argv)
+
+    pairs = parse_targets(args.targets)
+    failed = 0
+    with client_from_env(workers=args.workers, timeout=args.timeout) as client:
+        if args.command == 'pull':
+            fetched = client.fetch_many([wid for wid, _ in pairs])
+            for wid, path in pairs:
+                wf = fetched[wid]
+                if isinstance(wf, Exception):
+                    failed += 1
+                    print(f'{wid}: ERROR {wf}')
+                    continue
+                write_json(ROOT / path, wf)
+                print(f'{wid}: saved {path}')
+        else:
+            items = [(wid, load_json(ROOT / path)) for wid, path in pairs]
+            for res in client.push_many(items, dry_run=args.dry_run, force=args.force):
+                print(f"{res['id']}: {res['status']}" + (f" ({res['error']})" if 'error' in res else ''))
+                for line in res['diff']:
+                    print('   ' + line)
+                failed += res['status'] == 'error'
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
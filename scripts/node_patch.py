@@ -0,0 +1,269 @@
+"""Declarative patch pipeline for n8n node code (jsCode).
+
+Rules are declared once in RULES with a node selector (id, type and/or
+name substrings) and an edit. Edits are either precompiled regexes, literal
+replacements, or JS-token-aware edits that work line by line / bracket by
+bracket instead of lazy `.*?` DOTALL regexes over the whole prompt.
+
+Rules are indexed by node id and type up front, so each node only sees the
+rules that can apply to it, and every node is patched in a single pass. A
+rule with `skip_if_contains` leaves nodes that already have that text alone
+(e.g. a fetch that already has an AbortSignal), so rules stay idempotent.
+The old one-off scripts (fix_prompt.py, fix_prompt_v3.py, fix_prompt_v4.py)
+run subsets of RULES by name through patch_workflows().
+
+Usage:
+    python scripts/node_patch.py                      # n8n-exports/*.json + recetas_workflow_v3.json
+    python scripts/node_patch.py --write              # save patched exports
+    python scripts/node_patch.py --live               # patch the live workflows (N8N_API_KEY)
+    python scripts/node_patch.py --live --dry-run
+"""
+
+import argparse
+import re
+import sys
+from collections import defaultdict
+
+from site_data import ROOT, count, load_json, write_json
+
+DEFAULT_FILES = ('n8n-exports/*.json', 'recetas_workflow_v3.json')
+
+# JS tokens that can appear in a prompt string-concatenation line.
+_JS_STRING = r"""'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`"""
+_CONCAT_TOKEN_RE = re.compile(r'\s+|\+|[A-Za-z_$][\w$.]*|' + _JS_STRING, re.S)
+_SCAN_TOKEN_RE = re.compile(_JS_STRING + r'|//[^\n]*|/\*.*?\*/|[\[\]{}();]|[^\'"`\[\]{}();/]+|.', re.S)
+_TRAIL_RE = re.compile(r'[ \t]*\r?\n(?:[ \t]*\r?\n)?')
+
+
+def regex(pattern, repl, flags=re.M):
+    """Edit with a precompiled pattern; avoid unbounded `.*?` with DOTALL."""
+    compiled = re.compile(pattern, flags)
+
+    def edit(code):
+        return compiled.subn(repl, code)
+    return edit
+
+
+def literal(old, new):
+    def edit(code):
+        n = code.count(old)
+        return (code.replace(old, new), n) if n else (code, 0)
+    return edit
+
+
+def _concat_strings(line):
+    """Return the string literals of `line` if it is a `'...' + x + '...' +` piece, else None."""
+    pos, strings, last = 0, [], None
+    while pos < len(line):
+        m = _CONCAT_TOKEN_RE.match(line, pos)
+        if m is None:
+            return None
+        tok = m.group(0)
+        if tok[0] in '\'"`':
+            strings.append(tok)
+        if not tok.isspace():
+            last = tok
+        pos = m.end()
+    return strings if strings and last == '+' else None
+
+
+def drop_concat_lines(marker):
+    """Remove prompt lines like `'  "image_url": ...' + imageList + '...' +` whose literals contain `marker`.
+
+    Only lines that continue with `+` are dropped, so the concatenation stays valid.
+    """
+    def edit(code):
+        if marker not in code:
+            return code, 0
+        out, n = [], 0
+        for line in code.splitlines(keepends=True):
+            if marker in line:
+                strings = _concat_strings(line.rstrip('\r\n'))
+                if strings and any(marker in s for s in strings):
+                    n += 1
+                    continue
+            out.append(line)
+        return ''.join(out), n
+    return edit
+
+
+def drop_statement(prefix):
+    """Remove a whole statement starting with `prefix` (e.g. `const imageList =`) up to its `;`.
+
+    Brackets, strings and comments are skipped token by token, so a `;`
+    inside the array or a string does not end the statement early.
+    """
+    def edit(code):
+        start = code.find(prefix)
+        if start == -1:
+            return code, 0
+        depth, pos = 0, start
+        while pos < len(code):
+            m = _SCAN_TOKEN_RE.match(code, pos)
+            tok = m.group(0)
+            pos = m.end()
+            if tok in '([{':
+                depth += 1
+            elif tok in ')]}':
+                depth -= 1
+            elif tok == ';' and depth == 0:
+                break
+        else:
+            return code, 0
+        # Swallow the rest of the line and the blank line that usually follows.
+        end = _TRAIL_RE.match(code, pos)
+        return code[:start] + code[end.end() if end else pos:], 1
+    return edit
+
+
+class Rule:
+    def __init__(self, name, edit, node_id=None, node_type=None, name_contains=(), field='jsCode',
+                 skip_if_contains=None):
+        self.name = name
+        self.edit = edit
+        self.node_id = node_id
+        self.node_type = node_type
+        self.name_contains = (name_contains,) if isinstance(name_contains, str) else tuple(name_contains)
+        self.field = field
+        self.skip_if_contains = skip_if_contains
+
+    def matches(self, node):
+        if self.node_id is not None and node.get('id') != self.node_id:
+            return False
+        if self.node_type is not None and node.get('type') != self.node_type:
+            return False
+        if self.name_contains:
+            name = node.get('name', '')
+            return any(s in name for s in self.name_contains)
+        return True
+
+
+RULES = [
+    # The prompt no longer asks the LLM for an image URL (images come from "Generar Imagen IA").
+    Rule('drop-image-url-field', drop_concat_lines('"image_url"'),
+         node_type='n8n-nodes-base.code', name_contains=('Prompt', 'Chef')),
+    Rule('drop-image-list', drop_statement('const imageList ='),
+         node_type='n8n-nodes-base.code', name_contains=('Prompt', 'Chef')),
+    Rule('broaden-image-query',
+         literal('const query = encodeURIComponent(`${queryConcept} comida plato ecuador real photography -pinterest`);',
+                 'const query = encodeURIComponent(`${queryConcept} ecuador dish recipe`);'),
+         node_type='n8n-nodes-base.code', name_contains='Generar'),
+    Rule('image-search-timeout',
+         literal('fetch(searchUrl)', 'fetch(searchUrl, { signal: AbortSignal.timeout(10000) })'),
+         node_type='n8n-nodes-base.code', name_contains='Generar', skip_if_contains='AbortSignal'),
+]
+
+
+def rules_named(*names, rules=RULES):
+    by_name = {rule.name: rule for rule in rules}
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise KeyError(f"unknown rules: {', '.join(unknown)}")
+    return [by_name[n] for n in names]
+
+
+class PatchSet:
+    """Rules indexed by node id and type, applied to each node in one pass."""
+
+    def __init__(self, rules=RULES):
+        self.rules = list(rules)
+        self.by_id = defaultdict(list)
+        self.by_type = defaultdict(list)
+        self.generic = []
+        for i, rule in enumerate(self.rules):
+            if rule.node_id is not None:
+                self.by_id[rule.node_id].append(i)
+            elif rule.node_type is not None:
+                self.by_type[rule.node_type].append(i)
+            else:
+                self.generic.append(i)
+
+    def rules_for(self, node):
+        idx = self.by_id.get(node.get('id'), []) + self.by_type.get(node.get('type'), []) + self.generic
+        return [self.rules[i] for i in sorted(idx) if self.rules[i].matches(node)]
+
+    def apply(self, workflow):
+        """Patch workflow['nodes'] in place. Returns {rule name: [node names it changed]}."""
+        fired = defaultdict(list)
+        for node in workflow.get('nodes', []):
+            params = node.get('parameters') or {}
+            for rule in self.rules_for(node):
+                code = params.get(rule.field)
+                if not isinstance(code, str) or not code:
+                    continue
+                if rule.skip_if_contains and rule.skip_if_contains in code:
+                    continue
+                new_code, n = rule.edit(code)
+                if n and new_code != code:
+                    params[rule.field] = new_code
+                    fired[rule.name].append(node.get('name'))
+        count('nodes', len(workflow.get('nodes', [])))
+        count('nodes_patched', len({name for names in fired.values() for name in names}))
+        return dict(fired)
+
+
+def print_report(label, fired):
+    if not fired:
+        print(f'{label}: no changes')
+        return
+    print(f'{label}:')
+    for rule, nodes in fired.items():
+        print(f"  {rule}: {', '.join(nodes)}")
+
+
+def patch_files(patches, files, write):
+    for path in files:
+        workflow = load_json(path)
+        fired = patches.apply(workflow)
+        print_report(path.relative_to(ROOT) if path.is_relative_to(ROOT) else path, fired)
+        if fired and write:
+            write_json(path, workflow)
+
+
+def patch_workflows(patches, client, workflows, dry_run=False):
+    """Patch {wid: workflow dict or fetch Exception} and PUT the changed ones; returns their ids."""
+    changed = []
+    for wid, workflow in workflows.items():
+        if isinstance(workflow, Exception):
+            print(f'{wid}: ERROR {workflow}')
+            continue
+        fired = patches.apply(workflow)
+        print_report(f"{workflow.get('name', wid)} ({wid})", fired)
+        if fired:
+            changed.append((wid, workflow))
+    if changed and not dry_run:
+        for res in client.push_many(changed, force=True):
+            print(f"{res['id']}: {res['status']}" + (f" ({res['error']})" if 'error' in res else ''))
+    return [wid for wid, _ in changed]
+
+
+def patch_live(patches, wids, dry_run):
+    from n8n_sync import WORKFLOWS, client_from_env
+
+    wids = wids or list(WORKFLOWS)
+    with client_from_env() as client:
+        patch_workflows(patches, client, client.fetch_many(wids), dry_run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply declared jsCode patches to n8n workflows.')
+    parser.add_argument('files', nargs='*', help='Workflow exports (default: n8n-exports/*.json, recetas_workflow_v3.json)')
+    parser.add_argument('--write', action='store_true', help='Save patched local exports')
+    parser.add_argument('--live', nargs='*', metavar='ID', help='Patch live workflows instead (default: all known)')
+    parser.add_argument('--dry-run', action='store_true', help='With --live: report only, do not PUT')
+    args = parser.parse_args(argv)
+
+    patches = PatchSet()
+    if args.live is not None:
+        patch_live(patches, args.live, args.dry_run)
+        return 0
+    if args.files:
+        files = [ROOT / f for f in args.files]
+    else:
+        files = [p for pattern in DEFAULT_FILES for p in sorted(ROOT.glob(pattern))]
+    patch_files(patches, files, args.write)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
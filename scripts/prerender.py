@@ -0,0 +1,444 @@
+"""Pre-render recipe.html / post.html into one static HTML file per slug.
+
+Each page is the normal template with the above-the-fold content filled in
+(title, description, hero image, specs, ingredients and steps for recipes;
+title, meta and article body for posts), the head meta tags and JSON-LD
+that js/seo.js would inject (Recipe / Article, BreadcrumbList, FAQPage,
+VideoObject), and the record itself embedded as
+<script type="application/json" id="prerender-data">, so js/data.js does not
+download recipes.json / posts.json again. script.js still runs on top and
+wires up the interactive parts.
+
+Output goes to prerender/recipe/<slug>.html and prerender/post/<slug>.html;
+vercel.json rewrites /recipe?slug=... and /post?slug=... to those files for
+every slug matching REWRITE_SLUG_RE, so each such record gets a file: a
+record that cannot be pre-rendered (no title yet) gets the bare template,
+which renders client-side as before. Slugs the rewrite cannot match are
+left to recipe.html / post.html.
+
+A page is only re-rendered when its record, its template or this renderer
+changes (hashes in CACHE_DIR/prerender.json). prerender/ is gitignored and
+starts empty on every Vercel build, so rendered pages are also kept in
+CACHE_DIR/prerender/ (persisted, see site_data.py) and unchanged ones are
+restored from there. Pages are rendered in a process pool and pages for
+deleted slugs are removed from both places.
+
+Usage:
+    python scripts/prerender.py
+    python scripts/prerender.py --force --workers 8
+    python scripts/prerender.py --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from urllib.parse import quote
+
+from site_data import (CACHE_DIR, POSTS_PATH, RECIPES_PATH, ROOT, commit_atomic, ingredient_text, link_or_copy,
+                       load_json, open_atomic, write_json)
+
+OUT_DIR = ROOT / 'prerender'
+CACHE_PATH = CACHE_DIR / 'prerender.json'
+STORE_DIR = CACHE_DIR / 'prerender'
+# The slug pattern of the /recipe and /post rewrites in vercel.json
+REWRITE_SLUG_RE = re.compile(r'[a-z0-9-]+')
+BASE_URL = 'https://ecuadoralacarta.com'
+
+# Bump when the rendered markup changes so every page is rebuilt.
+RENDERER_VERSION = 2
+
+FLAG_EC = '\U0001F1EA\U0001F1E8'
+
+
+# ─── JSON-LD / meta (mirrors js/seo.js) ───────────────────────
+
+def time_to_iso8601(value):
+    """Port of timeToISO8601() in js/utils.js."""
+    if not value:
+        return ''
+    m = re.search(r'(\d+)\s*h(?:ora)?s?\s*(\d+)?\s*m?i?n?|(\d+)\s*m?i?n', str(value), re.I)
+    if not m:
+        return ''
+    if m.group(1):
+        minutes = int(m.group(2) or 0)
+        return f"PT{int(m.group(1))}H" + (f'{minutes}M' if minutes > 0 else '')
+    return f'PT{int(m.group(3))}M'
+
+
+def _keywords(record, extra):
+    raw = record.get('keywords') or []
+    if isinstance(raw, str):
+        raw = [s.strip() for s in raw.split(',')]
+    return ', '.join(list(raw) + extra)
+
+
+def _published(record):
+    value = record.get('date_published') or record.get('created_at')
+    return str(value)[:10] if value else None
+
+
+def _breadcrumb(section, section_url, title, canonical):
+    return {
+        '@context': 'https://schema.org',
+        '@type': 'BreadcrumbList',
+        'itemListElement': [
+            {'@type': 'ListItem', 'position': 1, 'name': 'Inicio', 'item': BASE_URL + '/'},
+            {'@type': 'ListItem', 'position': 2, 'name': section, 'item': section_url},
+            {'@type': 'ListItem', 'position': 3, 'name': title, 'item': canonical},
+        ],
+    }
+
+
+def _faq_page(faqs):
+    return {
+        '@context': 'https://schema.org',
+        '@type': 'FAQPage',
+        'mainEntity': [{
+            '@type': 'Question',
+            'name': faq.get('q') or faq.get('question') or '',
+            'acceptedAnswer': {'@type': 'Answer', 'text': faq.get('a') or faq.get('answer') or ''},
+        } for faq in faqs if isinstance(faq, dict)],
+    }
+
+
+def recipe_seo(recipe):
+    canonical = f"{BASE_URL}/recipe.html?slug={quote(recipe['slug'], safe='')}"
+    image = recipe.get('image_url') or ''
+    keywords = _keywords(recipe, ['recetas ecuatorianas', 'cocina ecuatoriana', 'gastronomia ecuatoriana',
+                                  'Ecuador a la Carta'])
+    schema = {
+        '@context': 'https://schema.org',
+        '@type': 'Recipe',
+        'name': recipe['title'],
+        'description': recipe.get('description') or '',
+        'image': image,
+        'author': {'@type': 'Organization', 'name': 'Ecuador a la Carta', 'url': BASE_URL},
+        'publisher': {'@type': 'Organization', 'name': 'Ecuador a la Carta'},
+        'recipeCategory': recipe.get('category') or '',
+        'recipeCuisine': 'Ecuadorian',
+        'recipeYield': recipe.get('servings') or '',
+        'prepTime': time_to_iso8601(recipe.get('prep_time')),
+        'cookTime': time_to_iso8601(recipe.get('cook_time')),
+        'totalTime': time_to_iso8601(recipe.get('total_time')),
+        'recipeIngredient': [
+            ((f"{ing['quantity']} " if ing.get('quantity') else '') + (ing.get('name') or ''))
+            if isinstance(ing, dict) else str(ing)
+            for ing in recipe.get('ingredients') or []
+        ],
+        'recipeInstructions': [
+            {'@type': 'HowToStep', 'position': i + 1,
+             'text': step if isinstance(step, str) else step.get('text', '')}
+            for i, step in enumerate(recipe.get('instructions') or [])
+        ],
+        'keywords': keywords,
+        'countryOfOrigin': {'@type': 'Country', 'name': 'Ecuador'},
+    }
+    published = _published(recipe)
+    if published:
+        schema['datePublished'] = published
+    videos = [v for v in recipe.get('youtube_videos') or [] if isinstance(v, dict) and v.get('videoId')]
+    if videos:
+        schema['video'] = []
+        for v in videos:
+            obj = {
+                '@type': 'VideoObject',
+                'name': v.get('title') or recipe['title'],
+                'embedUrl': 'https://www.youtube-nocookie.com/embed/' + v['videoId'],
+                'thumbnailUrl': f"https://img.youtube.com/vi/{v['videoId']}/hqdefault.jpg",
+                'publisher': {'@type': 'Organization', 'name': v.get('channel') or 'YouTube'},
+            }
+            if v.get('uploadDate'):
+                obj['uploadDate'] = v['uploadDate']
+            if v.get('description'):
+                obj['description'] = v['description']
+            schema['video'].append(obj)
+
+    schemas = [schema, _breadcrumb('Recetas', BASE_URL + '/recipes.html', recipe['title'], canonical)]
+    if recipe.get('faqs'):
+        schemas.append(_faq_page(recipe['faqs']))
+    return {
+        'title': recipe.get('meta_title') or f"{recipe['title']} — Receta Ecuatoriana Auténtica | "
+                                              f"Cocina Ecuador {FLAG_EC}",
+        'description': (recipe.get('meta_description') or recipe.get('description')
+                        or f"Aprende a preparar {recipe['title']}, una deliciosa receta ecuatoriana tradicional."),
+        'image': recipe.get('og_image') or image,
+        'canonical': canonical,
+        'keywords': keywords,
+        'schemas': schemas,
+    }
+
+
+def post_seo(post):
+    canonical = f"{BASE_URL}/post.html?slug={quote(post['slug'], safe='')}"
+    image = post.get('image_url') or ''
+    keywords = _keywords(post, ['turismo ecuador', 'viaje ecuador', 'destinos ecuador'])
+    article = {
+        '@context': 'https://schema.org',
+        '@type': 'Article',
+        'headline': post['title'],
+        'description': post.get('description') or '',
+        'image': image,
+        'author': {'@type': 'Organization', 'name': 'Ecuador a la Carta'},
+        'publisher': {
+            '@type': 'Organization',
+            'name': 'Ecuador a la Carta',
+            'logo': {'@type': 'ImageObject', 'url': BASE_URL + '/favicon.ico'},
+        },
+        'keywords': keywords,
+        'inLanguage': 'es',
+        'about': {'@type': 'Country', 'name': 'Ecuador'},
+    }
+    if post.get('date_published') or post.get('created_at'):
+        article['datePublished'] = post.get('date_published') or post['created_at']
+    if post.get('created_at'):
+        article['dateModified'] = post['created_at']
+    schemas = [article, _breadcrumb('Blog Turismo', BASE_URL + '/blog.html', post['title'], canonical)]
+    if post.get('faqs'):
+        schemas.append(_faq_page(post['faqs']))
+    return {
+        'title': post.get('meta_title') or f"{post['title']} | Turismo Ecuador {FLAG_EC}",
+        'description': post.get('meta_description') or post.get('description') or post['title'],
+        'image': post.get('og_image') or image,
+        'canonical': canonical,
+        'keywords': keywords,
+        'schemas': schemas,
+    }
+
+
+# ─── Template editing ─────────────────────────────────────────
+
+def _open_tag(html, el_id):
+    m = re.search(r'<(\w+)\b[^>]*\bid="%s"[^>]*>' % re.escape(el_id), html)
+    if not m:
+        raise ValueError(f'template has no element with id="{el_id}"')
+    return m
+
+
+def set_inner(html, el_id, markup):
+    """Replace the (template-side, non-nested) content of the element with this id."""
+    m = _open_tag(html, el_id)
+    end = html.index(f'</{m.group(1)}>', m.end())
+    return html[:m.end()] + markup + html[end:]
+
+
+def set_text(html, el_id, text):
+    return set_inner(html, el_id, escape(str(text), quote=False))
+
+
+def set_attr(html, el_id, name, value):
+    m = _open_tag(html, el_id)
+    tag = m.group(0)
+    attr_re = re.compile(r'\b%s="[^"]*"' % re.escape(name))
+    new = f'{name}="{escape(str(value))}"'
+    tag = attr_re.sub(new, tag, count=1) if attr_re.search(tag) else tag[:-1].rstrip() + f' {new}>'
+    return html[:m.start()] + tag + html[m.end():]
+
+
+def edit_classes(html, el_id, add=(), remove=()):
+    m = _open_tag(html, el_id)
+    cls = re.search(r'\bclass="([^"]*)"', m.group(0))
+    classes = [c for c in (cls.group(1).split() if cls else []) if c not in remove]
+    classes += [c for c in add if c not in classes]
+    return set_attr(html, el_id, 'class', ' '.join(classes))
+
+
+def _json_script(data, attrs):
+    # "</" would end the <script> element early
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return f'<script {attrs}>{raw}</script>'
+
+
+def render_head(html, seo, record):
+    title = escape(seo['title'])
+    description = escape(seo['description'])
+    canonical = escape(seo['canonical'])
+    html = re.sub(r'<title>.*?</title>', lambda _: f'<title>{title}</title>', html, count=1, flags=re.S)
+    html = re.sub(r'<meta name="description"\s+content="[^"]*"\s*/?>',
+                  lambda _: f'<meta name="description" content="{description}" />', html, count=1)
+    html = re.sub(r'<link rel="canonical"([^>]*?)href="[^"]*"',
+                  lambda m: f'<link rel="canonical"{m.group(1)}href="{canonical}"', html, count=1)
+    for prop, value in (('url', canonical), ('title', title), ('description', description)):
+        html = re.sub(r'<meta property="(og|twitter):%s" content="[^"]*">' % prop,
+                      lambda m: f'<meta property="{m.group(1)}:{prop}" content="{value}">', html)
+    html = re.sub(r'\s*<script type="application/ld\+json">.*?</script>', '', html, flags=re.S)
+
+    extra = [f'<meta name="keywords" content="{escape(seo["keywords"])}" />']
+    if seo['image']:
+        image = escape(seo['image'])
+        extra += [f'<meta property="og:image" content="{image}">',
+                  f'<meta name="twitter:image" content="{image}">']
+    extra += [_json_script(seo['schemas'], 'type="application/ld+json"'),
+              _json_script(record, 'type="application/json" id="prerender-data"')]
+    return html.replace('</head>', '  ' + '\n  '.join(extra) + '\n</head>', 1)
+
+
+def _card_image(record, default):
+    img = record.get('image_url') or ''
+    if not img.strip():
+        videos = [v for v in record.get('youtube_videos') or [] if isinstance(v, dict) and v.get('videoId')]
+        valid = [v for v in videos if (v.get('channel') or '').upper() not in ('KIWA', 'KWA')]
+        if videos:
+            img = f"https://img.youtube.com/vi/{(valid or videos)[0]['videoId']}/maxresdefault.jpg"
+    return img or default
+
+
+INGREDIENT_ITEM = '''
+          <li class="flex items-start gap-4 text-white/40 hover:text-white transition-colors group cursor-default">
+            <span class="w-1.5 h-1.5 rounded-full bg-ec-gold group-hover:scale-150 transition-transform mt-2"></span>
+            <span class="text-sm tracking-[0.05em] font-light italic">{}</span>
+          </li>'''
+
+INSTRUCTION_ITEM = '''
+        <li class="grid md:grid-cols-[80px_1fr] gap-8 group instruction-line" data-aos="fade-up">
+          <div class="flex flex-col items-center">
+             <span class="w-12 h-12 rounded-xl border border-ec-gold/20 flex items-center justify-center text-ec-gold font-display font-black italic text-xl group-hover:scale-110 transition-all">{}</span>
+          </div>
+          <div>
+            <p class="text-white/60 text-xl font-light leading-relaxed tracking-tight group-hover:text-white transition-colors text-balance">{}</p>
+          </div>
+        </li>'''
+
+
+def render_recipe(template, recipe):
+    """Same content initRecipe() puts in the hero and the ingredient/step lists."""
+    html = render_head(template, recipe_seo(recipe), recipe)
+    html = edit_classes(html, 'recipe-loading', add=['hidden'])
+    html = edit_classes(html, 'recipe-content', remove=['hidden', 'opacity-0'])
+    html = set_attr(html, 'recipe-hero-img', 'src',
+                    _card_image(recipe, 'https://images.unsplash.com/photo-1547517023-7ca0c162f816?w=1200'))
+    html = set_attr(html, 'recipe-hero-img', 'alt', recipe.get('image_alt') or recipe['title'])
+    fields = (
+        ('recipe-title', recipe['title']),
+        ('recipe-description', recipe.get('description')
+         or 'Receta tradicional de la gastronomía ecuatoriana, preservada en nuestros archivos maestros.'),
+        ('recipe-category', recipe.get('category') or 'General'),
+        ('recipe-total-time', recipe.get('total_time') or '-- min'),
+        ('recipe-servings', recipe.get('servings') or '-- per'),
+        ('recipe-difficulty', recipe.get('difficulty') or 'Media'),
+    )
+    for el_id, text in fields:
+        html = set_text(html, el_id, text)
+    html = set_inner(html, 'ingredients-list', ''.join(
+        INGREDIENT_ITEM.format(escape(ingredient_text(ing), quote=False))
+        for ing in recipe.get('ingredients') or []))
+    html = set_inner(html, 'instructions-list', ''.join(
+        INSTRUCTION_ITEM.format(i, escape(step if isinstance(step, str) else step.get('text', ''), quote=False))
+        for i, step in enumerate(recipe.get('instructions') or [], 1)))
+    return html
+
+
+def render_post(template, post):
+    """Same content initPost() puts in the hero and the article body."""
+    html = render_head(template, post_seo(post), post)
+    html = edit_classes(html, 'post-loading', add=['hidden'])
+    html = edit_classes(html, 'post-content', remove=['hidden'])
+    html = set_attr(html, 'post-hero-img', 'src',
+                    post.get('image_url') or 'https://images.unsplash.com/photo-1555881400-74d7acaacd8b?w=1200&q=80')
+    html = set_attr(html, 'post-hero-img', 'alt', post.get('image_alt') or post['title'])
+    for el_id, key in (('post-title', 'title'), ('post-subtitle', 'subtitle'), ('post-category', 'category'),
+                       ('post-region', 'region'), ('post-date', 'date_published'),
+                       ('post-reading-time', 'reading_time')):
+        if post.get(key):
+            html = set_text(html, el_id, post[key])
+    if post.get('content'):
+        # Trusted HTML from the tourism workflow; initPost() assigns it with innerHTML too.
+        html = set_inner(html, 'post-content-body', post['content'])
+    return html
+
+
+# ─── Build ────────────────────────────────────────────────────
+
+PAGES = {
+    # kind -> (template, data, renderer)
+    'recipe': ('recipe.html', RECIPES_PATH, render_recipe),
+    'post': ('post.html', POSTS_PATH, render_post),
+}
+
+_templates = {}
+
+
+def _init_worker(templates):
+    _templates.update(templates)
+
+
+def render_page(kind, record):
+    # Without a title there is nothing to fill in: serve the template and let script.js render it
+    html = PAGES[kind][2](_templates[kind], record) if record.get('title') else _templates[kind]
+    path = OUT_DIR / kind / f"{record['slug']}.html"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f, tmp = open_atomic(path)
+    with f:
+        f.write(html)
+    commit_atomic(tmp, path)
+    link_or_copy(path, STORE_DIR / kind / path.name)
+    return kind, record['slug']
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()[:16]
+
+
+def build(force=False, workers=None, dry_run=False):
+    templates = {kind: (ROOT / tpl).read_text(encoding='utf-8') for kind, (tpl, _, _) in PAGES.items()}
+    cache = {} if force or not CACHE_PATH.exists() else load_json(CACHE_PATH)
+    state, todo = {}, []
+    for kind, (_, data_path, _) in PAGES.items():
+        base = _digest(str(RENDERER_VERSION), templates[kind])
+        for record in load_json(data_path):
+            slug = record.get('slug')
+            if not isinstance(slug, str) or not REWRITE_SLUG_RE.fullmatch(slug):
+                continue
+            key = f'{kind}/{slug}'
+            digest = _digest(base, json.dumps(record, ensure_ascii=False, sort_keys=True))
+            state[key] = digest
+            served, kept = OUT_DIR / f'{key}.html', STORE_DIR / f'{key}.html'
+            if cache.get(key) != digest or not (served.exists() or kept.exists()):
+                todo.append((kind, record))
+            elif not dry_run:
+                if not served.exists():
+                    link_or_copy(kept, served)
+                elif not kept.exists():
+                    link_or_copy(served, kept)
+
+    stale = sorted(p for kind in PAGES for d in (OUT_DIR, STORE_DIR) for p in (d / kind).glob('*.html')
+                   if f'{kind}/{p.stem}' not in state)
+    if not dry_run:
+        if todo:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(templates,)) as pool:
+                list(pool.map(render_page, *zip(*todo), chunksize=8))
+        for p in stale:
+            p.unlink()
+        write_json(CACHE_PATH, state, indent=None)
+    return {'pages': len(state), 'rendered': [f"{k}/{r['slug']}" for k, r in todo],
+            'removed': sorted({f'{p.parent.name}/{p.name}' for p in stale})}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-render recipe and post pages into prerender/.')
+    parser.add_argument('--force', action='store_true', help='Re-render every page')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='List the pages that would be rendered')
+    args = parser.parse_args(argv)
+
+    result = build(force=args.force, workers=args.workers, dry_run=args.dry_run)
+    if len(result['rendered']) <= 20:
+        for key in result['rendered']:
+            print(f'  + prerender/{key}.html')
+    for key in result['removed']:
+        print(f'  - prerender/{key}')
+    verb = 'would render' if args.dry_run else 'rendered'
+    print(f"{result['pages']} pages, {verb} {len(result['rendered'])}, removed {len(result['removed'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,561 @@
+"""Concurrent supermarket price refresher for price_db.json.
+
+Every price_db.json ingredient is searched in every store (STORES) in
+parallel over one pooled requests.Session, with a per-store rate limit so
+no store sees more than `rate` requests per second. Search pages are cached
+in .cache/prices/: within --ttl hours a page is not requested again, after
+that the request is conditional (If-None-Match / If-Modified-Since) and a
+304 reuses the cached page.
+
+Each product on a results page is scored against the ingredient:
+    0.5 * coverage    ingredient words found in the product name (whole words,
+                      so "ajo" does not match "Estropajo")
+    0.3 * head        the product name starts with the ingredient's head noun
+                      ("Sardina en salsa de tomate" is a sardine, not a tomato)
+    0.2 * precision   share of the product's words that the ingredient explains
+times a category factor: products in a category the ingredient does not
+name (cleaning, pet food, snacks, drinks, preserves, frozen) are scaled by
+CATEGORY_PENALTY. Store prices are per package, while price_db.json prices
+are per entry unit (kg, litro, 250g, unidad...), so each product's pack size
+is read from its name ("Camarón 400 g") and its price converted to the entry
+unit; a product whose size cannot be compared (a bare "Camarón" for a kg
+entry) is rejected. The best product per store is kept only with a score of
+at least --min-score and a unit price within PRICE_TOLERANCE times the curated
+reference range; otherwise the store entry is cleared, so a bad match never
+reaches price_min / price_max or the store prices renderIngredient()
+shows. The curated reference_price_min / reference_price_max are never
+written here: they stay the band later matches are checked against, and
+renderIngredient() only falls back to them when a store has no live match.
+
+For tests, `serve` runs a local stand-in for the stores that serves recorded
+pages (<dir>/<store>/<ingredient>.html, e.g. written by `refresh --record`);
+point the refresher at it with --base-url.
+
+Usage:
+    python scripts/price_refresh.py refresh                        # network, then write price_db.json
+    python scripts/price_refresh.py refresh --dry-run --only ajo cebolla
+    python scripts/price_refresh.py rescore                        # re-check stored matches, no network
+    python scripts/price_refresh.py score cebolla "Papas crema y cebolla tubo" "Cebolla paiteña"
+    python scripts/price_refresh.py serve recorded/ --port 8765 &
+    python scripts/price_refresh.py refresh --base-url tuti=http://127.0.0.1:8765/tuti \\
+        --base-url supermaxi=http://127.0.0.1:8765/supermaxi
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from site_data import CACHE_DIR, PRICE_DB_PATH, load_json, norm_text, write_json
+
+# store key in price_db.json -> search endpoint. `param` is the query parameter
+# holding the search text (used by the stand-in server).
+STORES = {
+    'tuti': {'name': 'Tuti', 'base_url': 'https://tuti.com.ec', 'search': '/?s={q}&post_type=product',
+             'param': 's', 'rate': 5.0},
+    'supermaxi': {'name': 'Supermaxi', 'base_url': 'https://www.supermaxi.com', 'search': '/?s={q}&post_type=product',
+                  'param': 's', 'rate': 5.0},
+}
+
+PAGE_CACHE_DIR = CACHE_DIR / 'prices'
+PAGE_INDEX_PATH = PAGE_CACHE_DIR / 'index.json'
+
+MIN_SCORE = 0.7
+CATEGORY_PENALTY = 0.25
+# Unit prices further than this factor outside the reference range are rejected.
+PRICE_TOLERANCE = 2.0
+
+# measure word -> (base, amount in base); anything else (unidad, atado, cubo) is a count
+MEASURES = {}
+for _base, _words in {('g', 1): 'g gr grs gramo gramos', ('g', 1000): 'kg kgs kilo kilos',
+                      ('g', 453.6): 'lb lbs libra libras', ('ml', 1): 'ml',
+                      ('ml', 1000): 'l lt lts litro litros'}.items():
+    MEASURES.update(dict.fromkeys(_words.split(), _base))
+_SIZE_RE = re.compile(r'(?:(\d+(?:[.,]\d+)?)\s*)?(?<![a-z])(%s)\b' % '|'.join(sorted(MEASURES, key=len, reverse=True)))
+
+STOPWORDS = frozenset('a al con de del el en la las los para por sabor sin y x'.split())
+# Words that describe rather than change a product ("Arroz blanco", "Camarón grande")
+DESCRIPTORS = frozenset(
+    'fresco fresca frescos frescas blanco blanca grande mediano mediana pequeno pequena natural entero entera '
+    'nacional premium extra granel kg g gr lb libra libras unidad unidades funda bandeja malla paquete '
+    'organico organica tradicional'.split()
+)
+# Product categories that are never the raw ingredient unless the ingredient names them
+CATEGORY_WORDS = {
+    'limpieza': 'estropajo detergente jabon cloro desinfectante esponja lavavajilla suavizante limpiador',
+    'mascotas': 'perro gato mascota mascotas croqueta',
+    'snack': 'snack tubo bocadito rosquita popcorn palito galleta cereal chocolate chifle frita '
+             'caramelo golosina',
+    'bebida': 'nectar jugo te gaseosa bebida refresco infusion',
+    'conserva': 'sardina atun salsa enlatado mermelada pasta aceituna',
+    'congelado': 'congelado congelada apanado nugget',
+}
+_CATEGORY_OF = {w: cat for cat, words in CATEGORY_WORDS.items() for w in words.split()}
+
+_VOID_TAGS = frozenset('area base br col embed hr img input link meta source track wbr'.split())
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_PRICE_RE = re.compile(r'(\d+(?:[.,]\d{1,2})?)')
+
+
+# ─── Scoring ──────────────────────────────────────────────────
+
+def singular(word):
+    if len(word) > 4 and word.endswith('es') and word[-3] in 'lnrdzj':
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s'):
+        return word[:-1]
+    return word
+
+
+def tokens(text):
+    return [singular(t) for t in _TOKEN_RE.findall(norm_text(text)) if t not in STOPWORDS]
+
+
+def score_product(ingredient, product_name):
+    """Similarity of a store product to a price_db ingredient, 0..1."""
+    ing = tokens(ingredient)
+    prod = tokens(product_name)
+    if not ing or not prod:
+        return 0.0
+    ing_set = set(ing)
+    shared = ing_set & set(prod)
+    coverage = len(shared) / len(ing_set)
+    head = 1.0 if prod[0] == ing[0] else 0.0
+    content = [t for t in prod if t not in DESCRIPTORS]
+    precision = len([t for t in content if t in ing_set]) / len(content) if content else 1.0
+    score = 0.5 * coverage + 0.3 * head + 0.2 * precision
+    ing_categories = {_CATEGORY_OF[t] for t in ing if t in _CATEGORY_OF}
+    if any(_CATEGORY_OF.get(t) not in (None, *ing_categories) for t in prod):
+        score *= CATEGORY_PENALTY
+    return round(score, 3)
+
+
+def pack_size(text):
+    """'Camarón 400 g' -> (400.0, 'g'); (1, 'unidad') when no measure is named."""
+    m = _SIZE_RE.search(norm_text(text or ''))
+    if not m:
+        return 1.0, 'unidad'
+    base, factor = MEASURES[m.group(2)]
+    return float((m.group(1) or '1').replace(',', '.')) * factor, base
+
+
+def unit_price(product, unit):
+    """The product's price per price_db `unit`, or None when the sizes are not comparable."""
+    have, want = pack_size(product['name']), pack_size(unit)
+    if not product.get('price') or not have[0] or have[1] != want[1]:
+        return None
+    return round(product['price'] / have[0] * want[0], 2)
+
+
+def price_plausible(price, entry):
+    low, high = entry.get('reference_price_min'), entry.get('reference_price_max')
+    if not price or not low:
+        return bool(price)
+    return low / PRICE_TOLERANCE <= price <= (high or low) * PRICE_TOLERANCE
+
+
+def best_match(ingredient, products, entry, min_score=MIN_SCORE):
+    """(product, None) for the best acceptable product, else (None, reason)."""
+    scored = sorted(((score_product(ingredient, p['name']), p) for p in products),
+                    key=lambda sp: (-sp[0], sp[1]['price'] or 0))
+    reason = 'no products'
+    for score, product in scored:
+        if score < min_score:
+            reason = f"best '{product['name']}' scored {score}" if reason == 'no products' else reason
+            break
+        unit = entry.get('unit') or 'kg'
+        price = unit_price(product, unit)
+        if price is None:
+            reason = f"'{product['name']}' has no pack size comparable to {unit}"
+            continue
+        if not price_plausible(price, entry):
+            reason = f"'{product['name']}' {price}/{unit} outside reference range"
+            continue
+        return dict(product, score=score, unit_price=price), None
+    return None, reason
+
+
+def apply_matches(entry, matches, today):
+    """Store the accepted per-store matches and recompute the derived prices (per entry unit)."""
+    for key, product in matches.items():
+        entry[key] = product
+    prices = [entry[key]['unit_price'] for key in STORES if entry.get(key) and entry[key].get('unit_price')]
+    entry['source'] = 'scraping' if prices else 'referencia_mercado'
+    # reference_price_min / max are the curated band price_plausible() checks against; live
+    # prices only go to the store entries and price_min / price_max, so the band never drifts.
+    entry['price_min'] = min(prices) if prices else entry.get('reference_price_min')
+    entry['price_max'] = max(prices) if prices else entry.get('reference_price_max')
+    entry['updated'] = today
+    return entry
+
+
+# ─── Page parsing ─────────────────────────────────────────────
+
+class ProductListParser(HTMLParser):
+    """Products of a WooCommerce search page (li.product cards); JSON-LD Product blocks as fallback."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.products = []
+        self.ld_json = []
+        self._depth = 0
+        self._card_depth = None
+        self._field = None
+        self._field_depth = None
+        self._script = None
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'script' and attrs.get('type') == 'application/ld+json':
+            self._script = []
+        if tag in ('li', 'div') and 'product' in classes and self._current is None:
+            self._current = {'name': '', 'price_text': '', 'url': None, 'brand': ''}
+            self._card_depth = self._depth
+        elif self._current is not None:
+            if tag == 'a' and not self._current['url'] and attrs.get('href'):
+                self._current['url'] = attrs['href']
+            field = None
+            if any(c.endswith('product__title') or c == 'product-title' for c in classes):
+                field = 'name'
+            elif 'woocommerce-Price-amount' in classes:
+                field = 'price_text'
+            elif any('brand' in c for c in classes):
+                field = 'brand'
+            if field and not self._field:
+                self._field, self._field_depth = field, self._depth
+                self._current[field] = ''
+        if tag not in _VOID_TAGS:
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        self._depth -= 1
+        if tag == 'script' and self._script is not None:
+            self.ld_json.append(''.join(self._script))
+            self._script = None
+        if self._field and self._depth == self._field_depth:
+            self._field = None
+        if self._current is not None and self._depth == self._card_depth:
+            self._finish()
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+        elif self._current is not None and self._field:
+            self._current[self._field] += data
+
+    def _finish(self):
+        card, self._current, self._field = self._current, None, None
+        prices = _PRICE_RE.findall(card['price_text'] or '')
+        name = ' '.join(card['name'].split())
+        if name and prices:
+            self.products.append({'name': name, 'price': float(prices[-1].replace(',', '.')),
+                                  'brand': card['brand'].strip() or None, 'url': card['url']})
+
+
+def _ld_products(blocks):
+    out = []
+
+    def visit(node):
+        if isinstance(node, list):
+            for n in node:
+                visit(n)
+        elif isinstance(node, dict):
+            if node.get('@type') == 'Product' and node.get('name'):
+                offers = node.get('offers') or {}
+                offers = offers[0] if isinstance(offers, list) and offers else offers
+                price = offers.get('price') or offers.get('lowPrice') if isinstance(offers, dict) else None
+                brand = node.get('brand')
+                if price is not None:
+                    out.append({'name': node['name'], 'price': float(price), 'url': node.get('url'),
+                                'brand': brand.get('name') if isinstance(brand, dict) else brand})
+            for key in ('itemListElement', 'item', '@graph'):
+                if key in node:
+                    visit(node[key])
+
+    for block in blocks:
+        try:
+            visit(json.loads(block))
+        except ValueError:
+            continue
+    return out
+
+
+def parse_products(html):
+    parser = ProductListParser()
+    parser.feed(html)
+    parser.close()
+    return parser.products or _ld_products(parser.ld_json)
+
+
+# ─── Fetching ─────────────────────────────────────────────────
+
+class RateLimiter:
+    """At most `rate` calls per second across threads (calls are spaced, not burst)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class PriceFetcher:
+    def __init__(self, stores=STORES, workers=8, ttl_hours=24, retries=3, backoff=0.5, timeout=20,
+                 cache_dir=PAGE_CACHE_DIR, record_dir=None):
+        self.stores = stores
+        self.workers = workers
+        self.ttl = ttl_hours * 3600
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.record_dir = record_dir
+        self.index_path = cache_dir / 'index.json' if cache_dir else None
+        self.index = load_json(self.index_path) if self.index_path and self.index_path.exists() else {}
+        self.limiters = {key: RateLimiter(store['rate']) for key, store in stores.items()}
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({'GET'}))
+        adapter = HTTPAdapter(pool_connections=len(stores), pool_maxsize=workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0 (compatible; ecuadoralacarta-prices/1.0)',
+                                     'Accept-Language': 'es-EC,es;q=0.9'})
+
+    def close(self):
+        self.session.close()
+        if self.index_path:
+            with self._lock:
+                write_json(self.index_path, self.index, indent=None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search_url(self, store_key, query):
+        store = self.stores[store_key]
+        return store['base_url'].rstrip('/') + store['search'].format(q=quote_plus(query))
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_page(self, store_key, query):
+        url = self.search_url(store_key, query)
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        body_path = self.cache_dir / f'{key}.html' if self.cache_dir else None
+        entry = self.index.get(url, {})
+        cached = body_path is not None and body_path.exists()
+        if cached and time.time() - entry.get('fetched', 0) < self.ttl:
+            self._count('fresh')
+            return body_path.read_text(encoding='utf-8')
+
+        headers = {}
+        if cached and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if cached and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        self.limiters[store_key].wait()
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and cached:
+            self._count('revalidated')
+            html = body_path.read_text(encoding='utf-8')
+        else:
+            r.raise_for_status()
+            r.encoding = r.encoding or 'utf-8'
+            html = r.text
+            self._count('fetched')
+            if body_path:
+                body_path.parent.mkdir(parents=True, exist_ok=True)
+                body_path.write_text(html, encoding='utf-8')
+        with self._lock:
+            self.index[url] = {'fetched': time.time(), 'etag': r.headers.get('ETag', entry.get('etag')),
+                               'last_modified': r.headers.get('Last-Modified', entry.get('last_modified'))}
+        if self.record_dir:
+            path = Path(self.record_dir) / store_key / f'{norm_text(query)}.html'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(html, encoding='utf-8')
+        return html
+
+    def search(self, store_key, query):
+        try:
+            products = parse_products(self.get_page(store_key, query))
+        except requests.RequestException as e:
+            self._count('errors')
+            return e
+        url = self.search_url(store_key, query)
+        return [dict(p, url=p['url'] or url, store=self.stores[store_key]['name'], unit='unidad') for p in products]
+
+    def search_many(self, queries):
+        """{(store, query): [products] or exception}, all stores and queries in parallel."""
+        tasks = [(store, q) for q in queries for store in self.stores]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(tasks, pool.map(lambda t: self.search(*t), tasks)))
+
+
+# ─── Stand-in server ──────────────────────────────────────────
+
+def make_handler(root, stores=STORES):
+    root = Path(root)
+
+    class RecordedPages(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            store = parts.path.strip('/').split('/')[0]
+            query = (parse_qs(parts.query).get(stores.get(store, {}).get('param', 's')) or [''])[0]
+            path = root / store / f'{norm_text(query)}.html'
+            if not path.is_file():
+                self.send_error(404)
+                return
+            body = path.read_bytes()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return RecordedPages
+
+
+# ─── CLI ──────────────────────────────────────────────────────
+
+def refresh(price_db, results, min_score, today):
+    """Apply search results to price_db in place; returns report lines."""
+    report = []
+    for name, entry in price_db.items():
+        query = entry.get('ingredient') or name
+        matches = {}
+        for store in STORES:
+            products = results.get((store, query))
+            if products is None:
+                continue
+            if isinstance(products, Exception):
+                report.append(f'  ! {name} [{store}]: {products}')
+                continue
+            match, reason = best_match(query, products, entry, min_score)
+            matches[store] = match
+            report.append(f"  {'+' if match else '-'} {name} [{store}]: " +
+                          (f"{match['name']} ${match['unit_price']:.2f}/{entry.get('unit') or 'kg'} ({match['score']})"
+                           if match else reason))
+        if matches:
+            apply_matches(entry, matches, today)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Refresh price_db.json from supermarket search pages.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    ref = sub.add_parser('refresh', help='Search every ingredient in every store')
+    ref.add_argument('--only', nargs='+', metavar='INGREDIENT', help='Refresh only these price_db keys')
+    ref.add_argument('--workers', type=int, default=8)
+    ref.add_argument('--ttl', type=float, default=24, help='Hours a cached page is used without revalidating')
+    ref.add_argument('--min-score', type=float, default=MIN_SCORE)
+    ref.add_argument('--base-url', action='append', default=[], metavar='STORE=URL',
+                     help='Override a store base URL (e.g. the stand-in server)')
+    ref.add_argument('--record', metavar='DIR', help='Also save every page as DIR/<store>/<ingredient>.html')
+    ref.add_argument('--dry-run', action='store_true', help='Report matches without writing price_db.json')
+    res = sub.add_parser('rescore', help='Re-check the stored matches without fetching')
+    res.add_argument('--min-score', type=float, default=MIN_SCORE)
+    res.add_argument('--dry-run', action='store_true')
+    sc = sub.add_parser('score', help='Score product names against an ingredient')
+    sc.add_argument('ingredient')
+    sc.add_argument('products', nargs='+')
+    srv = sub.add_parser('serve', help='Serve recorded pages as a local stand-in for the stores')
+    srv.add_argument('dir')
+    srv.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == 'score':
+        for name in args.products:
+            print(f'  {score_product(args.ingredient, name):.3f}  {name}')
+        return 0
+
+    if args.command == 'serve':
+        server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.dir))
+        print(f'Serving {args.dir} on http://127.0.0.1:{args.port}/<store>/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    price_db = load_json(PRICE_DB_PATH)
+    original = json.dumps(price_db, sort_keys=True)
+    today = datetime.date.today().isoformat()
+
+    if args.command == 'rescore':
+        results = {(store, entry.get('ingredient') or name): [entry[store]] if entry.get(store) else []
+                   for name, entry in price_db.items() for store in STORES}
+        report = refresh(price_db, results, args.min_score, today)
+        # Rescoring re-validates old data; it does not make it newer.
+        for name, entry in load_json(PRICE_DB_PATH).items():
+            price_db[name]['updated'] = entry.get('updated')
+        for line in report:
+            if line.lstrip().startswith('-') and 'no products' not in line:
+                print(line)
+    else:
+        stores = {k: dict(v) for k, v in STORES.items()}
+        for item in args.base_url:
+            store, _, url = item.partition('=')
+            if store not in stores:
+                parser.error(f'unknown store: {store}')
+            stores[store]['base_url'] = url
+        names = args.only or list(price_db)
+        missing = [n for n in names if n not in price_db]
+        if missing:
+            parser.error(f"not in price_db.json: {', '.join(missing)}")
+        subset = {n: price_db[n] for n in names}
+        started = time.monotonic()
+        with PriceFetcher(stores, workers=args.workers, ttl_hours=args.ttl, record_dir=args.record) as fetcher:
+            results = fetcher.search_many([e.get('ingredient') or n for n, e in subset.items()])
+        for line in refresh(subset, results, args.min_score, today):
+            print(line)
+        print(f"{len(results)} searches in {time.monotonic() - started:.1f}s: " +
+              ', '.join(f'{k} {v}' for k, v in fetcher.stats.items()))
+
+    changed = json.dumps(price_db, sort_keys=True) != original
+    if changed and not args.dry_run:
+        write_json(PRICE_DB_PATH, price_db)
+    print('price_db.json ' + ('unchanged' if not changed else 'would change' if args.dry_run else 'updated'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,509 @@
+"""Batch Quality Gate for recipes.json and posts.json.
+
+The n8n "Quality Gate" / "Validate Gate" nodes only see the record being
+generated; this checks the whole corpus. Each kind has a declarative spec in
+SCHEMAS that is compiled once into a flat list of checks per field (regexes,
+enum tables and limits resolved up front). Every record is then:
+
+    normalized  legacy shapes rewritten to the canonical form the front end
+                reads: ingredient objects -> strings, {question, answer} ->
+                {q, a}, seo_keywords and comma strings -> a keywords list,
+                origin_cities strings -> {city, province, region}, 'A|B' post
+                categories -> 'A', enum spellings ('Fácil' -> 'Facil'),
+                surrounding whitespace, null optional fields and FAQs
+                without an answer
+    validated   against the compiled spec, plus slug uniqueness across files
+
+Files are streamed element by element (json_stream.iter_array); inputs larger
+than PARALLEL_MIN_BYTES are decoded, normalized and validated in batches on a
+process pool. Violations are reported grouped by rule. With --fix the
+normalized records are written back, only when something changed; the Vercel
+build runs that before prerender.py, so pages can trust the canonical shapes
+instead of re-normalizing them in every browser. Exits 1 when errors remain.
+
+With --warn-only (the Vercel build) the gate exits 0 even when errors
+remain, so one bad auto-published record does not block every deploy, but
+nothing is unpublished either: records with errors stay in the file (the
+rewrites in vercel.json already point at their pages), each one is printed
+to stderr in a block the build log cannot hide, and copies are saved under
+.cache/review/ for whoever fixes the workflow.
+
+Usage:
+    python scripts/quality_gate.py
+    python scripts/quality_gate.py --fix
+    python scripts/quality_gate.py --fix --warn-only      # deploy: publish, but list failing records
+    python scripts/quality_gate.py posts.json --json
+    python scripts/quality_gate.py export.json --kind recipes --workers 8
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_geo import GAZETTEER
+from json_stream import iter_array
+from site_data import CACHE_DIR, POSTS_PATH, RECIPES_PATH, commit_atomic, count, discard_atomic, \
+    ingredient_text, norm_text, open_atomic, write_json
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Inputs at least this big are validated on a process pool.
+PARALLEL_MIN_BYTES = 8 << 20
+BATCH_SIZE = 256
+# Violating slugs kept per rule in the report.
+MAX_EXAMPLES = 10
+REVIEW_DIR = CACHE_DIR / 'review'
+
+SLUG_PATTERN = r'^[a-z0-9]+(?:-[a-z0-9]+)*$'
+URL_PATTERN = r'^(?:https?://|/|images/)'
+DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}'
+REGIONS = ('Costa', 'Sierra', 'Amazonia', 'Galapagos')
+DIFFICULTIES = ('Facil', 'Media', 'Dificil')
+POST_CATEGORIES = ('Destinos', 'Naturaleza', 'Aventura', 'Festividades', 'Cultura', 'Rutas', 'Gastronomia')
+
+# city -> (province, region) for origin_cities entries stored as bare names
+CITIES = {name: entry[2:] for name, entry in GAZETTEER.items()}
+
+# ─── Schema ───────────────────────────────────────────────────
+# Per field: type, required, severity (default error) and checks; checks under
+# 'warn' are reported as warnings. 'items' is the spec of each list element.
+
+_COMMON = {
+    'slug': {'type': str, 'required': True, 'pattern': SLUG_PATTERN},
+    'title': {'type': str, 'required': True, 'min_len': 10},
+    'description': {'type': str, 'required': True, 'min_len': 80},
+    'keywords': {'type': list, 'required': True, 'severity': WARNING, 'items': {'type': str, 'min_len': 2}},
+    'faqs': {'type': list, 'items': {'type': dict, 'keys': ('q', 'a')}},
+    'image_url': {'type': str, 'required': True, 'severity': WARNING, 'pattern': URL_PATTERN},
+    'og_image': {'type': str, 'pattern': URL_PATTERN},
+    'meta_title': {'type': str, 'warn': {'max_len': 70}},
+    'meta_description': {'type': str, 'warn': {'max_len': 160}},
+    'date_published': {'type': str, 'pattern': DATE_PATTERN},
+}
+
+SCHEMAS = {
+    'recipes': dict(_COMMON, **{
+        'region': {'type': str, 'required': True, 'enum': REGIONS},
+        'category': {'type': str, 'required': True, 'severity': WARNING},
+        'difficulty': {'type': str, 'enum': DIFFICULTIES},
+        # n8n Quality Gate asks new recipes for >= 8 ingredients and >= 6 steps
+        'ingredients': {'type': list, 'required': True, 'min_items': 1, 'warn': {'min_items': 8},
+                        'items': {'type': str, 'min_len': 2}},
+        'instructions': {'type': list, 'required': True, 'min_items': 1, 'warn': {'min_items': 6},
+                         'items': {'type': str, 'min_len': 5}},
+        'origin_cities': {'type': list, 'items': {'type': dict, 'keys': ('city',)}},
+        'image_keywords': {'type': list, 'items': {'type': str}},
+        'tips': {'type': list, 'items': {'type': str}},
+    }),
+    'posts': dict(_COMMON, **{
+        'region': {'type': str, 'required': True, 'severity': WARNING, 'enum': REGIONS},
+        'category': {'type': str, 'required': True, 'enum': POST_CATEGORIES},
+        'content': {'type': str, 'required': True, 'min_text': 20},
+        'featured': {'type': bool},
+    }),
+}
+
+# Optional fields that are known but not checked; anything else is reported.
+EXTRA_FIELDS = {
+    'recipes': ('id', 'created_at', 'servings', 'prep_time', 'cook_time', 'total_time', 'image_alt', 'places',
+                'substitutions', 'estimated_cost', 'youtube_videos', 'is_chuchaqui', 'diaspora_substitutes',
+                'spicy_level', 'spotify_playlist_id', 'image_credit', '_image_source', '_image_source_url',
+                '_imagen_status', 'target_audience', 'international_substitutes', 'tourism_route'),
+    'posts': ('id', 'created_at', 'subtitle', 'image_alt', 'image_credit', '_image_source', '_image_source_url',
+              '_imagen_status', '_imagen3_status', 'reading_time', 'source'),
+}
+
+_TYPE_NAMES = {str: 'string', list: 'list', dict: 'object', bool: 'boolean'}
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+# ─── Compiled checks ──────────────────────────────────────────
+# Each factory returns fn(value) -> None when fine, else a short detail.
+
+def _min_len(n):
+    return lambda v: None if len(v.strip()) >= n else f'{len(v.strip())} < {n} chars'
+
+
+def _max_len(n):
+    return lambda v: None if len(v) <= n else f'{len(v)} > {n} chars'
+
+
+def _min_items(n):
+    return lambda v: None if len(v) >= n else f'{len(v)} < {n} items'
+
+
+def _min_text(n):
+    def check(v):
+        size = len(_TAG_RE.sub('', v).strip())
+        return None if size >= n else f'{size} < {n} chars of text'
+    return check
+
+
+def _pattern(pattern):
+    search = re.compile(pattern).search
+    return lambda v: None if search(v) else repr(v[:40])
+
+
+def _enum(values):
+    allowed = frozenset(values)
+    return lambda v: None if v in allowed else repr(v)
+
+
+def _keys(keys):
+    def check(v):
+        missing = [k for k in keys if not v.get(k)]
+        return 'missing ' + ', '.join(missing) if missing else None
+    return check
+
+
+CHECKS = {'min_len': _min_len, 'max_len': _max_len, 'min_items': _min_items, 'min_text': _min_text,
+          'pattern': _pattern, 'enum': _enum, 'keys': _keys}
+
+
+def _compile_checks(name, spec):
+    """Return [(rule, severity, fn)] for the checks of one field spec."""
+    severity = spec.get('severity', ERROR)
+    checks = [(f'{name}.{check}', severity, CHECKS[check](spec[check])) for check in CHECKS if check in spec]
+    checks += [(f'{name}.{check}', WARNING, CHECKS[check](arg)) for check, arg in spec.get('warn', {}).items()]
+    return checks
+
+
+class Field:
+    __slots__ = ('name', 'type', 'required', 'severity', 'checks', 'items')
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.type = spec['type']
+        self.required = spec.get('required', False)
+        self.severity = spec.get('severity', ERROR)
+        self.checks = _compile_checks(name, spec)
+        self.items = Field(name + '[]', spec['items']) if 'items' in spec else None
+
+    def validate(self, value, out):
+        """Append (rule, severity, detail) violations of a present value to `out`."""
+        if not isinstance(value, self.type):
+            out.append((f'{self.name}.type', self.severity,
+                        f'expected {_TYPE_NAMES[self.type]}, got {type(value).__name__}'))
+            return
+        for rule, severity, check in self.checks:
+            detail = check(value)
+            if detail is not None:
+                out.append((rule, severity, detail))
+        if self.items is not None:
+            # One violation per rule and record, listing the offending positions.
+            found = {}
+            for i, item in enumerate(value):
+                sub = []
+                self.items.validate(item, sub)
+                for rule, severity, detail in sub:
+                    found.setdefault((rule, severity), []).append(f'#{i + 1} {detail}')
+            for (rule, severity), details in found.items():
+                out.append((rule, severity, '; '.join(details[:3]) + (' …' if len(details) > 3 else '')))
+
+
+# ─── Normalizers ──────────────────────────────────────────────
+# Each one rewrites a legacy shape in place; they run in order before validation.
+
+def _strip_and_drop_nulls(record):
+    for key in list(record):
+        value = record[key]
+        if value is None:
+            del record[key]
+        elif isinstance(value, str):
+            record[key] = value.strip()
+
+
+def _merge_keywords(record):
+    if 'keywords' not in record and 'seo_keywords' not in record:
+        return
+    words = []
+    for key in ('keywords', 'seo_keywords'):
+        value = record.get(key)
+        if isinstance(value, str):
+            value = value.split(',')
+        for word in value or ():
+            word = str(word).strip()
+            if word and word not in words:
+                words.append(word)
+    # Rebuilt in place so 'keywords' keeps the position of the field it replaces.
+    items = list(record.items())
+    record.clear()
+    for key, value in items:
+        if key in ('keywords', 'seo_keywords'):
+            if words and 'keywords' not in record:
+                record['keywords'] = words
+        else:
+            record[key] = value
+
+
+def _faqs(record):
+    faqs = record.get('faqs')
+    if not isinstance(faqs, list):
+        return
+    out = []
+    for faq in faqs:
+        if isinstance(faq, dict):
+            faq = {'q': str(faq.get('q') or faq.get('question') or '').strip(),
+                   'a': str(faq.get('a') or faq.get('answer') or '').strip()}
+            # An unanswered question would only emit an empty FAQPage entry.
+            if not (faq['q'] and faq['a']):
+                continue
+        out.append(faq)
+    record['faqs'] = out
+
+
+def _text_items(key, flatten):
+    def normalize(record):
+        items = record.get(key)
+        if isinstance(items, list):
+            record[key] = [flatten(item).strip() if isinstance(item, (str, dict)) else item for item in items]
+    return normalize
+
+
+def _step_text(step):
+    return str(step.get('text') or step.get('step') or '') if isinstance(step, dict) else step
+
+
+def _origin_cities(record):
+    cities = record.get('origin_cities')
+    if not isinstance(cities, list):
+        return
+    out = []
+    for entry in cities:
+        if isinstance(entry, str):
+            entry = {'city': entry.strip()}
+        if isinstance(entry, dict) and entry.get('city'):
+            province, region = CITIES.get(entry['city'], (None, record.get('region')))
+            entry = {'city': entry['city'], 'province': entry.get('province') or province,
+                     'region': entry.get('region') or region}
+        out.append(entry)
+    record['origin_cities'] = out
+
+
+def _primary_category(record):
+    category = record.get('category')
+    if isinstance(category, str) and '|' in category:
+        record['category'] = category.split('|')[0].strip()
+
+
+NORMALIZERS = {
+    'recipes': (_strip_and_drop_nulls, _merge_keywords, _faqs, _text_items('ingredients', ingredient_text),
+                _text_items('instructions', _step_text), _origin_cities),
+    'posts': (_strip_and_drop_nulls, _merge_keywords, _faqs, _primary_category),
+}
+
+
+# ─── Gate ─────────────────────────────────────────────────────
+
+class Gate:
+    """Compiled schema for one kind; check(record) normalizes and validates it."""
+
+    def __init__(self, kind):
+        schema = SCHEMAS[kind]
+        self.kind = kind
+        self.fields = [Field(name, spec) for name, spec in schema.items()]
+        self.known = frozenset(schema) | frozenset(EXTRA_FIELDS[kind])
+        self.normalizers = NORMALIZERS[kind]
+        # Accent/case-insensitive spelling -> canonical enum value
+        self.enums = {name: {norm_text(v): v for v in spec['enum']}
+                      for name, spec in schema.items() if 'enum' in spec}
+
+    def normalize(self, record):
+        for normalize in self.normalizers:
+            normalize(record)
+        for name, canonical in self.enums.items():
+            value = record.get(name)
+            if isinstance(value, str):
+                record[name] = canonical.get(norm_text(value), value)
+        return record
+
+    def validate(self, record):
+        out = []
+        for field in self.fields:
+            value = record.get(field.name)
+            if value is None or value == '' or value == []:
+                if field.required:
+                    out.append((f'{field.name}.required', field.severity, 'missing or empty'))
+                continue
+            field.validate(value, out)
+        for key in record:
+            if key not in self.known:
+                out.append(('unknown_field', WARNING, key))
+        return out
+
+    def check(self, raw):
+        """Decode one raw JSON record; return (slug, json_text, changed, violations)."""
+        original = json.loads(raw)
+        if not isinstance(original, dict):
+            return None, raw, False, [('record.type', ERROR, f'expected object, got {type(original).__name__}')]
+        record = self.normalize(json.loads(raw))
+        text = json.dumps(record, indent=2, ensure_ascii=False)
+        return record.get('slug'), text, record != original, self.validate(record)
+
+
+_gate = None
+
+
+def _init_worker(kind):
+    global _gate
+    _gate = Gate(kind)
+
+
+def check_batch(raws):
+    return [_gate.check(raw) for raw in raws]
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_checked(path, kind, workers=None):
+    """Yield Gate.check results for every record of `path`, in file order."""
+    with open(path, 'r', encoding='utf-8') as f:
+        raws = iter_array(f, decode=False)
+        if workers == 1 or (workers is None and Path(path).stat().st_size < PARALLEL_MIN_BYTES):
+            gate = Gate(kind)
+            for raw in raws:
+                yield gate.check(raw)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kind,)) as pool:
+            # Bounded window of in-flight batches keeps memory flat on huge inputs.
+            pending = deque()
+            for batch in _batches(raws, BATCH_SIZE):
+                pending.append(pool.submit(check_batch, batch))
+                if len(pending) >= 2 * pool._max_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+
+class Report:
+    def __init__(self):
+        self.rules = {}
+        self.records = 0
+        self.changed = 0
+        self.flagged = []
+
+    def add(self, name, slug, violations):
+        for rule, severity, detail in violations:
+            entry = self.rules.setdefault((name, rule), {'severity': severity, 'count': 0, 'examples': []})
+            entry['count'] += 1
+            if len(entry['examples']) < MAX_EXAMPLES:
+                entry['examples'].append(f'{slug or "?"}: {detail}')
+
+    def count(self, severity):
+        return sum(e['count'] for e in self.rules.values() if e['severity'] == severity)
+
+    def as_dict(self):
+        return {'records': self.records, 'normalized': self.changed,
+                'errors': self.count(ERROR), 'warnings': self.count(WARNING), 'flagged': self.flagged,
+                'rules': [dict(file=name, rule=rule, **entry) for (name, rule), entry in self.sorted()]}
+
+    def sorted(self):
+        return sorted(self.rules.items(), key=lambda kv: (kv[1]['severity'] != ERROR, -kv[1]['count'], kv[0]))
+
+
+def run(paths, kind=None, fix=False, workers=None, review=None):
+    """Check `paths` (kind guessed from the file name unless given); return a Report.
+
+    With `review` (a directory), records with errors are listed in
+    Report.flagged and copied to review/<file name>; they stay in the file.
+    """
+    report = Report()
+    seen = {}
+    for path in paths:
+        path = Path(path)
+        file_kind = kind or ('posts' if 'post' in path.stem else 'recipes')
+        out, tmp = open_atomic(path) if fix else (None, None)
+        changed = 0
+        flagged = []
+        try:
+            with open(path, 'rb') as f:
+                f.seek(max(0, path.stat().st_size - 1))
+                trailing = '\n' if f.read(1) == b'\n' else ''
+            first = True
+            for slug, text, record_changed, violations in iter_checked(path, file_kind, workers):
+                report.records += 1
+                changed += record_changed
+                if slug in seen:
+                    violations = violations + [('slug.duplicate', ERROR, f'also in {seen[slug]}')]
+                report.add(path.name, slug, violations)
+                if review is not None and any(severity == ERROR for _, severity, _ in violations):
+                    flagged.append(json.loads(text))
+                    report.flagged.append(f"{path.name}: {slug or '?'} "
+                                          f"({', '.join(sorted({r for r, sev, _ in violations if sev == ERROR}))})")
+                if slug and slug not in seen:
+                    seen[slug] = path.name
+                if out is not None:
+                    out.write(('[\n  ' if first else ',\n  ') + text.replace('\n', '\n  '))
+                first = False
+            if out is not None:
+                out.write(('[]' if first else '\n]') + trailing)
+                out.close()
+                if changed:
+                    commit_atomic(tmp, path)
+                else:
+                    discard_atomic(tmp)
+            if flagged:
+                write_json(Path(review) / path.name, flagged)
+        except BaseException:
+            if out is not None:
+                out.close()
+                discard_atomic(tmp)
+            raise
+        report.changed += changed
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate and normalize recipes.json / posts.json.')
+    parser.add_argument('files', nargs='*', help='JSON arrays to check (default: recipes.json posts.json)')
+    parser.add_argument('--kind', choices=sorted(SCHEMAS), help='Schema to use (default: from the file name)')
+    parser.add_argument('--fix', action='store_true', help='Write the normalized records back when they changed')
+    parser.add_argument('--warn-only', nargs='?', const=REVIEW_DIR, type=Path, metavar='DIR',
+                        help='Exit 0 even with errors; list the failing records on stderr and copy them '
+                             f'to DIR (default: {REVIEW_DIR}). They are still published')
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f'Process pool size (default: CPU count for files over {PARALLEL_MIN_BYTES >> 20} MB)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print errors and the summary')
+    args = parser.parse_args(argv)
+    report = run(args.files or [RECIPES_PATH, POSTS_PATH], args.kind, args.fix, args.workers, args.warn_only)
+    summary = report.as_dict()
+    count('records_checked', summary['records'])
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        for (name, rule), entry in report.sorted():
+            if args.quiet and entry['severity'] != ERROR:
+                continue
+            print(f"{entry['severity']:7} {name} {rule}: {entry['count']}")
+            for example in entry['examples']:
+                print(f'          {example}')
+        verb = 'normalized' if args.fix else 'would normalize'
+        print(f"{summary['records']} records, {verb} {summary['normalized']}: "
+              f"{summary['errors']} errors, {summary['warnings']} warnings")
+    if summary['flagged']:
+        bar = '!' * 72
+        print(f"{bar}\n!! QUALITY GATE: {len(summary['flagged'])} published record(s) have errors "
+              f"(copies in {args.warn_only})", file=sys.stderr)
+        for flagged in summary['flagged']:
+            print(f'!!   {flagged}', file=sys.stderr)
+        print(bar, file=sys.stderr)
+    return 1 if summary['errors'] and not args.warn_only else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,560 @@
+"""Response cache and offline replay for the workflow's external calls.
+
+RECETAS-AI-Auto-Publisher-v3 calls the LLM (Nombrador de Plato, Chef
+Redactor v3), YouTube search / videos and the image search one after the
+other on every run, and re-asks for searches and video ids it has already
+resolved. This module sits in front of those calls:
+
+    key      sha256 of the normalized request: method, URL with sorted query
+             and without credentials (key=, access_token=), and the body
+             (JSON bodies re-serialized with sorted keys)
+    store    .cache/responses/objects/<sha256 of body>: content-addressed, so
+             identical responses (e.g. the same video list) are stored once
+    index    .cache/responses/index.json: key -> endpoint, status, object,
+             stored / last-used time, kept in least-recently-used order
+    TTL      per endpoint (ENDPOINTS); anything else (GitHub reads and
+             writes) is passed through and never served from the cache
+    size     past --max-mb the least recently used entries are evicted and
+             their objects deleted once nothing references them
+
+Modes:
+    live     fresh cache hits are served, misses go to the network and are stored
+    record   live, and every exchange (cached or not) is appended to a cassette
+    offline  cache only, stale entries included; a miss is an error (504)
+    replay   a cassette first, then the cache; no network at all
+
+A cassette is an ordered list of exchanges. Replay matches a request by its
+key, and otherwise by method + host + path in recorded order, so a run whose
+prompts or query strings differ slightly still gets the recorded answers.
+`import` builds a cassette from an n8n execution dump: the output of every
+HTTP Request node becomes the recorded response for that node's endpoint.
+Requests made from inside Code nodes (Generar Imagen IA uses fetch) are not
+in the dump; record them with the proxy instead.
+
+The proxy takes the target URL as its path, so an HTTP Request node only
+needs its URL prefixed:
+    http://127.0.0.1:8766/https://www.googleapis.com/youtube/v3/search?...
+
+Usage:
+    python scripts/response_cache.py serve                          # live cache on :8766
+    python scripts/response_cache.py serve --mode record --cassette run.json
+    python scripts/response_cache.py serve --mode replay --cassette .cache/responses/cassettes/423.json
+    python scripts/response_cache.py import last-execution.json     # -> .cache/responses/cassettes/<id>.json
+    python scripts/response_cache.py get "https://www.googleapis.com/youtube/v3/videos?part=status&id=abc&key=..."
+    python scripts/response_cache.py stats
+    python scripts/response_cache.py prune --max-mb 64
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from site_data import CACHE_DIR, ROOT, commit_atomic, discard_atomic, load_json, open_atomic, write_json
+
+CACHE_ROOT = CACHE_DIR / 'responses'
+CASSETTE_DIR = CACHE_ROOT / 'cassettes'
+DAY = 86400
+
+# endpoint -> methods, URL pattern and seconds a response stays fresh
+ENDPOINTS = {
+    'llm': {'methods': ('POST',), 'pattern': r'^https://api\.x\.ai/v1/chat/completions$', 'ttl': 7 * DAY},
+    'youtube_search': {'methods': ('GET',), 'pattern': r'^https://www\.googleapis\.com/youtube/v3/search$',
+                       'ttl': 7 * DAY},
+    # Embeddable / privacy status rarely changes once a video is public
+    'youtube_videos': {'methods': ('GET',), 'pattern': r'^https://www\.googleapis\.com/youtube/v3/videos$',
+                       'ttl': 30 * DAY},
+    'image_search': {'methods': ('GET',), 'pattern': r'^https://www\.googleapis\.com/customsearch/v1$',
+                     'ttl': 30 * DAY},
+    'image': {'methods': ('GET',), 'pattern': r'^https?://[^/]+/.*\.(?:jpe?g|png|webp|gif)$', 'ttl': 30 * DAY},
+}
+_ENDPOINT_RES = [(name, frozenset(spec['methods']), re.compile(spec['pattern'], re.I))
+                 for name, spec in ENDPOINTS.items()]
+
+# Query parameters that carry credentials: not part of the key, never stored
+SECRET_PARAMS = frozenset({'key', 'api_key', 'apikey', 'access_token', 'token'})
+# Request headers forwarded upstream by the proxy
+FORWARD_HEADERS = ('Authorization', 'Content-Type', 'Accept', 'Accept-Language', 'User-Agent')
+MAX_MB = 256
+# The index is flushed to disk after this many new entries (and on close)
+FLUSH_EVERY = 20
+
+
+class CacheMiss(LookupError):
+    """No usable response and the mode forbids going to the network."""
+
+
+# ─── Keys ─────────────────────────────────────────────────────
+
+def normalize_url(url):
+    """Lowercase scheme/host, drop default ports, fragments and credentials, sort the query."""
+    parts = urlsplit(url)
+    scheme, host = parts.scheme.lower(), (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def normalize_body(body):
+    if not body:
+        return b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def request_key(method, url, body=None):
+    h = hashlib.sha256()
+    h.update(f'{method.upper()}\n{normalize_url(url)}\n'.encode('utf-8'))
+    h.update(normalize_body(body))
+    return h.hexdigest()
+
+
+def route(method, url):
+    """(method, host + path) used to match cassette exchanges when keys differ."""
+    parts = urlsplit(normalize_url(url))
+    return method.upper(), parts.netloc + parts.path
+
+
+def endpoint_of(method, url):
+    """ENDPOINTS name for a request, or None when it must not be cached."""
+    base = urlunsplit(urlsplit(normalize_url(url))._replace(query=''))
+    for name, methods, pattern in _ENDPOINT_RES:
+        if method.upper() in methods and pattern.match(base):
+            return name
+    return None
+
+
+# ─── Store ────────────────────────────────────────────────────
+
+class CachedResponse:
+    def __init__(self, status, content_type, body, source):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+        self.source = source  # hit, stale, miss, replay, pass
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ResponseStore:
+    """Content-addressed bodies plus an LRU-ordered index, bounded by max_bytes."""
+
+    def __init__(self, root=CACHE_ROOT, max_bytes=MAX_MB << 20, endpoints=ENDPOINTS):
+        self.root = root
+        self.objects = root / 'objects'
+        self.index_path = root / 'index.json'
+        self.max_bytes = max_bytes
+        self.ttls = {name: spec['ttl'] for name, spec in endpoints.items()}
+        self.index = load_json(self.index_path) if self.index_path.exists() else {}
+        self.refs = {}
+        self.sizes = {}
+        for entry in self.index.values():
+            self._ref(entry, 1)
+        self.stats = {'hit': 0, 'stale': 0, 'miss': 0, 'evicted': 0}
+        self._dirty = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes.values())
+
+    def _ref(self, entry, delta):
+        obj = entry['object']
+        self.refs[obj] = self.refs.get(obj, 0) + delta
+        if self.refs[obj] <= 0:
+            del self.refs[obj]
+            self.sizes.pop(obj, None)
+            return True
+        self.sizes[obj] = entry['size']
+        return False
+
+    def _object_path(self, obj):
+        return self.objects / obj[:2] / obj
+
+    def read(self, obj):
+        return self._object_path(obj).read_bytes()
+
+    def write_object(self, body):
+        obj = hashlib.sha256(body).hexdigest()
+        path = self._object_path(obj)
+        if not path.exists():
+            f, tmp = open_atomic(path, 'wb')
+            try:
+                with f:
+                    f.write(body)
+                commit_atomic(tmp, path)
+            except BaseException:
+                discard_atomic(tmp)
+                raise
+        return obj
+
+    def lookup(self, key, allow_stale=False):
+        """CachedResponse for `key`, or None when absent (or expired, unless allow_stale)."""
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                self.stats['miss'] += 1
+                return None
+            ttl = self.ttls.get(entry['endpoint'], 0)
+            fresh = time.time() - entry['stored'] < ttl
+            if not fresh and not allow_stale:
+                self.stats['miss'] += 1
+                return None
+            # Move to the most recently used end
+            del self.index[key]
+            entry['used'] = time.time()
+            self.index[key] = entry
+            self.stats['hit' if fresh else 'stale'] += 1
+        try:
+            body = self.read(entry['object'])
+        except FileNotFoundError:
+            with self._lock:
+                if self.index.pop(key, None) is not None:
+                    self._ref(entry, -1)
+            return None
+        return CachedResponse(entry['status'], entry['type'], body, 'hit' if fresh else 'stale')
+
+    def put(self, key, endpoint, method, url, status, content_type, body):
+        obj = self.write_object(body)
+        now = time.time()
+        entry = {'endpoint': endpoint, 'method': method.upper(), 'url': normalize_url(url), 'status': status,
+                 'type': content_type, 'object': obj, 'size': len(body), 'stored': now, 'used': now}
+        with self._lock:
+            old = self.index.pop(key, None)
+            if old is not None:
+                self._ref(old, -1)
+            self.index[key] = entry
+            self._ref(entry, 1)
+            self._dirty += 1
+            self._evict()
+            flush = self._dirty >= FLUSH_EVERY
+        if flush:
+            self.flush()
+        return obj
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (lock held)."""
+        total = self.total_bytes
+        while total > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            entry = self.index.pop(key)
+            self.stats['evicted'] += 1
+            if self._ref(entry, -1):
+                total -= entry['size']
+                self._object_path(entry['object']).unlink(missing_ok=True)
+
+    def prune(self, max_bytes=None, expired=False):
+        """Evict down to max_bytes (default: the store's), optionally dropping expired entries first."""
+        with self._lock:
+            if expired:
+                now = time.time()
+                for key in [k for k, e in self.index.items() if now - e['stored'] >= self.ttls.get(e['endpoint'], 0)]:
+                    entry = self.index.pop(key)
+                    self.stats['evicted'] += 1
+                    if self._ref(entry, -1):
+                        self._object_path(entry['object']).unlink(missing_ok=True)
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+            self._dirty += 1
+        self.flush()
+        return self.sweep()
+
+    def sweep(self, cassette_dir=CASSETTE_DIR):
+        """Delete objects referenced by neither the index nor a cassette; returns bytes freed."""
+        keep = set(self.refs)
+        for path in cassette_dir.glob('*.json'):
+            keep.update(ex['object'] for ex in load_json(path))
+        freed = 0
+        for path in self.objects.glob('*/*'):
+            if path.name not in keep and not path.name.startswith('.'):
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self.index)
+            self._dirty = 0
+        write_json(self.index_path, snapshot, indent=None)
+
+
+# ─── Cassettes ────────────────────────────────────────────────
+
+class Cassette:
+    """Ordered exchanges of one run: [{key, method, url, node?, status, type, object}]."""
+
+    def __init__(self, path, exchanges=None):
+        self.path = path
+        self.exchanges = exchanges if exchanges is not None else (load_json(path) if path.exists() else [])
+        self.by_key = {}
+        self.by_route = {}
+        for i, ex in enumerate(self.exchanges):
+            self.by_key.setdefault(ex.get('key'), []).append(i)
+            self.by_route.setdefault(route(ex['method'], ex['url']), []).append(i)
+        self.used = set()
+        self._lock = threading.Lock()
+
+    def match(self, key, method, url):
+        """Next unused exchange with this key, else with this method + host + path."""
+        with self._lock:
+            for candidates in (self.by_key.get(key, ()), self.by_route.get(route(method, url), ())):
+                for i in candidates:
+                    if i not in self.used:
+                        self.used.add(i)
+                        return self.exchanges[i]
+        return None
+
+    def append(self, exchange):
+        with self._lock:
+            self.exchanges.append(exchange)
+
+    def save(self):
+        with self._lock:
+            write_json(self.path, self.exchanges)
+
+
+def _static_url(url):
+    """The literal part of an n8n URL parameter: '=https://host/path?q={{ ... }}' -> 'https://host/path'."""
+    url = url.lstrip('=').split('{{')[0]
+    return url.split('?')[0]
+
+
+def import_execution(execution, store, out_path):
+    """Cassette from an n8n execution dump: one exchange per HTTP Request node run."""
+    nodes = {n['name']: n for n in execution.get('workflowData', {}).get('nodes', [])}
+    run_data = execution['data']['resultData']['runData']
+    exchanges = []
+    for name, runs in run_data.items():
+        node = nodes.get(name)
+        if not node or not node['type'].endswith('httpRequest'):
+            continue
+        params = node.get('parameters', {})
+        method, url = params.get('method', 'GET').upper(), _static_url(params.get('url', ''))
+        if not url:
+            continue
+        for run in runs:
+            items = ((run.get('data') or {}).get('main') or [[]])[0] or []
+            if run.get('error') or not items:
+                continue
+            # n8n splits array responses into one item per element
+            data = items[0]['json'] if len(items) == 1 else [item['json'] for item in items]
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            exchanges.append({'node': name, 'key': None, 'method': method, 'url': normalize_url(url),
+                              'status': 200, 'type': 'application/json', 'object': store.write_object(body),
+                              'started': run.get('startTime')})
+    exchanges.sort(key=lambda ex: ex.pop('started') or 0)
+    cassette = Cassette(out_path, exchanges)
+    cassette.save()
+    return cassette
+
+
+# ─── Client ───────────────────────────────────────────────────
+
+class CachingClient:
+    def __init__(self, store, mode='live', cassette=None, timeout=60):
+        if mode in ('record', 'replay') and cassette is None:
+            raise ValueError(f'mode {mode} needs a cassette')
+        self.store = store
+        self.mode = mode
+        self.cassette = cassette
+        self.timeout = timeout
+        self.session = requests.Session() if mode in ('live', 'record') else None
+        self.stats = {'hit': 0, 'stale': 0, 'miss': 0, 'pass': 0, 'replay': 0}
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.store.flush()
+        if self.mode == 'record':
+            self.cassette.save()
+        if self.session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def request(self, method, url, body=None, headers=None):
+        method = method.upper()
+        key = request_key(method, url, body)
+        endpoint = endpoint_of(method, url)
+
+        if self.mode == 'replay':
+            ex = self.cassette.match(key, method, url)
+            if ex is not None:
+                self._count('replay')
+                return CachedResponse(ex['status'], ex['type'], self.store.read(ex['object']), 'replay')
+        if endpoint or self.mode in ('offline', 'replay'):
+            cached = self.store.lookup(key, allow_stale=self.mode in ('offline', 'replay'))
+            if cached is not None:
+                self._count(cached.source)
+                self._record(key, method, url, None, cached)
+                return cached
+        if self.mode in ('offline', 'replay'):
+            raise CacheMiss(f'{method} {normalize_url(url)}')
+
+        r = self.session.request(method, url, data=body, headers=headers, timeout=self.timeout)
+        response = CachedResponse(r.status_code, r.headers.get('Content-Type', ''), r.content,
+                                  'miss' if endpoint else 'pass')
+        obj = None
+        if endpoint and 200 <= r.status_code < 300:
+            obj = self.store.put(key, endpoint, method, url, r.status_code, response.content_type, r.content)
+        self._count(response.source)
+        self._record(key, method, url, obj, response)
+        return response
+
+    def _record(self, key, method, url, obj, response):
+        if self.mode != 'record':
+            return
+        self.cassette.append({'key': key, 'method': method, 'url': normalize_url(url), 'status': response.status,
+                              'type': response.content_type,
+                              'object': obj or self.store.write_object(response.body)})
+
+
+# ─── Proxy ────────────────────────────────────────────────────
+
+def make_handler(client):
+    class CachingProxy(BaseHTTPRequestHandler):
+        def _proxy(self):
+            url = self.path.lstrip('/')
+            if not url.startswith(('http://', 'https://')):
+                self.send_error(400, 'Expected /<absolute url>')
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            headers = {h: self.headers[h] for h in FORWARD_HEADERS if self.headers.get(h)}
+            try:
+                r = client.request(self.command, url, body, headers)
+            except CacheMiss as e:
+                self.send_error(504, f'Not cached: {e}')
+                return
+            except requests.RequestException as e:
+                self.send_error(502, str(e))
+                return
+            self.send_response(r.status)
+            if r.content_type:
+                self.send_header('Content-Type', r.content_type)
+            self.send_header('Content-Length', str(len(r.body)))
+            self.send_header('X-Cache', r.source)
+            self.end_headers()
+            self.wfile.write(r.body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _proxy
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return CachingProxy
+
+
+# ─── CLI ──────────────────────────────────────────────────────
+
+def _mb(n):
+    return f'{n / 1048576:.1f} MB'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cache and replay the workflow\'s external API calls.')
+    parser.add_argument('--max-mb', type=float, default=MAX_MB, help=f'Store size bound (default {MAX_MB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    srv = sub.add_parser('serve', help='Caching proxy: http://host:port/<absolute url>')
+    srv.add_argument('--port', type=int, default=8766)
+    srv.add_argument('--mode', choices=('live', 'record', 'offline', 'replay'), default='live')
+    srv.add_argument('--cassette', help='Cassette file for record / replay')
+    imp = sub.add_parser('import', help='Build a replay cassette from an n8n execution dump')
+    imp.add_argument('execution', nargs='?', default=str(ROOT / 'last-execution.json'))
+    imp.add_argument('-o', '--output', help='Cassette path (default: .cache/responses/cassettes/<id>.json)')
+    get = sub.add_parser('get', help='Fetch one URL through the cache')
+    get.add_argument('url')
+    get.add_argument('-X', '--method', default='GET')
+    get.add_argument('-d', '--data', help='Request body')
+    get.add_argument('--mode', choices=('live', 'offline'), default='live')
+    sub.add_parser('stats', help='Entries and bytes per endpoint')
+    prn = sub.add_parser('prune', help='Evict down to --max-mb and delete unreferenced objects')
+    prn.add_argument('--expired', action='store_true', help='Also drop entries past their TTL')
+    args = parser.parse_args(argv)
+
+    store = ResponseStore(max_bytes=int(args.max_mb * 1048576))
+
+    if args.command == 'serve':
+        if args.mode in ('record', 'replay') and not args.cassette:
+            parser.error(f'--mode {args.mode} needs --cassette')
+        cassette = Cassette(Path(args.cassette)) if args.cassette else None
+        client = CachingClient(store, args.mode, cassette)
+        server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(client))
+        print(f'{args.mode} cache on http://127.0.0.1:{args.port}/<absolute url>')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.close()
+            print(', '.join(f'{k} {v}' for k, v in client.stats.items()))
+        return 0
+
+    if args.command == 'import':
+        execution = load_json(args.execution)
+        out = args.output or CASSETTE_DIR / f"{execution.get('id', 'execution')}.json"
+        cassette = import_execution(execution, store, Path(out))
+        for ex in cassette.exchanges:
+            print(f"  {ex['method']:4} {ex['url']}  <- {ex['node']}")
+        print(f'{len(cassette.exchanges)} exchanges -> {out}')
+        return 0
+
+    if args.command == 'get':
+        with CachingClient(store, args.mode) as client:
+            try:
+                r = client.request(args.method, args.url, args.data)
+            except CacheMiss as e:
+                print(f'not cached: {e}', file=sys.stderr)
+                return 1
+        print(f'{r.status} {r.source} {len(r.body)} bytes', file=sys.stderr)
+        sys.stdout.write(r.body.decode('utf-8', 'replace'))
+        return 0 if r.status < 400 else 1
+
+    if args.command == 'prune':
+        before = store.total_bytes
+        freed = store.prune(expired=args.expired)
+        print(f"{store.stats['evicted']} entries evicted, {_mb(before)} -> {_mb(store.total_bytes)}, "
+              f"{_mb(freed)} of unreferenced objects removed")
+        return 0
+
+    now = time.time()
+    rows = {}
+    for entry in store.index.values():
+        row = rows.setdefault(entry['endpoint'], [0, 0, 0])
+        row[0] += 1
+        row[1] += entry['size']
+        row[2] += now - entry['stored'] >= store.ttls.get(entry['endpoint'], 0)
+    for name, (count, size, expired) in sorted(rows.items()):
+        print(f'  {name:16} {count:6} entries  {_mb(size):>10}  {expired} expired')
+    print(f'{len(store.index)} entries, {_mb(store.total_bytes)} in {len(store.sizes)} objects (max {_mb(store.max_bytes)})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
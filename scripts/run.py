@@ -0,0 +1,580 @@
+"""Instrumented runner for the maintenance scripts, with a run history.
+
+Every script in scripts/ is a command named after its file (`build_shards`,
+`fix-tourism-json`, `n8n_sync`, ...); a path to any other script works too.
+`pipeline` runs the build stages of scripts/bench.py in order. Each run
+happens in a child process and records:
+
+    seconds, cpu_seconds, rss_mb   wall and CPU time, peak RSS (pool workers included)
+    read_bytes, write_bytes        bytes through read()/write() on files, pipes and
+                                   sockets (/proc/self/io; Linux only)
+    http                           calls, errors, latency (total, p50, p95, max) and
+                                   calls per host, for everything that goes through
+                                   http.client (requests, urllib); not Node scripts
+    items                          what the shared helpers report via site_data.count():
+                                   records loaded, strings scanned and rewritten, n8n
+                                   nodes patched, workflows pushed, files migrated
+
+--profile cprofile writes a .prof next to the history (pstats, snakeviz);
+--profile sample samples the main thread's stack every --interval ms and
+writes collapsed stacks (flamegraph.pl, speedscope). Both only see the main
+thread of the script and print its top functions.
+
+Runs are appended to .cache/runs/history.jsonl, one JSON object per line.
+`history` lists them; `trend` compares each command's latest run with the
+median of its previous ones, slowest first, so the step that is becoming the
+bottleneck as the corpus and the workflows grow stands out.
+
+--root (or SITE_ROOT) points a run at another tree, as scripts/bench.py does.
+
+Usage:
+    python scripts/run.py list
+    python scripts/run.py task build_shards
+    python scripts/run.py task --profile sample n8n_sync -- push --dry-run
+    python scripts/run.py task --root /tmp/site-100x prerender --force
+    python scripts/run.py pipeline --only shards search_index prerender
+    python scripts/run.py history --command prerender --last 20
+    python scripts/run.py trend --window 10
+"""
+
+import argparse
+import ast
+import cProfile
+import json
+import os
+import pstats
+import runpy
+import secrets
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from site_data import CACHE_DIR, ROOT, load_json
+
+RUNNER = Path(__file__).resolve()
+SCRIPTS_DIR = RUNNER.parent
+RUNS_DIR = CACHE_DIR / 'runs'
+HISTORY_PATH = RUNS_DIR / 'history.jsonl'
+
+# Helpers and harnesses, not maintenance tasks
+NOT_COMMANDS = frozenset(('run.py', 'site_data.py', 'n8n-code-runner.mjs', 'bench-client.mjs'))
+COMMAND_SUFFIXES = ('.py', '.mjs', '.js')
+
+DEFAULT_INTERVAL_MS = 5
+TOP_FUNCTIONS = 12
+DEFAULT_WINDOW = 10
+# Changes smaller than these are noise, whatever the ratio (same as bench.py).
+TREND_TOLERANCE = 0.25
+MIN_DELTA_SECONDS = 0.1
+
+CHILD_FLAG = '--child'
+
+
+# ─── Commands ─────────────────────────────────────────────────
+
+def _description(path):
+    """First line of the module docstring (Python) or of the header comment (Node)."""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return ''
+    if path.suffix == '.py':
+        try:
+            doc = ast.get_docstring(ast.parse(text))
+        except SyntaxError:
+            doc = None
+        return doc.strip().splitlines()[0] if doc else ''
+    for line in text.splitlines()[:12]:
+        line = line.strip()
+        if not line or line.startswith('#!'):
+            continue
+        if not line.startswith(('//', '/*', '*')):
+            break  # code before any comment
+        line = line.lstrip('/*').strip()
+        if line:
+            return line
+    return ''
+
+
+def commands():
+    """{name: path} for every runnable script in scripts/."""
+    found = {}
+    for path in sorted(SCRIPTS_DIR.iterdir()):
+        if path.suffix in COMMAND_SUFFIXES and path.name not in NOT_COMMANDS and path.is_file():
+            found.setdefault(path.stem, path)
+    return found
+
+
+def resolve(name):
+    """Command name, script file name or path -> (name, path)."""
+    known = commands()
+    if name in known:
+        return name, known[name]
+    path = SCRIPTS_DIR / name if (SCRIPTS_DIR / name).is_file() else Path(name)
+    if path.is_file() and path.suffix in COMMAND_SUFFIXES:
+        return path.stem, path.resolve()
+    raise SystemExit(f'Unknown command {name!r} (see `python scripts/run.py list`)')
+
+
+# ─── Instrumentation (child process) ──────────────────────────
+
+def read_proc_io():
+    """(rchar, wchar) of this process and its reaped children, or None off Linux."""
+    try:
+        with open('/proc/self/io', 'r', encoding='ascii') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class HttpStats:
+    """Counts requests made through http.client, from putrequest() to the response headers."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def install(self):
+        import http.client
+
+        stats = self
+        putrequest = http.client.HTTPConnection.putrequest
+        getresponse = http.client.HTTPConnection.getresponse
+
+        def timed_putrequest(conn, *args, **kwargs):
+            conn._run_started = time.perf_counter()
+            return putrequest(conn, *args, **kwargs)
+
+        def timed_getresponse(conn, *args, **kwargs):
+            try:
+                response = getresponse(conn, *args, **kwargs)
+            except Exception:
+                stats.record(conn, None)
+                raise
+            stats.record(conn, response.status)
+            return response
+
+        http.client.HTTPConnection.putrequest = timed_putrequest
+        http.client.HTTPConnection.getresponse = timed_getresponse
+
+    def record(self, conn, status):
+        started = getattr(conn, '_run_started', None)
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            self.calls.append((conn.host, seconds, status))
+
+    def summary(self):
+        if not self.calls:
+            return None
+        latencies = sorted(s for _, s, _ in self.calls)
+        return {
+            'calls': len(self.calls),
+            'errors': sum(1 for _, _, status in self.calls if status is None or status >= 400),
+            'seconds': round(sum(latencies), 3),
+            'p50': round(latencies[len(latencies) // 2], 3),
+            'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            'max': round(latencies[-1], 3),
+            'hosts': dict(Counter(host for host, _, _ in self.calls).most_common()),
+        }
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})'
+
+
+# Runner frames are left out of profiles
+_RUNNER_FILES = frozenset((str(RUNNER), runpy.__file__, '<frozen runpy>'))
+
+
+class StackSampler:
+    """Samples the main thread's stack on a timer; no tracing overhead between samples."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._target = threading.main_thread().ident
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                if frame.f_code.co_filename not in _RUNNER_FILES:
+                    stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, n in self.stacks.most_common():
+                f.write(';'.join(stack) + f' {n}\n')
+
+    def top(self, n=TOP_FUNCTIONS):
+        total = sum(self.stacks.values()) or 1
+        own, inclusive = Counter(), Counter()
+        for stack, hits in self.stacks.items():
+            own[stack[-1]] += hits
+            for label in set(stack):
+                inclusive[label] += hits
+        return [{'function': label, 'self': round(hits / total, 3), 'total': round(inclusive[label] / total, 3)}
+                for label, hits in own.most_common(n)]
+
+
+def _cprofile_top(profile, n=TOP_FUNCTIONS):
+    stats = pstats.Stats(profile).stats
+    # Import machinery and exec() frames only repeat the cumulative time of what they run
+    rows = [(ct, tt, nc, file, line, func) for (file, line, func), (_, nc, tt, ct, _) in stats.items()
+            if file not in _RUNNER_FILES and not file.startswith('<frozen')
+            and func not in ('<built-in method builtins.exec>', '<built-in method builtins.__import__>')]
+    rows.sort(reverse=True)
+    return [{'function': f'{func} ({Path(file).name}:{line})', 'calls': nc,
+             'self': round(tt, 3), 'total': round(ct, 3)}
+            for ct, tt, nc, file, line, func in rows[:n]]
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def child_main(spec):
+    """Run one script in this process with the hooks installed; write the measurements to spec['metrics']."""
+    script = Path(spec['script'])
+    http = HttpStats()
+    http.install()
+    io_start = read_proc_io()
+    profiler = None
+    if spec.get('profile') == 'cprofile':
+        profiler = cProfile.Profile()
+    elif spec.get('profile') == 'sample':
+        profiler = StackSampler(spec['interval'])
+
+    status = 'ok'
+    try:
+        if isinstance(profiler, StackSampler):
+            profiler.start()
+        elif profiler is not None:
+            profiler.enable()
+        try:
+            if script.suffix == '.py':
+                sys.path.insert(0, str(script.parent))
+                sys.argv = [str(script), *spec['args']]
+                runpy.run_path(str(script), run_name='__main__')
+                code = 0
+            else:
+                node = shutil.which('node')
+                if not node:
+                    print('node not found', file=sys.stderr)
+                    code = 127
+                else:
+                    code = subprocess.run([node, str(script), *spec['args']]).returncode
+        except SystemExit as e:
+            code = _exit_code(e.code)
+        except KeyboardInterrupt:
+            status, code = 'interrupted', 130
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+    finally:
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+        elif profiler is not None:
+            profiler.disable()
+    if code and status == 'ok':
+        status = 'failed'
+
+    io_end = read_proc_io()
+    site_data = sys.modules.get('site_data')
+    metrics = {'status': status, 'exit': code}
+    if io_start and io_end:
+        metrics['read_bytes'] = io_end[0] - io_start[0]
+        metrics['write_bytes'] = io_end[1] - io_start[1]
+    if http.calls:
+        metrics['http'] = http.summary()
+    if site_data is not None and site_data.COUNTERS:
+        metrics['items'] = dict(site_data.COUNTERS.most_common())
+    if isinstance(profiler, StackSampler):
+        profiler.write(spec['profile_path'])
+        metrics['profile'] = {'kind': 'sample', 'path': spec['profile_path'],
+                              'samples': sum(profiler.stacks.values()), 'top': profiler.top()}
+    elif profiler is not None:
+        profiler.dump_stats(spec['profile_path'])
+        metrics['profile'] = {'kind': 'cprofile', 'path': spec['profile_path'], 'top': _cprofile_top(profiler)}
+    with open(spec['metrics'], 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, ensure_ascii=False)
+    return code
+
+
+# ─── Runs (parent process) ────────────────────────────────────
+
+def _rss_mb(usage):
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return round(usage.ru_maxrss / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def _wait(proc):
+    """Wait for the child, through Ctrl-C (the child gets it too and records the interruption)."""
+    while True:
+        try:
+            if hasattr(os, 'wait4'):
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                return usage
+            proc.wait()
+            return None
+        except KeyboardInterrupt:
+            continue
+
+
+def run_task(name, script, args, root=ROOT, profile=None, interval_ms=DEFAULT_INTERVAL_MS,
+             history=HISTORY_PATH, batch=None):
+    """Run one script in an instrumented child; append the result to `history` and return it."""
+    started = datetime.now(timezone.utc)
+    run_id = started.strftime('%Y%m%dT%H%M%S') + '-' + secrets.token_hex(2)
+    history.parent.mkdir(parents=True, exist_ok=True)
+    spec = {'script': str(script), 'args': list(args), 'profile': profile, 'interval': interval_ms / 1000}
+    if profile:
+        spec['profile_path'] = str(history.parent / f"{run_id}.{'prof' if profile == 'cprofile' else 'folded'}")
+    fd, spec['metrics'] = tempfile.mkstemp(prefix='.run-', suffix='.json', dir=history.parent)
+    os.close(fd)
+    env = dict(os.environ, SITE_ROOT=str(root), PYTHONIOENCODING='utf-8')
+    try:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, str(RUNNER), CHILD_FLAG, json.dumps(spec)], cwd=root, env=env)
+        usage = _wait(proc)
+        seconds = time.perf_counter() - start
+        try:
+            metrics = load_json(spec['metrics'])
+        except ValueError:
+            # The child died before writing them (killed, or the runner itself crashed)
+            metrics = {'status': 'failed', 'exit': proc.returncode}
+    finally:
+        os.unlink(spec['metrics'])
+
+    entry = {'id': run_id, 'started': started.strftime('%Y-%m-%dT%H:%M:%SZ'), 'command': name,
+             'args': list(args), 'root': str(root), 'status': metrics.pop('status'),
+             'exit': metrics.pop('exit'), 'seconds': round(seconds, 3)}
+    if batch:
+        entry['batch'] = batch
+    if usage is not None:
+        entry['cpu_seconds'] = round(usage.ru_utime + usage.ru_stime, 3)
+        entry['rss_mb'] = _rss_mb(usage)
+    entry.update(metrics)
+    with open(history, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return entry
+
+
+def load_history(path=HISTORY_PATH):
+    if not path.exists():
+        return []
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue  # a run cut off mid-write
+    return runs
+
+
+# ─── Report ───────────────────────────────────────────────────
+
+def _fmt_bytes(n):
+    if n is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} GB'
+
+
+def _fmt_items(items):
+    return ', '.join(f'{k}={v}' for k, v in (items or {}).items())
+
+
+def print_run(entry):
+    http = entry.get('http')
+    line = (f"[run] {entry['command']}: {entry['status']} in {entry['seconds']:.2f}s"
+            + (f" (cpu {entry['cpu_seconds']:.2f}s, {entry['rss_mb']} MB peak)" if 'rss_mb' in entry else '')
+            + f", read {_fmt_bytes(entry.get('read_bytes'))}, wrote {_fmt_bytes(entry.get('write_bytes'))}")
+    if http:
+        line += (f", {http['calls']} http calls ({http['errors']} errors, p50 {http['p50'] * 1000:.0f} ms,"
+                 f" max {http['max'] * 1000:.0f} ms)")
+    print(line)
+    if entry.get('items'):
+        print(f"[run]   items: {_fmt_items(entry['items'])}")
+    profile = entry.get('profile')
+    if profile:
+        print(f"[run]   profile ({profile['kind']}): {profile['path']}")
+        for row in profile['top']:
+            detail = (f"{row['total'] * 100:5.1f}% total {row['self'] * 100:5.1f}% self" if profile['kind'] == 'sample'
+                      else f"{row['total']:8.3f}s total {row['self']:8.3f}s self {row['calls']:>8} calls")
+            print(f"[run]     {detail}  {row['function']}")
+
+
+def print_history(runs):
+    print(f"{'started':20} {'command':22} {'status':11} {'seconds':>8} {'cpu':>8} {'rss':>9} "
+          f"{'read':>10} {'written':>10} {'http':>5}  items")
+    for run in runs:
+        rss = f"{run['rss_mb']} MB" if 'rss_mb' in run else '-'
+        cpu = f"{run['cpu_seconds']:.2f}" if 'cpu_seconds' in run else '-'
+        print(f"{run['started']:20} {run['command'][:22]:22} {run['status']:11} {run['seconds']:8.2f} {cpu:>8} "
+              f"{rss:>9} {_fmt_bytes(run.get('read_bytes')):>10} {_fmt_bytes(run.get('write_bytes')):>10} "
+              f"{run.get('http', {}).get('calls', 0):>5}  {_fmt_items(run.get('items'))}")
+
+
+def trends(runs, window=DEFAULT_WINDOW, tolerance=TREND_TOLERANCE):
+    """Per command: latest successful run against the median of the `window` runs before it."""
+    by_command = {}
+    for run in runs:
+        if run['status'] == 'ok':
+            by_command.setdefault(run['command'], []).append(run)
+    rows = []
+    for command, found in by_command.items():
+        latest, earlier = found[-1], found[-1 - window:-1]
+        row = {'command': command, 'runs': len(found), 'seconds': latest['seconds'],
+               'rss_mb': latest.get('rss_mb'), 'items': sum((latest.get('items') or {}).values())}
+        if row['items']:
+            row['ms_per_1k_items'] = round(latest['seconds'] * 1e6 / row['items'], 2)
+        if earlier:
+            median = statistics.median(r['seconds'] for r in earlier)
+            row['median_before'] = round(median, 3)
+            row['change'] = round((latest['seconds'] - median) / median, 3) if median else None
+            row['slower'] = bool(row['change'] and row['change'] > tolerance
+                                 and latest['seconds'] - median > MIN_DELTA_SECONDS)
+        rows.append(row)
+    rows.sort(key=lambda r: r['seconds'], reverse=True)
+    return rows
+
+
+def print_trends(rows):
+    print(f"{'command':24} {'runs':>5} {'latest':>9} {'median':>9} {'change':>8} {'rss':>9} {'ms/1k items':>12}")
+    for row in rows:
+        median = f"{row['median_before']:.2f}s" if 'median_before' in row else '-'
+        change = f"{row['change'] * 100:+.0f}%" if row.get('change') is not None else '-'
+        rss = f"{row['rss_mb']} MB" if row.get('rss_mb') is not None else '-'
+        per_item = f"{row['ms_per_1k_items']:.2f}" if 'ms_per_1k_items' in row else '-'
+        print(f"{row['command'][:24]:24} {row['runs']:5} {row['seconds']:8.2f}s {median:>9} {change:>8} "
+              f"{rss:>9} {per_item:>12}" + ('  SLOWER' if row.get('slower') else ''))
+
+
+# ─── CLI ──────────────────────────────────────────────────────
+
+def _add_run_options(parser):
+    parser.add_argument('--root', type=Path, default=ROOT, help='Site tree to run against (default: SITE_ROOT or the repo)')
+    parser.add_argument('--profile', choices=('cprofile', 'sample'), help='Profile the main thread')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_MS, metavar='MS',
+                        help=f'Sampling interval for --profile sample (default {DEFAULT_INTERVAL_MS} ms)')
+    parser.add_argument('--history', type=Path, default=HISTORY_PATH, help='Run history file')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == CHILD_FLAG:
+        return child_main(json.loads(argv[1]))
+
+    parser = argparse.ArgumentParser(description='Run maintenance scripts with timing, memory, I/O and HTTP counters.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='List the commands and their last run')
+    t = sub.add_parser('task', help='Run one script')
+    _add_run_options(t)
+    t.add_argument('name', help='Command (script name without extension) or path to a script')
+    t.add_argument('args', nargs=argparse.REMAINDER, help="Arguments for the script (after the name, or after '--')")
+    p = sub.add_parser('pipeline', help='Run the build stages of scripts/bench.py in order')
+    _add_run_options(p)
+    p.add_argument('--only', nargs='+', metavar='STAGE')
+    h = sub.add_parser('history', help='List recorded runs')
+    h.add_argument('--command', dest='name')
+    h.add_argument('--last', type=int, default=20)
+    h.add_argument('--json', action='store_true', help='One JSON object per line')
+    h.add_argument('--history', type=Path, default=HISTORY_PATH)
+    tr = sub.add_parser('trend', help="Compare each command's latest run with its earlier ones")
+    tr.add_argument('--command', dest='name')
+    tr.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='Earlier runs to take the median of')
+    tr.add_argument('--tolerance', type=float, default=TREND_TOLERANCE)
+    tr.add_argument('--json', action='store_true')
+    tr.add_argument('--history', type=Path, default=HISTORY_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        last = {run['command']: run for run in load_history()}
+        for name, path in commands().items():
+            run = last.get(name)
+            when = f"{run['seconds']:7.2f}s {run['started'][:10]}" if run else ''
+            print(f'{name:28} {when:19} {_description(path)[:70]}')
+        return 0
+
+    if args.command == 'task':
+        name, script = resolve(args.name)
+        script_args = args.args[1:] if args.args[:1] == ['--'] else args.args
+        entry = run_task(name, script, script_args, args.root.resolve(), args.profile, args.interval, args.history)
+        print_run(entry)
+        return entry['exit']
+
+    if args.command == 'pipeline':
+        from bench import STAGES
+
+        stages = [s for s in STAGES if not s.node and (not args.only or s.name in args.only)]
+        unknown = set(args.only or ()) - {s.name for s in STAGES}
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        batch = 'pipeline-' + datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        failed, total = [], 0.0
+        for stage in stages:
+            # Recorded under the script name, like `task`, so both share one history
+            script = SCRIPTS_DIR / stage.argv[0]
+            entry = run_task(script.stem, script, stage.argv[1:], args.root.resolve(),
+                             args.profile, args.interval, args.history, batch=batch)
+            print_run(entry)
+            total += entry['seconds']
+            if entry['status'] != 'ok':
+                failed.append(stage.name)
+        print(f"[run] pipeline: {len(stages)} stages in {total:.2f}s"
+              + (f", failed: {', '.join(failed)}" if failed else ''))
+        return 1 if failed else 0
+
+    runs = [r for r in load_history(args.history) if not args.name or r['command'] == args.name]
+    if args.command == 'history':
+        runs = runs[-args.last:]
+        if args.json:
+            for run in runs:
+                print(json.dumps(run, ensure_ascii=False))
+        else:
+            print_history(runs)
+        return 0
+
+    rows = trends(runs, args.window, args.tolerance)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print_trends(rows)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""Recipe scaling engine: every ingredient quantity parsed once, rescaled as arrays.
+
+All ingredient lines in recipes.json are parsed a single time (ingredients.py)
+into flat columns: quantity, unit, conversion factor to the unit's base
+(g / ml / count), spice flag and the text that follows the quantity. Recipes
+are slices of those columns, so rescaling one recipe or a whole weekly menu
+is a handful of numpy operations instead of a regex pass per line.
+
+Spices (Ingredient.isSpice) follow a sub-linear curve, ratio ** SPICE_EXPONENT:
+doubling a recipe multiplies the salt by ~1.7, not 2.
+
+The columns are also written to data/scaling.json, which js/scaling.js loads
+for the portion calculator on recipe pages. The file records the hash of
+recipes.json it was built from; ScalingTable.load() rebuilds it when stale.
+
+Usage:
+    python scripts/scaling.py build
+    python scripts/scaling.py scale fanesca-ecuatoriana 10
+    python scripts/scaling.py list fanesca-ecuatoriana:8 encebollado-de-pescado:4   # shopping list
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+from fractions import Fraction
+
+import numpy as np
+
+from ingredients import parse_ingredient, parse_quantity
+from site_data import RECIPES_PATH, ROOT, load_json, norm_text, parse_servings, write_json
+
+TABLE_PATH = ROOT / 'data' / 'scaling.json'
+
+# Bump when the columns change so data/scaling.json is rebuilt.
+TABLE_VERSION = 1
+
+SPICE_EXPONENT = 0.75
+
+# unit -> (dimension, factor to the dimension's base unit)
+MASS, VOLUME, COUNT = 0, 1, 2
+UNIT_TABLE = {
+    'g': (MASS, 1.0), 'kg': (MASS, 1000.0), 'lb': (MASS, 453.592), 'oz': (MASS, 28.3495),
+    'ml': (VOLUME, 1.0), 'l': (VOLUME, 1000.0), 'taza': (VOLUME, 240.0), 'cucharada': (VOLUME, 15.0),
+    'cucharadita': (VOLUME, 5.0),
+}
+UNITS = ('', 'g', 'kg', 'lb', 'oz', 'ml', 'l', 'taza', 'cucharada', 'cucharadita', 'pizca', 'diente', 'rama', 'hoja',
+         'atado', 'lata', 'paquete', 'unidad')
+_UNIT_CODE = {u: i for i, u in enumerate(UNITS)}
+_PLURALS = {'taza': 'tazas', 'cucharada': 'cucharadas', 'cucharadita': 'cucharaditas', 'pizca': 'pizcas',
+            'diente': 'dientes', 'rama': 'ramas', 'hoja': 'hojas', 'atado': 'atados', 'lata': 'latas',
+            'paquete': 'paquetes', 'unidad': 'unidades'}
+_PLURAL_WORDS = frozenset(_PLURALS.values())
+
+# Re-rendered units stay in the family the recipe was written in.
+_FAMILIES = {
+    'g': ('kg', 'g'), 'kg': ('kg', 'g'),
+    'ml': ('l', 'ml'), 'l': ('l', 'ml'),
+    'taza': ('taza', 'cucharada', 'cucharadita'), 'cucharada': ('taza', 'cucharada', 'cucharadita'),
+    'cucharadita': ('taza', 'cucharada', 'cucharadita'),
+}
+# Smallest amount (in base units) shown in each unit before stepping down
+_MIN_SHOWN = {'kg': 1000.0, 'g': 0.0, 'l': 1000.0, 'ml': 0.0, 'taza': 60.0, 'cucharada': 15.0, 'cucharadita': 0.0}
+# Metric small units read as integers; everything else as kitchen fractions
+_DECIMAL_UNITS = ('g', 'ml')
+_NICE_FRACTIONS = (Fraction(0), Fraction(1, 4), Fraction(1, 3), Fraction(1, 2), Fraction(2, 3), Fraction(3, 4),
+                   Fraction(1))
+
+_SINGULAR = ('1', '1/4', '1/3', '1/2', '2/3', '3/4')
+
+_SIZE_RE = re.compile(r'^(median[oa]|pequeñ[oa]|grande)\b')
+
+
+def source_hash(recipes):
+    raw = json.dumps([TABLE_VERSION, recipes], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+# ─── Rendering ────────────────────────────────────────────────
+
+def round_half_up(value):
+    """Math.round() for the non-negative amounts here; round() would send 22.5 to 22 (half to even)."""
+    return math.floor(value + 0.5)
+
+
+def format_number(value, unit=''):
+    """1.5 -> "1 1/2", 0.3333 -> "1/3", 237.4 (g) -> "235"."""
+    if unit in _DECIMAL_UNITS:
+        step = 5 if value >= 50 else 1
+        return str(max(step, round_half_up(value / step) * step))
+    if value >= 10:
+        return str(round_half_up(value))
+    whole = int(value)
+    frac = min(_NICE_FRACTIONS, key=lambda f: abs(float(f) - (value - whole)))
+    if frac == 1:
+        whole, frac = whole + 1, Fraction(0)
+    if whole == 0 and frac == 0:
+        frac = Fraction(1, 4)
+    if frac == 0:
+        return str(whole)
+    return f'{whole} {frac}' if whole else str(frac)
+
+
+def display_unit(base_value, unit):
+    """Pick the unit of the same family that reads best: 1500 g -> kg, 0.2 taza -> cucharadas."""
+    family = _FAMILIES.get(unit)
+    if not family:
+        return unit, base_value / UNIT_TABLE.get(unit, (COUNT, 1.0))[1]
+    for candidate in family:
+        if base_value >= _MIN_SHOWN[candidate]:
+            return candidate, base_value / UNIT_TABLE[candidate][1]
+    return family[-1], base_value / UNIT_TABLE[family[-1]][1]
+
+
+def format_quantity(base_value, unit, show_unit=True):
+    unit, value = display_unit(base_value, unit)
+    number = format_number(value, unit)
+    if not show_unit or not unit:
+        return number
+    word = unit if number in _SINGULAR else _PLURALS.get(unit, unit)
+    return f'{number} {word}'
+
+
+# ─── Table ────────────────────────────────────────────────────
+
+class ScalingTable:
+    """Flat ingredient columns for every recipe; recipe i owns rows offsets[i]:offsets[i + 1]."""
+
+    def __init__(self, slugs, servings, offsets, qty, unit, spice, shown, tails, names, source=''):
+        self.slugs = list(slugs)
+        self.index = {s: i for i, s in enumerate(self.slugs)}
+        self.servings = np.asarray(servings, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.qty = np.asarray(qty, dtype=np.float64)          # NaN = no quantity (al gusto, ...)
+        self.unit = np.asarray(unit, dtype=np.int16)
+        self.spice = np.asarray(spice, dtype=bool)
+        self.shown = np.asarray(shown, dtype=bool)            # unit word written in the line
+        self.tails = list(tails)                              # text after quantity (+ unit)
+        self.names = list(names)                              # normalized ingredient name
+        self.source = source
+        factors = np.array([UNIT_TABLE.get(u, (COUNT, 1.0))[1] for u in UNITS])
+        dims = np.array([UNIT_TABLE.get(u, (COUNT, 1.0))[0] for u in UNITS], dtype=np.int8)
+        self.base = self.qty * factors[self.unit]             # quantity in g / ml / count
+        self.dim = dims[self.unit]
+
+    @classmethod
+    def from_recipes(cls, recipes):
+        slugs, servings, offsets = [], [], [0]
+        qty, unit, spice, shown, tails, names = [], [], [], [], [], []
+        for recipe in recipes:
+            if not recipe.get('slug'):
+                continue
+            slugs.append(recipe['slug'])
+            servings.append(parse_servings(recipe.get('servings')))
+            for ing in recipe.get('ingredients') or []:
+                parsed = parse_ingredient(ing)
+                text = parsed['text']
+                q, raw_unit, tail = parse_quantity(text, skip_sizes=False)
+                if q is None or parsed['to_taste']:
+                    q, raw_unit, tail = None, '', text
+                qty.append(np.nan if q is None else q)
+                unit.append(_UNIT_CODE.get(raw_unit or parsed['unit'] if q is not None else '', 0))
+                shown.append(bool(raw_unit))
+                spice.append(parsed['is_spice'])
+                tails.append(tail)
+                names.append(norm_text(parsed['name']))
+            offsets.append(len(qty))
+        return cls(slugs, servings, offsets, qty, unit, spice, shown, tails, names, source_hash(recipes))
+
+    @classmethod
+    def load(cls, path=TABLE_PATH, recipes=None):
+        """Table for the current recipes.json, reusing `path` when it is up to date."""
+        recipes = load_json(RECIPES_PATH) if recipes is None else recipes
+        digest = source_hash(recipes)
+        if path and path.exists():
+            data = load_json(path)
+            if data.get('v') == TABLE_VERSION and data.get('source') == digest:
+                return cls.from_json(data)
+        table = cls.from_recipes(recipes)
+        if path:
+            table.save(path)
+        return table
+
+    def to_json(self):
+        return {
+            'v': TABLE_VERSION,
+            'source': self.source,
+            'units': list(UNITS),
+            'spice_exponent': SPICE_EXPONENT,
+            'slugs': self.slugs,
+            'servings': self.servings.astype(int).tolist(),
+            'offsets': self.offsets.tolist(),
+            'qty': [None if np.isnan(q) else round(float(q), 4) for q in self.qty],
+            'unit': self.unit.tolist(),
+            'spice': self.spice.astype(int).tolist(),
+            'shown': self.shown.astype(int).tolist(),
+            'tails': self.tails,
+            'names': self.names,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        qty = [np.nan if q is None else q for q in data['qty']]
+        return cls(data['slugs'], data['servings'], data['offsets'], qty, data['unit'], data['spice'],
+                   data['shown'], data['tails'], data['names'], data['source'])
+
+    def save(self, path=TABLE_PATH):
+        data = self.to_json()
+        if path.exists() and load_json(path) == data:
+            return False
+        write_json(path, data, indent=None)
+        return True
+
+    # ─── Scaling ──────────────────────────────────────────────
+
+    def rows(self, recipe_ids):
+        """Concatenated row indices of the given recipes, and each row's position in recipe_ids."""
+        recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        starts = self.offsets[recipe_ids]
+        counts = self.offsets[recipe_ids + 1] - starts
+        owner = np.repeat(np.arange(len(recipe_ids)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return starts[owner] + within, owner
+
+    def scale(self, slugs, servings):
+        """Scale a batch of recipes to `servings` (one value or one per recipe).
+
+        Returns (rows, owner, base_qty): row indices into the columns, the
+        position in `slugs` each row belongs to and the scaled quantity in
+        base units (NaN where the line has no quantity).
+        """
+        ids = np.array([self.index[s] for s in slugs], dtype=np.int64)
+        target = np.broadcast_to(np.asarray(servings, dtype=np.float64), ids.shape)
+        ratio = target / self.servings[ids]
+        rows, owner = self.rows(ids)
+        factor = ratio[owner]
+        factor = np.where(self.spice[rows], factor ** SPICE_EXPONENT, factor)
+        return rows, owner, self.base[rows] * factor
+
+    def render(self, slug, servings):
+        """Ingredient lines of one recipe rescaled to `servings`."""
+        rows, _, base = self.scale([slug], servings)
+        lines = []
+        for row, value in zip(rows.tolist(), base.tolist()):
+            if np.isnan(value):
+                lines.append(self.tails[row])
+                continue
+            unit = UNITS[self.unit[row]]
+            quantity = format_quantity(value, unit, self.shown[row])
+            tail = self.tails[row]
+            if self.shown[row] and quantity.rsplit(' ', 1)[-1] in _PLURAL_WORDS:
+                tail = _SIZE_RE.sub(r'\1s', tail)
+            lines.append(quantity + (tail if tail[:1] in (',', '') else ' ' + tail))
+        return lines
+
+    def shopping_list(self, selection):
+        """Merge the scaled ingredients of [(slug, servings), ...] by name and dimension.
+
+        Returns [(name, quantity text)] sorted by name; lines without a
+        quantity are listed once with an empty quantity.
+        """
+        slugs = [s for s, _ in selection]
+        rows, _, base = self.scale(slugs, [n for _, n in selection])
+        names = np.array([self.names[r] for r in rows.tolist()], dtype=object)
+        # Count units only merge with the same unit; mass and volume merge across units.
+        unit_key = np.where(self.dim[rows] == COUNT, self.unit[rows], -1 - self.dim[rows])
+        keys = np.array([f'{n}\0{u}' for n, u in zip(names, unit_key.tolist())], dtype=object)
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        has_qty = ~np.isnan(base)
+        totals = np.bincount(inverse, weights=np.where(has_qty, base, 0.0), minlength=len(uniq))
+        counted = np.bincount(inverse, weights=has_qty, minlength=len(uniq)) > 0
+        first = np.full(len(uniq), len(rows), dtype=np.int64)
+        np.minimum.at(first, inverse, np.arange(len(rows)))
+        out = []
+        for k in range(len(uniq)):
+            row = int(rows[first[k]])
+            name = self.names[row] or self.tails[row]
+            if not counted[k]:
+                out.append((name, ''))
+                continue
+            unit = UNITS[self.unit[row]]
+            if self.dim[row] != COUNT:
+                unit = {MASS: 'g', VOLUME: 'ml'}[int(self.dim[row])] if unit not in _FAMILIES else unit
+            out.append((name, format_quantity(float(totals[k]), unit or 'unidad')))
+        return sorted(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rescale recipes to a number of servings.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='Parse recipes.json into data/scaling.json')
+    sc = sub.add_parser('scale', help='Print one recipe rescaled')
+    sc.add_argument('slug')
+    sc.add_argument('servings', type=int)
+    ls = sub.add_parser('list', help='Shopping list for several recipes')
+    ls.add_argument('items', nargs='+', metavar='SLUG:SERVINGS')
+    args = parser.parse_args(argv)
+
+    recipes = load_json(RECIPES_PATH)
+    if args.command == 'build':
+        table = ScalingTable.from_recipes(recipes)
+        written = table.save()
+        print(f'{len(table.slugs)} recipes, {len(table.qty)} ingredients, '
+              f'{int(np.isnan(table.qty).sum())} without quantity' + ('' if written else ' (unchanged)'))
+        return 0
+
+    table = ScalingTable.load(recipes=recipes)
+    if args.command == 'scale':
+        if args.slug not in table.index:
+            parser.error(f'unknown recipe: {args.slug}')
+        for line in table.render(args.slug, args.servings):
+            print(f'  {line}')
+        return 0
+
+    selection = []
+    for item in args.items:
+        slug, _, servings = item.partition(':')
+        if slug not in table.index:
+            parser.error(f'unknown recipe: {slug}')
+        selection.append((slug, int(servings) if servings else table.servings[table.index[slug]]))
+    for name, quantity in table.shopping_list(selection):
+        print(f'  {quantity:>18}  {name}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Shared helpers for the Python maintenance scripts.
+
+Keeps repo paths and file-writing conventions in one place so the tools in
+scripts/ stop hard-coding c:\\Users\\... paths.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+# SITE_ROOT points the scripts at another tree (scripts/bench.py runs them on synthetic corpora).
+ROOT = Path(os.environ.get('SITE_ROOT') or Path(__file__).resolve().parent.parent).resolve()
+# Incremental build state (image hashes, prerender hashes, sitemap lastmods...). Vercel starts
+# every build from a fresh checkout but restores node_modules/ from its build cache, so that is
+# where the state lives on Vercel; SITE_CACHE_DIR overrides both.
+if os.environ.get('SITE_CACHE_DIR'):
+    CACHE_DIR = Path(os.environ['SITE_CACHE_DIR']).resolve()
+elif os.environ.get('VERCEL') and not os.environ.get('SITE_ROOT'):
+    CACHE_DIR = ROOT / 'node_modules' / '.cache' / 'site'
+else:
+    CACHE_DIR = ROOT / '.cache'
+
+RECIPES_PATH = ROOT / 'recipes.json'
+POSTS_PATH = ROOT / 'posts.json'
+PRICE_DB_PATH = ROOT / 'price_db.json'
+
+# Recipes without a usable "servings" value ("", "0", "al gusto") are read as this many.
+DEFAULT_SERVINGS = 4
+
+# Same folding as normText() in js/prices.js
+_FOLD = str.maketrans('áàâäéèêëíìîïóòôöúùûüñ', 'aaaaeeeeiiiioooouuuun')
+
+_PARENS_RE = re.compile(r'\([^)]*\)')
+_QTY_RE = re.compile(r'^\d+[\d/.,]*\s*')
+_UNIT_DE_RE = re.compile(r'^(tazas?|cucharadas?|cucharitas?|cucharaditas?|kg|g\b|gr\b|lb|litros?|ml|cc|unidades?|'
+                         r'dientes?|atados?|trozos?|pedazos?|lonjas?|filetes?|pizcas?|ramitas?|manojos?)\s+de\s+', re.I)
+_DE_RE = re.compile(r'^de\s+', re.I)
+_INT_RE = re.compile(r'\d+')
+_MINUTES_RE = re.compile(r'(\d+)\s*h(?:ora)?s?\s*(\d+)?\s*m?i?n?|(\d+)\s*m?i?n', re.I)
+
+
+# Items processed, per kind; scripts/run.py records them with each run.
+COUNTERS = Counter()
+_COUNTERS_LOCK = threading.Lock()
+
+
+def count(kind, n=1):
+    """Add `n` processed items of `kind` (call once per batch, not per item in a hot loop)."""
+    with _COUNTERS_LOCK:
+        COUNTERS[kind] += n
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        count('records_loaded', len(data))
+    return data
+
+
+def open_atomic(path, mode='w', encoding='utf-8'):
+    """Open a temp file next to `path`; call commit_atomic() to move it in place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix='.' + path.name + '.', suffix='.tmp', dir=path.parent)
+    # mkstemp creates 0600; keep the target's mode (or a normal 0644) instead.
+    os.chmod(tmp, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+    if 'b' in mode:
+        return os.fdopen(fd, mode), tmp
+    return os.fdopen(fd, mode, encoding=encoding, newline=''), tmp
+
+
+def commit_atomic(tmp, path):
+    os.replace(tmp, path)
+
+
+def discard_atomic(tmp):
+    try:
+        os.unlink(tmp)
+    except FileNotFoundError:
+        pass
+
+
+def link_or_copy(src, dst):
+    """Put `src` at `dst` as a hard link (a copy across file systems), replacing `dst`."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def write_json(path, data, indent=2):
+    """Write JSON atomically, UTF-8 without escaping accents (same as the n8n exports)."""
+    f, tmp = open_atomic(path)
+    try:
+        with f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            if indent is not None:
+                f.write('\n')
+        commit_atomic(tmp, path)
+    except BaseException:
+        discard_atomic(tmp)
+        raise
+
+
+def norm_text(text):
+    """Python port of normText(): lowercase and strip Spanish accents."""
+    return str(text).lower().translate(_FOLD).strip()
+
+
+def ingredient_text(ing):
+    """Flatten {name, quantity, where_to_buy} ingredients like renderIngredient() does."""
+    if isinstance(ing, dict):
+        return ((ing.get('quantity') + ' de ' if ing.get('quantity') else '') + (ing.get('name') or '') +
+                (' (' + ing['where_to_buy'] + ')' if ing.get('where_to_buy') else ''))
+    return str(ing)
+
+
+def extract_ing_base(ing):
+    """Python port of extractIngBase(): drop quantity, unit and store notes."""
+    t = _PARENS_RE.sub('', str(ing))
+    t = _QTY_RE.sub('', t)
+    t = _UNIT_DE_RE.sub('', t)
+    t = _DE_RE.sub('', t)
+    return norm_text(t.split(',')[0].split(';')[0])
+
+
+def parse_servings(value):
+    """First positive integer in a servings value ("4 porciones" -> 4), else DEFAULT_SERVINGS."""
+    m = _INT_RE.search(str(value or ''))
+    return int(m.group(0)) if m and int(m.group(0)) > 0 else DEFAULT_SERVINGS
+
+
+def parse_minutes(value):
+    """Port of parseMinutes() in js/utils.js (0 instead of 9999 when unknown)."""
+    m = _MINUTES_RE.search(str(value or ''))
+    if not m:
+        return 0
+    if m.group(1):
+        return int(m.group(1)) * 60 + int(m.group(2) or 0)
+    return int(m.group(3))
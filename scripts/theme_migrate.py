@@ -0,0 +1,140 @@
+"""Theme/class migration for the site's HTML files.
+
+Color, font and class mappings live in theme_tables.json (one named table
+per migration). A table is compiled into a single alternation regex plus a
+dispatch dict, so each file is scanned once instead of once per
+replacement. Files are processed in a process pool and only written back
+when their content actually changed, so untouched pages keep their mtime
+and do not trigger a redeploy.
+
+Table entries:
+    {"from": "bg-blue-800", "to": "bg-[#0b1324]"}          literal
+    {"regex": "<link href=...Inter[^\\"]+...", "to": "..."}  regex (replacement is literal)
+    "if_contains" / "unless_contains"                       only apply to files that (don't) contain a string
+
+Unlike the old chained str.replace calls, replacements never feed into each
+other: every match is taken from the original text.
+
+Usage:
+    python scripts/theme_migrate.py editorial
+    python scripts/theme_migrate.py utility-classes --dry-run
+    python scripts/theme_migrate.py editorial blog.html post.html
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from site_data import ROOT, commit_atomic, count, load_json, open_atomic
+
+TABLES_PATH = ROOT / 'scripts' / 'theme_tables.json'
+
+
+class CompiledTable:
+    def __init__(self, entries):
+        self.entries = entries
+        self.literals = {}
+        regex_parts = []
+        for i, entry in enumerate(entries):
+            if 'regex' in entry:
+                regex_parts.append(f"(?P<r{i}>{entry['regex']})")
+            elif entry['from'] != entry['to']:
+                self.literals.setdefault(entry['from'], i)
+        # Regex entries first, then literals longest-first so overlapping keys resolve to the longer one.
+        literal_parts = [re.escape(k) for k in sorted(self.literals, key=len, reverse=True)]
+        parts = regex_parts + literal_parts
+        self.pattern = re.compile('|'.join(parts)) if parts else None
+
+    def sub(self, text):
+        """Return (new_text, Counter of entry index -> replacements)."""
+        counts = Counter()
+        if self.pattern is None:
+            return text, counts
+        entries, literals = self.entries, self.literals
+
+        def dispatch(m):
+            i = int(m.lastgroup[1:]) if m.lastgroup else literals[m.group(0)]
+            counts[i] += 1
+            return entries[i]['to']
+
+        return self.pattern.sub(dispatch, text), counts
+
+
+_SKIP = {'from': '', 'to': ''}
+
+# Per worker process: the table entries and one compiled pattern per set of enabled entries.
+_entries = []
+_compiled = {}
+
+
+def _init_worker(entries):
+    global _entries
+    _entries = entries
+    _compiled.clear()
+
+
+def compile_for(entries, text):
+    """Compile (and memoize) the entries whose if_contains/unless_contains allow this file."""
+    active = tuple(
+        ('if_contains' not in e or e['if_contains'] in text)
+        and ('unless_contains' not in e or e['unless_contains'] not in text)
+        for e in entries
+    )
+    table = _compiled.get(active)
+    if table is None:
+        # Disabled entries keep their slot so the returned counts index into `entries`.
+        table = _compiled[active] = CompiledTable([e if on else _SKIP for e, on in zip(entries, active)])
+    return table
+
+
+def migrate_file(path, dry_run=False):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
+    new_content, counts = compile_for(_entries, content).sub(content)
+    changed = (hashlib.sha256(new_content.encode('utf-8')).digest() !=
+               hashlib.sha256(content.encode('utf-8')).digest())
+    if changed and not dry_run:
+        out, tmp = open_atomic(path)
+        with out:
+            out.write(new_content)
+        commit_atomic(tmp, path)
+    return str(path), changed, dict(counts)
+
+
+def _label(entry):
+    return entry.get('note') or entry.get('from') or entry.get('regex')
+
+
+def main(argv=None):
+    tables = load_json(TABLES_PATH)
+    parser = argparse.ArgumentParser(description='Apply a theme mapping table to the HTML files.')
+    parser.add_argument('table', choices=sorted(tables))
+    parser.add_argument('files', nargs='*', help='HTML files (default: *.html in the repo root)')
+    parser.add_argument('--dry-run', action='store_true', help='Report counts without writing')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    entries = tables[args.table]
+    files = [ROOT / f for f in args.files] if args.files else sorted(ROOT.glob('*.html'))
+    totals = Counter()
+    changed_files = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(entries,)) as pool:
+        results = pool.map(migrate_file, files, [args.dry_run] * len(files))
+        for path, changed, counts in results:
+            totals.update(counts)
+            changed_files += changed
+            if counts:
+                detail = ', '.join(f'{_label(entries[i])} x{n}' for i, n in sorted(counts.items()))
+                print(f"{'~' if changed else '='} {path}: {detail}")
+    count('files', len(files))
+    count('replacements', sum(totals.values()))
+    verb = 'would change' if args.dry_run else 'updated'
+    print(f'{changed_files}/{len(files)} files {verb}, {sum(totals.values())} replacements')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
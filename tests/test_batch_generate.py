@@ -0,0 +1,47 @@
+import json
+import shutil
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import batch_generate
+from batch_generate import make_llm_handler, merge
+from site_data import RECIPES_PATH
+
+pytestmark = pytest.mark.skipif(not shutil.which('node'), reason='node is not installed')
+
+
+@pytest.fixture
+def llm():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_llm_handler(fail_rate=0.2, seed=3))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}/v1/chat/completions'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_merge_prepends_newest_first_with_ids_after_the_corpus():
+    corpus = [{'id': 7, 'slug': 'b'}, {'id': 'x', 'slug': 'a'}]
+    merged = merge(corpus, [{'slug': 'n1'}, {'slug': 'n2'}])
+    assert [(r['id'], r['slug']) for r in merged[:2]] == [(9, 'n2'), (8, 'n1')]
+    assert merged[2:] == corpus and merged[0]['created_at'] == merged[1]['created_at']
+
+
+def test_batch_is_merged_in_one_write(tmp_path, monkeypatch, llm):
+    corpus = json.loads(RECIPES_PATH.read_text(encoding='utf-8'))[:5]
+    path = tmp_path / 'recipes.json'
+    path.write_text(json.dumps(corpus, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    monkeypatch.setitem(batch_generate.FLOWS, 'recipes', dict(batch_generate.FLOWS['recipes'], path=path))
+    writes = []
+    write_corpus = batch_generate.write_corpus
+    monkeypatch.setattr(batch_generate, 'write_corpus', lambda p, r: (writes.append(p), write_corpus(p, r)))
+
+    assert batch_generate.main(['recipes', '-n', '4', '--llm-url', llm, '--backoff', '0', '--retries', '5']) == 0
+
+    assert writes == [path]
+    merged = json.loads(path.read_text(encoding='utf-8'))
+    new, old = merged[:4], merged[4:]
+    assert old == corpus
+    assert len({r['slug'] for r in merged}) == len(merged)
+    assert all(r['slug'] not in {c['slug'] for c in corpus} for r in new)
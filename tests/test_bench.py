@@ -0,0 +1,39 @@
+import pytest
+
+from bench import Synthesizer, compare, growth
+
+RECIPES = [
+    {'slug': 'locro', 'title': 'Locro de Papa Receta Tradicional', 'description': 'Una sopa espesa de papa chola. '
+     'Se sirve con aguacate y queso fresco.', 'ingredients': ['1 kg de papa', '1 taza de leche'],
+     'instructions': ['Cocinar la papa hasta que se deshaga.'], 'keywords': ['sopa']},
+    {'slug': 'seco', 'title': 'Seco de Chivo Ecuatoriano', 'description': 'Un guiso lento con naranjilla y chicha. '
+     'Se acompaña de arroz amarillo y maduro.', 'ingredients': ['1 kg de chivo'],
+     'instructions': ['Marinar el chivo toda la noche.', 'Cocinar a fuego lento.'], 'keywords': ['guiso']},
+]
+
+
+def results(stages_by_scale):
+    return {'scales': {scale: {'records': {'recipes': records}, 'stages': stages}
+                       for scale, (records, stages) in stages_by_scale.items()}}
+
+
+def test_synthetic_corpus_is_deterministic_with_unique_slugs():
+    a = list(Synthesizer(RECIPES, [], {}, seed=1).recipes_at(10))
+    b = list(Synthesizer(RECIPES, [], {}, seed=1).recipes_at(10))
+    assert a == b and len(a) == 20
+    assert len({r['slug'] for r in a}) == 20
+    assert all(set(r['ingredients']) <= {'1 kg de papa', '1 taza de leche', '1 kg de chivo'}
+               for r in a if isinstance(r['ingredients'][0], str))
+
+
+def test_growth_exponent_and_regressions():
+    found = results({
+        '10': (100, {'search': {'status': 'ok', 'seconds': 1.0, 'rss_mb': 50}}),
+        '100': (1000, {'search': {'status': 'ok', 'seconds': 100.0, 'rss_mb': 60}}),
+    })
+    k, scale, seconds = growth(found)['search']
+    assert k == pytest.approx(2.0) and scale == 100.0 and seconds == 100.0
+
+    baseline = results({'100': (1000, {'search': {'status': 'ok', 'seconds': 50.0, 'rss_mb': 59}})})
+    assert [(s, name) for s, name, _ in compare(found, baseline, tolerance=0.2)] == [('100', 'search')]
+    assert compare(found, baseline, tolerance=1.5) == []
@@ -0,0 +1,43 @@
+from build_assets import AssetWriter, build_modules, fingerprint, rewrite_page
+
+PAGE = ('<script type="module" src="/script.js"></script>\n'
+        '<link rel="stylesheet" href="styles.css">\n'
+        '<a href="https://example.com/script.js">x</a>\n')
+
+
+def test_fingerprint_is_content_addressed():
+    assert fingerprint('js/utils.js', b'a') == fingerprint('js/utils.js', b'a')
+    assert fingerprint('js/utils.js', b'a') != fingerprint('js/utils.js', b'b')
+    assert fingerprint('js/utils.js', b'a').startswith('js/utils.') and fingerprint('js/utils.js', b'a').endswith('.js')
+
+
+def test_rewrite_page_is_idempotent_and_follows_new_fingerprints():
+    old = {'script.js': '/assets/script.aaaaaaaaaaaa.js'}
+    new = {'script.js': '/assets/script.bbbbbbbbbbbb.js'}
+    once = rewrite_page(PAGE, old)
+    assert 'src="/assets/script.aaaaaaaaaaaa.js"' in once
+    assert 'href="styles.css"' in once and 'https://example.com/script.js' in once
+    assert rewrite_page(once, old) == once
+    assert rewrite_page(once, new) == rewrite_page(PAGE, new)
+
+
+def test_modules_are_renamed_when_a_dependency_changes(tmp_path):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'script.js').write_text("import { a } from './js/utils.js';\nfetch('recipes.json');\n")
+    utils = tmp_path / 'js' / 'utils.js'
+    modules = {'script.js': tmp_path / 'script.js', 'js/utils.js': utils}
+
+    def urls_for(content):
+        utils.write_text(content)
+        urls = {'recipes.json': '/assets/recipes.cccccccccccc.json'}
+        writer = AssetWriter(tmp_path / 'assets')
+        build_modules(modules, urls, writer)
+        return urls, writer
+
+    first, _ = urls_for('export const a = 1;\n')
+    main = (tmp_path / first['script.js'].lstrip('/')).read_text()
+    assert f"from '{first['js/utils.js']}'" in main and "fetch('/assets/recipes.cccccccccccc.json')" in main
+    again, writer = urls_for('export const a = 1;\n')
+    assert again == first and writer.written == []
+    second, _ = urls_for('export const a = 2;\n')
+    assert second['js/utils.js'] != first['js/utils.js'] and second['script.js'] != first['script.js']
@@ -0,0 +1,50 @@
+import pytest
+
+from build_geo import GAZETTEER, MAX_ZOOM, TILE_PX, GeoIndex, Gazetteer, cluster, extract_features, \
+    feature_tiles, haversine_km, to_world
+
+RECIPES = [
+    {'slug': 'locro', 'title': 'Locro', 'origin_cities': [{'city': 'Quito'}, 'quito'],
+     'places': [{'name': 'La Ronda', 'city': 'Quito'}, {'name': 'Sin ciudad'}]},
+    {'slug': 'hornado', 'title': 'Hornado', 'origin_cities': ['Sangolquí', 'Riobamba']},
+    {'slug': 'encebollado', 'title': 'Encebollado', 'origin_cities': ['Guayaquil']},
+]
+POSTS = [{'slug': 'un-dia-en-otavalo', 'title': 'Un día en Otavalo'}, {'slug': 'viajar', 'title': 'Viajar'}]
+
+
+@pytest.fixture(scope='module')
+def features():
+    return extract_features(RECIPES, POSTS, Gazetteer())
+
+
+def test_features_are_located_by_city_place_and_title(features):
+    found, unlocated = features
+    assert [(f['kind'], f['slug'], f['city']) for f in found] == [
+        ('recipe', 'locro', 'Quito'), ('place', 'locro', 'Quito'), ('recipe', 'hornado', 'Sangolquí'),
+        ('recipe', 'hornado', 'Riobamba'), ('recipe', 'encebollado', 'Guayaquil'),
+        ('post', 'un-dia-en-otavalo', 'Otavalo')]
+    assert dict(unlocated) == {'place': 1, 'post': 1}
+
+
+def test_within_matches_a_full_scan(features):
+    found, _ = features
+    lat, lng = GAZETTEER['Quito'][:2]
+    expected = sorted(f['slug'] + f['kind'] for f in found if haversine_km(lat, lng, f['lat'], f['lng']) <= 30)
+    assert sorted(f['slug'] + f['kind'] for _, f in GeoIndex(found).within(lat, lng, 30)) == expected
+    assert [f['city'] for _, f in GeoIndex(found).nearest(lat, lng, 3)] == ['Quito', 'Quito', 'Sangolquí']
+
+
+def test_clusters_merge_nearby_features_and_land_in_their_tile(features):
+    found, _ = features
+    tiles = cluster(found, 6)
+    clusters = [c for cs in tiles.values() for c in cs]
+    assert sum(c['count'] for c in clusters) == len(found)
+    quito = next(c for c in clusters if c['city'] == 'Quito')
+    assert quito['count'] == 3 and quito['kinds'] == {'place': 1, 'recipe': 2}  # Quito x2 + Sangolquí
+    for (tx, ty), cs in tiles.items():
+        for c in cs:
+            x, y = to_world(c['lat'], c['lng'], 6)
+            assert (int(x // TILE_PX), int(y // TILE_PX)) == (tx, ty)
+
+    by_tile = feature_tiles(found, MAX_ZOOM)
+    assert sorted(f['slug'] for fs in by_tile.values() for f in fs) == sorted(f['slug'] for f in found)
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+import build_images  # noqa: E402
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    images = tmp_path / 'images'
+    (images / 'posts').mkdir(parents=True)
+    Image.new('RGB', (800, 600), (200, 120, 40)).save(images / 'posts' / 'quito.jpg')
+    Image.new('RGB', (300, 200), (20, 90, 160)).save(images / 'locro.png')
+    cache = tmp_path / 'persisted'
+    for name, value in {'ROOT': tmp_path, 'IMAGES_DIR': images, 'DERIVED_DIR': images / 'derived',
+                        'MANIFEST_PATH': images / 'manifest.json', 'CACHE_PATH': cache / 'images.json',
+                        'STORE_DIR': cache / 'images'}.items():
+        monkeypatch.setattr(build_images, name, value)
+    return tmp_path
+
+
+def test_manifest_entries(tree):
+    result = build_images.build(workers=1)
+    assert sorted(result['encoded']) == ['images/locro.png', 'images/posts/quito.jpg']
+    manifest = json.loads((tree / 'images' / 'manifest.json').read_text(encoding='utf-8'))
+    quito = manifest['images']['images/posts/quito.jpg']
+    assert (quito['width'], quito['height']) == (800, 600)
+    assert quito['placeholder'].startswith('data:image/webp;base64,')
+    assert [s.rsplit(' ', 1)[1] for s in quito['srcset']['webp'].split(', ')] == ['320w', '640w', '800w']
+
+
+def test_fresh_checkout_restores_instead_of_reencoding(tree):
+    build_images.build(workers=1)
+    derived = tree / 'images' / 'derived'
+    names = sorted(p.name for p in derived.iterdir())
+    for p in derived.iterdir():  # a new deploy: gitignored derivatives are gone, the cache dir is not
+        p.unlink()
+    result = build_images.build(workers=1)
+    assert result['encoded'] == []
+    assert sorted(p.name for p in derived.iterdir()) == names
+
+
+def test_replaced_image_drops_its_old_derivatives(tree):
+    build_images.build(workers=1)
+    Image.new('RGB', (300, 200), (0, 0, 0)).save(tree / 'images' / 'locro.png')
+    result = build_images.build(workers=1)
+    assert result['encoded'] == ['images/locro.png'] and result['removed']
+    store = {p.name for p in (tree / 'persisted' / 'images').iterdir()}
+    assert store == {p.name for p in (tree / 'images' / 'derived').iterdir()}
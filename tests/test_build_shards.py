@@ -0,0 +1,39 @@
+import json
+
+from build_shards import RECIPE_CARD_FIELDS, build, card
+
+RECIPE = {
+    'slug': 'encebollado', 'title': 'Encebollado', 'region': 'Costa', 'keywords': ['sopa', 'albacora'],
+    'ingredients': ['500 g de albacora'], 'instructions': ['Hervir la yuca'],
+    'origin_cities': [{'city': 'Manta', 'province': 'Manabí', 'region': 'Costa'}],
+    'places': [{'name': 'Picantería A'}, {'name': 'Picantería B'}],
+    'youtube_videos': [{'videoId': 'abc', 'channel': 'X', 'title': 'Cómo hacer encebollado'}],
+}
+
+
+def test_card_keeps_what_the_listing_filters_need():
+    out = card(RECIPE, RECIPE_CARD_FIELDS)
+    assert 'ingredients' not in out and 'instructions' not in out
+    assert out['keywords'] == ['sopa', 'albacora']
+    assert out['origin_cities'] == ['Manta']
+    assert out['places'] == [{'name': 'Picantería A'}]
+    assert out['youtube_videos'] == [{'videoId': 'abc', 'channel': 'X'}]
+
+
+def test_build_is_incremental_and_prunes(tmp_path):
+    path = tmp_path / 'recipes.json'
+    path.write_text(json.dumps([RECIPE]), encoding='utf-8')
+    corpora = {'recipes': (path, RECIPE_CARD_FIELDS)}
+    out = tmp_path / 'data'
+
+    written, removed, changed = build(corpora, out)
+    assert len(written) == 2 and changed
+    manifest = json.loads((out / 'manifest.json').read_text(encoding='utf-8'))
+    shard = manifest['recipes']['items']['encebollado']
+    assert json.loads((tmp_path / shard).read_text(encoding='utf-8')) == RECIPE
+
+    assert build(corpora, out) == ([], [], False)
+
+    path.write_text(json.dumps([dict(RECIPE, title='Encebollado manabita')]), encoding='utf-8')
+    written, removed, changed = build(corpora, out)
+    assert len(written) == 2 and len(removed) == 2 and changed
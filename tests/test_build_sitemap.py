@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+import build_sitemap
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    recipes = tmp_path / 'recipes.json'
+    recipes.write_text(json.dumps([{'slug': 'encebollado', 'title': 'Encebollado', 'created_at': '2025-01-02'}]),
+                       encoding='utf-8')
+    (tmp_path / 'index.html').write_text('<h1>Inicio</h1>', encoding='utf-8')
+    monkeypatch.setattr(build_sitemap, 'ROOT', tmp_path)
+    monkeypatch.setattr(build_sitemap, 'SITEMAP_PATH', tmp_path / 'sitemap.xml')
+    monkeypatch.setattr(build_sitemap, 'STATE_PATH', tmp_path / 'cache' / 'sitemap_state.json')
+    monkeypatch.setattr(build_sitemap, 'STATIC_PAGES', (('/', 'index.html', 'daily', '1.0'),))
+    monkeypatch.setattr(build_sitemap, 'CORPORA', (('recipes', recipes, '/recipe.html', 'monthly', '0.8'),))
+    return tmp_path
+
+
+def test_lost_state_is_seeded_from_the_published_sitemap(site):
+    first = build_sitemap.build(today='2026-01-01')
+    assert len(first['changed']) == 2
+    sitemap = (site / 'sitemap.xml').read_bytes()
+
+    build_sitemap.STATE_PATH.unlink()  # e.g. the build cache was cleared
+    again = build_sitemap.build(today='2026-06-01')
+    assert again['changed'] == [] and again['written'] == []
+    assert (site / 'sitemap.xml').read_bytes() == sitemap
+
+    (site / 'index.html').write_text('<h1>Bienvenidos</h1>', encoding='utf-8')
+    edited = build_sitemap.build(today='2026-07-01')
+    assert edited['changed'] == ['https://ecuadoralacarta.com/']
+    assert b'<lastmod>2025-01-02</lastmod>' in (site / 'sitemap.xml').read_bytes()
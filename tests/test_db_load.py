@@ -0,0 +1,117 @@
+"""Integration test for db_load.load() against a local PostgreSQL.
+
+Runs only when DATABASE_URL is set (and psycopg2 is installed); everything
+happens in a throwaway schema that is dropped afterwards.
+"""
+
+import os
+import uuid
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+DATABASE_URL = os.environ.get('DATABASE_URL')
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason='DATABASE_URL not set')
+
+from db_load import KEYWORD_LINK_TABLE, load  # noqa: E402
+
+# The tables db_load writes, as `prisma migrate` creates them from prisma/schema.prisma.
+SCHEMA_DDL = f'''
+CREATE TYPE "Difficulty" AS ENUM ('FACIL', 'INTERMEDIO', 'AVANZADO');
+CREATE TYPE "Region" AS ENUM ('SIERRA', 'COSTA', 'AMAZONIA', 'GALAPAGOS');
+CREATE TYPE "Category" AS ENUM ('SOPAS', 'PLATOS_FUERTES', 'MARISCOS', 'POSTRES', 'BEBIDAS');
+CREATE TABLE "Recipe" (
+    id text PRIMARY KEY, slug text NOT NULL UNIQUE, title text NOT NULL, description text NOT NULL,
+    "prepTime" integer NOT NULL, "cookTime" integer NOT NULL, servings integer NOT NULL,
+    difficulty "Difficulty" NOT NULL, region "Region" NOT NULL, category "Category" NOT NULL,
+    "isChuchaqui" boolean NOT NULL DEFAULT false, "altitudAdjustment" boolean NOT NULL DEFAULT false,
+    "spotifyPlaylistId" text, "isPremium" boolean NOT NULL DEFAULT false, "digitalProductUrl" text,
+    image text NOT NULL, "videoUrl" text, "schemaMarkup" jsonb
+);
+CREATE TABLE "Ingredient" (
+    id text PRIMARY KEY, "recipeId" text NOT NULL REFERENCES "Recipe"(id), name text NOT NULL,
+    "baseQuantity" double precision NOT NULL, unit text NOT NULL, "diasporaSubstitute" text,
+    "diasporaNotes" text, "isSpice" boolean NOT NULL DEFAULT false, "estimatedPrice" double precision
+);
+CREATE TABLE "Step" (
+    id text PRIMARY KEY, "recipeId" text NOT NULL REFERENCES "Recipe"(id), "order" integer NOT NULL,
+    description text NOT NULL, "gifUrl" text
+);
+CREATE TABLE "Faq" (
+    id text PRIMARY KEY, "recipeId" text NOT NULL REFERENCES "Recipe"(id), question text NOT NULL,
+    answer text NOT NULL
+);
+CREATE TABLE "Keyword" (id text PRIMARY KEY, word text NOT NULL UNIQUE);
+CREATE TABLE "{KEYWORD_LINK_TABLE}" (
+    "A" text NOT NULL REFERENCES "Keyword"(id) ON DELETE CASCADE,
+    "B" text NOT NULL REFERENCES "Recipe"(id) ON DELETE CASCADE,
+    PRIMARY KEY ("A", "B")
+);
+'''
+
+RECIPES = [
+    {'slug': 'encebollado', 'title': 'Encebollado', 'region': 'Costa', 'category': 'Sopas', 'difficulty': 'Media',
+     'servings': '4 porciones', 'prep_time': '20 min', 'cook_time': '1 hora',
+     'ingredients': ['500 g de albacora', '1 kg de yuca', '1 cebolla paiteña'],
+     'instructions': ['Cocinar la yuca', 'Agregar la albacora'],
+     'faqs': [{'q': '¿Se come al desayuno?', 'a': 'Sí, para el chuchaqui.'}],
+     'keywords': ['sopa', 'Albacora'], 'seo_keywords': 'encebollado, sopa'},
+    {'slug': 'locro-de-papa', 'title': 'Locro de papa', 'region': 'Sierra', 'category': 'Sopas',
+     'ingredients': ['1 kg de papa chola', '1 taza de leche'], 'instructions': ['Cocinar la papa'],
+     'keywords': ['sopa', 'papa']},
+]
+
+
+@pytest.fixture
+def conn():
+    schema = 'db_load_test_' + uuid.uuid4().hex[:8]
+    conn = psycopg2.connect(DATABASE_URL, options=f'-c search_path={schema}')
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(f'CREATE SCHEMA {schema}')
+            cur.execute(SCHEMA_DDL)
+        yield conn
+    finally:
+        conn.rollback()
+        with conn, conn.cursor() as cur:
+            cur.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+        conn.close()
+
+
+def fetch(conn, sql):
+    with conn.cursor() as cur:
+        cur.execute(sql)
+        return cur.fetchall()
+
+
+def test_reload_keeps_ids_and_replaces_children(conn):
+    # A row created by the app before the first load keeps its (cuid) id.
+    with conn, conn.cursor() as cur:
+        cur.execute('INSERT INTO "Recipe" (id, slug, title, description, "prepTime", "cookTime", servings, '
+                    'difficulty, region, category, image) VALUES '
+                    "('ckexisting0001', 'encebollado', 'Viejo', '', 0, 0, 1, 'FACIL', 'COSTA', 'SOPAS', '')")
+
+    with conn:
+        counts, _ = load(conn, RECIPES, {})
+    assert counts['Recipe'] == 2 and counts['Ingredient'] == 5
+    ids = dict(fetch(conn, 'SELECT slug, id FROM "Recipe"'))
+    assert ids['encebollado'] == 'ckexisting0001'
+
+    edited = [dict(RECIPES[0], title='Encebollado manabita', ingredients=RECIPES[0]['ingredients'][:2],
+                   keywords=['sopa']), RECIPES[1]]
+    with conn:
+        load(conn, edited, {})
+
+    assert dict(fetch(conn, 'SELECT slug, id FROM "Recipe"')) == ids
+    assert fetch(conn, "SELECT title FROM \"Recipe\" WHERE slug = 'encebollado'") == [('Encebollado manabita',)]
+    per_recipe = dict(fetch(conn, 'SELECT r.slug, count(i.id) FROM "Recipe" r '
+                                  'LEFT JOIN "Ingredient" i ON i."recipeId" = r.id GROUP BY r.slug'))
+    assert per_recipe == {'encebollado': 2, 'locro-de-papa': 2}
+    assert fetch(conn, 'SELECT count(*) FROM "Step"') == [(3,)]
+    assert fetch(conn, 'SELECT count(*) FROM "Faq"') == [(1,)]
+
+    links = fetch(conn, f'SELECT r.slug, k.word FROM "{KEYWORD_LINK_TABLE}" l JOIN "Keyword" k ON k.id = l."A" '
+                        'JOIN "Recipe" r ON r.id = l."B" ORDER BY 1, 2')
+    assert links == [('encebollado', 'encebollado'), ('encebollado', 'sopa'),
+                     ('locro-de-papa', 'papa'), ('locro-de-papa', 'sopa')]
+    assert fetch(conn, 'SELECT count(*) FROM "Keyword"') == [(4,)]
@@ -0,0 +1,46 @@
+import json
+
+import dedup
+
+
+def _corpus(tmp_path, titles):
+    path = tmp_path / 'recipes.json'
+    path.write_text(json.dumps([{'slug': f's{i}', 'title': t, 'ingredients': ['papa', 'queso'], 'steps': [t]}
+                                for i, t in enumerate(titles)]), encoding='utf-8')
+    return {'r': path}
+
+
+TITLES = ['Llapingachos de la sierra con hierbas', 'Encebollado de albacora', 'Fanesca tradicional de Semana Santa']
+
+
+def test_check_finds_title_near_duplicate(tmp_path):
+    index = dedup.DedupIndex(tmp_path / 'dedup.sqlite')
+    index.update(_corpus(tmp_path, TITLES))
+    field, hits = index.check('Llapingachos de la sierra con hierbas aromáticas')
+    assert field == 'title'
+    assert [h['key'] for h in hits] == ['r/s0']
+    assert index.check('Ceviche de camarón')[1] == []
+
+
+def test_index_persists_and_check_does_not_reload_corpus(tmp_path, monkeypatch):
+    corpora = _corpus(tmp_path, TITLES)
+    index = dedup.DedupIndex(tmp_path / 'dedup.sqlite')
+    assert len(index.update(corpora)[0]) == 3
+    index.close()
+
+    monkeypatch.setattr(dedup, 'load_json', lambda path: (_ for _ in ()).throw(AssertionError('corpus reloaded')))
+    index = dedup.DedupIndex(tmp_path / 'dedup.sqlite')
+    assert len(index) == 3
+    assert index.sync(corpora) == ([], [])
+    assert index.check('Encebollado de albacora')[1][0]['key'] == 'r/s1'
+
+
+def test_sync_catches_up_on_edits(tmp_path):
+    corpora = _corpus(tmp_path, TITLES)
+    index = dedup.DedupIndex(tmp_path / 'dedup.sqlite')
+    index.update(corpora)
+    _corpus(tmp_path, TITLES[:2] + ['Seco de chivo'])
+    changed, removed = index.sync(corpora)
+    assert changed == ['r/s2'] and removed == []
+    assert index.check('Fanesca tradicional de Semana Santa')[1] == []
+    assert index.check('Seco de chivo')[1][0]['key'] == 'r/s2'
@@ -0,0 +1,65 @@
+from build_glossary import TermAutomaton, build, compile_patterns, fold, utf16_spans, variants
+
+GLOSSARY = {
+    'achiote': {'term': 'Achiote', 'definition': 'Semilla roja para dar color.'},
+    'sancochar': {'term': 'Sancochar', 'definition': 'Cocer a medias.'},
+    'hoja de achira': {'term': 'Hoja de achira', 'definition': 'Envoltura de los quimbolitos.'},
+    'maiz': {'term': 'Maíz', 'definition': 'Grano básico.', 'variants': ['mote']},
+}
+
+
+def automaton():
+    return TermAutomaton(compile_patterns(GLOSSARY))
+
+
+def test_fold_keeps_offsets():
+    assert fold('Maíz Ñ') == 'maiz n'
+    assert len(fold('İstanbul')) == len('İstanbul')
+
+
+def test_variants():
+    assert variants('maiz', GLOSSARY['maiz']) == {'maiz', 'maices', 'mote', 'motes'}
+    assert {'sancochado', 'sancochadas', 'sancochando'} <= variants('sancochar', GLOSSARY['sancochar'])
+    # Conjugated forms are left out: "sancocho" is a soup
+    assert 'sancocho' not in variants('sancochar', GLOSSARY['sancochar'])
+    assert 'hojas de achira' in variants('hoja de achira', GLOSSARY['hoja de achira'])
+
+
+def test_find_word_boundaries_and_longest_match():
+    text = 'Envolver en hojas de achira con achiote; achioteado no cuenta.'
+    spans = automaton().find(text)
+    assert [(text[s:e], key) for s, e, key in spans] == [('hojas de achira', 'hoja de achira'),
+                                                        ('achiote', 'achiote')]
+
+
+def test_find_accents_and_case():
+    text = 'MAÍCES y papas sancochadas'
+    assert [(text[s:e], key) for s, e, key in automaton().find(text)] == [('MAÍCES', 'maiz'),
+                                                                         ('sancochadas', 'sancochar')]
+
+
+def test_utf16_offsets_after_astral_chars():
+    text = '🌽 maíz'
+    spans = automaton().find(text)
+    assert spans == [[2, 6, 'maiz']]
+    # '🌽' is two UTF-16 code units, as String.prototype.slice() counts them
+    assert utf16_spans(text, spans) == [[3, 7, 'maiz']]
+    assert utf16_spans('maíz', [[0, 4, 'maiz']]) == [[0, 4, 'maiz']]
+
+
+def test_build_lists_every_recipe_and_reuses_cache():
+    recipes = [{'slug': 'mote-pillo', 'description': 'Mote con huevo y achiote.', 'ingredients': ['2 tazas de mote']},
+               {'slug': 'agua', 'description': 'Solo agua.'}]
+    output, cache, stats = build(recipes, GLOSSARY)
+    assert output['recipes']['mote-pillo'] == {'description': {'0': [[0, 4, 'maiz'], [17, 24, 'achiote']]},
+                                               'ingredients': {'0': [[11, 15, 'maiz']]}}
+    # Recipes without matches still get an entry, so script.js only falls back for new ones
+    assert output['recipes']['agua'] == {}
+    assert stats['annotated'] == 2
+
+    _, _, stats = build(recipes, GLOSSARY, cache)
+    assert stats['annotated'] == 0
+    glossary = dict(GLOSSARY, huevo={'term': 'Huevo', 'definition': '...'})
+    output, _, stats = build(recipes, glossary, cache)
+    assert stats['annotated'] == 1
+    assert [9, 14, 'huevo'] in output['recipes']['mote-pillo']['description']['0']
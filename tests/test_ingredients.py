@@ -0,0 +1,45 @@
+import pytest
+
+import ingredients
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2', 2.0), ('0,5', 0.5), ('1/2', 0.5), ('1 1/2', 1.5), ('¾', 0.75), ('1/0', 0.0),
+])
+def test_parse_number(text, expected):
+    assert ingredients.parse_number(text) == pytest.approx(expected)
+
+
+def test_parse_quantity_units_ranges_and_sizes():
+    assert ingredients.parse_quantity('1 1/2 tazas de mote') == (1.5, 'taza', 'de mote')
+    assert ingredients.parse_quantity('2 a 3 papas') == (2.5, '', 'papas')
+    assert ingredients.parse_quantity('2 dientes grandes de ajo') == (2.0, 'diente', 'de ajo')
+    # rest stays a suffix of the input so the line can be re-rendered
+    assert ingredients.parse_quantity('2 dientes grandes de ajo', skip_sizes=False)[2] == 'grandes de ajo'
+    assert ingredients.parse_quantity('Sal') == (None, '', 'Sal')
+
+
+@pytest.mark.parametrize('line, name, quantity, unit, note, store', [
+    ('1 kg Papas (comprar en Supermaxi)', 'Papas', 1.0, 'kg', '', 'Supermaxi'),
+    ('1/2 taza, picado de Cilantro fresco (Supermaxi)', 'Cilantro fresco', 0.5, 'taza', 'picado', 'Supermaxi'),
+    ('3 dientes de ajo, triturados', 'Ajo', 3.0, 'diente', 'triturados', ''),
+    ('2-3 tomates', 'Tomates', 2.5, 'unidad', '', ''),
+    ('½ cucharadita de comino (molido)', 'Comino', 0.5, 'cucharadita', 'molido', ''),
+])
+def test_parse_ingredient_lines(line, name, quantity, unit, note, store):
+    parsed = ingredients.parse_ingredient(line)
+    assert (parsed['name'], parsed['quantity'], parsed['unit'], parsed['note'], parsed['store']) == \
+        (name, quantity, unit, note, store)
+    assert parsed['text'] == line
+
+
+def test_parse_ingredient_to_taste_and_spice():
+    parsed = ingredients.parse_ingredient('Al gusto Sal')
+    assert (parsed['name'], parsed['quantity'], parsed['unit']) == ('Sal', None, 'al gusto')
+    assert parsed['to_taste'] and parsed['is_spice']
+    assert not ingredients.parse_ingredient('1 kg Papas')['is_spice']
+
+
+def test_parse_ingredient_workflow_object():
+    parsed = ingredients.parse_ingredient({'name': 'Queso fresco', 'quantity': '200 g', 'where_to_buy': 'Tuti'})
+    assert (parsed['name'], parsed['quantity'], parsed['unit'], parsed['store']) == ('Queso fresco', 200.0, 'g', 'Tuti')
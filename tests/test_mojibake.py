@@ -0,0 +1,48 @@
+import pytest
+
+from mojibake import Repairer, repair
+
+
+@pytest.mark.parametrize('broken, fixed', [
+    ('artÃ­culo', 'artículo'),
+    ('optimizaciÃ³n', 'optimización'),
+    ('CafÃ© con piÃ±a', 'Café con piña'),
+    ('Ã‰xito', 'Éxito'),
+    ('Â¿QuÃ© tal?', '¿Qué tal?'),
+    ('â€œHolaâ€\x9d', '“Hola”'),
+    ('10 â€” 15 min', '10 — 15 min'),
+    ('â‚¬5', '€5'),
+])
+def test_repairs_mojibake(broken, fixed):
+    assert repair(broken)[0] == fixed
+
+
+def test_repairs_double_encoding():
+    assert repair('ÃƒÂ©') == ('é', 2)
+
+
+@pytest.mark.parametrize('text', [
+    # Uppercase accented letter + CP1252 punctuation decodes as UTF-8 too
+    'SÍ—no',
+    'CAFÉ”',
+    'AÑ…',
+    'PERÚ’s',
+    'Café con piña',
+    'Ãx',
+    'Â€',
+])
+def test_leaves_valid_text_alone(text):
+    assert repair(text) == (text, 0)
+
+
+def test_repairer_cache(tmp_path):
+    cache = tmp_path / 'mojibake.json'
+    long_text = 'niÃ±o ' * 60
+    repairer = Repairer(cache_path=cache, min_cache_len=10)
+    assert repairer.sub(long_text) == ('niño ' * 60, 60)
+    assert repairer.sub('ascii') == ('ascii', 0)
+    repairer.save()
+
+    again = Repairer(cache_path=cache, min_cache_len=10)
+    assert again.sub(long_text) == ('niño ' * 60, 60)
+    assert again.stats['cache_hits'] == 1
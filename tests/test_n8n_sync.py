@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import site_data
+from n8n_sync import N8nClient, content_hash
+
+
+class FakeN8n(BaseHTTPRequestHandler):
+    """Stand-in for the n8n public API: GET/PUT /api/v1/workflows/<id> with ETags."""
+
+    def log_message(self, *args):
+        pass
+
+    def _workflow_id(self):
+        return self.path.rsplit('/', 1)[-1]
+
+    def _enter(self):
+        state = self.server.state
+        with state['lock']:
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+        time.sleep(state['delay'])
+
+    def _leave(self):
+        with self.server.state['lock']:
+            self.server.state['in_flight'] -= 1
+
+    def do_GET(self):
+        state = self.server.state
+        self._enter()
+        try:
+            wid = self._workflow_id()
+            state['log'].append(('GET', wid, self.headers.get('If-None-Match')))
+            workflow = state['workflows'][wid]
+            etag = '"%s"' % content_hash(workflow)[:12]
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(workflow).encode('utf-8')
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            self._leave()
+
+    def do_PUT(self):
+        state = self.server.state
+        self._enter()
+        try:
+            wid = self._workflow_id()
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            state['log'].append(('PUT', wid, None))
+            state['workflows'][wid] = dict(state['workflows'].get(wid, {}), **payload)
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+        finally:
+            self._leave()
+
+
+def workflow(name, code='return items;'):
+    return {'id': name, 'name': name, 'connections': {},
+            'nodes': [{'name': 'Code', 'type': 'n8n-nodes-base.code', 'parameters': {'jsCode': code}}]}
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeN8n)
+    httpd.state = {'workflows': {w: workflow(w) for w in ('w1', 'w2', 'w3', 'w4')}, 'log': [],
+                   'lock': threading.Lock(), 'in_flight': 0, 'peak': 0, 'delay': 0}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    with N8nClient('test-key', f'http://127.0.0.1:{server.server_port}/api/v1/', workers=4, retries=0,
+                   timeout=5, cache_path=tmp_path / 'sync.json', body_cache_dir=tmp_path / 'bodies') as c:
+        yield c
+
+
+def test_get_is_conditional_and_reuses_the_cached_body(server, client):
+    first = client.get_workflow('w1')
+    second = client.get_workflow('w1')
+    assert first == second == server.state['workflows']['w1']
+    (_, _, etag1), (_, _, etag2) = server.state['log']
+    assert etag1 is None and etag2  # the second GET sent If-None-Match and got a 304
+
+
+def test_push_skips_the_put_when_nothing_changed(server, client):
+    before = site_data.COUNTERS['workflows_unchanged']
+    changed = workflow('w1', 'return [];')
+    assert client.push('w1', changed)['status'] == 'updated'
+    assert client.push('w1', changed)['status'] == 'unchanged'
+    assert [m for m, _, _ in server.state['log']] == ['PUT']
+    assert server.state['workflows']['w1']['nodes'] == changed['nodes']
+    assert site_data.COUNTERS['workflows_unchanged'] == before + 1
+
+
+def test_push_many_runs_requests_in_parallel(server, client):
+    server.state['delay'] = 0.2
+    items = [(w, workflow(w, 'return [1];')) for w in ('w1', 'w2', 'w3', 'w4')]
+    results = client.push_many(items)
+    assert [r['status'] for r in results] == ['updated'] * 4
+    assert server.state['peak'] > 1
@@ -0,0 +1,58 @@
+import copy
+import json
+
+from node_patch import RULES, PatchSet, patch_files
+
+PROMPT = (
+    "const imageList = ['a.jpg', 'b.jpg'].join('\\n');\n"
+    "\n"
+    "const prompt = 'Genera JSON:\\n' +\n"
+    "  '  \"title\": \"...\",\\n' +\n"
+    "  '  \"image_url\": \"Elige URL:\\n' + imageList + '\\nNUNCA uses photo-XXXX.\",\\n' +\n"
+    "  '}';\n"
+)
+GENERAR = (
+    "const query = encodeURIComponent(`${queryConcept} comida plato ecuador real photography -pinterest`);\n"
+    "const res = await fetch(searchUrl);\n"
+)
+
+
+def node(name, code):
+    return {'id': name, 'name': name, 'type': 'n8n-nodes-base.code', 'parameters': {'jsCode': code}}
+
+
+def workflow(*nodes):
+    return {'name': 'wf', 'nodes': list(nodes), 'connections': {}}
+
+
+def test_rules_fire_once_then_nothing():
+    wf = workflow(node('Armar Prompt', PROMPT), node('Generar Imagen', GENERAR))
+    patches = PatchSet(RULES)
+
+    fired = patches.apply(wf)
+    assert set(fired) == {r.name for r in RULES}
+    prompt, generar = (n['parameters']['jsCode'] for n in wf['nodes'])
+    assert 'imageList' not in prompt and '"title"' in prompt and "'}';" in prompt
+    assert 'AbortSignal.timeout(10000)' in generar and 'ecuador dish recipe' in generar
+
+    patched = copy.deepcopy(wf)
+    assert patches.apply(wf) == {}
+    assert wf == patched
+
+
+def test_timeout_rule_skips_fetches_that_already_have_a_signal():
+    code = "const signal = AbortSignal.timeout(5000);\nconst res = await fetch(searchUrl);\n"
+    wf = workflow(node('Generar Imagen', code))
+    assert PatchSet(RULES).apply(wf) == {}
+    assert wf['nodes'][0]['parameters']['jsCode'] == code
+
+
+def test_no_match_does_not_rewrite_the_file(tmp_path):
+    path = tmp_path / 'wf.json'
+    text = json.dumps(workflow(node('Otro nodo', PROMPT)), indent=4)
+    path.write_text(text, encoding='utf-8')
+    mtime = path.stat().st_mtime_ns
+
+    patch_files(PatchSet(RULES), [path], write=True)
+    assert path.read_text(encoding='utf-8') == text
+    assert path.stat().st_mtime_ns == mtime
@@ -0,0 +1,70 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import prerender
+
+REPO = Path(__file__).resolve().parent.parent
+
+RECIPES = [
+    {'slug': 'encebollado', 'title': 'Encebollado manabita', 'description': 'Sopa de albacora con yuca.',
+     'region': 'Costa', 'ingredients': ['500 g de albacora'], 'instructions': ['Hervir la yuca.']},
+    {'slug': 'sin-titulo', 'description': 'Publicado sin título.'},
+    {'slug': 'Con/Barra', 'title': 'Slug que la rewrite no puede alcanzar'},
+]
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    for name in ('recipe.html', 'post.html'):
+        shutil.copy(REPO / name, tmp_path / name)
+    (tmp_path / 'recipes.json').write_text(json.dumps(RECIPES), encoding='utf-8')
+    (tmp_path / 'posts.json').write_text('[]', encoding='utf-8')
+    monkeypatch.setattr(prerender, 'ROOT', tmp_path)
+    monkeypatch.setattr(prerender, 'OUT_DIR', tmp_path / 'prerender')
+    monkeypatch.setattr(prerender, 'CACHE_PATH', tmp_path / 'persisted' / 'prerender.json')
+    monkeypatch.setattr(prerender, 'STORE_DIR', tmp_path / 'persisted' / 'prerender')
+    monkeypatch.setattr(prerender, 'PAGES', {
+        'recipe': ('recipe.html', tmp_path / 'recipes.json', prerender.render_recipe),
+        'post': ('post.html', tmp_path / 'posts.json', prerender.render_post),
+    })
+    return tmp_path
+
+
+def test_rewrite_slug_pattern_matches_vercel_json():
+    rewrites = json.loads((REPO / 'vercel.json').read_text(encoding='utf-8'))['rewrites']
+    for rule in rewrites:
+        if rule['destination'].startswith('/prerender/'):
+            assert rule['has'][0]['value'] == f'(?<slug>{prerender.REWRITE_SLUG_RE.pattern})'
+
+
+def test_every_rewritable_slug_gets_a_page(tree):
+    result = prerender.build(workers=1)
+    assert sorted(result['rendered']) == ['recipe/encebollado', 'recipe/sin-titulo']
+    page = (tree / 'prerender' / 'recipe' / 'encebollado.html').read_text(encoding='utf-8')
+    assert '<title>Encebollado manabita' in page and 'id="prerender-data"' in page
+    # titleless records fall back to the client-rendered template
+    assert (tree / 'prerender' / 'recipe' / 'sin-titulo.html').read_text(encoding='utf-8') == \
+        (tree / 'recipe.html').read_text(encoding='utf-8')
+
+
+def test_only_the_canonical_link_is_rewritten(tree):
+    prerender.build(workers=1)
+    page = (tree / 'prerender' / 'recipe' / 'encebollado.html').read_text(encoding='utf-8')
+    assert '<link rel="canonical" href="https://ecuadoralacarta.com/recipe.html?slug=encebollado"' in page
+    assert '<link rel="alternate" hreflang="es-EC" href="https://ecuadoralacarta.com/recipe.html"' in page
+
+
+def test_fresh_checkout_restores_pages_without_rendering(tree):
+    prerender.build(workers=1)
+    shutil.rmtree(tree / 'prerender')
+    result = prerender.build(workers=1)
+    assert result['rendered'] == []
+    assert (tree / 'prerender' / 'recipe' / 'encebollado.html').exists()
+
+    (tree / 'recipes.json').write_text(json.dumps(RECIPES[:1]), encoding='utf-8')
+    result = prerender.build(workers=1)
+    assert result['removed'] == ['recipe/sin-titulo.html']
+    assert not (tree / 'persisted' / 'prerender' / 'recipe' / 'sin-titulo.html').exists()
@@ -0,0 +1,54 @@
+import pytest
+
+import price_refresh
+
+
+def _entry():
+    return {'ingredient': 'cebolla', 'reference_price_min': 1.2, 'reference_price_max': 1.8, 'unit': 'kg'}
+
+
+def test_apply_matches_keeps_reference_band():
+    entry = _entry()
+    price_refresh.apply_matches(entry, {'tuti': {'name': 'Cebolla paiteña 500 g', 'price': 0.45, 'unit_price': 0.9},
+                                        'supermaxi': {'name': 'Cebolla blanca kg', 'price': 2.1, 'unit_price': 2.1}},
+                                '2026-01-01')
+    assert (entry['reference_price_min'], entry['reference_price_max']) == (1.2, 1.8)
+    assert (entry['price_min'], entry['price_max']) == (0.9, 2.1)
+    assert entry['tuti']['unit_price'] == 0.9 and entry['updated'] == '2026-01-01'
+    assert entry['source'] == 'scraping'
+
+
+def test_repeated_refreshes_do_not_drift():
+    # Each accepted price is checked against the curated band, not against the previous match
+    entry = _entry()
+    for price in (2.5, 3.5, 6.0):
+        match, _ = price_refresh.best_match('cebolla', [{'name': 'Cebolla paiteña 1 kg', 'price': price}], entry)
+        price_refresh.apply_matches(entry, {'tuti': match}, '2026-01-01')
+    assert entry['reference_price_min'] == 1.2
+    assert entry['tuti'] is None and entry['price_min'] == 1.2
+    assert entry['source'] == 'referencia_mercado'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Camarón 400 g', (400.0, 'g')), ('Aceite 900ml', (900.0, 'ml')), ('Fréjol 2 lb', (907.2, 'g')),
+    ('Leche 1 L', (1000.0, 'ml')), ('Queso 1,5 kg', (1500.0, 'g')), ('Camarón grande', (1.0, 'unidad')),
+    ('Lengua', (1.0, 'unidad')),
+])
+def test_pack_size(name, expected):
+    assert price_refresh.pack_size(name) == pytest.approx(expected)
+
+
+def test_package_prices_are_converted_to_the_entry_unit():
+    # Camarón 400 g at $4.49 is $11.23/kg: inside a 7-12/kg band only once converted
+    entry = {'unit': 'kg', 'reference_price_min': 7, 'reference_price_max': 12}
+    match, _ = price_refresh.best_match('camaron', [{'name': 'Camarón 400 g', 'price': 4.49}], entry)
+    assert match['unit_price'] == 11.23 and match['price'] == 4.49
+    # A bare per-package price cannot be compared to a per-kg band
+    match, reason = price_refresh.best_match('camaron', [{'name': 'Camarón grande', 'price': 4.49}], entry)
+    assert match is None and 'pack size' in reason
+    assert price_refresh.unit_price({'name': 'Cilantro', 'price': 0.5}, 'atado') == 0.5
+
+
+def test_score_product_whole_words():
+    assert price_refresh.score_product('ajo', 'Estropajo de acero') < price_refresh.MIN_SCORE
+    assert price_refresh.score_product('cebolla', 'Cebolla paiteña') >= price_refresh.MIN_SCORE
@@ -0,0 +1,87 @@
+import json
+
+from quality_gate import ERROR, Gate, main, run
+
+DESCRIPTION = 'Tortillas de papa rellenas de queso, doradas en manteca de color y servidas con salsa de maní.'
+
+
+def recipe(**fields):
+    record = {'slug': 'llapingachos', 'title': 'Llapingachos ecuatorianos', 'description': DESCRIPTION,
+              'keywords': ['papa', 'queso'], 'image_url': 'images/llapingachos.jpg', 'region': 'Sierra',
+              'category': 'Platos fuertes', 'ingredients': ['1 kg de papa'], 'instructions': ['Cocinar las papas.']}
+    record.update(fields)
+    return record
+
+
+def rules(violations, severity=ERROR):
+    return sorted(rule for rule, sev, _ in violations if sev == severity)
+
+
+def test_normalizes_legacy_shapes():
+    record = Gate('recipes').normalize(recipe(
+        title='  Llapingachos ecuatorianos ',
+        keywords='papa, queso', seo_keywords=['queso', 'Sierra'],
+        ingredients=[{'quantity': '1 kg', 'name': 'papa chola', 'where_to_buy': 'mercado'}],
+        instructions=[{'text': 'Cocinar las papas.'}, {'step': 'Formar las tortillas.'}],
+        faqs=[{'question': '¿Con qué se sirven?', 'answer': 'Con chorizo.'}, {'question': 'Sin respuesta'}],
+        origin_cities=['Quito'], difficulty='fácil', tips=None,
+    ))
+    assert record['title'] == 'Llapingachos ecuatorianos'
+    assert record['keywords'] == ['papa', 'queso', 'Sierra']
+    assert 'seo_keywords' not in record and 'tips' not in record
+    assert record['ingredients'] == ['1 kg de papa chola (mercado)']
+    assert record['instructions'] == ['Cocinar las papas.', 'Formar las tortillas.']
+    assert record['faqs'] == [{'q': '¿Con qué se sirven?', 'a': 'Con chorizo.'}]
+    assert record['origin_cities'] == [{'city': 'Quito', 'province': 'Pichincha', 'region': 'Sierra'}]
+    assert record['difficulty'] == 'Facil'
+
+
+def test_keywords_keep_their_position():
+    record = Gate('recipes').normalize({'slug': 'x', 'seo_keywords': 'a, b', 'title': 't'})
+    assert list(record) == ['slug', 'keywords', 'title']
+
+
+def test_post_category_and_valid_record():
+    gate = Gate('posts')
+    post = gate.normalize({'slug': 'quito', 'title': 'Qué comer en Quito', 'description': DESCRIPTION,
+                           'keywords': ['quito'], 'image_url': '/images/quito.jpg', 'region': 'Sierra',
+                           'category': 'Gastronomía|Destinos', 'content': '<p>' + 'Quito ' * 10 + '</p>'})
+    assert post['category'] == 'Gastronomia'
+    assert gate.validate(post) == []
+
+
+def test_validation_errors():
+    gate = Gate('recipes')
+    assert rules(gate.validate(gate.normalize(recipe()))) == []
+    assert rules(gate.validate(recipe(region='Luna', description='corta', slug='No Slug'))) == \
+        ['description.min_len', 'region.enum', 'slug.pattern']
+    violations = gate.validate(recipe(extra=1, ingredients=[]))
+    assert rules(violations) == ['ingredients.required']
+    assert ('unknown_field', 'warning', 'extra') in violations
+
+
+def _write(path, records):
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+
+def test_warn_only_flags_but_keeps_every_record(tmp_path, capsys):
+    path = tmp_path / 'recipes.json'
+    _write(path, [recipe(), recipe(slug='luna', region='Luna', description='Corta')])
+
+    report = run([path], fix=True, review=tmp_path / 'review')
+    assert report.flagged == ['recipes.json: luna (description.min_len, region.enum)']
+    assert [r['slug'] for r in json.loads(path.read_text(encoding='utf-8'))] == ['llapingachos', 'luna']
+    flagged = json.loads((tmp_path / 'review' / 'recipes.json').read_text(encoding='utf-8'))
+    assert [r['slug'] for r in flagged] == ['luna']
+
+    assert main([str(path), '--fix', '--warn-only', str(tmp_path / 'review'), '-q']) == 0
+    assert 'recipes.json: luna' in capsys.readouterr().err
+    assert main([str(path), '-q']) == 1
+
+
+def test_fix_only_rewrites_changed_files(tmp_path):
+    path = tmp_path / 'recipes.json'
+    _write(path, [recipe()])
+    before = path.stat().st_mtime_ns
+    assert run([path], fix=True).changed == 0
+    assert path.stat().st_mtime_ns == before
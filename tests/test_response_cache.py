@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from response_cache import CacheMiss, Cassette, CachingClient, ResponseStore, endpoint_of, request_key
+
+SEARCH = 'https://www.googleapis.com/youtube/v3/search'
+
+
+def test_key_ignores_credentials_query_order_and_json_key_order():
+    a = request_key('get', SEARCH + '?q=locro&part=snippet&key=SECRET1')
+    b = request_key('GET', 'HTTPS://WWW.googleapis.com:443/youtube/v3/search?part=snippet&q=locro&key=SECRET2')
+    assert a == b
+    assert a != request_key('GET', SEARCH + '?q=fanesca&part=snippet')
+    assert request_key('POST', 'https://api.x.ai/v1/chat/completions', '{"a": 1, "b": 2}') == \
+        request_key('POST', 'https://api.x.ai/v1/chat/completions', b'{"b":2,"a":1}')
+    assert endpoint_of('GET', SEARCH + '?q=x') == 'youtube_search'
+    assert endpoint_of('PUT', 'https://api.github.com/repos/x/y/contents/recipes.json') is None
+
+
+def test_store_dedupes_bodies_and_evicts_least_recently_used(tmp_path):
+    store = ResponseStore(tmp_path, max_bytes=10)
+    store.put('k1', 'youtube_search', 'GET', SEARCH, 200, 'application/json', b'12345')
+    store.put('k2', 'youtube_search', 'GET', SEARCH, 200, 'application/json', b'12345')
+    assert store.total_bytes == 5  # one object, two keys
+    store.lookup('k1')
+    store.put('k3', 'youtube_search', 'GET', SEARCH, 200, 'application/json', b'abcdefgh')
+    assert list(store.index) == ['k3'] and store.stats['evicted'] == 2
+    assert store.lookup('k1') is None and store.lookup('k3').body == b'abcdefgh'
+
+
+class Upstream(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.hits += 1
+        body = json.dumps({'path': self.path, 'n': self.server.hits}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def upstream():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Upstream)
+    httpd.hits = 0
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_record_then_replay_without_network(tmp_path, upstream):
+    base = f'http://127.0.0.1:{upstream.server_port}'
+    tape = tmp_path / 'run.json'
+    with CachingClient(ResponseStore(tmp_path / 'store'), 'record', Cassette(tape)) as client:
+        first = client.request('GET', base + '/videos?id=a&key=SECRET').json()
+        second = client.request('GET', base + '/videos?id=b').json()
+    upstream.shutdown()
+
+    assert 'SECRET' not in tape.read_text(encoding='utf-8')
+    with CachingClient(ResponseStore(tmp_path / 'store'), 'replay', Cassette(tape)) as client:
+        # Same key first; a different query on the same route gets the next recorded answer.
+        assert client.request('GET', base + '/videos?key=OTHER&id=a').json() == first
+        assert client.request('GET', base + '/videos?id=zzz').json() == second
+        with pytest.raises(CacheMiss):
+            client.request('GET', base + '/videos?id=c')
+    assert upstream.hits == 2
@@ -0,0 +1,36 @@
+import json
+
+from run import load_history, run_task, trends
+
+SCRIPT = '''import sys
+from site_data import count
+
+count('widgets', 3)
+sys.exit(int(sys.argv[1]))
+'''
+
+
+def test_runs_are_appended_to_the_history(tmp_path):
+    script = tmp_path / 'tiny.py'
+    script.write_text(SCRIPT, encoding='utf-8')
+    history = tmp_path / 'runs' / 'history.jsonl'
+
+    ok = run_task('tiny', script, ['0'], root=tmp_path, history=history)
+    failed = run_task('tiny', script, ['2'], root=tmp_path, history=history, batch='b1')
+    assert (ok['status'], ok['exit']) == ('ok', 0)
+    assert failed['exit'] == 2 and failed['status'] != 'ok' and failed['batch'] == 'b1'
+
+    with open(history, 'a', encoding='utf-8') as f:
+        f.write('{"id": "cut off mid-wr')  # an interrupted append is skipped, not fatal
+    runs = load_history(history)
+    assert [r['id'] for r in runs] == [ok['id'], failed['id']]
+    assert runs[0]['items'] == {'widgets': 3} and runs[0]['args'] == ['0']
+    assert json.loads(history.read_text(encoding='utf-8').splitlines()[1])['command'] == 'tiny'
+    assert list(tmp_path.joinpath('runs').glob('.run-*')) == []  # metrics temp files are cleaned up
+
+
+def test_trend_compares_the_latest_run_with_the_median_before_it():
+    runs = [{'command': 'prerender', 'status': 'ok', 'seconds': s} for s in (1.0, 1.2, 1.1, 2.0)]
+    runs.append({'command': 'prerender', 'status': 'failed', 'seconds': 9.0})
+    (row,) = trends(runs, window=3)
+    assert row['seconds'] == 2.0 and row['median_before'] == 1.1 and row['slower']
@@ -0,0 +1,96 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from scaling import ScalingTable, format_number, format_quantity
+from site_data import DEFAULT_SERVINGS, parse_servings
+
+SCALING_JS = Path(__file__).resolve().parent.parent / 'js' / 'scaling.js'
+
+RECIPES = [
+    {'slug': 'locro', 'servings': '4 porciones', 'ingredients': [
+        '1 kg de papa chola', '2 tazas de leche', '1 cucharadita de sal', '3 dientes de ajo, picados',
+        '1 cebolla mediana', '250 g de queso fresco', 'Al gusto Cilantro']},
+    {'slug': 'caldo', 'servings': 2, 'ingredients': ['450 g de carne molida', '500 ml de caldo']},
+]
+
+
+@pytest.fixture(scope='module')
+def table():
+    return ScalingTable.from_recipes(RECIPES)
+
+
+@pytest.mark.parametrize('value, servings', [('4 porciones', 4), (6, 6), ('', DEFAULT_SERVINGS),
+                                             ('0', DEFAULT_SERVINGS), (None, DEFAULT_SERVINGS),
+                                             ('al gusto', DEFAULT_SERVINGS)])
+def test_parse_servings(value, servings):
+    assert parse_servings(value) == servings
+
+
+@pytest.mark.parametrize('value, unit, text', [
+    (112.5, 'g', '115'),        # half up, like Math.round (round() gives 110)
+    (12.5, 'ml', '13'),
+    (237.4, 'g', '235'),
+    (0.2, 'g', '1'),
+    (10.5, 'unidad', '11'),
+    (1.5, 'taza', '1 1/2'),
+    (0.3333, 'taza', '1/3'),
+    (0.05, 'unidad', '1/4'),
+    (2.9, 'unidad', '3'),
+])
+def test_format_number(value, unit, text):
+    assert format_number(value, unit) == text
+
+
+def test_format_quantity_changes_unit_within_family():
+    assert format_quantity(1500, 'g') == '1 1/2 kg'
+    assert format_quantity(30, 'taza') == '2 cucharadas'
+    assert format_quantity(240, 'cucharada') == '1 taza'
+    assert format_quantity(2, 'diente') == '2 dientes'
+
+
+def test_render(table):
+    assert table.render('locro', 4) == [
+        '1 kg de papa chola', '2 tazas de leche', '1 cucharadita de sal', '3 dientes de ajo, picados',
+        '1 cebolla mediana', '250 g de queso fresco', 'Al gusto Cilantro']
+    lines = table.render('locro', 8)
+    assert lines[:2] == ['2 kg de papa chola', '4 tazas de leche']
+    # Spices grow sub-linearly: 2 ** 0.75 = 1.68 cucharaditas, ajo is a spice too
+    assert lines[2] == '1 2/3 cucharaditas de sal'
+    assert lines[3] == '5 dientes de ajo, picados'
+    assert lines[-1] == 'Al gusto Cilantro'
+    assert table.render('caldo', 1) == ['225 g de carne molida', '250 ml de caldo']
+
+
+def test_shopping_list_merges_by_name_and_dimension(table):
+    items = dict(table.shopping_list([('locro', 4), ('caldo', 4)]))
+    assert items['papa chola'] == '1 kg'
+    assert items['carne molida'] == '900 g'
+    assert items['cilantro'] == ''
+
+
+def test_json_round_trip(table, tmp_path):
+    path = tmp_path / 'scaling.json'
+    table.save(path)
+    loaded = ScalingTable.load(path, recipes=RECIPES)
+    assert loaded.render('locro', 6) == table.render('locro', 6)
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason='node not installed')
+def test_js_renders_the_same_lines(table, tmp_path):
+    module = tmp_path / 'scaling.mjs'
+    shutil.copy(SCALING_JS, module)
+    (tmp_path / 'scaling.json').write_text(json.dumps(table.to_json()), encoding='utf-8')
+    cases = [(slug, n) for slug in table.slugs for n in (1, 3, 5, 7, 12)]
+    script = f"""
+        import fs from 'fs';
+        globalThis.fetch = async () => ({{ ok: true, json: async () => JSON.parse(fs.readFileSync({json.dumps(str(tmp_path / 'scaling.json'))}, 'utf8')) }});
+        const {{ loadScalingTable, scaleRecipe }} = await import({json.dumps(module.as_uri())});
+        const table = await loadScalingTable();
+        console.log(JSON.stringify({json.dumps(cases)}.map(([slug, n]) => scaleRecipe(table, slug, n))));
+    """
+    out = subprocess.run(['node', '--input-type=module', '-e', script], capture_output=True, text=True, check=True)
+    assert json.loads(out.stdout) == [table.render(slug, n) for slug, n in cases]
@@ -0,0 +1,85 @@
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from build_search_index import STOPWORDS, build_index, search, tokenize
+
+JS_DIR = Path(__file__).resolve().parent.parent / 'js'
+SEARCH_JS = JS_DIR / 'search.js'
+
+RECIPES = [
+    {'slug': 'llapingachos', 'title': 'Llapingachos con salsa de maní', 'description': 'Tortillas de papa',
+     'ingredients': ['1 kg de papa chola', '200 g de queso fresco (comprar en Supermaxi)'], 'region': 'Sierra'},
+    {'slug': 'encebollado', 'title': 'Encebollado', 'description': 'Sopa de albacora con yuca',
+     'ingredients': ['500 g de albacora', '1 kg de yuca'], 'region': 'Costa'},
+]
+POSTS = [{'slug': 'quito', 'title': 'Qué comer en Quito', 'category': 'Destinos|Gastronomía'}]
+
+
+def test_tokenize_folds_and_drops_stopwords():
+    assert tokenize('Llapingachos con Maní, AJÍ y 2 papas') == ['llapingachos', 'mani', 'aji', 'papas']
+
+
+@pytest.mark.parametrize('query', ['', 'a', 'de', 'con', 's', 'de la'])
+def test_queries_without_terms(query):
+    # script.js falls back to its substring filter for these
+    assert tokenize(query) == []
+
+
+def test_stopwords_match_search_js():
+    js_words = re.search(r"const STOPWORDS = new Set\('([^']*)'", SEARCH_JS.read_text(encoding='utf-8')).group(1)
+    assert frozenset(js_words.split()) == STOPWORDS
+
+
+def test_prefix_and_conjunction():
+    index = build_index(RECIPES, POSTS)
+    assert [slug for _, _, slug in search(index, 'llapinga')] == ['llapingachos']
+    assert [slug for _, _, slug in search(index, 'sopa yuc')] == ['encebollado']
+    assert search(index, 'papa albacora') == []
+    assert search(index, 'de') == []
+
+
+def test_ingredient_notes_are_not_indexed():
+    index = build_index(RECIPES, POSTS)
+    assert 'supermaxi' not in index['terms']
+    assert [kind for _, kind, _ in search(index, 'destinos')] == ['p']
+
+
+# More terms share the prefix "co" than any old expansion cap; "costa*" sorts last.
+MANY = [{'slug': f'r{i}', 'title': f'co{chr(97 + i // 26)}{chr(97 + i % 26)}x'} for i in range(60)] + \
+    [{'slug': 'costa', 'title': 'Costa'}, {'slug': 'costeno', 'title': 'Costeño'}]
+
+
+def _slugs(results):
+    return {slug for _, _, slug in results}
+
+
+def test_prefix_results_only_shrink_as_the_query_grows():
+    index = build_index(MANY, [])
+    assert len([t for t in index['terms'] if t.startswith('co')]) > 60
+    co, cos, cost = (_slugs(search(index, q, limit=None)) for q in ('co', 'cos', 'cost'))
+    assert {'costa', 'costeno'} <= co
+    assert cost <= cos <= co
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason='node not installed')
+def test_js_search_expands_every_prefix_term(tmp_path):
+    for name in ('search.js', 'prices.js', 'utils.js'):
+        shutil.copy(JS_DIR / name, tmp_path / name)
+    (tmp_path / 'package.json').write_text('{"type": "module"}')
+    index = build_index(MANY, [])
+    script = f"""
+        globalThis.window = {{ location: {{ pathname: '/' }} }};
+        globalThis.document = {{ addEventListener() {{}} }};
+        const {{ searchIndex }} = await import({json.dumps((tmp_path / 'search.js').as_uri())});
+        const index = {json.dumps(index)};
+        console.log(JSON.stringify(['co', 'cos'].map(q => searchIndex(index, q, 'r').map(r => r.slug))));
+    """
+    out = subprocess.run(['node', '--input-type=module', '-e', script], capture_output=True, text=True, check=True)
+    co, cos = (set(x) for x in json.loads(out.stdout))
+    assert {'costa', 'costeno'} <= co
+    assert cos <= co